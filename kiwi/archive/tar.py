@@ -16,11 +16,34 @@
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
 import os
+import json
+import logging
+import tarfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import (
+    IO, Any, Deque, List, Optional
+)
 
 # project
+import kiwi.defaults as defaults
+
 from kiwi.command import Command
 from kiwi.defaults import Defaults
+from kiwi.utils.codec import Codec
+from kiwi.utils.compress import (
+    COMPRESSION_FORMATS, Compress, CompressCodecBase
+)
 from kiwi.utils.command_capabilities import CommandCapabilities
+from kiwi.utils.temporary import Temporary
+
+from kiwi.exceptions import (
+    KiwiArchiveTarError,
+    KiwiCommandError
+)
+
+log = logging.getLogger('kiwi')
 
 
 class ArchiveTar:
@@ -33,17 +56,32 @@ class ArchiveTar:
     Moreover tarfile lacks support for xz compression under
     Python v2.7.
 
+    Compressed archives are created and extracted through the
+    multithreaded compression tools. An indexed archive consists
+    of independently compressed chunks of the tar data, which is
+    still a valid compressed file for all tools. The index file
+    stored next to the archive lists the chunks and the position
+    of every member, such that single members can be extracted
+    by uncompressing only the chunks containing them.
+
     :param string filename:
         filename to use for archive extraction or creation
     :param bool create_from_file_list:
         use file list not entire directory to create the archive
     :param list file_list:
         list of files and directorie names to archive
+    :param int member_count:
+        number of members of the created archive, if counted
+    :param int uncompressed_size:
+        size of the uncompressed tar data of the created archive,
+        if counted
     """
     def __init__(self, filename, create_from_file_list=True, file_list=None):
         self.filename = filename
         self.create_from_file_list = create_from_file_list
         self.file_list = file_list
+        self.member_count = None
+        self.uncompressed_size = None
 
         if CommandCapabilities.check_version('tar', (1, 27)):
             self.xattrs_options = [
@@ -90,7 +128,8 @@ class ArchiveTar:
         return self.filename
 
     def create_xz_compressed(
-        self, source_dir, exclude=None, options=None, xz_options=None
+        self, source_dir, exclude=None, options=None, xz_options=None,
+        indexed=False
     ):
         """
         Create XZ compressed tar archive
@@ -99,46 +138,256 @@ class ArchiveTar:
         :param list exclude: list of excluded items
         :param list options: custom tar creation options
         :param list xz_options: custom xz compression options
+        :param bool indexed: create indexed archive
         """
         if not options:
             options = []
         if not xz_options:
             xz_options = Defaults.get_xz_compression_options()
-        bash_command = [
-            'tar', '-C', source_dir
-        ] + options + self.xattrs_options + [
-            '-c', '--to-stdout'
-        ] + self._get_archive_items(source_dir, exclude) + [
-            '|', 'xz', '-f'
-        ] + xz_options + [
-            '>', self.filename + '.xz'
-        ]
-        Command.run(['bash', '-c', ' '.join(bash_command)])
-        return self.filename + '.xz'
-
-    def create_gnu_gzip_compressed(self, source_dir, exclude=None):
+        return self._create_compressed(
+            'xz', [
+                'tar', '-C', source_dir
+            ] + options + self.xattrs_options + [
+                '-c', '--to-stdout'
+            ] + self._get_archive_items(source_dir, exclude),
+            xz_options, indexed
+        )
+
+    def create_zstd_compressed(
+        self, source_dir, exclude=None, options=None, zstd_options=None,
+        indexed=False
+    ):
+        """
+        Create zstd compressed tar archive
+
+        :param string source_dir: data source directory
+        :param list exclude: list of excluded items
+        :param list options: custom tar creation options
+        :param list zstd_options: custom zstd compression options
+        :param bool indexed: create indexed archive
+        """
+        if not options:
+            options = []
+        if not zstd_options:
+            zstd_options = Defaults.get_zstd_compression_options()
+        return self._create_compressed(
+            'zstd', [
+                'tar', '-C', source_dir
+            ] + options + self.xattrs_options + [
+                '-c', '--to-stdout'
+            ] + self._get_archive_items(source_dir, exclude),
+            zstd_options, indexed
+        )
+
+    def create_gzip_compressed(
+        self, source_dir, exclude=None, options=None, gzip_options=None
+    ):
+        """
+        Create gzip compressed tar archive in one pass
+
+        The tar data is compressed while it is written, by pigz
+        if installed. The number of members and the size of the
+        uncompressed tar data are counted on the way and provided
+        in member_count and uncompressed_size
+
+        :param string source_dir: data source directory
+        :param list exclude: list of excluded items
+        :param list options: custom tar creation options
+        :param list gzip_options: custom gzip compression options
+        """
+        if not options:
+            options = []
+        return self._create_compressed(
+            'gzip', [
+                'tar', '-C', source_dir
+            ] + options + self.xattrs_options + [
+                '-c', '--to-stdout'
+            ] + self._get_archive_items(source_dir, exclude),
+            gzip_options, indexed=False, counted=True
+        )
+
+    def create_gnu_gzip_compressed(
+        self, source_dir, exclude=None, indexed=False
+    ):
         """
         Create gzip compressed tar archive
 
+        The data is compressed by pigz if installed
+
         :param string source_dir: data source directory
         :param list exclude: list of excluded items
+        :param bool indexed: create indexed archive
         """
-        Command.run(
-            [
+        return self._create_compressed(
+            'gzip', [
                 'tar', '-C', source_dir,
-                '--format=gnu', '-cSz', '-f', self.filename + '.gz'
-            ] + self._get_archive_items(source_dir, exclude)
+                '--format=gnu', '-cS', '--to-stdout'
+            ] + self._get_archive_items(source_dir, exclude),
+            None, indexed
         )
-        return self.filename + '.gz'
 
-    def extract(self, dest_dir):
+    def extract(self, dest_dir, files=None):
         """
         Extract tar archive contents
 
+        Compressed archives are uncompressed by the codec of the
+        detected compression format. If members are requested
+        from an indexed archive, only the chunks containing
+        them are uncompressed
+
         :param string dest_dir: target data directory
+        :param list files: list of members to extract, all by default
         """
+        if files:
+            index = self._read_index()
+            if index:
+                self._extract_indexed(dest_dir, files, index)
+                return
+        zipper = Compress(self.filename).get_format() \
+            if os.path.isfile(self.filename) else None
+        if zipper:
+            Compress.get_codec(zipper).uncompress_command(
+                ['tar', '-C', dest_dir, '-x', '-v', '-f', '-'] + (files or []),
+                self.filename
+            )
+        else:
+            Command.run(
+                [
+                    'tar', '-C', dest_dir, '-x', '-v', '-f', self.filename
+                ] + (files or [])
+            )
+
+    def _create_compressed(
+        self, zipper, command, options, indexed, counted=False
+    ):
+        codec = Compress.get_codec(zipper)
+        filename = self.filename + COMPRESSION_FORMATS[zipper].suffix
+        if not indexed and not counted:
+            codec.compress_command(command, filename, options)
+            return filename
+        call = Command.call(command)
+        members = []
+        parse_error = None
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # stderr is read in parallel, a full pipe would block tar
+            error = executor.submit(call.error.read)
+            try:
+                with ExitStack() as stack:
+                    stack.enter_context(call.output)
+                    if indexed:
+                        target = ArchiveTarChunkCompressor(
+                            stack.enter_context(open(filename, 'wb')),
+                            codec, options
+                        )
+                        stack.callback(target.close)
+                    else:
+                        target = stack.enter_context(
+                            codec.open_writer(filename, options)
+                        )
+                    reader = ArchiveTarReader(call.output, target)
+                    try:
+                        # the members are read from the tar stream while
+                        # it is passed on to the compression
+                        with tarfile.open(fileobj=reader, mode='r|') as tar:
+                            for member in tar:
+                                members.append(
+                                    (
+                                        os.path.normpath(member.name),
+                                        member.offset
+                                    )
+                                )
+                            end = tar.offset
+                    except tarfile.TarError as issue:
+                        parse_error = issue
+                    while reader.read(defaults.COMPRESS_BUFFER_SIZE):
+                        pass
+            except Exception:
+                # tar must not stay blocked on its full output pipe
+                call.process.kill()
+                call.process.wait()
+                raise
+            error_output = Codec.decode(error.result())
+        if call.process.wait() != 0:
+            raise KiwiCommandError(
+                '{0}: stderr: {1}'.format(command[0], error_output)
+            )
+        if parse_error:
+            raise KiwiArchiveTarError(
+                'Failed to read members of {0}: {1}'.format(
+                    filename, parse_error
+                )
+            )
+        self.member_count = len(members)
+        self.uncompressed_size = reader.size
+        if indexed:
+            ends = [offset for name, offset in members[1:]] + [end]
+            with open(filename + '.index', 'w') as index:
+                json.dump(
+                    {
+                        'format': zipper,
+                        'size': os.path.getsize(filename),
+                        'chunks': target.chunks,
+                        'members': {
+                            name: [offset, member_end]
+                            for (name, offset), member_end
+                            in zip(members, ends)
+                        }
+                    }, index
+                )
+        return filename
+
+    def _read_index(self):
+        try:
+            with open(self.filename + '.index') as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return None
+        if index.get('size') != os.path.getsize(self.filename):
+            log.warning(
+                'Ignoring outdated archive index of {0}'.format(self.filename)
+            )
+            return None
+        return index
+
+    def _extract_indexed(self, dest_dir, files, index):
+        codec = Compress.get_codec(index['format'])
+        members = set()
+        for name in files:
+            name = os.path.normpath(name)
+            if name not in index['members']:
+                raise KiwiArchiveTarError(
+                    '{0} not found in {1}'.format(name, self.filename)
+                )
+            # a directory is extracted with all members below it
+            prefix = '' if name == '.' else name + os.sep
+            for member_name, member in index['members'].items():
+                if member_name == name or member_name.startswith(prefix):
+                    members.add(tuple(member))
+        member_archive = Temporary(prefix='kiwi_archive.').new_file()
+        chunk = None
+        data = b''
+        with open(self.filename, 'rb') as archive:
+            # the members are read in archive order, every chunk
+            # is uncompressed only once
+            for start, end in sorted(members):
+                for chunk_data in index['chunks']:
+                    offset, size, compressed_offset, compressed_size = \
+                        chunk_data
+                    if offset < end and offset + size > start:
+                        if chunk != chunk_data:
+                            archive.seek(compressed_offset)
+                            data = codec.uncompress_bytes(
+                                archive.read(compressed_size)
+                            )
+                            chunk = chunk_data
+                        member_archive.write(
+                            data[max(start - offset, 0):end - offset]
+                        )
+        # two zero blocks mark the end of the archive
+        member_archive.write(bytes(1024))
+        member_archive.flush()
         Command.run(
-            ['tar', '-C', dest_dir, '-x', '-v', '-f', self.filename]
+            ['tar', '-C', dest_dir, '-x', '-v', '-f', member_archive.name]
         )
 
     def _get_archive_items(self, source_dir, exclude_list):
@@ -171,3 +420,137 @@ class ArchiveTar:
             archive_items.append('--exclude')
             archive_items.append('./' + exclude)
         return archive_items
+
+
+class ArchiveTarReader:
+    """
+    **Read tar data while passing it on**
+
+    A readable stream passing on the data read from the source
+    to the target and counting the number of bytes
+
+    :param io source: readable binary stream of the tar data
+    :param io target: writable binary stream
+    """
+    def __init__(self, source: IO[bytes], target: Any) -> None:
+        self.source = source
+        self.target = target
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read data from the source and write it to the target
+
+        :param int size: number of bytes to read
+
+        :return: data read
+
+        :rtype: bytes
+        """
+        data = self.source.read(size)
+        if data:
+            self.target.write(data)
+            self.size += len(data)
+        return data
+
+
+class ArchiveTarChunkCompressor:
+    """
+    **Compression of tar data in independent chunks**
+
+    A writable stream splitting the data into chunks which
+    are compressed in parallel and written to the target in order.
+    All CPUs are busy with compressing chunks, thus every chunk is
+    compressed by a single thread and the zstd long distance
+    matching window is limited to the chunk size
+
+    :param io target: writable binary stream of the compressed data
+    :param CompressCodecBase codec: codec of the compression format
+    :param list options: compression options
+    """
+    def __init__(
+        self, target: IO[bytes], codec: CompressCodecBase,
+        options: List[str] = None
+    ) -> None:
+        self.target = target
+        self.codec = codec
+        self.options = self._get_chunk_options(options)
+        self.buffer = bytearray()
+        self.offset = 0
+        self.compressed_offset = 0
+        self.chunks: List[List[int]] = []
+        self.workers = os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.pending: Deque = deque()
+
+    def write(self, data: bytes) -> int:
+        """
+        Add data to the chunks, full chunks are compressed
+
+        :param bytes data: data to write
+
+        :return: number of bytes written
+
+        :rtype: int
+        """
+        self.buffer += data
+        while len(self.buffer) >= defaults.ARCHIVE_INDEX_CHUNK_SIZE:
+            self._submit(
+                bytes(self.buffer[:defaults.ARCHIVE_INDEX_CHUNK_SIZE])
+            )
+            del self.buffer[:defaults.ARCHIVE_INDEX_CHUNK_SIZE]
+        return len(data)
+
+    def close(self) -> None:
+        """
+        Compress the remaining data and write all pending chunks
+        """
+        try:
+            if self.buffer:
+                self._submit(bytes(self.buffer))
+                self.buffer = bytearray()
+            while self.pending:
+                self._write_chunk()
+        finally:
+            self.executor.shutdown()
+
+    def _get_chunk_options(self, options: Optional[List[str]]) -> List[str]:
+        if options is None:
+            options = self.codec.compression_format.compress_options
+        chunk_options = []
+        for option in options:
+            if option.startswith(('--threads=', '-T')):
+                continue
+            if option.startswith('--long'):
+                option = '--long={0}'.format(
+                    defaults.ARCHIVE_INDEX_CHUNK_SIZE.bit_length() - 1
+                )
+            chunk_options.append(option)
+        if self.codec.name in ('xz', 'zstd'):
+            chunk_options.append('--threads=1')
+        elif getattr(self.codec, 'tool', None) == 'pigz':
+            chunk_options += ['-p', '1']
+        return chunk_options
+
+    def _submit(self, data: bytes) -> None:
+        # the number of chunks in memory is bounded
+        if len(self.pending) >= 2 * self.workers:
+            self._write_chunk()
+        self.pending.append(
+            (
+                len(data),
+                self.executor.submit(
+                    self.codec.compress_bytes, data, self.options
+                )
+            )
+        )
+
+    def _write_chunk(self) -> None:
+        size, compressed = self.pending.popleft()
+        data = compressed.result()
+        self.target.write(data)
+        self.chunks.append(
+            [self.offset, size, self.compressed_offset, len(data)]
+        )
+        self.offset += size
+        self.compressed_offset += len(data)
@@ -42,6 +42,7 @@ class ArchiveBuilder:
     :param str root_dir: root directory path name
     :param dict custom_args: Custom processing arguments defined as hash keys:
         * xz_options: string of XZ compression parameters
+        * zstd_options: string of zstd compression parameters
     """
     def __init__(
         self, xml_state: XMLState, target_dir: str,
@@ -56,9 +57,13 @@ class ArchiveBuilder:
         self.system_setup = SystemSetup(
             xml_state=xml_state, root_dir=self.root_dir
         )
-        self.filename = self._target_file_for('tar.xz')
+        self.filename = self._target_file_for(
+            'tar.zst' if self.requested_archive_type == 'tzst' else 'tar.xz'
+        )
         self.xz_options = custom_args['xz_options'] if custom_args \
             and 'xz_options' in custom_args else None
+        self.zstd_options = custom_args['zstd_options'] if custom_args \
+            and 'zstd_options' in custom_args else None
 
         self.runtime_config = RuntimeConfig()
 
@@ -66,11 +71,13 @@ class ArchiveBuilder:
         """
         Create a root archive tarball
 
-        Build a simple XZ compressed root tarball from the image root tree
+        Build a simple XZ or zstd compressed root tarball from the
+        image root tree
 
         Image types which triggers this builder are:
 
         * image="tbz"
+        * image="tzst"
 
         :return: result
 
@@ -82,57 +89,63 @@ class ArchiveBuilder:
                 'Unknown archive type: %s' % self.requested_archive_type
             )
 
-        if self.requested_archive_type == 'tbz':
-            log.info('Creating XZ compressed tar archive')
-            archive = ArchiveTar(
-                self._target_file_for('tar')
+        exclude = Defaults.get_exclude_list_for_root_data_sync() + \
+            Defaults.get_exclude_list_from_custom_exclude_files(self.root_dir)
+        archive = ArchiveTar(
+            self._target_file_for('tar')
+        )
+        if self.requested_archive_type == 'tzst':
+            log.info('Creating zstd compressed tar archive')
+            archive.create_zstd_compressed(
+                self.root_dir, zstd_options=self.zstd_options,
+                exclude=exclude
             )
+        else:
+            log.info('Creating XZ compressed tar archive')
             archive.create_xz_compressed(
                 self.root_dir, xz_options=self.xz_options,
-                exclude=Defaults.
-                get_exclude_list_for_root_data_sync() + Defaults.
-                get_exclude_list_from_custom_exclude_files(self.root_dir)
-            )
-            Result.verify_image_size(
-                self.runtime_config.get_max_size_constraint(),
-                self.filename
-            )
-            if self.bundle_format:
-                self.result.add_bundle_format(self.bundle_format)
-            self.result.add(
-                key='root_archive',
-                filename=self.filename,
-                use_for_bundle=True,
-                compress=False,
-                shasum=True
-            )
-            self.result.add(
-                key='image_packages',
-                filename=self.system_setup.export_package_list(
-                    self.target_dir
-                ),
-                use_for_bundle=True,
-                compress=False,
-                shasum=False
-            )
-            self.result.add(
-                key='image_changes',
-                filename=self.system_setup.export_package_changes(
-                    self.target_dir
-                ),
-                use_for_bundle=True,
-                compress=True,
-                shasum=False
-            )
-            self.result.add(
-                key='image_verified',
-                filename=self.system_setup.export_package_verification(
-                    self.target_dir
-                ),
-                use_for_bundle=True,
-                compress=False,
-                shasum=False
+                exclude=exclude
             )
+        Result.verify_image_size(
+            self.runtime_config.get_max_size_constraint(),
+            self.filename
+        )
+        if self.bundle_format:
+            self.result.add_bundle_format(self.bundle_format)
+        self.result.add(
+            key='root_archive',
+            filename=self.filename,
+            use_for_bundle=True,
+            compress=False,
+            shasum=True
+        )
+        self.result.add(
+            key='image_packages',
+            filename=self.system_setup.export_package_list(
+                self.target_dir
+            ),
+            use_for_bundle=True,
+            compress=False,
+            shasum=False
+        )
+        self.result.add(
+            key='image_changes',
+            filename=self.system_setup.export_package_changes(
+                self.target_dir
+            ),
+            use_for_bundle=True,
+            compress=True,
+            shasum=False
+        )
+        self.result.add(
+            key='image_verified',
+            filename=self.system_setup.export_package_verification(
+                self.target_dir
+            ),
+            use_for_bundle=True,
+            compress=False,
+            shasum=False
+        )
         return self.result
 
     def _target_file_for(self, suffix: str) -> str:
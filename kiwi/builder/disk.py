@@ -51,11 +51,13 @@ from kiwi.filesystem.squashfs import FileSystemSquashFs
 from kiwi.volume_manager import VolumeManager
 from kiwi.command import Command
 from kiwi.system.setup import SystemSetup
+from kiwi.system.size import SystemSize
 from kiwi.builder.install import InstallImageBuilder
 from kiwi.system.kernel import Kernel
 from kiwi.storage.subformat import DiskFormat
 from kiwi.system.result import Result
 from kiwi.utils.block import BlockID
+from kiwi.utils.block_copy import BlockCopy
 from kiwi.utils.fstab import Fstab
 from kiwi.runtime_config import RuntimeConfig
 from kiwi.partitioner import Partitioner
@@ -204,6 +206,7 @@ class DiskBuilder:
         :rtype: instance of :class:`Result`
         """
         result = self.create_disk()
+        self._log_raw_disk_allocation()
         result = self.create_install_media(result)
         self.append_unpartitioned_space()
         return self.create_disk_format(result)
@@ -405,7 +408,9 @@ class DiskBuilder:
                 'quota_groups':
                     self.xml_state.build_type.get_btrfs_quota_groups(),
                 'resize_on_boot':
-                    self.disk_resize_requested
+                    self.disk_resize_requested,
+                'root_size':
+                    self.disk_setup.rootsize
             }
             volume_manager = VolumeManager.new(
                 self.volume_manager_name, device_map,
@@ -762,13 +767,7 @@ class DiskBuilder:
                                     readonly_target, readonly_target_bytesize
                                 )
                             )
-                            Command.run(
-                                [
-                                    'dd',
-                                    'if=%s' % squashed_root_file.name,
-                                    'of=%s' % readonly_target
-                                ]
-                            )
+                            BlockCopy(squashed_root_file.name, readonly_target).copy()
                         else:
                             filesystem.create_on_device(
                                 label=map_name.upper()
@@ -1261,6 +1260,42 @@ class DiskBuilder:
             self.requested_filesystem, int(boot_partition_id)
         )
 
+    def _log_raw_disk_allocation(self) -> None:
+        disk_stat = os.stat(self.diskname)
+        log.info(
+            '--> Raw disk image size: logical {0} MB, allocated {1} MB'.format(
+                disk_stat.st_size // 1048576,
+                disk_stat.st_blocks * 512 // 1048576
+            )
+        )
+
+    def _log_root_filesystem_usage(self, mountpoint: Optional[str]) -> None:
+        # the prediction of the filesystem size model, calculated
+        # from the root tree index of the disk size calculation
+        predicted_size = self.disk_setup.root_filesystem_size
+        if predicted_size:
+            if not mountpoint:
+                # populated at mkfs time, there is no mount to measure
+                log.info(
+                    '--> {0} root filesystem usage: predicted {1} MB of '
+                    '{2} MB, actual usage not measured for a filesystem '
+                    'populated at creation time'.format(
+                        self.requested_filesystem,
+                        predicted_size.used_bytes // 1048576,
+                        predicted_size.size_bytes // 1048576
+                    )
+                )
+                return
+            log.info(
+                '--> {0} root filesystem usage: predicted {1} MB of {2} MB, '
+                'actual {3} MB'.format(
+                    self.requested_filesystem,
+                    predicted_size.used_bytes // 1048576,
+                    predicted_size.size_bytes // 1048576,
+                    SystemSize.get_used_bytes(mountpoint) // 1048576
+                )
+            )
+
     def _sync_system_to_image(
         self, device_map: Dict, system: Any,
         system_boot: Optional[FileSystemBase],
@@ -1277,7 +1312,7 @@ class DiskBuilder:
             system_custom_part = system_custom_parts[map_name]
             log.info('--> Syncing custom partition(s) data')
             if not system_custom_part.filename:
-                system_custom_part.sync_data()
+                system_custom_part.sync_data(populate=True)
             if device_map.get(f'{map_name}clone1'):
                 log.info(
                     f'--> Dumping {map_name!r} clone data at extra partition'
@@ -1298,7 +1333,7 @@ class DiskBuilder:
         if system_boot:
             log.info('--> Syncing boot data at extra partition')
             system_boot.sync_data(
-                self._get_exclude_list_for_boot_data_sync()
+                self._get_exclude_list_for_boot_data_sync(), populate=True
             )
             if device_map.get('bootclone1'):
                 log.info(
@@ -1348,13 +1383,7 @@ class DiskBuilder:
                     readonly_target, readonly_target_bytesize
                 )
             )
-            Command.run(
-                [
-                    'dd',
-                    'if=%s' % squashed_root_file.name,
-                    'of=%s' % readonly_target
-                ]
-            )
+            BlockCopy(squashed_root_file.name, readonly_target).copy()
             if self.root_filesystem_embed_verity_metadata:
                 squashed_root.create_verification_metadata(
                     readonly_target
@@ -1398,8 +1427,10 @@ class DiskBuilder:
                 uuid=BlockID(root_target).get_uuid()
             )
             filesystem.sync_data(
-                self._get_exclude_list_for_root_data_sync(device_map)
+                self._get_exclude_list_for_root_data_sync(device_map),
+                populate=True
             )
+            self._log_root_filesystem_usage(filesystem.get_mountpoint())
             filesystem.umount()
             filesystem.create_verity_layer(
                 self.root_filesystem_verity_blocks if
@@ -1413,13 +1444,7 @@ class DiskBuilder:
                     root_target, root_target_bytesize
                 )
             )
-            Command.run(
-                [
-                    'dd',
-                    'if=%s' % verity_root_file.name,
-                    'of=%s' % root_target
-                ]
-            )
+            BlockCopy(verity_root_file.name, root_target).copy()
             if self.root_filesystem_embed_verity_metadata:
                 filesystem.create_verification_metadata(
                     root_target
@@ -1432,9 +1457,16 @@ class DiskBuilder:
                     self._get_clone_devices('rootclone', device_map)
                 )
         else:
-            system.sync_data(
-                self._get_exclude_list_for_root_data_sync(device_map)
+            exclude_list = self._get_exclude_list_for_root_data_sync(
+                device_map
             )
+            if self.volume_manager_name:
+                system.sync_data(exclude_list)
+            else:
+                system.sync_data(exclude_list, populate=True)
+            if self.volume_manager_name != 'lvm':
+                # with lvm the root data is spread across the volumes
+                self._log_root_filesystem_usage(system.get_mountpoint())
             if device_map.get('rootclone1'):
                 log.info(
                     '--> Dumping root clone data at extra partition'
@@ -188,7 +188,8 @@ class FileSystemBuilder:
         filesystem.sync_data(
             Defaults.
             get_exclude_list_for_root_data_sync() + Defaults.
-            get_exclude_list_from_custom_exclude_files(self.root_dir)
+            get_exclude_list_from_custom_exclude_files(self.root_dir),
+            populate=True
         )
 
     def _operate_on_file(self) -> None:
@@ -167,7 +167,7 @@ class InstallImageBuilder:
         self.squashed_contents = Temporary(
             prefix='kiwi_install_squashfs.', path=self.target_dir
         ).new_dir()
-        checksum = Checksum(self.diskname)
+        checksum = Checksum(self.diskname, cache=True)
         checksum.md5(self.squashed_contents.name + '/' + self.md5name)
 
         # the system image name is stored in a config file
@@ -308,7 +308,7 @@ class InstallImageBuilder:
                 self.pxename, '.md5'
             ]
         )
-        checksum = Checksum(self.diskname)
+        checksum = Checksum(self.diskname, cache=True)
         checksum.md5(pxe_md5_filename)
 
         # the install image name is stored in a config file
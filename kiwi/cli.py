@@ -106,7 +106,6 @@ global options for services: image, system
 import logging
 import sys
 import os
-import pkg_resources
 from docopt import docopt
 
 # project
@@ -269,8 +268,8 @@ class Cli:
         :rtype: object
         """
         discovered_tasks = {
-            entry_point.name: entry_point.load()
-            for entry_point in pkg_resources.iter_entry_points('kiwi.tasks')
+            entry_point.name: entry_point
+            for entry_point in self._get_task_entry_points()
         }
         service = self.get_servicename()
         command = self.get_command()
@@ -286,9 +285,11 @@ class Cli:
                 'No command specified for {0} service'.format(service)
             )
 
-        self.command_loaded = discovered_tasks.get(
+        task_entry_point = discovered_tasks.get(
             service + '_' + command
         )
+        self.command_loaded = task_entry_point.load() \
+            if task_entry_point else None
         if not self.command_loaded:
             prefix = 'usage:'
             discovered_tasks_for_service = ''
@@ -305,6 +306,30 @@ class Cli:
             )
         return self.command_loaded
 
+    @staticmethod
+    def _get_task_entry_points():
+        """
+        Provides the entry points of the kiwi.tasks group
+
+        The task modules are not imported here, only the entry point
+        for the requested command gets loaded
+
+        :return: list of entry point objects
+
+        :rtype: list
+        """
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:  # pragma: no cover
+            # python < 3.8 has no importlib.metadata
+            import pkg_resources
+            return list(pkg_resources.iter_entry_points('kiwi.tasks'))
+        discovered_entry_points = entry_points()
+        if hasattr(discovered_entry_points, 'select'):
+            return list(discovered_entry_points.select(group='kiwi.tasks'))
+        # python < 3.10 provides a dict of entry point groups
+        return list(discovered_entry_points.get('kiwi.tasks', []))
+
     def _load_command_args(self):
         try:
             argv = [
@@ -15,8 +15,12 @@
 # You should have received a copy of the GNU General Public License
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
+import os
 import logging
-from collections import namedtuple
+import selectors
+from collections import (
+    namedtuple, deque
+)
 
 # project
 from kiwi.utils.codec import Codec
@@ -54,21 +58,38 @@ class CommandProcess:
                 self.command.get_error_output()
             )
 
-    def poll_show_progress(self, items_to_complete, match_method):
+    def poll_show_progress(
+        self, items_to_complete, match_method=None, parse_method=None
+    ):
         """
         Iterate over process and show progress in percent
         raise on error and log output
 
+        If a parse_method is given each output line is parsed
+        only once and the result is looked up in the set of
+        pending items. Otherwise the match_method is called for
+        each item on each output line
+
         :param list items_to_complete: all items
         :param function match_method: method matching item
+        :param function parse_method:
+            method returning the item name information from
+            an output line or an empty string
         """
         self._init_progress()
+        if parse_method:
+            self._init_items_index(items_to_complete)
         for line in self.command:
             if line:
                 log.debug('%s: %s', self.log_topic, line)
-                self._update_progress(
-                    match_method, items_to_complete, line
-                )
+                if parse_method:
+                    self._update_progress_from_index(
+                        parse_method, line
+                    )
+                else:
+                    self._update_progress(
+                        match_method, items_to_complete, line
+                    )
         self._stop_progress()
         if self.command.get_error_code() != 0:
             raise KiwiCommandError(
@@ -140,6 +161,36 @@ class CommandProcess:
                         '[ INFO    ]: Processing'
                     )
 
+    def _init_items_index(self, items_to_complete):
+        self.items_known = set(items_to_complete)
+        self.items_pending = set(self.items_known)
+        self.items_count = len(self.items_pending)
+        self.items_max_length = max(
+            [len(item) for item in self.items_known], default=0
+        )
+
+    def _update_progress_from_index(self, parse_method, command_output):
+        # The parsed name information from the output line usually
+        # carries more than the plain item name, e.g version or
+        # architecture. Thus the longest known item which is a
+        # prefix of the parsed name is taken as the completed item.
+        # Known items which are already completed are not counted
+        # again and must not match a shorter pending item either
+        item_name = parse_method(command_output)
+        for name_length in range(
+            min(len(item_name), self.items_max_length), 0, -1
+        ):
+            item = item_name[:name_length]
+            if item in self.items_known:
+                if item in self.items_pending:
+                    self.items_pending.remove(item)
+                    self.items_processed += 1
+                    Logger.progress(
+                        self.items_processed, self.items_count,
+                        '[ INFO    ]: Processing'
+                    )
+                return
+
     def __del__(self):
         if self.command and self.command.get_error_code() is None:
             log.info(
@@ -152,39 +203,35 @@ class CommandIterator:
     """
     **Implements an Iterator for Instances of Command**
 
+    The stdout and stderr channels of the command are switched to
+    non blocking mode and read in chunks through one selector.
+    Complete lines from stdout are handed out one by one, the data
+    from stderr is collected for later retrieval
+
     :param subprocess command: instance of subprocess
     """
+    read_chunk_size = 65536
+
     def __init__(self, command):
         self.command = command
-        self.command_error_output = bytes(b'')
+        self.command_error_output = bytearray()
         self.command_output_line = bytes(b'')
+        self.command_output_lines = deque()
         self.output_eof_reached = False
         self.errors_eof_reached = False
+        self.selector = None
 
     def __next__(self):
-        line_read = None
-        if self.command.process.poll() is not None:
+        while not self.command_output_lines:
             if self.output_eof_reached and self.errors_eof_reached:
+                if self.command_output_line:
+                    line_read = self.command_output_line
+                    self.command_output_line = bytes(b'')
+                    return Codec.decode(line_read)
+                self.command.process.wait()
                 raise StopIteration()
-
-        if self.command.output_available():
-            byte_read = self.command.output.read(1)
-            if not byte_read:
-                self.output_eof_reached = True
-            elif byte_read == bytes(b'\n'):
-                line_read = Codec.decode(self.command_output_line)
-                self.command_output_line = bytes(b'')
-            else:
-                self.command_output_line += byte_read
-
-        if self.command.error_available():
-            byte_read = self.command.error.read(1)
-            if not byte_read:
-                self.errors_eof_reached = True
-            else:
-                self.command_error_output += byte_read
-
-        return line_read
+            self._read_available_data()
+        return Codec.decode(self.command_output_lines.popleft())
 
     def get_error_output(self):
         """
@@ -194,7 +241,7 @@ class CommandIterator:
 
         :rtype: str
         """
-        return Codec.decode(self.command_error_output)
+        return Codec.decode(bytes(self.command_error_output))
 
     def get_error_code(self):
         """
@@ -224,3 +271,30 @@ class CommandIterator:
 
     def __iter__(self):
         return self
+
+    def _read_available_data(self):
+        if not self.selector:
+            self.selector = selectors.DefaultSelector()
+            for channel in (self.command.output, self.command.error):
+                os.set_blocking(channel.fileno(), False)
+                self.selector.register(channel, selectors.EVENT_READ)
+        for key, event in self.selector.select():
+            try:
+                data = os.read(key.fd, self.read_chunk_size)
+            except BlockingIOError:
+                continue
+            if key.fileobj is self.command.output:
+                if not data:
+                    self.output_eof_reached = True
+                else:
+                    lines = (self.command_output_line + data).split(b'\n')
+                    self.command_output_line = lines.pop()
+                    self.command_output_lines.extend(lines)
+            elif data:
+                self.command_error_output += data
+            else:
+                self.errors_eof_reached = True
+            if not data:
+                self.selector.unregister(key.fileobj)
+        if self.output_eof_reached and self.errors_eof_reached:
+            self.selector.close()
@@ -21,7 +21,6 @@ import glob
 from collections import namedtuple
 import platform
 import yaml
-from pkg_resources import resource_filename
 from typing import (
     List, NamedTuple, Optional
 )
@@ -65,6 +64,10 @@ DM_METADATA_OFFSET = 4096  # 4kb
 VERITY_DATA_BLOCKSIZE = 4096  # 4kb
 VERITY_HASH_BLOCKSIZE = 4096  # 4kb
 INTEGRITY_SECTOR_SIZE = 512
+BLOCK_COPY_BUFFER_SIZE = 1048576  # 1mb
+CHECKSUM_BUFFER_SIZE = 1048576  # 1mb
+COMPRESS_BUFFER_SIZE = 1048576  # 1mb
+ARCHIVE_INDEX_CHUNK_SIZE = 16777216  # 16mb
 
 INTEGRITY_ALGORITHM = 'sha256'
 INTEGRITY_KEY_ALGORITHM = 'hmac-sha256'
@@ -150,6 +153,28 @@ class Defaults:
             '--threads=0'
         ]
 
+    @staticmethod
+    def get_zstd_compression_options():
+        """
+        Provides compression options for the zstd compressor
+
+        Uses all CPUs and the long distance matching mode with a
+        window of 128MB, which zstd decompresses without extra
+        options
+
+        :return:
+            Contains list of options
+
+            .. code:: python
+
+                ['--option=value']
+
+        :rtype: list
+        """
+        return [
+            '--threads=0', '--long=27', '-10'
+        ]
+
     @staticmethod
     def get_platform_name():
         """
@@ -310,6 +335,21 @@ class Defaults:
             SHARED_CACHE_DIR
         )).lstrip(os.sep)
 
+    @staticmethod
+    def get_description_cache_location():
+        """
+        Provides the location to store cached information about
+        processed image descriptions. The location is a subdirectory
+        of the shared cache location
+
+        :return: directory path
+
+        :rtype: str
+        """
+        return os.sep + os.sep.join(
+            [Defaults.get_shared_cache_location(), 'description']
+        )
+
     @staticmethod
     def get_temp_location():
         """
@@ -1397,7 +1437,7 @@ class Defaults:
 
         :rtype: list
         """
-        return ['tbz']
+        return ['tbz', 'tzst']
 
     @staticmethod
     def get_container_image_types():
@@ -1604,13 +1644,25 @@ class Defaults:
         """
         return Defaults.project_file('xsl/master.xsl')
 
+    @staticmethod
+    def get_xsl_current_schema_stylesheet_file():
+        """
+        Provides the file path to the KIWI XSLT style sheet used for
+        descriptions which already use the current schema version
+
+        :return: file path
+
+        :rtype: str
+        """
+        return Defaults.project_file('xsl/current.xsl')
+
     @staticmethod
     def project_file(filename):
         """
         Provides the python module base directory search path
 
-        The method uses the resource_filename method to identify
-        files and directories from the application
+        The file path is resolved relative to the location of the
+        kiwi python module
 
         :param string filename: relative project file
 
@@ -1618,7 +1670,9 @@ class Defaults:
 
         :rtype: str
         """
-        return resource_filename('kiwi', filename)
+        return os.sep.join(
+            [os.path.dirname(os.path.abspath(__file__)), filename]
+        )
 
     @staticmethod
     def get_imported_root_image(root_dir):
@@ -1662,6 +1716,50 @@ class Defaults:
         """
         return 'xorriso'
 
+    @staticmethod
+    def get_bundle_compression_format():
+        """
+        Provides default compression format of bundled results
+
+        :return: name
+
+        :rtype: str
+        """
+        return 'xz'
+
+    @staticmethod
+    def get_bundle_jobs():
+        """
+        Provides default number of result files bundled in parallel
+
+        :return: number of jobs
+
+        :rtype: int
+        """
+        return 1
+
+    @staticmethod
+    def get_compress_codec():
+        """
+        Provides default implementation of the compression codecs
+
+        :return: name
+
+        :rtype: str
+        """
+        return 'tool'
+
+    @staticmethod
+    def get_disk_size_model():
+        """
+        Provides default model to calculate the root filesystem size
+
+        :return: name
+
+        :rtype: str
+        """
+        return 'factor'
+
     @staticmethod
     def get_container_compression():
         """
@@ -47,6 +47,13 @@ class KiwiArchiveTarError(KiwiError):
     """
 
 
+class KiwiBlockCopyError(KiwiError):
+    """
+    Exception raised if copying data between files or block
+    devices has failed.
+    """
+
+
 class KiwiBootImageSetupError(KiwiError):
     """
     Exception raised if an unsupported initrd system type is used.
@@ -168,6 +175,12 @@ class KiwiCommandNotLoaded(KiwiError):
     """
 
 
+class KiwiCompressionError(KiwiError):
+    """
+    Exception raised if compressing or uncompressing data failed.
+    """
+
+
 class KiwiCompressionFormatUnknown(KiwiError):
     """
     Exception raised if the compression format of the data could
@@ -16,8 +16,11 @@
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
 import os
+import re
+import stat
 import logging
 import copy
+import fnmatch
 from typing import (
     Dict, List, Optional
 )
@@ -72,6 +75,11 @@ class FileSystemBase:
         # filesystem file name here
         self.filename = ''
 
+        # filesystems which can be populated from a directory stores
+        # the command used by create_on_device here, such that they
+        # can be created again with the root data tree as content
+        self.create_command: List[str] = []
+
         self.custom_args: Dict = {}
         self.post_init(custom_args)
         self.veritysetup: Optional[VeritySetup] = None
@@ -172,11 +180,17 @@ class FileSystemBase:
             return self.filesystem_mount.mountpoint
         return None
 
-    def sync_data(self, exclude: List[str] = []):
+    def sync_data(self, exclude: List[str] = [], populate: bool = False):
         """
         Copy root data tree into filesystem
 
         :param list exclude: list of exclude dirs/files
+        :param bool populate:
+            create the filesystem again with the root data tree as
+            its content instead of copying the data into the mounted
+            filesystem, if the filesystem creation tool can express
+            the data tree and the exclude list. The label and UUID
+            of the filesystem are kept
         """
         if not self.root_dir:
             raise KiwiFileSystemSyncError(
@@ -186,6 +200,8 @@ class FileSystemBase:
             raise KiwiFileSystemSyncError(
                 'given root directory %s does not exist' % self.root_dir
             )
+        if populate and self.create_command and self._populate(exclude):
+            return
         self.filesystem_mount = MountManager(
             device=self.device_provider.get_device()
         )
@@ -257,11 +273,147 @@ class FileSystemBase:
     def umount(self) -> None:
         """
         Umounts the filesystem in case it is mounted, does nothing otherwise
+
+        The unused blocks of the filesystem are discarded before
         """
         if self.filesystem_mount:
             log.info('umount %s instance', type(self).__name__)
+            self.filesystem_mount.trim()
             self.filesystem_mount.umount()
 
+    def _populate(self, exclude: List[str]) -> bool:
+        """
+        Create filesystem again with the root data tree as content
+
+        Implement in specialized filesystem class for filesystems
+        whose creation tool can populate them from a directory
+
+        :param list exclude: list of exclude dirs/files
+
+        :return: True if populated, False if the data must be synced
+
+        :rtype: bool
+        """
+        return False
+
+    def _get_populate_issue(
+        self, exclude_paths: List[str], xattrs: bool = True,
+        hardlinks: bool = True
+    ) -> str:
+        """
+        Check if the root data tree can be expressed by the
+        filesystem creation tool
+
+        Like the rsync based sync the data must not cross filesystem
+        boundaries and filesystem attributes are applied through a
+        mount of the filesystem
+
+        :param list exclude_paths: excluded paths not removed afterwards
+        :param bool xattrs: tool copies extended attributes and ACLs
+        :param bool hardlinks: tool keeps hard links
+
+        :return: reason to sync the data, empty if the tree can be used
+
+        :rtype: str
+        """
+        if self.custom_args['fs_attributes']:
+            return 'filesystem attributes requested'
+        if exclude_paths:
+            return 'excluded {0} exists'.format(exclude_paths[0])
+        mount_points = self._get_mount_points()
+        if mount_points:
+            return '{0} is a mount point'.format(mount_points[0])
+        if xattrs and hardlinks:
+            return ''
+        for top, dirs, files in os.walk(self.root_dir):
+            for name in dirs + files:
+                path = os.path.join(top, name)
+                if not hardlinks:
+                    path_stat = os.lstat(path)
+                    if path_stat.st_nlink > 1 and \
+                       not stat.S_ISDIR(path_stat.st_mode):
+                        return '{0} has hard links'.format(path)
+                if not xattrs and os.listxattr(path, follow_symlinks=False):
+                    return '{0} has extended attributes'.format(path)
+        return ''
+
+    def _get_mount_points(self) -> List[str]:
+        """
+        Provides the mount points below the root data tree
+
+        The mount table is used instead of comparing the device
+        of every path in the data tree
+
+        :return: sorted list of mount point path names
+
+        :rtype: list
+        """
+        root_dir = os.path.realpath(self.root_dir).rstrip(os.sep) + os.sep
+        mount_points = []
+        with open('/proc/self/mountinfo') as mountinfo:
+            for line in mountinfo:
+                # the mount point is the fifth field, octal escaped
+                mount_point = re.sub(
+                    r'\\([0-7]{3})',
+                    lambda escaped: chr(int(escaped.group(1), 8)),
+                    line.split()[4]
+                )
+                if mount_point.startswith(root_dir):
+                    mount_points.append(mount_point)
+        return sorted(mount_points)
+
+    def _remove_excluded(self, exclude_paths: List[str]) -> None:
+        """
+        Mount the populated filesystem and remove the excluded paths
+
+        For filesystems whose creation tool has no exclude option
+        and no offline editing tool. The filesystem stays mounted
+        like after a sync of the data
+
+        :param list exclude_paths: existing excluded paths of the data tree
+        """
+        self.filesystem_mount = MountManager(
+            device=self.device_provider.get_device()
+        )
+        self.filesystem_mount.mount(
+            self.custom_args['mount_options']
+        )
+        Command.run(
+            ['rm', '-r', '-f'] + [
+                os.path.join(
+                    self.filesystem_mount.mountpoint,
+                    os.path.relpath(path, self.root_dir)
+                ) for path in exclude_paths
+            ]
+        )
+
+    def _get_exclude_paths(self, exclude: List[str]) -> List[str]:
+        """
+        Provides the existing paths of the root data tree matching
+        the exclude list
+
+        Like for the rsync based sync the exclude patterns are
+        anchored at the root directory and a wildcard does not
+        match across directories
+
+        :param list exclude: list of exclude dirs/files
+
+        :return: sorted list of path names
+
+        :rtype: list
+        """
+        exclude_paths = set()
+        for pattern in exclude:
+            paths = [self.root_dir]
+            for part in pattern.strip(os.sep).split(os.sep):
+                paths = [
+                    os.path.join(path, name) for path in paths
+                    if os.path.isdir(path) and not os.path.islink(path)
+                    for name in fnmatch.filter(os.listdir(path), part)
+                ]
+            exclude_paths.update(paths)
+        return sorted(exclude_paths)
+
     def _map_size(self, size: float, from_unit: str, to_unit: str) -> float:
         """
         Return byte size value for given size and unit
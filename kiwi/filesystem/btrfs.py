@@ -15,11 +15,18 @@
 # You should have received a copy of the GNU General Public License
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
+import logging
+from typing import List
+
 # project
 import kiwi.defaults as defaults
 
 from kiwi.command import Command
 from kiwi.filesystem.base import FileSystemBase
+from kiwi.utils.block import BlockID
+from kiwi.utils.command_capabilities import CommandCapabilities
+
+log = logging.getLogger('kiwi')
 
 
 class FileSystemBtrfs(FileSystemBase):
@@ -57,9 +64,10 @@ class FileSystemBtrfs(FileSystemBase):
                     ), unit=defaults.UNIT.byte
                 )
             )
-        Command.run(
+        self.create_command = \
             ['mkfs.btrfs'] + self.custom_args['create_options'] + [device]
-        )
+        Command.run(self.create_command)
+        BlockID.invalidate(device)
 
     def set_uuid(self):
         """
@@ -69,3 +77,41 @@ class FileSystemBtrfs(FileSystemBase):
         Command.run(
             ['btrfstune', '-u', device]
         )
+        BlockID.invalidate(device)
+
+    def _populate(self, exclude: List[str]) -> bool:
+        """
+        Create btrfs filesystem again with mkfs.btrfs --rootdir
+
+        mkfs.btrfs keeps extended attributes and ACLs. Hard links
+        can't be expressed. It has no exclude option, excluded data
+        is removed from the mounted filesystem afterwards
+
+        :param list exclude: list of exclude dirs/files
+
+        :return: True if populated, False if the data must be synced
+
+        :rtype: bool
+        """
+        issue = self._get_populate_issue([], hardlinks=False)
+        if not issue and not CommandCapabilities.has_option_in_help(
+            'mkfs.btrfs', '--rootdir', raise_on_error=False
+        ):
+            issue = 'mkfs.btrfs has no populate support'
+        if issue:
+            log.info('--> Syncing data, can not populate: {0}'.format(issue))
+            return False
+        device = self.device_provider.get_device()
+        log.info('--> Populating btrfs filesystem on {0}'.format(device))
+        uuid_args = [] if '-U' in self.create_command else [
+            '-U', BlockID(device).get_uuid()
+        ]
+        Command.run(
+            self.create_command[:1] + [
+                '-f', '--rootdir', self.root_dir
+            ] + uuid_args + self.create_command[1:]
+        )
+        exclude_paths = self._get_exclude_paths(exclude)
+        if exclude_paths:
+            self._remove_excluded(exclude_paths)
+        return True
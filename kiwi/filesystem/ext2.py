@@ -20,6 +20,7 @@ import kiwi.defaults as defaults
 
 from kiwi.filesystem.base import FileSystemBase
 from kiwi.command import Command
+from kiwi.utils.block import BlockID
 
 
 class FileSystemExt2(FileSystemBase):
@@ -59,6 +60,7 @@ class FileSystemExt2(FileSystemBase):
         Command.run(
             ['mkfs.ext2'] + self.custom_args['create_options'] + device_args
         )
+        BlockID.invalidate(device_args[0])
 
     def set_uuid(self):
         """
@@ -71,3 +73,4 @@ class FileSystemExt2(FileSystemBase):
         Command.run(
             ['tune2fs', '-f', '-U', 'random', device]
         )
+        BlockID.invalidate(device)
@@ -15,11 +15,22 @@
 # You should have received a copy of the GNU General Public License
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 
+import os
+import logging
+from typing import List
+
 # project
 import kiwi.defaults as defaults
 
 from kiwi.filesystem.base import FileSystemBase
 from kiwi.command import Command
+from kiwi.utils.block import BlockID
+from kiwi.utils.command_capabilities import CommandCapabilities
+from kiwi.utils.temporary import Temporary
+
+from kiwi.exceptions import KiwiFileSystemSyncError
+
+log = logging.getLogger('kiwi')
 
 
 class FileSystemExt4(FileSystemBase):
@@ -56,9 +67,10 @@ class FileSystemExt4(FileSystemBase):
                     ), unit=defaults.UNIT.kb
                 )
             )
-        Command.run(
+        self.create_command = \
             ['mkfs.ext4'] + self.custom_args['create_options'] + device_args
-        )
+        Command.run(self.create_command)
+        BlockID.invalidate(device_args[0])
 
     def set_uuid(self):
         """
@@ -71,3 +83,81 @@ class FileSystemExt4(FileSystemBase):
         Command.run(
             ['tune2fs', '-f', '-U', 'random', device]
         )
+        BlockID.invalidate(device)
+
+    def _populate(self, exclude: List[str]) -> bool:
+        """
+        Create ext4 filesystem again with mkfs.ext4 -d
+
+        mkfs.ext4 keeps hard links, extended attributes and ACLs.
+        It has no exclude option, excluded data is removed from
+        the filesystem with debugfs afterwards
+
+        :param list exclude: list of exclude dirs/files
+
+        :return: True if populated, False if the data must be synced
+
+        :rtype: bool
+        """
+        exclude_paths = self._get_exclude_paths(exclude)
+        issue = self._get_populate_issue(
+            [
+                # debugfs can't quote those names
+                path for path in exclude_paths
+                if '"' in path or '\n' in path
+            ]
+        )
+        if not issue and not CommandCapabilities.has_option_in_help(
+            'mkfs.ext4', '[-d root-directory', ['-h'], raise_on_error=False
+        ):
+            issue = 'mkfs.ext4 has no populate support'
+        if issue:
+            log.info('--> Syncing data, can not populate: {0}'.format(issue))
+            return False
+        device = self.device_provider.get_device()
+        log.info('--> Populating ext4 filesystem on {0}'.format(device))
+        uuid_args = [] if '-U' in self.create_command else [
+            '-U', BlockID(device).get_uuid()
+        ]
+        Command.run(
+            self.create_command[:1] + [
+                '-F', '-d', self.root_dir
+            ] + uuid_args + self.create_command[1:]
+        )
+        if exclude_paths:
+            self._remove_paths(device, exclude_paths)
+        return True
+
+    def _remove_paths(self, device: str, paths: List[str]) -> None:
+        commands = []
+        for path in paths:
+            entries = []
+            if os.path.isdir(path) and not os.path.islink(path):
+                # the contents of a directory are removed first
+                for top, dirs, files in os.walk(path, topdown=False):
+                    entries += [os.path.join(top, name) for name in files + dirs]
+            for entry in entries + [path]:
+                is_dir = os.path.isdir(entry) and not os.path.islink(entry)
+                commands.append(
+                    '{0} "{1}"'.format(
+                        'rmdir' if is_dir else 'rm',
+                        os.sep + os.path.relpath(entry, self.root_dir)
+                    )
+                )
+        with Temporary().new_file() as command_file:
+            command_file.write(os.linesep.join(commands).encode())
+            command_file.flush()
+            debugfs = Command.run(
+                ['debugfs', '-w', '-f', command_file.name, device]
+            )
+        # debugfs reports failed commands on stderr only
+        errors = [
+            line for line in debugfs.error.splitlines()
+            if line and not line.startswith('debugfs ')
+        ]
+        if errors:
+            raise KiwiFileSystemSyncError(
+                'Failed to remove excluded data: {0}'.format(
+                    ', '.join(errors)
+                )
+            )
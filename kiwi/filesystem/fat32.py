@@ -20,6 +20,7 @@ import kiwi.defaults as defaults
 
 from kiwi.filesystem.base import FileSystemBase
 from kiwi.command import Command
+from kiwi.utils.block import BlockID
 
 
 class FileSystemFat32(FileSystemBase):
@@ -61,6 +62,7 @@ class FileSystemFat32(FileSystemBase):
                 'mkdosfs', '-F32', '-I'
             ] + self.custom_args['create_options'] + device_args
         )
+        BlockID.invalidate(device_args[0])
 
     def set_uuid(self):
         """
@@ -70,3 +72,4 @@ class FileSystemFat32(FileSystemBase):
         Command.run(
             ['mlabel', '-n', '-i', device, '::']
         )
+        BlockID.invalidate(device)
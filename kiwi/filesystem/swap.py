@@ -20,6 +20,7 @@ import kiwi.defaults as defaults
 
 from kiwi.filesystem.base import FileSystemBase
 from kiwi.command import Command
+from kiwi.utils.block import BlockID
 
 
 class FileSystemSwap(FileSystemBase):
@@ -45,3 +46,4 @@ class FileSystemSwap(FileSystemBase):
         Command.run(
             ['mkswap'] + self.custom_args['create_options'] + [device]
         )
+        BlockID.invalidate(device)
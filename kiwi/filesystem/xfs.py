@@ -15,11 +15,18 @@
 # You should have received a copy of the GNU General Public License
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
+import logging
+from typing import List
+
 # project
 import kiwi.defaults as defaults
 
 from kiwi.filesystem.base import FileSystemBase
 from kiwi.command import Command
+from kiwi.utils.block import BlockID
+from kiwi.utils.command_capabilities import CommandCapabilities
+
+log = logging.getLogger('kiwi')
 
 
 class FileSystemXfs(FileSystemBase):
@@ -59,9 +66,10 @@ class FileSystemXfs(FileSystemBase):
                     )
                 )
             )
-        Command.run(
+        self.create_command = \
             ['mkfs.xfs', '-f'] + self.custom_args['create_options'] + [device]
-        )
+        Command.run(self.create_command)
+        BlockID.invalidate(device)
 
     def set_uuid(self):
         """
@@ -74,3 +82,42 @@ class FileSystemXfs(FileSystemBase):
         Command.run(
             ['xfs_admin', '-U', 'generate', device]
         )
+        BlockID.invalidate(device)
+
+    def _populate(self, exclude: List[str]) -> bool:
+        """
+        Create xfs filesystem again with mkfs.xfs -p
+
+        Since xfsprogs 6.17 the prototype can be a directory.
+        Extended attributes and hard links are not expressed.
+        Excluded data is removed from the mounted filesystem
+        afterwards
+
+        :param list exclude: list of exclude dirs/files
+
+        :return: True if populated, False if the data must be synced
+
+        :rtype: bool
+        """
+        issue = self._get_populate_issue([], xattrs=False, hardlinks=False)
+        if not issue and not CommandCapabilities.check_version(
+            'mkfs.xfs', (6, 17), ['-V'], raise_on_error=False
+        ):
+            issue = 'mkfs.xfs has no populate support'
+        if issue:
+            log.info('--> Syncing data, can not populate: {0}'.format(issue))
+            return False
+        device = self.device_provider.get_device()
+        log.info('--> Populating xfs filesystem on {0}'.format(device))
+        uuid_args = [] if any(
+            'uuid=' in option for option in self.create_command
+        ) else ['-m', 'uuid={0}'.format(BlockID(device).get_uuid())]
+        Command.run(
+            self.create_command[:2] + [
+                '-p', self.root_dir
+            ] + uuid_args + self.create_command[2:]
+        )
+        exclude_paths = self._get_exclude_paths(exclude)
+        if exclude_paths:
+            self._remove_excluded(exclude_paths)
+        return True
@@ -16,18 +16,32 @@
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
 import os
+import logging
+import hashlib
+from typing import (
+    Dict, Tuple, Any
+)
 from lxml import etree
 from urllib.parse import urlparse
 
 # project
 from kiwi.utils.temporary import Temporary
+from kiwi.utils.checksum import Checksum
 from kiwi.defaults import Defaults
+from kiwi.runtime_config import RuntimeConfig
+from kiwi.version import __version__
 from kiwi.exceptions import (
     KiwiConfigFileFormatNotSupported,
     KiwiDescriptionInvalid,
     KiwiIncludFileNotFoundError
 )
 
+log = logging.getLogger('kiwi')
+
+XSLT_TRANSFORMS: Dict[Tuple[str, str], Any] = {}
+
+SCHEMA_VERSION = ''
+
 
 class MarkupBase:
     """
@@ -39,6 +53,7 @@ class MarkupBase:
     """
     def __init__(self, description: str):
         self.description = description
+        self.xslt_processed_data: Dict[str, bytes] = {}
         self.post_init()
 
     def post_init(self) -> None:
@@ -52,10 +67,42 @@ class MarkupBase:
         Apply XSLT style sheet rules to an xml file
 
         The result of the XSLT processing is stored in a named
-        temporary file and returned to the caller
+        temporary file and returned to the caller. Descriptions
+        which already use the current schema version are only
+        processed for include references and formatting. The
+        processed data is kept for further calls on the same
+        description
 
         :param str description: path to an XML description file
         """
+        if description not in self.xslt_processed_data:
+            self.xslt_processed_data[description] = \
+                self._get_xslt_processed_data(description)
+        self.description_xslt_processed = Temporary(
+            prefix='kiwi_xslt-'
+        ).new_file()
+        with open(self.description_xslt_processed.name, "wb") as xsltout:
+            xsltout.write(self.xslt_processed_data[description])
+
+        return self.description_xslt_processed.name
+
+    def get_xml_description(self) -> str:
+        """
+        Return XML description file name
+
+        Implementation in specialized Markup class
+        """
+        raise NotImplementedError
+
+    def get_yaml_description(self) -> str:
+        """
+        Return YAML description file name
+
+        Implementation in specialized Markup class
+        """
+        raise NotImplementedError
+
+    def _get_xslt_processed_data(self, description: str) -> bytes:
         # Parse the provided description, raising the appropriate
         # exception if parsing fails.
         try:
@@ -68,45 +115,110 @@ class MarkupBase:
                 'Python anymarkup module is required.'
             )
 
-        xslt_transform_parser = etree.XMLParser()
-        xslt_transform_parser.resolvers.add(
-            FileResolver(os.path.dirname(self.description))
-        )
-        xslt_transform = etree.XSLT(
-            etree.parse(
-                Defaults.get_xsl_stylesheet_file(), xslt_transform_parser
-            )
-        )
-        self.description_xslt_processed = Temporary(
-            prefix='kiwi_xslt-'
-        ).new_file()
-        try:
-            with open(self.description_xslt_processed.name, "wb") as xsltout:
-                xsltout.write(
-                    etree.tostring(
-                        xslt_transform(parsed_description), pretty_print=True
+        # The result of descriptions using include references also
+        # depends on the included files and is therefore not cached
+        transform_cache_file = None
+        if parsed_description.find('include') is None and \
+           RuntimeConfig().get_description_transform_cache():
+            transform_cache_file = self._get_transform_cache_file(description)
+            if os.path.exists(transform_cache_file):
+                log.debug(
+                    'Using cached XSLT processed description: {0}'.format(
+                        transform_cache_file
                     )
                 )
+                with open(transform_cache_file, 'rb') as cached:
+                    return cached.read()
+
+        if parsed_description.getroot().get('schemaversion') == \
+           MarkupBase._get_schema_version():
+            stylesheet = Defaults.get_xsl_current_schema_stylesheet_file()
+        else:
+            stylesheet = Defaults.get_xsl_stylesheet_file()
+        xslt_transform = MarkupBase._get_xslt_transform(
+            stylesheet, os.path.dirname(self.description)
+        )
+        try:
+            xslt_processed_data = etree.tostring(
+                xslt_transform(parsed_description), pretty_print=True
+            )
         except etree.XMLSyntaxError as issue:
             raise KiwiDescriptionInvalid(issue)
 
-        return self.description_xslt_processed.name
+        if transform_cache_file:
+            try:
+                os.makedirs(
+                    os.path.dirname(transform_cache_file), exist_ok=True
+                )
+                with open(transform_cache_file, 'wb') as cache:
+                    cache.write(xslt_processed_data)
+            except OSError as issue:
+                log.debug(
+                    'Failed to store XSLT processed description: {0}'.format(
+                        issue
+                    )
+                )
+        return xslt_processed_data
+
+    @staticmethod
+    def _get_transform_cache_file(description: str) -> str:
+        digest = hashlib.sha256(__version__.encode())
+        digest.update(Checksum(description).sha256().encode())
+        return os.sep.join(
+            [
+                Defaults.get_description_cache_location(),
+                'xslt', digest.hexdigest()
+            ]
+        )
 
-    def get_xml_description(self) -> str:
+    @staticmethod
+    def _get_xslt_transform(stylesheet: str, description_dir: str) -> Any:
         """
-        Return XML description file name
+        Provide compiled XSLT transformation for the given stylesheet
 
-        Implementation in specialized Markup class
+        Include references are resolved relative to the description
+        directory by the file resolver of the stylesheet parser. The
+        compiled transformation is therefore kept in a process wide
+        cache per stylesheet and description directory
+
+        :param str stylesheet: path to XSLT stylesheet file
+        :param str description_dir: directory of the description
+
+        :return: etree.XSLT instance
+
+        :rtype: etree.XSLT
         """
-        raise NotImplementedError
+        key = (stylesheet, description_dir)
+        if key not in XSLT_TRANSFORMS:
+            xslt_transform_parser = etree.XMLParser()
+            xslt_transform_parser.resolvers.add(
+                FileResolver(description_dir)
+            )
+            XSLT_TRANSFORMS[key] = etree.XSLT(
+                etree.parse(stylesheet, xslt_transform_parser)
+            )
+        return XSLT_TRANSFORMS[key]
 
-    def get_yaml_description(self) -> str:
+    @staticmethod
+    def _get_schema_version() -> str:
         """
-        Return YAML description file name
+        Provide the schemaversion value as it is fixed in the
+        current RelaxNG schema
 
-        Implementation in specialized Markup class
+        :return: schema version
+
+        :rtype: str
         """
-        raise NotImplementedError
+        global SCHEMA_VERSION
+        if not SCHEMA_VERSION:
+            relaxng = '{http://relaxng.org/ns/structure/1.0}'
+            for attribute in etree.parse(Defaults.get_schema_file()).iter(
+                relaxng + 'attribute'
+            ):
+                if attribute.get('name') == 'schemaversion':
+                    SCHEMA_VERSION = attribute.findtext(relaxng + 'value')
+                    break
+        return SCHEMA_VERSION
 
 
 class FileResolver(etree.Resolver):
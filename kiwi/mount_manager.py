@@ -85,6 +85,25 @@ class MountManager:
                 ['mount'] + option_list + [self.device, self.mountpoint]
             )
 
+    def trim(self) -> None:
+        """
+        Discard the unused blocks of the mounted filesystem
+
+        On a loop device the discarded blocks are turned into holes
+        of the loop file. Filesystems without discard support, or
+        a missing fstrim tool, are not considered an error
+        """
+        if self.is_mounted():
+            fstrim = Command.run(
+                ['fstrim', self.mountpoint], raise_on_error=False
+            )
+            if fstrim.returncode != 0:
+                log.debug(
+                    'fstrim of {0} skipped: {1}'.format(
+                        self.mountpoint, fstrim.error
+                    )
+                )
+
     def umount_lazy(self) -> None:
         """
         Umount by the mountpoint directory in lazy mode
@@ -530,6 +530,39 @@ class PackageManagerApt(PackageManagerBase):
             )
         )
 
+    def parse_package_installed(self, package_manager_output: str) -> str:
+        """
+        Parse package name information from a apt-get status line
+        which indicates a package has been installed
+
+        The returned information starts with the package name
+        but can contain further data like version and architecture
+
+        :param str package_manager_output: apt-get status line
+
+        :returns: package name information or empty string
+
+        :rtype: str
+        """
+        return self._parse_package_name(
+            r'Unpacking (\S+)', package_manager_output
+        )
+
+    def parse_package_deleted(self, package_manager_output: str) -> str:
+        """
+        Parse package name information from a apt-get status line
+        which indicates a package has been deleted
+
+        :param str package_manager_output: apt-get status line
+
+        :returns: package name information or empty string
+
+        :rtype: str
+        """
+        return self._parse_package_name(
+            r'Removing (\S+)', package_manager_output
+        )
+
     def _package_requests(self) -> List:
         items = self.package_requests[:]
         self.cleanup_requests()
@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU General Public License
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
+import re
 from typing import (
     List, Dict
 )
@@ -201,6 +202,36 @@ class PackageManagerBase:
         """
         raise NotImplementedError
 
+    def parse_package_installed(self, package_manager_output: str) -> str:
+        """
+        Parse package name information from a status line which
+        indicates a package has been installed
+
+        Implementation in specialized package manager class
+
+        :param str package_manager_output: unused
+
+        :return: package name information or empty string
+
+        :rtype: str
+        """
+        raise NotImplementedError
+
+    def parse_package_deleted(self, package_manager_output: str) -> str:
+        """
+        Parse package name information from a status line which
+        indicates a package has been deleted
+
+        Implementation in specialized package manager class
+
+        :param str package_manager_output: unused
+
+        :return: package name information or empty string
+
+        :rtype: str
+        """
+        raise NotImplementedError
+
     @decommissioned
     def database_consistent(self) -> None:
         pass  # pragma: no cover
@@ -276,3 +307,9 @@ class PackageManagerBase:
         del self.collection_requests[:]
         del self.product_requests[:]
         del self.exclude_requests[:]
+
+    def _parse_package_name(
+        self, expression: str, package_manager_output: str
+    ) -> str:
+        package_search = re.search(expression, package_manager_output)
+        return package_search.group(1) if package_search else ''
@@ -275,3 +275,36 @@ class PackageManagerPacman(PackageManagerBase):
                 package_manager_output
             )
         )
+
+    def parse_package_installed(self, package_manager_output: str) -> str:
+        """
+        Parse package name information from a pacman status line
+        which indicates a package has been installed
+
+        The returned information starts with the package name
+        but can contain further data like version and architecture
+
+        :param str package_manager_output: pacman status line
+
+        :returns: package name information or empty string
+
+        :rtype: str
+        """
+        return self._parse_package_name(
+            r' installing (\S+)', package_manager_output
+        )
+
+    def parse_package_deleted(self, package_manager_output: str) -> str:
+        """
+        Parse package name information from a pacman status line
+        which indicates a package has been deleted
+
+        :param str package_manager_output: pacman status line
+
+        :returns: package name information or empty string
+
+        :rtype: str
+        """
+        return self._parse_package_name(
+            r' removing (\S+)', package_manager_output
+        )
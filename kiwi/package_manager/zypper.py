@@ -286,6 +286,39 @@ class PackageManagerZypper(PackageManagerBase):
             )
         )
 
+    def parse_package_installed(self, package_manager_output: str) -> str:
+        """
+        Parse package name information from a zypper status line
+        which indicates a package has been installed
+
+        The returned information starts with the package name
+        but can contain further data like version and architecture
+
+        :param str package_manager_output: zypper status line
+
+        :returns: package name information or empty string
+
+        :rtype: str
+        """
+        return self._parse_package_name(
+            r'Installing: (\S+)', package_manager_output
+        )
+
+    def parse_package_deleted(self, package_manager_output: str) -> str:
+        """
+        Parse package name information from a zypper status line
+        which indicates a package has been deleted
+
+        :param str package_manager_output: zypper status line
+
+        :returns: package name information or empty string
+
+        :rtype: str
+        """
+        return self._parse_package_name(
+            r'Removing: (\S+)', package_manager_output
+        )
+
     def post_process_install_requests_bootstrap(
         self, root_bind: RootBind = None
     ) -> None:
@@ -131,3 +131,12 @@ class PartitionerBase:
         :param int entries: unused
         """
         raise NotImplementedError
+
+    def commit(self) -> None:
+        """
+        Write the partition table changes collected so far
+
+        Partitioners collecting the changes write the whole set
+        in one call of the partition tool. Does nothing by default
+        """
+        pass
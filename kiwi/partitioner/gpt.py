@@ -16,7 +16,9 @@
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
 import logging
-from typing import List
+from typing import (
+    Dict, List
+)
 
 # project
 from kiwi.command import Command
@@ -49,6 +51,11 @@ class PartitionerGpt(PartitionerBase):
             't.efi': 'EF00',
             't.prep': '4100'
         }
+        # sgdisk options of the changes not yet written, all changes
+        # are written in one sgdisk call on commit
+        self.changes: List[str] = []
+        # partition type codes by partition number
+        self.partition_types: Dict[int, str] = {}
 
     def create(
         self, name: str, mbsize: int, type_name: str, flags: List[str] = None
@@ -56,6 +63,8 @@ class PartitionerGpt(PartitionerBase):
         """
         Create GPT partition
 
+        The partition is written on commit
+
         :param string name: partition name
         :param int mbsize: partition size
         :param string type_name: partition type
@@ -70,18 +79,15 @@ class PartitionerGpt(PartitionerBase):
             # A start  sector value of 0 specifies the default value
             # defined in sgdisk
             self.start_sector = 0
-        Command.run(
-            [
-                'sgdisk', '-n', ':'.join(
-                    [
-                        format(self.partition_id),
-                        format(self.start_sector),
-                        partition_end
-                    ]
-                ), '-c', ':'.join([format(self.partition_id), name]),
-                self.disk_device
-            ]
-        )
+        self.changes += [
+            '-n', ':'.join(
+                [
+                    format(self.partition_id),
+                    format(self.start_sector),
+                    partition_end
+                ]
+            ), '-c', ':'.join([format(self.partition_id), name])
+        ]
         self.set_flag(self.partition_id, type_name)
         if flags:
             for flag_name in flags:
@@ -91,6 +97,8 @@ class PartitionerGpt(PartitionerBase):
         """
         Set GPT partition flag
 
+        The flag is written on commit
+
         :param int partition_id: partition number
         :param string flag_name: name from flag map
         """
@@ -99,24 +107,24 @@ class PartitionerGpt(PartitionerBase):
                 'Unknown partition flag %s' % flag_name
             )
         if self.flag_map[flag_name]:
-            Command.run(
-                [
-                    'sgdisk', '-t',
-                    ':'.join(
-                        [
-                            format(partition_id),
-                            format(self.flag_map[flag_name])
-                        ]
-                    ),
-                    self.disk_device
-                ]
-            )
+            self.partition_types[int(partition_id)] = \
+                format(self.flag_map[flag_name])
+            self.changes += [
+                '-t', ':'.join(
+                    [
+                        format(partition_id),
+                        format(self.flag_map[flag_name])
+                    ]
+                )
+            ]
         else:
             log.warning('Flag %s ignored on GPT', flag_name)
 
     def set_hybrid_mbr(self) -> None:
         """
         Turn partition table into hybrid GPT/MBR table
+
+        The conversion is done on commit
         """
         partition_ids = []
         partition_number_to_embed = self.partition_id
@@ -134,39 +142,37 @@ class PartitionerGpt(PartitionerBase):
             )
         for number in range(1, partition_number_to_embed + 1):
             partition_ids.append(format(number))
-        Command.run(
-            ['sgdisk', '-h', ':'.join(partition_ids), self.disk_device]
-        )
+        self.changes += ['-h', ':'.join(partition_ids)]
 
     def set_mbr(self) -> None:
         """
         Turn partition table into MBR (msdos table)
+
+        The conversion is done on commit
         """
         partition_ids = []
-        efi_partition_number = None
         for number in range(1, self.partition_id + 1):
-            partition_info = Command.run(
-                ['sgdisk', '-i={0}'.format(number), self.disk_device]
-            )
-            if '(EFI System)' in partition_info.output:
-                efi_partition_number = number
+            if self.partition_types.get(number) == self.flag_map['t.efi']:
+                # turn former EFI partition into standard linux partition
+                self.set_flag(number, 't.linux')
             partition_ids.append(format(number))
-        if efi_partition_number:
-            # turn former EFI partition into standard linux partition
-            self.set_flag(efi_partition_number, 't.linux')
-        Command.run(
-            ['sgdisk', '-m', ':'.join(partition_ids), self.disk_device]
-        )
+        self.changes += ['-m', ':'.join(partition_ids)]
 
     def resize_table(self, entries: int = 128) -> None:
         """
         Resize partition table
 
+        The changes collected so far are written along with it
+
         :param int entries: number of default entries
         """
-        Command.run(
-            [
-                'sgdisk', '--resize-table', '{0}'.format(entries),
-                self.disk_device
-            ]
-        )
+        self.changes += ['--resize-table', format(entries)]
+        self.commit()
+
+    def commit(self) -> None:
+        """
+        Write the collected partition table changes in one sgdisk call
+        """
+        if self.changes:
+            Command.run(['sgdisk'] + self.changes + [self.disk_device])
+            self.changes = []
@@ -15,14 +15,16 @@
 # You should have received a copy of the GNU General Public License
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
+import os
 import logging
-from typing import List
+from typing import (
+    Dict, List, Optional, Union
+)
 
 # project
 from kiwi.utils.temporary import Temporary
 from kiwi.command import Command
 from kiwi.partitioner.base import PartitionerBase
-from kiwi.utils.block import BlockID
 
 from kiwi.exceptions import (
     KiwiPartitionerMsDosFlagError
@@ -34,6 +36,9 @@ log = logging.getLogger('kiwi')
 class PartitionerMsDos(PartitionerBase):
     """
     **Implement old style msdos partition setup**
+
+    The partitions are collected and the table is written
+    in one sfdisk call on commit
     """
     def post_init(self) -> None:
         """
@@ -41,8 +46,6 @@ class PartitionerMsDos(PartitionerBase):
 
         Setup sfdisk partition type/flag map
         """
-        self.default_start = 2048
-        self.sector_size = 512
         self.flag_map = {
             'f.active': True,
             't.linux': '83',
@@ -54,6 +57,10 @@ class PartitionerMsDos(PartitionerBase):
             't.prep': '41',
             't.extended': '5'
         }
+        # list of partitions in partition number order
+        self.partitions: List[Dict] = []
+        self.table_start_sector: Optional[int] = None
+        self.changed = False
 
     def create(
         self, name: str, mbsize: int, type_name: str, flags: List[str] = []
@@ -66,19 +73,11 @@ class PartitionerMsDos(PartitionerBase):
         :param string type_name: partition type
         :param list flags: additional flags
         """
-        if self.extended_layout:
-            if self.partition_id < 3:
-                # in primary boundary
-                self._create_primary(name, mbsize, type_name, flags)
-            elif self.partition_id == 3:
-                # at primary boundary, create extended + logical
-                self._create_extended(name)
-                self._create_logical(name, mbsize, type_name, flags)
-            elif self.partition_id > 3:
-                # in logical boundary
-                self._create_logical(name, mbsize, type_name, flags)
-        else:
-            self._create_primary(name, mbsize, type_name, flags)
+        if self.extended_layout and self.partition_id == 3:
+            # at primary boundary, all following partitions are
+            # logical partitions inside of an extended partition
+            self._add_partition(name, 'all_free', 't.extended')
+        self._add_partition(name, mbsize, type_name, flags)
 
     def set_flag(self, partition_id: int, flag_name: str) -> None:
         """
@@ -92,20 +91,12 @@ class PartitionerMsDos(PartitionerBase):
                 'Unknown partition flag %s' % flag_name
             )
         if self.flag_map[flag_name]:
+            partition = self.partitions[int(partition_id) - 1]
             if flag_name == 'f.active':
-                Command.run(
-                    [
-                        'parted', self.disk_device,
-                        'set', format(partition_id), 'boot', 'on'
-                    ]
-                )
+                partition['bootable'] = True
             else:
-                Command.run(
-                    [
-                        'sfdisk', '-c', self.disk_device,
-                        format(partition_id), self.flag_map[flag_name]
-                    ]
-                )
+                partition['type'] = self.flag_map[flag_name]
+            self.changed = True
         else:
             log.warning('Flag %s ignored on msdos', flag_name)
 
@@ -122,120 +113,66 @@ class PartitionerMsDos(PartitionerBase):
     def set_start_sector(self, start_sector: int):
         """
         Set start sector of first partition as configured.
-        fdisk and friends are not able to work correctly if
-        the start sector of the first partition is any different
-        from 2048.
-
-        :param int start_sector: sector size
-        """
-        block_operation = BlockID(self.disk_device)
-        fdisk_input = Temporary().new_file()
-        with open(fdisk_input.name, 'w') as partition:
-            if block_operation.get_partition_count() >= 4:
-                # if the partition table is full fdisk does not ask
-                # for the partition number when there is only one choice
-                log.debug(f'fdisk: d 1 n p {start_sector} w q')
-                partition.write(
-                    'd\n1\nn\np\n{0}\n\nw\nq\n'.format(start_sector)
-                )
-            else:
-                # if the partition table has less than 4 partitions
-                # fdisk will ask for the partition number to change
-                log.debug(f'fdisk: d 1 n p 1 {start_sector} w q')
-                partition.write(
-                    'd\n1\nn\np\n1\n{0}\n\nw\nq\n'.format(start_sector)
-                )
-        self._call_fdisk(fdisk_input.name)
-
-    def _create_primary(
-        self, name: str, mbsize: int, type_name: str, flags: List[str] = []
-    ) -> None:
-        """
-        Create primary msdos partition
-        """
-        self.partition_id += 1
-        fdisk_input = Temporary().new_file()
-        if self.partition_id == 1 and self.start_sector:
-            if self.start_sector > self.default_start and mbsize != 'all_free':
-                # fdisk default start sector is self.default_start, increase
-                # the partition size such that after set_start_sector()
-                # the requested partition size is present
-                mbsize += int(
-                    (self.start_sector - self.default_start) * self.sector_size / (1024 * 1024)
-                )
-        with open(fdisk_input.name, 'w') as partition:
-            log.debug(
-                '%s: fdisk: n p %d cur_position +%sM w q',
-                name, self.partition_id, format(mbsize)
-            )
-            partition.write(
-                'n\np\n{0}\n\n{1}\nw\nq\n'.format(
-                    self.partition_id,
-                    '' if mbsize == 'all_free' else '+{0}M'.format(mbsize)
-                )
-            )
-        self._call_fdisk(fdisk_input.name)
-        self._set_all_flags(type_name, flags)
-
-    def _create_extended(self, name: str) -> None:
-        """
-        Create extended msdos partition
-        """
-        self.partition_id += 1
-        fdisk_input = Temporary().new_file()
-        with open(fdisk_input.name, 'w') as partition:
-            log.debug(
-                '%s: fdisk: n e %d cur_position +all_freeM w q',
-                name, self.partition_id
-            )
-            partition.write(
-                'n\ne\n{0}\n{1}\n{2}\nw\nq\n'.format(
-                    self.partition_id, '', ''
+        The requested size of the first partition is kept
+
+        :param int start_sector: sector number
+        """
+        self.table_start_sector = start_sector
+        self.changed = True
+
+    def commit(self) -> None:
+        """
+        Write the partition table in one sfdisk call
+        """
+        if not self.changed:
+            return
+        script = ['label: dos']
+        for number, partition in enumerate(self.partitions, 1):
+            fields = []
+            if number == 1 and self.table_start_sector:
+                fields.append('start={0}'.format(self.table_start_sector))
+            if partition['mbsize'] != 'all_free':
+                fields.append('size={0}MiB'.format(partition['mbsize']))
+            fields.append('type={0}'.format(partition['type']))
+            if partition['bootable']:
+                fields.append('bootable')
+            script.append(', '.join(fields))
+        log.debug('sfdisk: {0}'.format('; '.join(script)))
+        sfdisk_input = Temporary().new_file()
+        with open(sfdisk_input.name, 'w') as table:
+            table.write(os.linesep.join(script) + os.linesep)
+        # the partitions are mapped by the caller
+        Command.run(
+            [
+                'bash', '-c', ' '.join(
+                    [
+                        'sfdisk', '--no-reread', '--no-tell-kernel',
+                        self.disk_device, '<', sfdisk_input.name
+                    ]
                 )
-            )
-        self._call_fdisk(fdisk_input.name)
+            ]
+        )
+        self.changed = False
 
-    def _create_logical(
-        self, name: str, mbsize: int, type_name: str, flags: List[str] = []
+    def _add_partition(
+        self, name: str, mbsize: Union[int, str], type_name: str,
+        flags: List[str] = []
     ) -> None:
-        """
-        Create logical msdos partition
-        """
         self.partition_id += 1
-        fdisk_input = Temporary().new_file()
-        with open(fdisk_input.name, 'w') as partition:
-            log.debug(
-                '%s: fdisk: n %d cur_position +%sM w q',
-                name, self.partition_id, format(mbsize)
-            )
-            partition.write(
-                'n\n{0}\n{1}\n{2}\nw\nq\n'.format(
-                    self.partition_id,
-                    '',
-                    '' if mbsize == 'all_free' else '+{0}M'.format(mbsize)
-                )
-            )
-        self._call_fdisk(fdisk_input.name)
-        self._set_all_flags(type_name, flags)
-
-    def _set_all_flags(self, type_name: str, flags: List[str]) -> None:
+        log.debug(
+            '%s: sfdisk: partition %d size %sM',
+            name, self.partition_id, format(mbsize)
+        )
+        self.partitions.append(
+            {
+                'mbsize': mbsize,
+                # the default type as used by sfdisk
+                'type': self.flag_map['t.linux'],
+                'bootable': False
+            }
+        )
+        self.changed = True
         self.set_flag(self.partition_id, type_name)
         if flags:
             for flag_name in flags:
                 self.set_flag(self.partition_id, flag_name)
-
-    def _call_fdisk(self, fdisk_config_file_path: str) -> None:
-        bash_command = ' '.join(
-            ['cat', fdisk_config_file_path, '|', 'fdisk', self.disk_device]
-        )
-        try:
-            Command.run(
-                ['bash', '-c', bash_command]
-            )
-        except Exception:
-            # unfortunately fdisk reports that it can't read in the partition
-            # table which I consider a bug in fdisk. However the table was
-            # correctly created and therefore we continue. Problem is that we
-            # are not able to detect real errors with the fdisk operation at
-            # that point.
-            log.debug('potential fdisk errors were ignored')
@@ -203,10 +203,10 @@ class RuntimeConfig:
     def get_bundle_compression(self, default=True):
         """
         Return boolean value to express if the image bundle should
-        contain XZ compressed image results or not.
+        contain compressed image results or not.
 
         bundle:
-          - compress: true|false
+          - compress: true|false|xz|zstd
 
         If compression of image build results is activated the size
         of the bundle is smaller and the download speed increases.
@@ -228,6 +228,64 @@ class RuntimeConfig:
             bundle_compress = default
         return bool(bundle_compress)
 
+    def get_bundle_compression_format(self):
+        """
+        Return compression format of the results in the image bundle
+
+        bundle:
+          - compress: xz|zstd
+
+        if compression is configured as true|false or if no or an
+        invalid format is configured, the default format from the
+        Defaults class is returned
+
+        :return: A name
+
+        :rtype: str
+        """
+        bundle_compress = self._get_attribute(
+            element='bundle', attribute='compress'
+        )
+        if bundle_compress is None or isinstance(bundle_compress, bool):
+            return Defaults.get_bundle_compression_format()
+        elif bundle_compress in ('xz', 'zstd'):
+            return bundle_compress
+        else:
+            log.warning(
+                'Skipping invalid bundle compression: {0}'.format(
+                    bundle_compress
+                )
+            )
+            return Defaults.get_bundle_compression_format()
+
+    def get_bundle_jobs(self):
+        """
+        Return number of result files bundled in parallel
+
+        bundle:
+          - jobs: number
+
+        if no or an invalid number is configured, the default
+        from the Defaults class is returned
+
+        :return: number of jobs
+
+        :rtype: int
+        """
+        bundle_jobs = self._get_attribute(
+            element='bundle', attribute='jobs'
+        )
+        if bundle_jobs is None:
+            return Defaults.get_bundle_jobs()
+        elif isinstance(bundle_jobs, int) and \
+                not isinstance(bundle_jobs, bool) and bundle_jobs > 0:
+            return bundle_jobs
+        else:
+            log.warning(
+                'Skipping invalid bundle jobs: {0}'.format(bundle_jobs)
+            )
+            return Defaults.get_bundle_jobs()
+
     def get_xz_options(self):
         """
         Return list of XZ compression options in:
@@ -249,6 +307,57 @@ class RuntimeConfig:
         xz_options = self._get_attribute(element='xz', attribute='options')
         return xz_options.split() if xz_options else None
 
+    def get_zstd_options(self):
+        """
+        Return list of zstd compression options in:
+
+        zstd:
+          - options: ...
+
+        if no configuration exists None is returned
+
+        :return:
+            Contains list of options
+
+            .. code:: python
+
+                ['--option=value']
+
+        :rtype: list
+        """
+        zstd_options = self._get_attribute(
+            element='zstd', attribute='options'
+        )
+        return zstd_options.split() if zstd_options else None
+
+    def get_compress_codec(self):
+        """
+        Return name of the codec implementation used to compress
+        and uncompress data
+
+        compress:
+          - codec: tool|python
+
+        if no or invalid configuration exists the default codec
+        from the Defaults class is returned
+
+        :return: A name
+
+        :rtype: str
+        """
+        compress_codec = self._get_attribute(
+            element='compress', attribute='codec'
+        )
+        if not compress_codec:
+            return Defaults.get_compress_codec()
+        elif compress_codec in ('tool', 'python'):
+            return compress_codec
+        else:
+            log.warning(
+                'Skipping invalid compress codec: {0}'.format(compress_codec)
+            )
+            return Defaults.get_compress_codec()
+
     def get_container_compression(self):
         """
         Return compression for container images
@@ -350,6 +459,98 @@ class RuntimeConfig:
         )
         return StringToSize.to_bytes(max_size) if max_size else None
 
+    def get_checksum_cache(self):
+        """
+        Return boolean value to express if calculated checksums
+        should be stored in an extended attribute of the source
+        file and reused as long as the file is unchanged
+
+        checksum:
+          - cache: true|false
+
+        if no configuration exists the checksum cache is
+        switched off
+
+        :return: True or False
+
+        :rtype: bool
+        """
+        checksum_cache = self._get_attribute(
+            element='checksum', attribute='cache'
+        )
+        return bool(checksum_cache)
+
+    def get_description_validation_cache(self):
+        """
+        Return boolean value to express if the validation of an
+        image description should be skipped if the same description
+        was successfully validated against the same schema before
+
+        description:
+          - validation_cache: true|false
+
+        if no configuration exists the validation cache is
+        switched off
+
+        :return: True or False
+
+        :rtype: bool
+        """
+        validation_cache = self._get_attribute(
+            element='description', attribute='validation_cache'
+        )
+        return bool(validation_cache)
+
+    def get_description_transform_cache(self):
+        """
+        Return boolean value to express if the result of the XSLT
+        processing of an image description should be stored and
+        reused on the next processing of the same description with
+        the same kiwi version
+
+        description:
+          - transform_cache: true|false
+
+        if no configuration exists the transform cache is
+        switched off
+
+        :return: True or False
+
+        :rtype: bool
+        """
+        transform_cache = self._get_attribute(
+            element='description', attribute='transform_cache'
+        )
+        return bool(transform_cache)
+
+    def get_disk_size_model(self):
+        """
+        Return name of the model used to calculate the size of
+        the root filesystem from the data in the image root tree
+
+        disk:
+          - size_model: factor|filesystem
+
+        if no or invalid configuration exists the default size
+        model from the Defaults class is returned
+
+        :return: A name
+
+        :rtype: str
+        """
+        size_model = self._get_attribute(
+            element='disk', attribute='size_model'
+        )
+        if not size_model:
+            return Defaults.get_disk_size_model()
+        elif size_model in ('factor', 'filesystem'):
+            return size_model
+        else:
+            log.warning(
+                'Skipping invalid disk size model: {0}'.format(size_model)
+            )
+            return Defaults.get_disk_size_model()
+
     def get_disabled_runtime_checks(self):
         """
         Returns disabled runtime checks. Checks can be disabled with:
@@ -16,6 +16,9 @@
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
 import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from kiwi.storage.device_provider import DeviceProvider
@@ -23,10 +26,13 @@ from kiwi.storage.mapped_device import MappedDevice
 from kiwi.filesystem import FileSystem
 from kiwi.command import Command
 from kiwi.utils.block import BlockID
+from kiwi.utils.block_copy import BlockCopy
 from kiwi.defaults import Defaults
 
 from kiwi.exceptions import KiwiRaidSetupError
 
+log = logging.getLogger('kiwi')
+
 
 class CloneDevice(DeviceProvider):
     """
@@ -43,52 +49,73 @@ class CloneDevice(DeviceProvider):
         """
         self.source_provider = source_provider
         self.root_dir = root_dir
+        # vgimportclone and the mdadm reassembly of the source
+        # raid work on shared names and must not run in parallel
+        self.shared_id_lock = threading.Lock()
 
     def clone(self, target_devices: List[DeviceProvider]):
         """
         Clone source device to target device(s)
 
+        The source device is read once and written to all target
+        devices at the same time. Afterwards the identifiers of the
+        clones are made unique in parallel, except for volume group
+        and raid clones which are updated one after the other
+
         :param list target_devices:
             List of target DeviceProvider instances
         """
+        BlockCopy(
+            self.source_provider.get_device(),
+            *[target_device.get_device() for target_device in target_devices]
+        ).copy()
         for target_device in target_devices:
-            Command.run(
-                [
-                    'dd',
-                    'if={0}'.format(self.source_provider.get_device()),
-                    'of={0}'.format(target_device.get_device())
-                ]
-            )
-            clone_id = BlockID(target_device.get_device())
-            target_filesystem = clone_id.get_filesystem()
+            BlockID.invalidate(target_device.get_device())
+        with ThreadPoolExecutor(
+            max_workers=len(target_devices) or 1
+        ) as executor:
+            for target_device in executor.map(
+                self._set_unique_id, target_devices
+            ):
+                log.debug(
+                    '--> Updated identifiers of clone {0}'.format(
+                        target_device.get_device()
+                    )
+                )
 
-            if target_filesystem in Defaults.get_filesystem_image_types():
-                # Simple filesystem clones needs to be unique on the UUID
-                # to avoid conflicts on the running system
-                FileSystem.new(
-                    target_filesystem, target_device
-                ).set_uuid()
-            elif target_filesystem == 'LVM2_member':
-                # Volume Group clones requires to be unique on the vgroup
-                # name to avoid conflicts on the running system
+    def _set_unique_id(self, target_device: DeviceProvider) -> DeviceProvider:
+        clone_id = BlockID(target_device.get_device())
+        target_filesystem = clone_id.get_filesystem()
+
+        if target_filesystem in Defaults.get_filesystem_image_types():
+            # Simple filesystem clones needs to be unique on the UUID
+            # to avoid conflicts on the running system
+            FileSystem.new(
+                target_filesystem, target_device
+            ).set_uuid()
+        elif target_filesystem == 'LVM2_member':
+            # Volume Group clones requires to be unique on the vgroup
+            # name to avoid conflicts on the running system
+            with self.shared_id_lock:
                 Command.run(
                     ['vgimportclone', target_device.get_device()]
                 )
-            elif target_filesystem == 'crypto_LUKS':
-                # Device mapper clones based on the LUKS header needs to be
-                # unique in the LUKS UUID to avoid conflicts on the running
-                # system
-                Command.run(
-                    [
-                        'cryptsetup', '-q', 'luksUUID',
-                        target_device.get_device(), '--uuid',
-                        format(uuid.uuid4())
-                    ]
-                )
-            elif target_filesystem == 'linux_raid_member':
-                # Device mapper clones based on the RAID superblock needs
-                # to be unique in the UUID stored in the raid superblock
-                # to avoid conflicts on the running system
+        elif target_filesystem == 'crypto_LUKS':
+            # Device mapper clones based on the LUKS header needs to be
+            # unique in the LUKS UUID to avoid conflicts on the running
+            # system
+            Command.run(
+                [
+                    'cryptsetup', '-q', 'luksUUID',
+                    target_device.get_device(), '--uuid',
+                    format(uuid.uuid4())
+                ]
+            )
+        elif target_filesystem == 'linux_raid_member':
+            # Device mapper clones based on the RAID superblock needs
+            # to be unique in the UUID stored in the raid superblock
+            # to avoid conflicts on the running system
+            with self.shared_id_lock:
                 try:
                     mdadm_conf = f'{self.root_dir}/etc/mdadm.conf'
                     with open(mdadm_conf) as mdadm:
@@ -121,3 +148,5 @@ class CloneDevice(DeviceProvider):
                     raise KiwiRaidSetupError(
                         f'Failed to update mdraid UUID: {issue}'
                     )
+        BlockID.invalidate(target_device.get_device())
+        return target_device
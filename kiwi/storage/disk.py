@@ -28,6 +28,7 @@ from kiwi.command import Command
 from kiwi.storage.device_provider import DeviceProvider
 from kiwi.storage.mapped_device import MappedDevice
 from kiwi.partitioner import Partitioner
+from kiwi.utils.block import BlockID
 from kiwi.exceptions import KiwiCustomPartitionConflictError
 
 ptable_entry_type = NamedTuple(
@@ -390,14 +391,20 @@ class Disk(DeviceProvider):
                     'sgdisk', '--zap-all', self.storage_provider.get_device()
                 ]
             )
+        BlockID.invalidate(self.storage_provider.get_device())
 
     def map_partitions(self):
         """
         Map/Activate partitions
 
         In order to access the partitions through a device node it is
-        required to map them if the storage provider is loop based
+        required to map them if the storage provider is loop based.
+        The partition table changes collected by the partitioner
+        are written before. The cached block device metadata is
+        dropped as the partition device nodes are new
         """
+        self.partitioner.commit()
+        BlockID.invalidate()
         if self.storage_provider.is_loop():
             Command.run(
                 ['kpartx', '-s', '-a', self.storage_provider.get_device()]
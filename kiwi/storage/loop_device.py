@@ -16,11 +16,15 @@
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
 import os
+import errno
+import fcntl
+import struct
 import logging
 
 # project
 from kiwi.command import Command
 from kiwi.storage.device_provider import DeviceProvider
+from kiwi.utils.block import BlockID
 from kiwi.utils.command_capabilities import CommandCapabilities
 
 from kiwi.exceptions import (
@@ -29,6 +33,19 @@ from kiwi.exceptions import (
 
 log = logging.getLogger('kiwi')
 
+# loop device ioctls and flags as defined in linux/loop.h
+LOOP_CTL_GET_FREE = 0x4C82
+LOOP_CONFIGURE = 0x4C0A
+LOOP_CLR_FD = 0x4C01
+LO_FLAGS_DIRECT_IO = 16
+
+# struct loop_config, a backing file descriptor and block size
+# followed by struct loop_info64 and reserved space
+LOOP_CONFIG_FORMAT = '=II5Q4I64s64s32s2Q8Q'
+
+# another process can take a free loop device before it is configured
+LOOP_CONFIGURE_ATTEMPTS = 8
+
 
 class LoopDevice(DeviceProvider):
     """
@@ -77,13 +94,80 @@ class LoopDevice(DeviceProvider):
         The file to loop is created with the size specified in the
         constructor unless an existing one should not be overwritten
 
+        The file is created sparse and attached through the
+        LOOP_CONFIGURE ioctl using direct I/O. On kernels without
+        support for it losetup is used
+
         :param bool overwrite: overwrite existing file to loop
         """
         if overwrite:
-            qemu_img_size = format(self.filesize_mbytes) + 'M'
-            Command.run(
-                ['qemu-img', 'create', self.filename, qemu_img_size]
+            if not self.filesize_mbytes:
+                raise KiwiLoopSetupError(
+                    'Can not create loop file without a size'
+                )
+            with open(self.filename, 'wb') as loop_file:
+                loop_file.truncate(self.filesize_mbytes * 1048576)
+        try:
+            self.node_name = self._configure()
+        except OSError as issue:
+            log.debug(
+                'LOOP_CONFIGURE of {0} failed: {1}, using losetup'.format(
+                    self.filename, issue
+                )
             )
+            self.node_name = self._setup()
+        # the loop device node can be a reused one
+        BlockID.invalidate(self.node_name)
+
+    def _configure(self) -> str:
+        direct_io = True
+        backing_fd = os.open(self.filename, os.O_RDWR | os.O_CLOEXEC)
+        try:
+            control_fd = os.open(
+                '/dev/loop-control', os.O_RDWR | os.O_CLOEXEC
+            )
+            try:
+                for attempt in range(LOOP_CONFIGURE_ATTEMPTS):
+                    node_name = '/dev/loop{0}'.format(
+                        fcntl.ioctl(control_fd, LOOP_CTL_GET_FREE)
+                    )
+                    device_fd = os.open(node_name, os.O_RDWR | os.O_CLOEXEC)
+                    try:
+                        fcntl.ioctl(
+                            device_fd, LOOP_CONFIGURE,
+                            self._get_loop_config(backing_fd, direct_io)
+                        )
+                        return node_name
+                    except OSError as issue:
+                        if issue.errno == errno.EINVAL and direct_io:
+                            # direct I/O not possible for the backing file
+                            direct_io = False
+                        elif issue.errno != errno.EBUSY:
+                            raise
+                    finally:
+                        os.close(device_fd)
+                raise OSError(errno.EBUSY, 'No free loop device')
+            finally:
+                os.close(control_fd)
+        finally:
+            os.close(backing_fd)
+
+    def _get_loop_config(self, backing_fd: int, direct_io: bool) -> bytes:
+        file_name = os.fsencode(self.filename)[:63]
+        return struct.pack(
+            LOOP_CONFIG_FORMAT,
+            backing_fd, self.blocksize_bytes or 0,
+            # lo_device, lo_inode, lo_rdevice, lo_offset, lo_sizelimit
+            0, 0, 0, 0, 0,
+            # lo_number, lo_encrypt_type, lo_encrypt_key_size, lo_flags
+            0, 0, 0, LO_FLAGS_DIRECT_IO if direct_io else 0,
+            # lo_file_name, lo_crypt_name, lo_encrypt_key, lo_init
+            file_name, b'', b'', 0, 0,
+            # reserved
+            0, 0, 0, 0, 0, 0, 0, 0
+        )
+
+    def _setup(self) -> str:
         loop_options = []
         if self.blocksize_bytes and self.blocksize_bytes != 512:
             if CommandCapabilities.has_option_in_help(
@@ -96,13 +180,17 @@ class LoopDevice(DeviceProvider):
         loop_call = Command.run(
             ['losetup'] + loop_options + ['-f', '--show', self.filename]
         )
-        self.node_name = loop_call.output.rstrip(os.linesep)
+        return loop_call.output.rstrip(os.linesep)
 
     def __del__(self):
         if self.node_name:
             log.info('Cleaning up %s instance', type(self).__name__)
             try:
-                Command.run(['losetup', '-d', self.node_name])
+                device_fd = os.open(self.node_name, os.O_RDWR | os.O_CLOEXEC)
+                try:
+                    fcntl.ioctl(device_fd, LOOP_CLR_FD)
+                finally:
+                    os.close(device_fd)
             except Exception:
                 log.warning(
                     'loop device %s still busy', self.node_name
@@ -21,6 +21,7 @@ from typing import Optional
 
 # project
 from kiwi.utils.temporary import Temporary
+from kiwi.utils.block_copy import BlockCopy
 from kiwi.command import Command
 from kiwi.defaults import Defaults
 from kiwi.storage.device_provider import DeviceProvider
@@ -109,12 +110,8 @@ class LuksDevice(DeviceProvider):
         storage_size_mbytes = self.storage_provider.get_byte_size(
             storage_device
         ) / 1048576
-        Command.run(
-            [
-                'dd', 'if=/dev/urandom', 'bs=1M',
-                'count=%d' % storage_size_mbytes,
-                'of=%s' % storage_device
-            ]
+        BlockCopy('/dev/urandom', storage_device).copy(
+            byte_count=int(storage_size_mbytes) * 1048576
         )
         log.info('--> Creating LUKS map')
 
@@ -19,11 +19,15 @@ import os
 import logging
 from collections import namedtuple
 from textwrap import dedent
+from typing import Optional
 
 # project
 from kiwi.firmware import FirmWare
-from kiwi.system.size import SystemSize
+from kiwi.system.size import (
+    SystemSize, filesystem_size_type
+)
 from kiwi.defaults import Defaults
+from kiwi.runtime_config import RuntimeConfig
 from kiwi.xml_state import XMLState
 from kiwi.exceptions import (
     KiwiVolumeTooSmallError,
@@ -67,6 +71,9 @@ class DiskSetup:
             root_dir
         )
 
+        self.size_model = RuntimeConfig().get_disk_size_model()
+        self.root_filesystem_size: Optional[filesystem_size_type] = None
+
         self.root_dir = root_dir
         self.xml_state = xml_state
 
@@ -86,10 +93,24 @@ class DiskSetup:
         :rtype: int
         """
         log.info('Precalculating required disk size')
+        # walk the root tree once, the size queries for the root,
+        # the custom partitions and the volumes are served from it.
+        # The volume manager sizes the volumes from it as well as
+        # the volumes are created before the root tree is synced
+        self.rootsize.create_index(jobs=os.cpu_count() or 1)
         calculated_disk_mbytes = 0
-        root_filesystem_mbytes = self.rootsize.customize(
-            self.rootsize.accumulate_mbyte_file_sizes(), self.filesystem
-        )
+        if self.size_model == 'filesystem':
+            # the prediction is kept to be compared with the usage
+            # of the synced root filesystem
+            self.root_filesystem_size = self.rootsize.get_filesystem_size(
+                self.filesystem
+            )
+            root_filesystem_mbytes = \
+                -(-self.root_filesystem_size.size_bytes // 1048576)
+        else:
+            root_filesystem_mbytes = self.rootsize.customize(
+                self.rootsize.accumulate_mbyte_file_sizes(), self.filesystem
+            )
         if root_clone:
             root_clone += 1
             log.info(
@@ -443,7 +464,7 @@ class DiskSetup:
             if volume.realpath and not volume.realpath == '/':
                 path_to_volume = self.root_dir + '/' + volume.realpath
                 if os.path.exists(path_to_volume):
-                    volume_size = SystemSize(path_to_volume)
+                    volume_size = self.rootsize.get_subtree(path_to_volume)
                     volume_mbytes[volume.realpath] = volume_size.customize(
                         volume_size.accumulate_mbyte_file_sizes(),
                         self.filesystem
@@ -473,7 +494,9 @@ class DiskSetup:
                     os.sep.join([self.root_dir, partition_mount_path])
                 )
                 if os.path.exists(path_to_partition):
-                    partition_size = SystemSize(path_to_partition)
+                    partition_size = self.rootsize.get_subtree(
+                        path_to_partition
+                    )
                     partition_mbytes[partition_mount_path] = partition_size.customize(
                         partition_size.accumulate_mbyte_file_sizes(),
                         partition_filesystem
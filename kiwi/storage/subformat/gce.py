@@ -20,7 +20,7 @@ from collections import OrderedDict
 
 # project
 from kiwi.utils.temporary import Temporary
-from kiwi.command import Command
+from kiwi.utils.block_copy import BlockCopy
 from kiwi.storage.subformat.base import DiskFormatBase
 from kiwi.archive.tar import ArchiveTar
 from kiwi.system.result import Result
@@ -73,9 +73,12 @@ class DiskFormatGce(DiskFormatBase):
                 manifest.write('{"licenses": ["%s"]}' % self.tag)
             gce_tar_ball_file_list.append('manifest.json')
 
-        Command.run(
-            ['cp', diskname, temp_image_dir.name + '/disk.raw']
-        )
+        # the tarball is created from a hard link to the raw disk,
+        # if not possible the copy keeps the holes of the raw disk
+        try:
+            os.link(diskname, temp_image_dir.name + '/disk.raw')
+        except OSError:
+            BlockCopy(diskname, temp_image_dir.name + '/disk.raw').copy()
         gce_tar_ball_file_list.append('disk.raw')
 
         archive_name = os.path.basename(
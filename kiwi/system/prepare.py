@@ -257,9 +257,7 @@ class SystemPrepare:
         try:
             process.poll_show_progress(
                 items_to_complete=all_install_items,
-                match_method=process.create_match_method(
-                    manager.match_package_installed
-                )
+                parse_method=manager.parse_package_installed
             )
         except Exception as issue:
             if manager.has_failed(process.returncode()):
@@ -328,9 +326,7 @@ class SystemPrepare:
             try:
                 process.poll_show_progress(
                     items_to_complete=all_install_items,
-                    match_method=process.create_match_method(
-                        manager.match_package_installed
-                    )
+                    parse_method=manager.parse_package_installed
                 )
             except Exception as issue:
                 if manager.has_failed(process.returncode()):
@@ -423,9 +419,7 @@ class SystemPrepare:
             try:
                 process.poll_show_progress(
                     items_to_complete=all_install_items,
-                    match_method=process.create_match_method(
-                        manager.match_package_installed
-                    )
+                    parse_method=manager.parse_package_installed
                 )
             except Exception as issue:
                 raise KiwiSystemInstallPackagesFailed(
@@ -466,9 +460,7 @@ class SystemPrepare:
             try:
                 process.poll_show_progress(
                     items_to_complete=all_delete_items,
-                    match_method=process.create_match_method(
-                        manager.match_package_deleted
-                    )
+                    parse_method=manager.parse_package_deleted
                 )
                 manager.post_process_delete_requests(self.root_bind)
             except Exception as issue:
@@ -20,15 +20,17 @@ import simplejson
 import pickle
 import os
 from typing import (
-    Dict, NamedTuple, TypeVar, Any
+    Dict, NamedTuple, TypeVar, Any, TYPE_CHECKING
 )
 
 # project
-from kiwi.xml_state import XMLState
 from kiwi.exceptions import (
     KiwiResultError
 )
 
+if TYPE_CHECKING:  # pragma: no cover
+    from kiwi.xml_state import XMLState
+
 log = logging.getLogger('kiwi')
 
 # must be global to allow pickle to find it
@@ -64,7 +66,7 @@ class Result:
     :param object class_version: :class:`Result` class version
     :param object xml_state: instance of :class:`XMLState`
     """
-    def __init__(self, xml_state: XMLState):
+    def __init__(self, xml_state: 'XMLState'):
         self.result_files: Dict[str, Any] = {}
 
         # Instances of this class are stored as result reference.
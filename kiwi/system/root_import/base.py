@@ -84,5 +84,5 @@ class RootImportBase:
         raise NotImplementedError
 
     def _make_checksum(self, image):
-        checksum = Checksum(image)
+        checksum = Checksum(image, cache=True)
         checksum.md5(''.join([image, '.md5']))
@@ -19,7 +19,6 @@ import glob
 import os
 import logging
 import copy
-import pathlib
 from collections import OrderedDict
 from collections import namedtuple
 from typing import (
@@ -46,7 +45,6 @@ from kiwi.system.users import Users
 from kiwi.system.shell import Shell
 from kiwi.path import Path
 from kiwi.archive.tar import ArchiveTar
-from kiwi.utils.compress import Compress
 from kiwi.utils.command_capabilities import CommandCapabilities
 from kiwi.utils.rpm_database import RpmDataBase
 from kiwi.system.profile import Profile
@@ -815,14 +813,15 @@ class SystemSetup:
             'partition_filesystem':
                 self.root_dir + '/recovery.tar.filesystem'
         }
-        pathlib.Path(metadata['archive_name']).touch()
+        # recovery.tar.gz, the archive is compressed while it is
+        # written and its members and size are counted on the way
         archive = ArchiveTar(
             filename=metadata['archive_name'],
             create_from_file_list=False
         )
-        archive.create(
+        archive_name = archive.create_gzip_compressed(
             source_dir=self.root_dir,
-            exclude=['dev', 'proc', 'sys'],
+            exclude=['dev', 'proc', 'sys', 'recovery.tar.gz'],
             options=[
                 '--numeric-owner',
                 '--hard-dereference',
@@ -837,34 +836,22 @@ class SystemSetup:
             '--> Recovery partition filesystem: {0}'.format(recovery_filesystem)
         )
         # recovery.tar.files
-        bash_comand = [
-            'tar', '-tf', metadata['archive_name'], '|', 'wc', '-l'
-        ]
-        tar_files_call = Command.run(
-            ['bash', '-c', ' '.join(bash_comand)]
-        )
-        tar_files_count = int(tar_files_call.output.rstrip('\n'))
         with open(metadata['archive_filecount'], 'w') as files:
-            files.write('{0}{1}'.format(tar_files_count, os.linesep))
+            files.write('{0}{1}'.format(archive.member_count, os.linesep))
         log.info(
-            '--> Recovery file count: {0} files'.format(tar_files_count)
+            '--> Recovery file count: {0} files'.format(archive.member_count)
         )
         # recovery.tar.size
-        recovery_archive_size_bytes = os.path.getsize(metadata['archive_name'])
         with open(metadata['archive_size'], 'w') as size:
-            size.write('{0}'.format(recovery_archive_size_bytes))
+            size.write('{0}'.format(archive.uncompressed_size))
         log.info(
             '--> Recovery uncompressed size: {0} mbytes'.format(
-                int(recovery_archive_size_bytes / 1048576)
+                int(archive.uncompressed_size / 1048576)
             )
         )
-        # recovery.tar.gz
-        log.info('--> Compressing recovery archive')
-        compress = Compress(self.root_dir + '/recovery.tar')
-        compress.gzip()
         # recovery.partition.size
         recovery_archive_gz_size_mbytes = int(
-            os.path.getsize(metadata['archive_name'] + '.gz') / 1048576
+            os.path.getsize(archive_name) / 1048576
         )
         recovery_partition_mbytes = recovery_archive_gz_size_mbytes \
             + Defaults.get_recovery_spare_mbytes()
@@ -884,7 +871,7 @@ class SystemSetup:
             log.info(
                 '--> Inplace recovery requested, deleting archive'
             )
-            Path.wipe(metadata['archive_name'] + '.gz')
+            Path.wipe(archive_name)
 
     def _process_user_options(
         self,
@@ -16,21 +16,140 @@
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
 import os
-from typing import List
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Dict, List, NamedTuple, Optional, Tuple
+)
 
 # project
-from kiwi.command import Command
 from kiwi.defaults import Defaults
+from kiwi.exceptions import KiwiFileAccessError
+
+tree_size_type = NamedTuple(
+    'tree_size_type', [
+        ('apparent_bytes', int),
+        ('disk_bytes', int),
+        ('inodes', int),
+        ('block_bytes', int),
+        ('inline_files', int),
+        ('inline_bytes', int)
+    ]
+)
+
+filesystem_size_type = NamedTuple(
+    'filesystem_size_type', [
+        ('used_bytes', int),
+        ('reserved_bytes', int),
+        ('size_bytes', int)
+    ]
+)
+
+# number of size totals kept per index entry, see tree_size_type
+INDEX_FIELDS = 6
+
+# block size of the filesystems created by kiwi, the data of
+# each file occupies a multiple of it
+FILESYSTEM_BLOCK_BYTES = 4096
+
+# free space added to the modelled filesystem usage to store
+# data written after the sync, e.g. the bootloader setup
+FILESYSTEM_FREE_PERCENT = 5
+FILESYSTEM_MIN_FREE_BYTES = 64 * 1048576
+
+# symlink targets shorter than this are stored in the inode
+FAST_SYMLINK_BYTES = 60
+
+# block group size and inode ratios as used by mke2fs. Filesystems
+# smaller than EXT_SMALL_BYTES are created with the small inode ratio
+EXT_GROUP_BYTES = 32768 * FILESYSTEM_BLOCK_BYTES
+EXT_SMALL_BYTES = 512 * 1048576
+EXT_SMALL_INODE_RATIO = 4096
+EXT_INODE_RATIO = 16384
+
+# journal size in blocks as used by mke2fs for filesystems
+# below the given number of blocks
+EXT_JOURNAL_BLOCKS = [
+    (2048, 0),
+    (32768, 1024),
+    (256 * 1024, 4096),
+    (512 * 1024, 8192),
+    (4096 * 1024, 16384),
+    (8192 * 1024, 32768),
+    (16384 * 1024, 65536),
+    (32768 * 1024, 131072)
+]
+EXT_MAX_JOURNAL_BLOCKS = 262144
+
+# xfs inode size, inodes are allocated in chunks, and the log
+# size limits as used by mkfs.xfs
+XFS_INODE_BYTES = 512
+XFS_INODE_CHUNK = 64
+XFS_MIN_LOG_BYTES = 64 * 1048576
+XFS_MAX_LOG_BYTES = 2048 * 1048576
+XFS_MAX_RESERVE_BYTES = 8192 * FILESYSTEM_BLOCK_BYTES
+
+# btrfs stores small files inline in the metadata, metadata is
+# duplicated and allocated in chunks of at most 10% of the device
+BTRFS_MAX_INLINE_BYTES = 2048
+BTRFS_INODE_METADATA_BYTES = 512
+BTRFS_METADATA_COPIES = 2
+BTRFS_SYSTEM_CHUNK_BYTES = 8 * 1048576
+BTRFS_METADATA_CHUNK_BYTES = 256 * 1048576
+BTRFS_DATA_CHUNK_BYTES = 1024 * 1048576
 
 
 class SystemSize:
     """
     **Provide source tree size information**
 
+    The source tree is walked once and the size totals of each
+    directory are kept in an index from which all size queries
+    of the instance are answered. Files with multiple hard links
+    are only accounted once.
+
     :param str source_dir: source directory path name
     """
     def __init__(self, source_dir: str):
         self.source_dir = source_dir
+        self.source_path = os.path.abspath(source_dir)
+        self.index: Optional[Dict[str, List[int]]] = None
+        # size totals and link paths of files with multiple hard
+        # links, each link is accounted in the index
+        self.hardlinks: Dict[Tuple[int, int], Tuple[List[int], List[str]]] = {}
+        self.hardlinks_lock = threading.Lock()
+
+    def create_index(self, jobs: int = 1) -> None:
+        """
+        Walk the source tree and create its size index
+
+        The index reflects the source tree at the time it was
+        created. Size queries of instances from get_subtree are
+        answered from it without walking the tree again
+
+        :param int jobs:
+            number of threads to walk the toplevel directories
+            of the source tree in parallel
+        """
+        self.index = self._create_tree_index(jobs)
+
+    def get_subtree(self, source_dir: str) -> 'SystemSize':
+        """
+        Provide a SystemSize instance for a directory below the
+        source tree which shares the index of this instance
+
+        :param str source_dir: directory path name
+
+        :return: SystemSize instance
+
+        :rtype: SystemSize
+        """
+        subtree = SystemSize(source_dir)
+        if self.index and subtree.source_path in self.index:
+            subtree.index = self.index
+            subtree.hardlinks = self.hardlinks
+        return subtree
 
     def customize(self, size: float, requested_filesystem: str) -> int:
         """
@@ -64,6 +183,50 @@ class SystemSize:
 
         return int(size)
 
+    def get_tree_size(self, exclude: List[str] = None) -> tree_size_type:
+        """
+        Calculate apparent size, allocated size, number of inodes
+        and the block usage in a kiwi created filesystem of all
+        data in the source tree
+
+        :param list exclude: list of paths to exclude
+
+        :return: tree_size_type tuple
+
+        :rtype: tuple
+        """
+        index = self._get_index()
+        totals = list(index.get(self.source_path) or [0] * INDEX_FIELDS)
+        exclude_paths = [
+            os.sep.join([self.source_path, nodev])
+            for nodev in Defaults.get_exclude_list_for_non_physical_devices()
+        ]
+        for item in exclude or []:
+            exclude_paths.append(os.path.abspath(item))
+        excluded: List[str] = []
+        for exclude_path in sorted(set(exclude_paths)):
+            if not exclude_path.startswith(self.source_path + os.sep):
+                continue
+            if excluded and exclude_path.startswith(excluded[-1] + os.sep):
+                # already excluded with its parent directory
+                continue
+            excluded.append(exclude_path)
+            exclude_totals = index.get(exclude_path) or \
+                self._get_file_totals(exclude_path)
+            for position, value in enumerate(exclude_totals):
+                totals[position] -= value
+        # account files with multiple hard links only once for
+        # the links which are left after the excludes
+        for hardlink_totals, link_paths in self.hardlinks.values():
+            links = 0
+            for link_path in link_paths:
+                if link_path.startswith(self.source_path + os.sep) and \
+                   not self._is_excluded(link_path, excluded):
+                    links += 1
+            for position, value in enumerate(hardlink_totals):
+                totals[position] -= max(links - 1, 0) * value
+        return tree_size_type(*totals)
+
     def accumulate_mbyte_file_sizes(self, exclude: List[str] = None) -> int:
         """
         Calculate data size of all data in the source tree
@@ -74,24 +237,7 @@ class SystemSize:
 
         :rtype: int
         """
-        exclude_options: List[str] = []
-        for nodev in Defaults.get_exclude_list_for_non_physical_devices():
-            exclude_options.append('--exclude')
-            exclude_options.append(
-                os.sep.join([self.source_dir, nodev])
-            )
-        if exclude:
-            for item in exclude:
-                exclude_options.append('--exclude')
-                exclude_options.append(item)
-        du_call = Command.run(
-            [
-                'du', '-s', '--apparent-size', '--block-size', '1'
-            ] + exclude_options + [
-                self.source_dir
-            ]
-        )
-        return int(int(du_call.output.split('\t')[0]) / 1048576)
+        return int(self.get_tree_size(exclude).apparent_bytes / 1048576)
 
     def accumulate_files(self) -> int:
         """
@@ -101,12 +247,267 @@ class SystemSize:
 
         :rtype: int
         """
-        bash_comand = [
-            'find', self.source_dir, '|', 'wc', '-l'
-        ]
-        wc_call = Command.run(
-            [
-                'bash', '-c', ' '.join(bash_comand)
-            ]
+        return self.get_tree_size().inodes
+
+    def get_filesystem_size(
+        self, requested_filesystem: str, exclude: List[str] = None
+    ) -> filesystem_size_type:
+        """
+        Estimate the size of a filesystem to store all data in
+        the source tree
+
+        Unlike the empiric factor used in customize, the estimate
+        is modelled from the index of the source tree. The data of
+        each file is rounded up to the filesystem block size and
+        the space the requested filesystem needs for inode tables,
+        journal or log and metadata is added. Some free space is
+        added for data written after the sync
+
+        :param str requested_filesystem: filesystem name
+        :param list exclude: list of paths to exclude
+
+        :return: filesystem_size_type tuple
+
+        :rtype: tuple
+        """
+        tree_size = self.get_tree_size(exclude)
+        used_bytes = self._get_filesystem_used_bytes(
+            tree_size, requested_filesystem
+        )
+        data_bytes = used_bytes + max(
+            used_bytes * FILESYSTEM_FREE_PERCENT // 100,
+            FILESYSTEM_MIN_FREE_BYTES
         )
-        return int(wc_call.output.rstrip('\n'))
+        size_bytes = data_bytes
+        while True:
+            # the filesystem overhead grows with the filesystem size
+            reserved_bytes = self._get_filesystem_reserved_bytes(
+                size_bytes, requested_filesystem
+            )
+            required_bytes = data_bytes + reserved_bytes
+            if requested_filesystem and \
+               requested_filesystem.startswith('ext'):
+                # mke2fs creates one inode per inode ratio bytes
+                # which must be enough to store all files of the tree
+                required_bytes = max(
+                    required_bytes,
+                    tree_size.inodes * self._get_ext_inode_ratio(size_bytes)
+                )
+            if required_bytes <= size_bytes:
+                break
+            size_bytes = required_bytes
+        return filesystem_size_type(
+            used_bytes=used_bytes,
+            reserved_bytes=reserved_bytes,
+            size_bytes=size_bytes
+        )
+
+    def get_mbyte_filesystem_size(
+        self, requested_filesystem: str, exclude: List[str] = None
+    ) -> int:
+        """
+        Estimate the size of a filesystem to store all data in
+        the source tree, see get_filesystem_size
+
+        :param str requested_filesystem: filesystem name
+        :param list exclude: list of paths to exclude
+
+        :return: mbytes
+
+        :rtype: int
+        """
+        size_bytes = self.get_filesystem_size(
+            requested_filesystem, exclude
+        ).size_bytes
+        return -(-size_bytes // 1048576)
+
+    @staticmethod
+    def get_used_bytes(mountpoint: str) -> int:
+        """
+        Calculate the used space of a mounted filesystem
+
+        :param str mountpoint: mountpoint path name
+
+        :return: bytes
+
+        :rtype: int
+        """
+        filesystem_stat = os.statvfs(mountpoint)
+        return (
+            filesystem_stat.f_blocks - filesystem_stat.f_bfree
+        ) * filesystem_stat.f_frsize
+
+    @staticmethod
+    def _get_filesystem_used_bytes(
+        tree_size: tree_size_type, requested_filesystem: str
+    ) -> int:
+        if not requested_filesystem:
+            return tree_size.block_bytes
+        if requested_filesystem in ('ext2', 'ext3'):
+            # indirect blocks, one block addresses 1024 blocks
+            return tree_size.block_bytes + tree_size.block_bytes // 1024
+        if requested_filesystem == 'xfs':
+            inode_chunks = -(-tree_size.inodes // XFS_INODE_CHUNK)
+            return tree_size.block_bytes + \
+                inode_chunks * XFS_INODE_CHUNK * XFS_INODE_BYTES
+        if requested_filesystem == 'btrfs':
+            data_bytes = tree_size.block_bytes - \
+                tree_size.inline_files * FILESYSTEM_BLOCK_BYTES
+            # inode items, directory entries, inline data and
+            # one 4 byte checksum per data block
+            metadata_bytes = \
+                tree_size.inodes * BTRFS_INODE_METADATA_BYTES + \
+                tree_size.inline_bytes + data_bytes // 1024
+            return data_bytes + BTRFS_METADATA_COPIES * metadata_bytes
+        return tree_size.block_bytes
+
+    @staticmethod
+    def _get_filesystem_reserved_bytes(
+        size_bytes: int, requested_filesystem: str
+    ) -> int:
+        if not requested_filesystem:
+            return 0
+        if requested_filesystem.startswith('ext'):
+            inode_table_bytes = \
+                size_bytes // SystemSize._get_ext_inode_ratio(size_bytes) * \
+                Defaults.get_default_inode_size()
+            # block and inode bitmap of each block group
+            bitmap_bytes = \
+                -(-size_bytes // EXT_GROUP_BYTES) * 2 * FILESYSTEM_BLOCK_BYTES
+            journal_bytes = 0
+            if requested_filesystem != 'ext2':
+                blocks = size_bytes // FILESYSTEM_BLOCK_BYTES
+                journal_blocks = EXT_MAX_JOURNAL_BLOCKS
+                for max_blocks, default_blocks in EXT_JOURNAL_BLOCKS:
+                    if blocks < max_blocks:
+                        journal_blocks = default_blocks
+                        break
+                journal_bytes = journal_blocks * FILESYSTEM_BLOCK_BYTES
+            return inode_table_bytes + bitmap_bytes + journal_bytes
+        if requested_filesystem == 'xfs':
+            log_bytes = min(
+                max(size_bytes // 2048, XFS_MIN_LOG_BYTES), XFS_MAX_LOG_BYTES
+            )
+            # reserved blocks pool and the per allocation group
+            # reservations for the free inode and reverse mapping trees
+            reserve_bytes = min(size_bytes // 20, XFS_MAX_RESERVE_BYTES)
+            return log_bytes + reserve_bytes + size_bytes // 100
+        if requested_filesystem == 'btrfs':
+            # last partially used data and metadata chunks
+            chunk_bytes = size_bytes // 10
+            return BTRFS_METADATA_COPIES * (
+                BTRFS_SYSTEM_CHUNK_BYTES + min(
+                    chunk_bytes, BTRFS_METADATA_CHUNK_BYTES
+                )
+            ) + min(chunk_bytes, BTRFS_DATA_CHUNK_BYTES)
+        return 0
+
+    def _get_index(self) -> Dict[str, List[int]]:
+        if self.index is None:
+            self.index = self._create_tree_index()
+        return self.index
+
+    def _create_tree_index(self, jobs: int = 1) -> Dict[str, List[int]]:
+        if not os.path.isdir(self.source_path):
+            raise KiwiFileAccessError(
+                f'Source tree {self.source_dir!r} is not a directory'
+            )
+        index: Dict[str, List[int]] = {}
+        exclude_paths = [
+            os.sep.join([self.source_path, nodev])
+            for nodev in Defaults.get_exclude_list_for_non_physical_devices()
+        ]
+        self.hardlinks = {}
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            self._index_directory(
+                self.source_path, index, exclude_paths, executor
+            )
+        return index
+
+    def _index_directory(
+        self, path: str, index: Dict[str, List[int]],
+        exclude_paths: List[str] = None, executor: ThreadPoolExecutor = None
+    ) -> List[int]:
+        try:
+            path_stat = os.lstat(path)
+            with os.scandir(path) as entries:
+                directory_entries = list(entries)
+        except FileNotFoundError:
+            # directory vanished while walking the tree
+            return [0] * INDEX_FIELDS
+        totals = self._get_stat_totals(path_stat)
+        directories = []
+        for entry in directory_entries:
+            if exclude_paths and entry.path in exclude_paths:
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                    continue
+                entry_stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            entry_totals = self._get_stat_totals(entry_stat)
+            if entry_stat.st_nlink > 1:
+                inode = (entry_stat.st_dev, entry_stat.st_ino)
+                with self.hardlinks_lock:
+                    self.hardlinks.setdefault(
+                        inode, (entry_totals, [])
+                    )[1].append(entry.path)
+            for position, value in enumerate(entry_totals):
+                totals[position] += value
+        map_method = executor.map if executor else map
+        for subtotals in map_method(
+            lambda directory: self._index_directory(directory, index),
+            directories
+        ):
+            for position, value in enumerate(subtotals):
+                totals[position] += value
+        index[path] = totals
+        return totals
+
+    @staticmethod
+    def _is_excluded(path: str, excluded: List[str]) -> bool:
+        for exclude_path in excluded:
+            if path == exclude_path or path.startswith(exclude_path + os.sep):
+                return True
+        return False
+
+    @staticmethod
+    def _get_ext_inode_ratio(size_bytes: int) -> int:
+        if size_bytes < EXT_SMALL_BYTES:
+            return EXT_SMALL_INODE_RATIO
+        return EXT_INODE_RATIO
+
+    @staticmethod
+    def _get_file_totals(path: str) -> List[int]:
+        try:
+            path_stat = os.lstat(path)
+        except OSError:
+            return [0] * INDEX_FIELDS
+        if stat.S_ISDIR(path_stat.st_mode):
+            # directories not part of the index are not accounted
+            return [0] * INDEX_FIELDS
+        return SystemSize._get_stat_totals(path_stat)
+
+    @staticmethod
+    def _get_stat_totals(path_stat: os.stat_result) -> List[int]:
+        size = path_stat.st_size
+        blocks = -(-size // FILESYSTEM_BLOCK_BYTES)
+        inline_files = 0
+        inline_bytes = 0
+        if stat.S_ISDIR(path_stat.st_mode):
+            # a directory occupies at least one block
+            blocks = max(blocks, 1)
+        elif stat.S_ISREG(path_stat.st_mode):
+            if 0 < size <= BTRFS_MAX_INLINE_BYTES:
+                inline_files = 1
+                inline_bytes = size
+        elif not stat.S_ISLNK(path_stat.st_mode) or size < FAST_SYMLINK_BYTES:
+            # device nodes, sockets, fifos and short symlinks
+            # are stored in the inode
+            blocks = 0
+        return [
+            size, path_stat.st_blocks * 512, 1,
+            blocks * FILESYSTEM_BLOCK_BYTES, inline_files, inline_bytes
+        ]
@@ -19,17 +19,17 @@ import os
 import logging
 import glob
 from typing import (
-    List, Dict, Optional, Union, Any
+    List, Dict, Optional, Union, Any, TYPE_CHECKING
 )
 from operator import attrgetter
 
 # project
 from kiwi.cli import Cli
-from kiwi.xml_state import XMLState
-from kiwi.xml_description import XMLDescription
-from kiwi.runtime_checker import RuntimeChecker
 from kiwi.runtime_config import RuntimeConfig
 
+if TYPE_CHECKING:  # pragma: no cover
+    from kiwi.runtime_checker import RuntimeChecker
+
 from kiwi.exceptions import (
     KiwiConfigFileNotFound
 )
@@ -55,7 +55,7 @@ class CliTask:
         self.cli = Cli()
 
         # initialize runtime checker
-        self.runtime_checker: Optional[RuntimeChecker] = None
+        self.runtime_checker: Optional['RuntimeChecker'] = None
 
         # help requested
         self.cli.show_and_exit_on_help_request()
@@ -139,6 +139,12 @@ class CliTask:
             kiwi searches for a file named config.xml or
             a file matching .kiwi
         """
+        # the description stack pulls in lxml and the generated
+        # xml_parse module, import it only if a task needs it
+        from kiwi.xml_state import XMLState
+        from kiwi.xml_description import XMLDescription
+        from kiwi.runtime_checker import RuntimeChecker
+
         log.info('Loading XML description')
         if kiwi_file:
             config_file = os.sep.join([description_directory, kiwi_file])
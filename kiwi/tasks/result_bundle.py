@@ -20,6 +20,7 @@ usage: kiwi-ng result bundle -h | --help
        kiwi-ng result bundle --target-dir=<directory> --id=<bundle_id> --bundle-dir=<directory>
            [--zsync-source=<download_location>]
            [--package-as-rpm]
+           [--jobs=<number>]
        kiwi-ng result bundle help
 
 commands:
@@ -27,8 +28,9 @@ commands:
         create result bundle from the image build results in the
         specified target directory. Each result image will contain
         the specified bundle identifier as part of its filename.
-        Uncompressed image files will also become xz compressed
-        and a sha sum will be created from every result image.
+        Uncompressed image files will also become xz or zstd
+        compressed and a sha sum will be created from every result
+        image.
 
 options:
     --bundle-dir=<directory>
@@ -36,6 +38,10 @@ options:
     --id=<bundle_id>
         the bundle id. A free form text appended to the version
         information of the result image filename
+    --jobs=<number>
+        number of result files bundled in parallel. The threads of
+        the xz and zstd compressors are divided between the jobs.
+        Defaults to the bundle jobs setting in the runtime config
     --target-dir=<directory>
         the target directory to expect image build results
     --zsync-source=<download_location>
@@ -50,19 +56,35 @@ options:
         Take all result files and create an rpm package out of it
 """
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from textwrap import dedent
-from typing import List
+from typing import (
+    List, Optional
+)
 import logging
+import hashlib
+import shutil
+import subprocess
 import glob
 import os
 
 # project
+import kiwi.defaults as defaults
+
 from kiwi.tasks.base import CliTask
 from kiwi.help import Help
-from kiwi.system.result import Result
+from kiwi.defaults import Defaults
+from kiwi.system.result import (
+    Result, result_file_type
+)
 from kiwi.path import Path
+from kiwi.utils.block_copy import BlockCopy
+from kiwi.utils.codec import Codec
 from kiwi.utils.compress import Compress
-from kiwi.utils.checksum import Checksum
+from kiwi.utils.temporary import Temporary
+from kiwi.utils.checksum import (
+    Checksum, ChecksumWriter
+)
 from kiwi.privileges import Privileges
 from kiwi.command import Command
 
@@ -87,8 +109,9 @@ class ResultBundleTask(CliTask):
         Create result bundle from the image build results in the
         specified target directory. Each result image will contain
         the specified bundle identifier as part of its filename.
-        Uncompressed image files will also become xz compressed
-        and a sha sum will be created from every result image
+        Uncompressed image files will also become xz or zstd
+        compressed and a sha sum will be created from every result
+        image
         """
         self.manual = Help()
         if self._help():
@@ -161,6 +184,7 @@ class ResultBundleTask(CliTask):
             )
             del(ordered_results['bundle_format'])
 
+        bundle_files = []
         for result_file in list(ordered_results.values()):
             if result_file.use_for_bundle:
                 extension = result_file.filename.split('.').pop()
@@ -184,55 +208,35 @@ class ResultBundleTask(CliTask):
                             )
                         ]
                     )
-                log.info('Creating %s', bundle_file_basename)
-                bundle_file = ''.join(
-                    [bundle_directory, '/', bundle_file_basename]
-                )
-                Command.run(
-                    [
-                        'cp', result_file.filename, bundle_file
-                    ]
-                )
-                if result_file.compress:
-                    log.info('--> XZ compressing')
-                    compress = Compress(bundle_file)
-                    compress.xz(self.runtime_config.get_xz_options())
-                    bundle_file = compress.compressed_filename
-
-                if self.command_args['--zsync-source'] and result_file.shasum:
-                    # Files with a checksum are considered to be image files
-                    # and are therefore eligible to be provided via the
-                    # requested Partial/differential file download based on
-                    # zsync
-                    zsyncmake = Path.which('zsyncmake', access_mode=os.X_OK)
-                    if zsyncmake:
-                        log.info('--> Creating zsync control file')
-                        Command.run(
-                            [
-                                zsyncmake, '-e', '-u', os.sep.join(
-                                    [
-                                        self.command_args['--zsync-source'],
-                                        os.path.basename(bundle_file)
-                                    ]
-                                ), '-o', bundle_file + '.zsync', bundle_file
-                            ]
-                        )
-                    else:
-                        log.warning(
-                            '--> zsyncmake missing, zsync setup skipped'
+                bundle_files.append(
+                    (
+                        result_file, ''.join(
+                            [bundle_directory, '/', bundle_file_basename]
                         )
+                    )
+                )
 
-                if result_file.shasum:
-                    log.info('--> Creating SHA 256 sum')
-                    checksum = Checksum(bundle_file)
-                    with open(bundle_file + '.sha256', 'w') as shasum:
-                        shasum.write(
-                            '{0}  {1}{2}'.format(
-                                checksum.sha256(),
-                                os.path.basename(bundle_file),
-                                os.linesep
-                            )
-                        )
+        bundle_jobs = self._get_bundle_jobs()
+        compress_threads = None
+        if bundle_jobs > 1:
+            # xz and zstd use all CPUs by default, divide them between
+            # the jobs to keep the CPU and memory use of the compressor
+            # threads the same as in serial mode
+            compress_threads = max(1, (os.cpu_count() or 1) // bundle_jobs)
+        with ThreadPoolExecutor(max_workers=bundle_jobs) as executor:
+            jobs = [
+                executor.submit(
+                    self._create_bundle_file,
+                    result_file, bundle_file, compress_threads
+                ) for result_file, bundle_file in bundle_files
+            ]
+            try:
+                for job in jobs:
+                    job.result()
+            except Exception:
+                for job in jobs:
+                    job.cancel()
+                raise
         if self.command_args['--package-as-rpm']:
             ResultBundleTask._build_rpm_package(
                 bundle_directory,
@@ -242,6 +246,166 @@ class ResultBundleTask(CliTask):
                 list(glob.iglob(f'{bundle_directory}/*'))
             )
 
+    def _get_bundle_jobs(self) -> int:
+        if not self.command_args['--jobs']:
+            return self.runtime_config.get_bundle_jobs()
+        try:
+            bundle_jobs = int(self.command_args['--jobs'])
+        except ValueError:
+            bundle_jobs = 0
+        if bundle_jobs < 1:
+            raise KiwiBundleError(
+                'Invalid number of bundle jobs: {0}'.format(
+                    self.command_args['--jobs']
+                )
+            )
+        return bundle_jobs
+
+    def _create_bundle_file(
+        self, result_file: result_file_type, bundle_file: str,
+        compress_threads: Optional[int] = None
+    ) -> str:
+        """
+        Create bundle file and its checksum and zsync control file
+        in one read pass of the result file
+
+        Result files which are not compressed are hard linked into
+        the bundle directory, or copied, which clones the data on
+        filesystems supporting reflinks. The output of the compressor
+        is written to the bundle file, the sha256 digest and the
+        zsyncmake process at the same time
+
+        :param tuple result_file: result_file_type tuple
+        :param str bundle_file: bundle file path name
+        :param int compress_threads:
+            number of compressor threads, all CPUs if not specified
+
+        :return: bundle file path name including compression suffix
+
+        :rtype: str
+        """
+        log.info('Creating %s', os.path.basename(bundle_file))
+        codec = None
+        if result_file.compress:
+            if self.runtime_config.get_bundle_compression_format() == 'zstd':
+                log.info('--> zstd compressing')
+                codec = Compress.get_codec('zstd')
+                options = self.runtime_config.get_zstd_options() or \
+                    Defaults.get_zstd_compression_options()
+            else:
+                log.info('--> XZ compressing')
+                codec = Compress.get_codec('xz')
+                options = self.runtime_config.get_xz_options() or \
+                    Defaults.get_xz_compression_options()
+            if compress_threads:
+                # the last threads option takes precedence
+                options = options + [
+                    '--threads={0}'.format(compress_threads)
+                ]
+            bundle_file += codec.compression_format.suffix
+        else:
+            if os.path.lexists(bundle_file):
+                os.unlink(bundle_file)
+            try:
+                os.link(result_file.filename, bundle_file)
+            except OSError:
+                BlockCopy(result_file.filename, bundle_file).copy()
+        digests = []
+        targets = []
+        zsync = None
+        zsync_stopped = False
+        if result_file.shasum:
+            digests.append(hashlib.sha256())
+            if self.command_args['--zsync-source']:
+                # Files with a checksum are considered to be image files
+                # and are therefore eligible to be provided via the
+                # requested Partial/differential file download based on
+                # zsync
+                zsync_error = Temporary(prefix='kiwi_zsyncmake.').new_file()
+                zsync = self._call_zsyncmake(bundle_file, zsync_error)
+                if zsync:
+                    targets.append(zsync.stdin)
+                else:
+                    zsync_error.close()
+        try:
+            if codec:
+                with open(bundle_file, 'wb') as bundle:
+                    codec.compress_to_stream(
+                        result_file.filename,
+                        ChecksumWriter(digests, [bundle] + targets), options
+                    )
+            elif zsync:
+                with open(bundle_file, 'rb') as bundle:
+                    shutil.copyfileobj(
+                        bundle, ChecksumWriter(digests, targets),
+                        defaults.CHECKSUM_BUFFER_SIZE
+                    )
+        except BrokenPipeError:
+            if not zsync:
+                raise
+            # zsyncmake exited before all data was written to it
+            zsync_stopped = True
+        finally:
+            if zsync:
+                try:
+                    zsync.stdin.close()
+                except BrokenPipeError:
+                    zsync_stopped = True
+                zsync.wait()
+        if zsync:
+            zsync_error.seek(0)
+            error = zsync_error.read()
+            zsync_error.close()
+            if zsync_stopped or zsync.returncode != 0:
+                raise KiwiBundleError(
+                    'zsyncmake failed for {0}: {1}'.format(
+                        bundle_file, Codec.decode(error)
+                    )
+                )
+        if result_file.shasum:
+            log.info('--> Creating SHA 256 sum')
+            if codec or zsync:
+                sha256_checksum = digests[0].hexdigest()
+            else:
+                # the bundle file has the data of the result file
+                # whose checksum might be cached from the build
+                sha256_checksum = Checksum(
+                    result_file.filename, cache=True
+                ).sha256()
+            with open(bundle_file + '.sha256', 'w') as shasum:
+                shasum.write(
+                    '{0}  {1}{2}'.format(
+                        sha256_checksum,
+                        os.path.basename(bundle_file),
+                        os.linesep
+                    )
+                )
+        return bundle_file
+
+    def _call_zsyncmake(self, bundle_file, error_file):
+        zsyncmake = Path.which('zsyncmake', access_mode=os.X_OK)
+        if not zsyncmake:
+            log.warning('--> zsyncmake missing, zsync setup skipped')
+            return None
+        log.info('--> Creating zsync control file')
+        # zsyncmake reads the bundle file data from stdin, its
+        # messages are collected in error_file such that they can
+        # not fill up a pipe and block the data stream
+        command = [
+            zsyncmake, '-e', '-u', os.sep.join(
+                [
+                    self.command_args['--zsync-source'],
+                    os.path.basename(bundle_file)
+                ]
+            ), '-f', os.path.basename(bundle_file),
+            '-o', bundle_file + '.zsync'
+        ]
+        log.debug('EXEC: [%s]', ' '.join(command))
+        return subprocess.Popen(
+            command, stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL, stderr=error_file
+        )
+
     @staticmethod
     def _build_rpm_package(
         bundle_directory: str, image_name: str, image_version: str,
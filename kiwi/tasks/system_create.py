@@ -107,7 +107,8 @@ class SystemCreateTask(CliTask):
             abs_root_path,
             custom_args={
                 'signing_keys': self.command_args['--signing-key'],
-                'xz_options': self.runtime_config.get_xz_options()
+                'xz_options': self.runtime_config.get_xz_options(),
+                'zstd_options': self.runtime_config.get_zstd_options()
             }
         )
         result = image_builder.create()
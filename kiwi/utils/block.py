@@ -17,6 +17,7 @@
 #
 import os
 import re
+from typing import Dict
 
 # project
 from kiwi.command import Command
@@ -26,11 +27,20 @@ class BlockID:
     """
     **Get information from a block device**
 
+    The metadata of a device is read once by a single blkid call
+    and cached for all BlockID instances of the same device. Code
+    changing the metadata of a device, e.g. by creating a filesystem
+    or by setting a new UUID, must call BlockID.invalidate for it
+
     :param str device:
         block device node name name. The device can
         also be specified as UUID=<uuid>
 
     """
+    # blkid metadata and partition count by device node
+    _blkid_cache: Dict[str, Dict[str, str]] = {}
+    _partition_count_cache: Dict[str, int] = {}
+
     def __init__(self, device):
         uuid_format = re.match(r'^UUID=(.*)', device)
         if uuid_format:
@@ -79,14 +89,16 @@ class BlockID:
 
         :rtype: int
         """
-        partition_count = 0
-        lsblk_result = Command.run(
-            ['lsblk', '-r', '-o', 'NAME,TYPE', self.device]
-        )
-        for line in lsblk_result.output.strip().split(os.linesep):
-            if line.strip().endswith('part'):
-                partition_count += 1
-        return partition_count
+        if self.device not in BlockID._partition_count_cache:
+            partition_count = 0
+            lsblk_result = Command.run(
+                ['lsblk', '-r', '-o', 'NAME,TYPE', self.device]
+            )
+            for line in lsblk_result.output.strip().split(os.linesep):
+                if line.strip().endswith('part'):
+                    partition_count += 1
+            BlockID._partition_count_cache[self.device] = partition_count
+        return BlockID._partition_count_cache[self.device]
 
     def get_blkid(self, id_type):
         """
@@ -98,8 +110,35 @@ class BlockID:
 
         :rtype: str
         """
+        if self.device not in BlockID._blkid_cache:
+            BlockID._blkid_cache[self.device] = self._read_blkid()
+        return BlockID._blkid_cache[self.device].get(id_type, '')
+
+    @staticmethod
+    def invalidate(device: str = None) -> None:
+        """
+        Drop the cached metadata of the specified block device
+
+        :param str device:
+            block device node name, if not set the cached
+            metadata of all devices is dropped
+        """
+        if device:
+            BlockID._blkid_cache.pop(device, None)
+            BlockID._partition_count_cache.pop(device, None)
+        else:
+            BlockID._blkid_cache.clear()
+            BlockID._partition_count_cache.clear()
+
+    def _read_blkid(self) -> Dict[str, str]:
         blkid_result = Command.run(
-            ['blkid', self.device, '-s', id_type, '-o', 'value'],
+            ['blkid', '-o', 'export', self.device],
             raise_on_error=False
         )
-        return blkid_result.output.strip(os.linesep) if blkid_result else ''
+        blkid_data: Dict[str, str] = {}
+        for line in (blkid_result.output or '').splitlines():
+            if '=' in line:
+                id_type, value = line.split('=', 1)
+                # values are escaped for the use in a shell
+                blkid_data[id_type] = re.sub(r'\\(.)', r'\1', value)
+        return blkid_data
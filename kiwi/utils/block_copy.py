@@ -0,0 +1,320 @@
+# Copyright (c) 2026 SUSE Software Solutions Germany GmbH.  All rights reserved.
+#
+# This file is part of kiwi.
+#
+# kiwi is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# kiwi is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with kiwi.  If not, see <http://www.gnu.org/licenses/>
+#
+import os
+import mmap
+import stat
+import time
+import errno
+import fcntl
+import struct
+import logging
+from concurrent.futures import (
+    Future, ThreadPoolExecutor
+)
+from typing import (
+    Iterator, List, Optional, Tuple
+)
+
+# project
+import kiwi.defaults as defaults
+
+from kiwi.exceptions import KiwiBlockCopyError
+
+log = logging.getLogger('kiwi')
+
+# errors telling that a kernel copy method is not available
+# for the given pair of files
+UNSUPPORTED_COPY_ERRORS = (
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP,
+    errno.EBADF, errno.ETXTBSY
+)
+
+# block device ioctl to zero a byte range as defined in linux/fs.h
+BLKZEROOUT = 0x127F
+
+
+class BlockCopy:
+    """
+    **Copy data from a file or block device to other ones**
+
+    A replacement for dd. The data is copied in the kernel via
+    copy_file_range or sendfile if supported for the given files
+    and through a large page aligned buffer otherwise. Holes in
+    a sparse source file are not copied to target files, which
+    are truncated before. On other targets, e.g. block devices,
+    the holes are zeroed as the device can contain old data.
+
+    If more than one target is given, the source is read only
+    once and each block is written to all targets concurrently.
+
+    :param str source: source file or device path name
+    :param str targets: target file or device path names
+    """
+    def __init__(self, source: str, *targets: str) -> None:
+        self.source = source
+        self.targets = list(targets)
+        self.copy_file_range = hasattr(os, 'copy_file_range')
+        self.sendfile = True
+        self.buffers: List[mmap.mmap] = []
+
+    def copy(self, byte_count: int = None, sparse: bool = True) -> int:
+        """
+        Copy the data from source to all targets
+
+        :param int byte_count:
+            number of bytes to copy, if not specified all data
+            of the source is copied
+        :param bool sparse: skip holes in the source file
+
+        :return: number of bytes copied including skipped holes
+
+        :rtype: int
+        """
+        start = time.monotonic()
+        source_fd = None
+        target_fds: List[int] = []
+        try:
+            source_fd = os.open(self.source, os.O_RDONLY)
+            for target in self.targets:
+                target_fds.append(self._open_target(target))
+            source_stat = os.fstat(source_fd)
+            source_is_file = stat.S_ISREG(source_stat.st_mode)
+            end = byte_count
+            if source_is_file or stat.S_ISBLK(source_stat.st_mode):
+                source_size = os.lseek(source_fd, 0, os.SEEK_END)
+                end = source_size if byte_count is None else \
+                    min(byte_count, source_size)
+            copied_bytes = 0
+            segments: Iterator[Tuple[int, Optional[int]]]
+            holes = source_is_file and sparse and end is not None
+            if holes and end is not None:
+                segments = self._get_data_segments(source_fd, end)
+            else:
+                segments = iter([(0, end)])
+            # targets which are not truncated files get the holes zeroed
+            zero_fds = [
+                target_fd for target_fd in target_fds
+                if not stat.S_ISREG(os.fstat(target_fd).st_mode)
+            ]
+            if len(target_fds) == 1:
+                for offset, count in segments:
+                    self._zero_hole(zero_fds, copied_bytes, offset)
+                    copied_bytes = offset + self._copy_range(
+                        source_fd, target_fds[0], offset, count
+                    )
+            else:
+                with ThreadPoolExecutor(
+                    max_workers=len(target_fds)
+                ) as executor:
+                    for offset, count in segments:
+                        self._zero_hole(zero_fds, copied_bytes, offset)
+                        copied_bytes = offset + self._copy_range_to_targets(
+                            source_fd, target_fds, offset, count, executor
+                        )
+            if end is not None:
+                if holes:
+                    # holes at the end of the source
+                    self._zero_hole(zero_fds, copied_bytes, end)
+                copied_bytes = end
+                for target_fd in target_fds:
+                    if target_fd not in zero_fds:
+                        os.ftruncate(target_fd, end)
+        except OSError as issue:
+            raise KiwiBlockCopyError(
+                'Failed to copy {0!r} to {1!r}: {2}'.format(
+                    self.source, ', '.join(self.targets), issue
+                )
+            )
+        finally:
+            for fd in [source_fd] + target_fds:
+                if fd is not None:
+                    os.close(fd)
+            # the buffers are unmapped when no longer referenced
+            self.buffers = []
+        duration = time.monotonic() - start
+        log.info(
+            '--> Copied {0} MB from {1} to {2} in {3:.1f}s: {4:.1f} MB/s'.format(
+                copied_bytes // 1048576, self.source, ', '.join(self.targets),
+                duration, copied_bytes / 1048576 / duration if duration else 0
+            )
+        )
+        return copied_bytes
+
+    @staticmethod
+    def _open_target(target: str) -> int:
+        flags = os.O_WRONLY | os.O_CREAT
+        if os.path.isfile(target):
+            # like dd, a target file is truncated
+            flags |= os.O_TRUNC
+        return os.open(target, flags, 0o644)
+
+    @staticmethod
+    def _zero_hole(target_fds: List[int], start: int, end: int) -> None:
+        if start >= end:
+            return
+        for target_fd in target_fds:
+            try:
+                fcntl.ioctl(
+                    target_fd, BLKZEROOUT,
+                    struct.pack('=QQ', start, end - start)
+                )
+            except OSError:
+                # not a block device or not aligned to its sectors
+                zeros = bytes(min(end - start, defaults.BLOCK_COPY_BUFFER_SIZE))
+                with memoryview(zeros) as buffer:
+                    for offset in range(start, end, len(buffer)):
+                        BlockCopy._write(
+                            target_fd, buffer[:min(len(buffer), end - offset)],
+                            offset
+                        )
+
+    @staticmethod
+    def _get_data_segments(fd: int, end: int) -> Iterator[Tuple[int, int]]:
+        offset = 0
+        while offset < end:
+            try:
+                data_offset = os.lseek(fd, offset, os.SEEK_DATA)
+                hole_offset = os.lseek(fd, data_offset, os.SEEK_HOLE)
+            except OSError as issue:
+                if issue.errno == errno.ENXIO:
+                    # no more data after offset
+                    return
+                # holes can't be detected, copy all remaining data
+                yield offset, end - offset
+                return
+            if data_offset >= end:
+                return
+            hole_offset = min(hole_offset, end)
+            yield data_offset, hole_offset - data_offset
+            offset = hole_offset
+
+    def _copy_range(
+        self, source_fd: int, target_fd: int, offset: int,
+        count: Optional[int]
+    ) -> int:
+        """
+        Copy count bytes from offset, or all data up to the end of
+        the source if count is None. Returns the number of bytes
+        copied which is less than count if the source ended before
+        """
+        copied = 0
+        if count is not None and self.copy_file_range:
+            try:
+                while copied < count:
+                    written = os.copy_file_range(
+                        source_fd, target_fd, count - copied,
+                        offset + copied, offset + copied
+                    )
+                    if not written:
+                        return copied
+                    copied += written
+                return copied
+            except OSError as issue:
+                if issue.errno not in UNSUPPORTED_COPY_ERRORS:
+                    raise
+                self.copy_file_range = False
+        if count is not None and self.sendfile:
+            try:
+                os.lseek(target_fd, offset + copied, os.SEEK_SET)
+                while copied < count:
+                    written = os.sendfile(
+                        target_fd, source_fd, offset + copied, count - copied
+                    )
+                    if not written:
+                        return copied
+                    copied += written
+                return copied
+            except OSError as issue:
+                if issue.errno not in UNSUPPORTED_COPY_ERRORS:
+                    raise
+                self.sendfile = False
+        self._seek_source(source_fd, offset + copied)
+        with memoryview(self._get_buffer(0)) as buffer:
+            while count is None or copied < count:
+                size = len(buffer) if count is None else \
+                    min(len(buffer), count - copied)
+                read = os.readv(source_fd, [buffer[:size]])
+                if not read:
+                    break
+                self._write(target_fd, buffer[:read], offset + copied)
+                copied += read
+        return copied
+
+    def _copy_range_to_targets(
+        self, source_fd: int, target_fds: List[int], offset: int,
+        count: Optional[int], executor: ThreadPoolExecutor
+    ) -> int:
+        """
+        Copy count bytes from offset to all targets, or all data up
+        to the end of the source if count is None. The next block is
+        read into the second buffer while the current block is
+        written to the targets
+        """
+        copied = 0
+        self._seek_source(source_fd, offset)
+        writes: List[Future] = []
+        with memoryview(self._get_buffer(0)) as first, \
+                memoryview(self._get_buffer(1)) as second:
+            buffers = (first, second)
+            block = 0
+            while count is None or copied < count:
+                buffer = buffers[block % 2]
+                size = len(buffer) if count is None else \
+                    min(len(buffer), count - copied)
+                read = os.readv(source_fd, [buffer[:size]])
+                for write in writes:
+                    write.result()
+                writes = []
+                if not read:
+                    break
+                for target_fd in target_fds:
+                    writes.append(
+                        executor.submit(
+                            self._write, target_fd, buffer[:read],
+                            offset + copied
+                        )
+                    )
+                copied += read
+                block += 1
+            for write in writes:
+                write.result()
+        return copied
+
+    def _get_buffer(self, index: int) -> mmap.mmap:
+        while len(self.buffers) <= index:
+            self.buffers.append(
+                mmap.mmap(-1, defaults.BLOCK_COPY_BUFFER_SIZE)
+            )
+        return self.buffers[index]
+
+    @staticmethod
+    def _seek_source(source_fd: int, offset: int) -> None:
+        try:
+            os.lseek(source_fd, offset, os.SEEK_SET)
+        except OSError as issue:
+            if issue.errno != errno.ESPIPE or offset:
+                raise
+            # character devices and pipes are read from the start
+
+    @staticmethod
+    def _write(target_fd: int, data: memoryview, position: int) -> None:
+        written = 0
+        while written < len(data):
+            written += os.pwrite(
+                target_fd, data[written:], position + written
+            )
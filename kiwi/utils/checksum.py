@@ -15,12 +15,21 @@
 # You should have received a copy of the GNU General Public License
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
+import io
 import os
+import json
+import logging
 from collections import namedtuple
 import hashlib
 import encodings.ascii as encoding
+from typing import (
+    IO, Dict, List, NamedTuple, Optional, Union
+)
+import xattr
 
 # project
+import kiwi.defaults as defaults
+from kiwi.runtime_config import RuntimeConfig
 from kiwi.utils.compress import Compress
 from kiwi.utils.primes import factors
 
@@ -28,15 +37,43 @@ from kiwi.exceptions import (
     KiwiFileNotFound
 )
 
+log = logging.getLogger('kiwi')
+
+# extended attribute of the source file storing the checksum cache
+CHECKSUM_CACHE_XATTR = 'user.kiwi.checksum'
+
+
+checksum_type = NamedTuple(
+    'checksum_type', [
+        ('hexdigests', Dict[str, str]),
+        ('size', int),
+        ('blocksize', int),
+        ('blocks', int)
+    ]
+)
+
 
 class Checksum:
     """
     **Manage checksum creation for files**
 
+    If the cache is requested for a file created by the build and
+    the checksum cache is switched on in the runtime config, the
+    calculated digests are stored in an extended attribute of the
+    source file together with its device, inode, size and
+    modification time. As long as these are unchanged the digests
+    are taken from the cache instead of reading the file again
+
     :param str source_filename: source file name to build checksum for
-    :param str checksum_filename: target file with checksum information
+    :param bool verify:
+        calculate the checksums from the file data even if cached
+        digests exist, the cache is updated with the result
+    :param bool cache:
+        use the checksum cache for the source file. Only to be set
+        for files created by the build, host and input files must
+        not be changed
     """
-    def __init__(self, source_filename):
+    def __init__(self, source_filename, verify=False, cache=False):
         if not os.path.exists(source_filename):
             raise KiwiFileNotFound(
                 'checksum source file %s not found' % source_filename
@@ -44,6 +81,8 @@ class Checksum:
         self.source_filename = source_filename
         self.checksum_filename = None
         self.ascii = encoding.getregentry().name
+        self.verify = verify
+        self.cache = cache and RuntimeConfig().get_checksum_cache()
 
     def matches(self, checksum, filename):
         """
@@ -70,6 +109,53 @@ class Checksum:
                 return True
         return False
 
+    def calculate(self, algorithms: List[str] = None) -> checksum_type:
+        """
+        Calculate the checksums for the given hash algorithms
+        and the block list of the source file in a single read
+
+        The data is hashed outside of the global interpreter
+        lock, thus several files can be hashed in parallel
+        threads
+
+        :param list algorithms:
+            list of hashlib algorithm names, e.g. sha512 or
+            blake2b. Default is md5 and sha256
+
+        :return: checksum_type tuple
+
+        :rtype: tuple
+        """
+        algorithms = algorithms or ['md5', 'sha256']
+        cache_key = self._get_cache_key()
+        cache = self._read_cache(cache_key)
+        if all(name in cache['hexdigests'] for name in algorithms):
+            log.debug(
+                'Using cached checksums of %s', self.source_filename
+            )
+            hexdigests = {
+                name: cache['hexdigests'][name] for name in algorithms
+            }
+            size = cache['size']
+        else:
+            digests = {name: hashlib.new(name) for name in algorithms}
+            size = self._update_digests(
+                list(digests.values()), self.source_filename
+            )
+            hexdigests = {
+                name: digest.hexdigest() for name, digest in digests.items()
+            }
+            cache['hexdigests'].update(hexdigests)
+            cache['size'] = size
+            self._write_cache(cache_key, cache)
+        blocks = self._block_list(size)
+        return checksum_type(
+            hexdigests=hexdigests,
+            size=size,
+            blocksize=blocks.blocksize,
+            blocks=blocks.blocks
+        )
+
     def md5(self, filename=None):
         """
         Create md5 checksum
@@ -80,12 +166,11 @@ class Checksum:
 
         :rtype: str
         """
-        md5_checksum = self._calculate_hash_hexdigest(
-            hashlib.md5(), self.source_filename
-        )
+        checksum = self.calculate(['md5'])
+        md5_checksum = checksum.hexdigests['md5']
         if filename:
             self._create_checksum_file(
-                md5_checksum, filename
+                md5_checksum, filename, checksum.size
             )
         return md5_checksum
 
@@ -95,39 +180,44 @@ class Checksum:
 
         :param str filename: filename for checksum
         """
-        sha256_checksum = self._calculate_hash_hexdigest(
-            hashlib.sha256(), self.source_filename
-        )
+        checksum = self.calculate(['sha256'])
+        sha256_checksum = checksum.hexdigests['sha256']
         if filename:
             self._create_checksum_file(
-                sha256_checksum, filename
+                sha256_checksum, filename, checksum.size
             )
         return sha256_checksum
 
-    def _create_checksum_file(self, checksum, filename):
+    def _create_checksum_file(self, checksum, filename, size):
         """
         Creates the text file that contains the checksum
 
         :param str checksum: checksum to include into the file
         :param str filename: filename of the output file
+        :param int size: size of the source file
         """
         compressed_blocks = None
         compress = Compress(self.source_filename)
         if compress.get_format():
-            compressed_blocks = self._block_list(
-                os.path.getsize(self.source_filename)
-            )
-            compress.uncompress(temporary=True)
-            blocks = self._block_list(
-                os.path.getsize(compress.uncompressed_filename)
-            )
-            checksum = self._calculate_hash_hexdigest(
-                hashlib.md5(), compress.uncompressed_filename
-            )
+            compressed_blocks = self._block_list(size)
+            cache_key = self._get_cache_key()
+            cache = self._read_cache(cache_key)
+            uncompressed = cache.get('uncompressed')
+            if not uncompressed:
+                uncompressed_digest = hashlib.md5()
+                with compress.open_uncompressed() as uncompressed_data:
+                    uncompressed = {
+                        'size': self._update_digests_from_stream(
+                            [uncompressed_digest], uncompressed_data
+                        )
+                    }
+                uncompressed['md5'] = uncompressed_digest.hexdigest()
+                cache['uncompressed'] = uncompressed
+                self._write_cache(cache_key, cache)
+            blocks = self._block_list(uncompressed['size'])
+            checksum = uncompressed['md5']
         else:
-            blocks = self._block_list(
-                os.path.getsize(self.source_filename)
-            )
+            blocks = self._block_list(size)
         with open(filename, encoding=self.ascii, mode='w') as checksum_file:
             if compressed_blocks:
                 checksum_file.write(
@@ -143,19 +233,105 @@ class Checksum:
                     )
                 )
 
-    def _calculate_hash_hexdigest(self, digest, filename, digest_blocks=128):
+    def _get_cache_key(self) -> Optional[List[int]]:
+        """
+        Return the key of the checksum cache entry of the source
+        file or None if the cache is not used
         """
-        Calculates the hash hexadecimal digest for a given file.
+        if not self.cache:
+            return None
+        # the key is taken before the data is read, a modification
+        # while the checksum is calculated invalidates the entry
+        source_stat = os.stat(self.source_filename)
+        return [
+            source_stat.st_dev, source_stat.st_ino,
+            source_stat.st_size, source_stat.st_mtime_ns
+        ]
 
-        :param func digest: Digest function for hash calculation
+    def _read_cache(self, cache_key: Optional[List[int]]) -> Dict:
+        """
+        Return the checksum cache data of the source file, or empty
+        data if no valid entry for the given key exists or the
+        verify mode is active
+        """
+        cache: Dict = {'hexdigests': {}}
+        if cache_key and not self.verify:
+            try:
+                cache_entry = json.loads(
+                    xattr.getxattr(self.source_filename, CHECKSUM_CACHE_XATTR)
+                )
+                # a copy of the file keeps the extended attribute,
+                # the device and inode tell if it was made for this file
+                if cache_entry['key'] == cache_key and \
+                        isinstance(cache_entry['data']['hexdigests'], dict):
+                    cache = cache_entry['data']
+            except (OSError, ValueError, TypeError, KeyError):
+                pass
+        return cache
+
+    def _write_cache(self, cache_key: Optional[List[int]], cache: Dict) -> None:
+        """
+        Store the checksum cache data of the source file for the given key
+        """
+        if cache_key:
+            try:
+                xattr.setxattr(
+                    self.source_filename, CHECKSUM_CACHE_XATTR, json.dumps(
+                        {'key': cache_key, 'data': cache}
+                    ).encode()
+                )
+            except OSError as issue:
+                log.debug(
+                    'Checksum cache for %s not stored: %s',
+                    self.source_filename, issue
+                )
+
+    @staticmethod
+    def _update_digests(digests: List, filename: str) -> int:
+        """
+        Update all given digests with the data of the given file
+
+        The file is read into a preallocated buffer, hashlib
+        releases the global interpreter lock while hashing
+        the data
+
+        :param list digests: list of hashlib digest objects
         :param str filename: File to compute
-        :param int digest_blocks: Number of blocks processed at a time
+
+        :return: number of bytes read
+
+        :rtype: int
+        """
+        with open(filename, 'rb', buffering=0) as source:
+            return Checksum._update_digests_from_stream(digests, source)
+
+    @staticmethod
+    def _update_digests_from_stream(
+        digests: List, source: Union[io.RawIOBase, io.BufferedIOBase]
+    ) -> int:
+        """
+        Update all given digests with the data read from the
+        given binary file object until its end
+
+        :param list digests: list of hashlib digest objects
+        :param io.IOBase source: readable binary file object
+
+        :return: number of bytes read
+
+        :rtype: int
         """
-        chunk_size = digest_blocks * digest.block_size
-        with open(filename, 'rb') as source:
-            for chunk in iter(lambda: source.read(chunk_size), b''):
-                digest.update(chunk)
-        return digest.hexdigest()
+        size = 0
+        buffer = bytearray(defaults.CHECKSUM_BUFFER_SIZE)
+        with memoryview(buffer) as view:
+            while True:
+                read = source.readinto(buffer)
+                if not read:
+                    break
+                with view[:read] as data:
+                    for digest in digests:
+                        digest.update(data)
+                size += read
+        return size
 
     def _block_list(self, file_size):
         """
@@ -181,3 +357,47 @@ class Checksum:
             blocksize=blocksize,
             blocks=blocks
         )
+
+
+class ChecksumWriter(io.RawIOBase):
+    """
+    **Writable stream which updates digests with the written data**
+
+    The data is passed on to the given target streams, thus a
+    checksum is calculated while the data is written
+
+    .. code:: python
+
+        digest = hashlib.sha256()
+        with open('image.xz', 'wb') as image:
+            writer = ChecksumWriter([digest], [image])
+            Compress.get_codec('xz').compress_to_stream('image', writer)
+
+    :param list digests: list of hashlib digest objects
+    :param list targets: list of writable binary streams
+    """
+    def __init__(self, digests: List, targets: List[IO[bytes]]) -> None:
+        super().__init__()
+        self.digests = digests
+        self.targets = targets
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        """
+        Update the digests and write the data to all targets
+
+        :param bytes data: data to write
+
+        :return: number of bytes written
+
+        :rtype: int
+        """
+        for digest in self.digests:
+            digest.update(data)
+        for target in self.targets:
+            target.write(data)
+        self.size += len(data)
+        return len(data)
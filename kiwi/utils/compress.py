@@ -15,21 +15,89 @@
 # You should have received a copy of the GNU General Public License
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
+import io
 import os
+import re
+import gzip
+import lzma
+import shutil
 import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import (
+    ExitStack, contextmanager
+)
+from typing import (
+    IO, Dict, Iterator, List, NamedTuple, Optional, Union
+)
 
 # project
-from kiwi.utils.temporary import Temporary
+import kiwi.defaults as defaults
+
 from kiwi.command import Command
 from kiwi.defaults import Defaults
+from kiwi.path import Path
+from kiwi.runtime_config import RuntimeConfig
+from kiwi.utils.codec import Codec
+from kiwi.utils.temporary import Temporary
 
 from kiwi.exceptions import (
+    KiwiCommandError,
+    KiwiCommandNotFound,
+    KiwiCompressionError,
     KiwiFileNotFound,
     KiwiCompressionFormatUnknown
 )
 
 log = logging.getLogger('kiwi')
 
+writable_stream_type = Union[IO[bytes], io.RawIOBase]
+
+compression_format_type = NamedTuple(
+    'compression_format_type', [
+        ('suffix', str),
+        ('magic', bytes),
+        ('tools', List[str]),
+        ('compress_options', List[str]),
+        ('uncompress_options', List[str])
+    ]
+)
+
+# supported compression formats, the magic bytes at the start of
+# a compressed file identify the format. The first tool found in
+# the list of tools is used by the tool codec
+COMPRESSION_FORMATS: Dict[str, compression_format_type] = {
+    'xz': compression_format_type(
+        suffix='.xz',
+        magic=b'\xfd7zXZ\x00',
+        tools=['xz'],
+        compress_options=['--threads=0'],
+        uncompress_options=['--threads=0']
+    ),
+    'gzip': compression_format_type(
+        suffix='.gz',
+        magic=b'\x1f\x8b',
+        tools=['pigz', 'gzip'],
+        compress_options=['-9'],
+        uncompress_options=[]
+    ),
+    'zstd': compression_format_type(
+        suffix='.zst',
+        magic=b'\x28\xb5\x2f\xfd',
+        tools=['zstd'],
+        compress_options=['-q', '--threads=0'],
+        uncompress_options=['-q']
+    )
+}
+
+# xz check names as used on the xz command line
+XZ_CHECKS = {
+    'none': lzma.CHECK_NONE,
+    'crc32': lzma.CHECK_CRC32,
+    'crc64': lzma.CHECK_CRC64,
+    'sha256': lzma.CHECK_SHA256
+}
+
 
 class Compress:
     """
@@ -37,7 +105,7 @@ class Compress:
 
     :param bool keep_source: Request to keep the uncompressed source
     :param str source_filename: Source file name to compress
-    :param list supported_zipper: List of supported compression tools
+    :param list supported_zipper: List of supported compression formats
     :param str compressed_filename: Compressed file name path with
         compression suffix
     :param str uncompressed_filename:
@@ -50,12 +118,38 @@ class Compress:
             )
         self.keep_source = keep_source_on_compress
         self.source_filename = source_filename
-        self.supported_zipper = [
-            'xz', 'gzip'
-        ]
+        self.supported_zipper = list(COMPRESSION_FORMATS)
         self.compressed_filename = None
         self.uncompressed_filename = None
 
+    @staticmethod
+    def get_codec(name: str) -> 'CompressCodecBase':
+        """
+        Provide the codec for the given compression format
+
+        The codec implementation is selected in the runtime
+        config. The tool codec pipes the data through the
+        multithreaded compression tools, the python codec
+        uses the lzma and gzip modules in process. Formats
+        without a python module are always handled by the tool
+
+        :param str name: compression format name, e.g. xz
+
+        :return: codec instance
+
+        :rtype: CompressCodecBase
+        """
+        if name not in COMPRESSION_FORMATS:
+            raise KiwiCompressionFormatUnknown(
+                'unsupported compression format {0}'.format(name)
+            )
+        if RuntimeConfig().get_compress_codec() == 'python':
+            if name == 'xz':
+                return CompressCodecLzma(name)
+            if name == 'gzip':
+                return CompressCodecGzip(name)
+        return CompressCodecTool(name)
+
     def xz(self, options=None):
         """
         Create XZ compressed file
@@ -64,36 +158,32 @@ class Compress:
         """
         if not options:
             options = Defaults.get_xz_compression_options()
-        if self.keep_source:
-            options.append('--keep')
-        Command.run(
-            ['xz', '-f'] + options + [self.source_filename]
-        )
-        self.compressed_filename = self.source_filename + '.xz'
-        return self.compressed_filename
+        return self._compress('xz', options)
 
     def gzip(self):
         """
         Create gzip(max compression) compressed file
         """
-        options = [
-            '-9'
-        ]
-        if self.keep_source:
-            options.append('--keep')
-        Command.run(
-            ['gzip', '-f'] + options + [self.source_filename]
-        )
-        self.compressed_filename = self.source_filename + '.gz'
-        return self.compressed_filename
+        return self._compress('gzip')
+
+    def zstd(self, options=None):
+        """
+        Create zstd compressed file
+
+        :param list options: custom zstd compression options
+        """
+        if not options:
+            options = Defaults.get_zstd_compression_options()
+        return self._compress('zstd', options)
 
     def uncompress(self, temporary=False):
         """
         Uncompress with format autodetection
 
         By default the original source file will be changed into
-        the uncompressed variant. If temporary is set to True
-        a temporary file is created instead
+        the uncompressed variant, named without the compression
+        suffix. If temporary is set to True a temporary file is
+        created instead
 
         :param bool temporary: uncompress to a temporary file
         """
@@ -103,38 +193,629 @@ class Compress:
                 'could not detect compression format for %s' %
                 self.source_filename
             )
+        codec = Compress.get_codec(zipper)
         if not temporary:
-            Command.run([zipper, '-d', self.source_filename])
-            self.uncompressed_filename = self.source_filename
+            suffix = COMPRESSION_FORMATS[zipper].suffix
+            if self.source_filename.endswith(suffix):
+                uncompressed_filename = self.source_filename[:-len(suffix)]
+                codec.uncompress_file(
+                    self.source_filename, uncompressed_filename
+                )
+                os.remove(self.source_filename)
+            else:
+                uncompressed_filename = self.source_filename
+                codec.uncompress_file(
+                    self.source_filename, self.source_filename + '.tmp'
+                )
+                os.replace(self.source_filename + '.tmp', self.source_filename)
+            self.uncompressed_filename = uncompressed_filename
         else:
             self.temp_file = Temporary().new_file()
-            bash_command = [
-                zipper, '-c', '-d', self.source_filename,
-                '>', self.temp_file.name
-            ]
-            Command.run(['bash', '-c', ' '.join(bash_command)])
+            codec.uncompress_file(self.source_filename, self.temp_file.name)
             self.uncompressed_filename = self.temp_file.name
         return self.uncompressed_filename
 
     def get_format(self):
         """
-        Detect compression format
+        Detect compression format from the file header
 
         :return: compression format name or None if it couldn't be inferred
 
         :rtype: Optional[str]
         """
-        for zipper in self.supported_zipper:
-            cmd = [zipper, '-l', self.source_filename]
-            try:
-                Command.run(cmd)
+        with open(self.source_filename, 'rb') as source:
+            header = source.read(
+                max(len(item.magic) for item in COMPRESSION_FORMATS.values())
+            )
+        for zipper, compression_format in COMPRESSION_FORMATS.items():
+            if header.startswith(compression_format.magic):
                 return zipper
-            except Exception as exc:
-                log.debug(
-                    'Error running "{cmd:s}", got a {exc_t:s}: {exc:s}'
-                    .format(
-                        cmd=' '.join(cmd),
-                        exc_t=type(exc).__name__,
-                        exc=str(exc)
+        return None
+
+    @contextmanager
+    def open_uncompressed(self) -> Iterator[io.BufferedIOBase]:
+        """
+        Open the uncompressed data of the source file as a stream
+
+        The data is uncompressed by the codec for the detected
+        format while it is read. No temporary file is used
+
+        .. code:: python
+
+            with Compress('image.xz').open_uncompressed() as stream:
+                data = stream.read(8192)
+
+        :return: readable binary file object
+
+        :rtype: io.BufferedIOBase
+        """
+        zipper = self.get_format()
+        if not zipper:
+            raise KiwiCompressionFormatUnknown(
+                'could not detect compression format for %s' %
+                self.source_filename
+            )
+        with Compress.get_codec(zipper).open_reader(
+            self.source_filename
+        ) as stream:
+            yield stream
+
+    def _compress(self, zipper: str, options: List[str] = None) -> str:
+        compressed_filename = \
+            self.source_filename + COMPRESSION_FORMATS[zipper].suffix
+        Compress.get_codec(zipper).compress_file(
+            self.source_filename, compressed_filename, options
+        )
+        # like the compression tools keep the file mode and times
+        shutil.copystat(self.source_filename, compressed_filename)
+        if not self.keep_source:
+            os.remove(self.source_filename)
+        self.compressed_filename = compressed_filename
+        return self.compressed_filename
+
+
+class CompressCodecBase:
+    """
+    **Base class of a compression format implementation**
+
+    Provides a streaming file object API to compress and uncompress
+    data of the given format
+
+    :param str name: compression format name
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.compression_format = COMPRESSION_FORMATS[name]
+
+    @contextmanager
+    def open_reader(self, filename: str) -> Iterator[io.BufferedIOBase]:
+        """
+        Open compressed file for reading the uncompressed data
+
+        Implementation in specialized codec class
+
+        :param str filename: compressed file name
+        """
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    @contextmanager
+    def open_writer(
+        self, filename: Union[str, writable_stream_type],
+        options: List[str] = None
+    ) -> Iterator[io.BufferedIOBase]:
+        """
+        Open file for writing data compressed
+
+        Implementation in specialized codec class
+
+        :param str filename: compressed file name
+        :param list options: compression options in the command
+            line syntax of the compression tool
+        """
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    def compress_file(
+        self, source_filename: str, filename: str, options: List[str] = None
+    ) -> None:
+        """
+        Compress the data of source_filename into filename
+
+        :param str source_filename: uncompressed source file name
+        :param str filename: compressed file name
+        :param list options: compression options
+        """
+        with open(source_filename, 'rb') as source, \
+                self.open_writer(filename, options) as target:
+            shutil.copyfileobj(source, target, defaults.COMPRESS_BUFFER_SIZE)
+
+    def compress_to_stream(
+        self, source_filename: str, target: writable_stream_type,
+        options: List[str] = None
+    ) -> None:
+        """
+        Compress the data of source_filename and write the
+        compressed data to the given stream
+
+        :param str source_filename: uncompressed source file name
+        :param io.IOBase target: writable binary stream
+        :param list options: compression options
+        """
+        with open(source_filename, 'rb') as source, \
+                self.open_writer(target, options) as writer:
+            shutil.copyfileobj(source, writer, defaults.COMPRESS_BUFFER_SIZE)
+
+    def uncompress_file(self, filename: str, target_filename: str) -> None:
+        """
+        Uncompress the data of filename into target_filename
+
+        :param str filename: compressed file name
+        :param str target_filename: uncompressed target file name
+        """
+        with self.open_reader(filename) as source, \
+                open(target_filename, 'wb') as target:
+            shutil.copyfileobj(source, target, defaults.COMPRESS_BUFFER_SIZE)
+
+    def compress_bytes(self, data: bytes, options: List[str] = None) -> bytes:
+        """
+        Compress the given data
+
+        :param bytes data: uncompressed data
+        :param list options: compression options
+
+        :return: compressed data
+
+        :rtype: bytes
+        """
+        target = io.BytesIO()
+        with self.open_writer(target, options) as writer:
+            writer.write(data)
+        return target.getvalue()
+
+    def uncompress_bytes(self, data: bytes) -> bytes:
+        """
+        Uncompress the given data
+
+        Implementation in specialized codec class
+
+        :param bytes data: compressed data
+
+        :return: uncompressed data
+
+        :rtype: bytes
+        """
+        raise NotImplementedError
+
+    def uncompress_command(self, command: List[str], filename: str) -> None:
+        """
+        Uncompress the data of filename into the stdin of the
+        given command
+
+        .. code:: python
+
+            Compress.get_codec('xz').uncompress_command(
+                ['tar', '-x', '-f', '-'], 'archive.tar.xz'
+            )
+
+        :param list command: command and arguments reading from stdin
+        :param str filename: compressed file name
+        """
+        if not Path.which(command[0], access_mode=os.X_OK):
+            raise KiwiCommandNotFound(
+                'Command "%s" not found in the environment' % command[0]
+            )
+        log.debug('EXEC: [%s]', ' '.join(command))
+        with self.open_reader(filename) as source:
+            self._pipe_to_command(command, source)
+
+    def _pipe_to_command(self, command, source):
+        process = subprocess.Popen(
+            command, stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        # stdout and stderr are read in parallel, a full pipe
+        # would block the command
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            output = executor.submit(process.stdout.read)
+            error = executor.submit(process.stderr.read)
+            try:
+                shutil.copyfileobj(
+                    source, process.stdin, defaults.COMPRESS_BUFFER_SIZE
+                )
+                process.stdin.close()
+            except BrokenPipeError:
+                # the command exited early, its error is reported below
+                pass
+            log.debug(Codec.decode(output.result()))
+            error_output = Codec.decode(error.result())
+        process.stdout.close()
+        process.stderr.close()
+        if process.wait() != 0:
+            raise KiwiCommandError(
+                '{0}: stderr: {1}'.format(command[0], error_output)
+            )
+
+    def compress_command(
+        self, command: List[str], filename: str, options: List[str] = None
+    ) -> None:
+        """
+        Compress the output of the given command into filename
+
+        .. code:: python
+
+            Compress.get_codec('xz').compress_command(
+                ['tar', '-c', '--to-stdout', '.'], 'archive.tar.xz'
+            )
+
+        :param list command: command and arguments writing to stdout
+        :param str filename: compressed file name
+        :param list options: compression options
+        """
+        call = Command.call(command)
+        # stderr is read in parallel, a full pipe would block the command
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            error = executor.submit(call.error.read)
+            try:
+                with call.output as source, \
+                        self.open_writer(filename, options) as target:
+                    shutil.copyfileobj(
+                        source, target, defaults.COMPRESS_BUFFER_SIZE
                     )
+            except Exception:
+                # the command must not stay blocked on its output pipe
+                call.process.kill()
+                call.process.wait()
+                raise
+            error_output = Codec.decode(error.result())
+        if call.process.wait() != 0:
+            raise KiwiCommandError(
+                '{0}: stderr: {1}'.format(command[0], error_output)
+            )
+
+
+class CompressCodecTool(CompressCodecBase):
+    """
+    **Compression codec using the compression tool of the format**
+
+    The data is piped through xz, pigz or gzip and zstd, the
+    multithreaded tools use all available CPUs by default
+    """
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.tool = self.compression_format.tools[-1]
+        for tool in self.compression_format.tools:
+            if Path.which(tool, access_mode=os.X_OK):
+                self.tool = tool
+                break
+
+    @contextmanager
+    def open_reader(self, filename: str) -> Iterator[io.BufferedIOBase]:
+        """
+        Open compressed file for reading the uncompressed data
+        from the pipe of the uncompressing tool
+
+        :param str filename: compressed file name
+        """
+        with open(filename, 'rb') as source:
+            process = self._run(
+                ['-d', '-c'] + self.compression_format.uncompress_options,
+                stdin=source, stdout=subprocess.PIPE
+            )
+            completed = False
+            try:
+                yield process.stdout
+                completed = True
+            finally:
+                process.stdout.close()
+                if not completed and process.poll() is None:
+                    process.kill()
+                self._wait(process, raise_on_error=completed)
+
+    @contextmanager
+    def open_writer(
+        self, filename: Union[str, writable_stream_type],
+        options: List[str] = None
+    ) -> Iterator[io.BufferedIOBase]:
+        """
+        Open file or stream for writing data through the pipe of
+        the compression tool
+
+        :param str filename: compressed file name or writable
+            binary stream
+        :param list options: compression tool options
+        """
+        with ExitStack() as stack:
+            stdout: Union[int, IO[bytes]] = subprocess.PIPE
+            if isinstance(filename, str):
+                stdout = stack.enter_context(open(filename, 'wb'))
+            process = self._run(
+                self._get_compress_options(options),
+                stdin=subprocess.PIPE, stdout=stdout
+            )
+            output = None
+            if not isinstance(filename, str):
+                # the compressed data is passed on while it is written
+                output = stack.enter_context(
+                    ThreadPoolExecutor(max_workers=1)
+                ).submit(
+                    shutil.copyfileobj, process.stdout, filename,
+                    defaults.COMPRESS_BUFFER_SIZE
+                )
+            stopped = None
+            try:
+                yield process.stdin
+            except BrokenPipeError as issue:
+                # the tool exited before all data was written to it
+                stopped = issue
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError as issue:
+                    stopped = issue
+                if output:
+                    output.result()
+                    process.stdout.close()
+            # the exit status of the tool explains a broken pipe
+            self._wait(process)
+            if stopped:
+                raise stopped
+
+    def compress_file(
+        self, source_filename: str, filename: str, options: List[str] = None
+    ) -> None:
+        """
+        Compress the data of source_filename into filename, the
+        tool reads and writes the files directly
+
+        :param str source_filename: uncompressed source file name
+        :param str filename: compressed file name
+        :param list options: compression tool options
+        """
+        with open(source_filename, 'rb') as source, \
+                open(filename, 'wb') as target:
+            self._wait(
+                self._run(
+                    self._get_compress_options(options),
+                    stdin=source, stdout=target
+                )
+            )
+
+    def compress_to_stream(
+        self, source_filename: str, target: writable_stream_type,
+        options: List[str] = None
+    ) -> None:
+        """
+        Compress the data of source_filename and write the
+        compressed data from the pipe of the tool to the
+        given stream
+
+        :param str source_filename: uncompressed source file name
+        :param io.IOBase target: writable binary stream
+        :param list options: compression tool options
+        """
+        with open(source_filename, 'rb') as source:
+            process = self._run(
+                self._get_compress_options(options),
+                stdin=source, stdout=subprocess.PIPE
+            )
+            try:
+                shutil.copyfileobj(
+                    process.stdout, target, defaults.COMPRESS_BUFFER_SIZE
+                )
+            finally:
+                process.stdout.close()
+            self._wait(process)
+
+    def uncompress_file(self, filename: str, target_filename: str) -> None:
+        """
+        Uncompress the data of filename into target_filename, the
+        tool reads and writes the files directly
+
+        :param str filename: compressed file name
+        :param str target_filename: uncompressed target file name
+        """
+        with open(filename, 'rb') as source, \
+                open(target_filename, 'wb') as target:
+            self._wait(
+                self._run(
+                    ['-d', '-c'] + self.compression_format.uncompress_options,
+                    stdin=source, stdout=target
+                )
+            )
+
+    def compress_bytes(self, data: bytes, options: List[str] = None) -> bytes:
+        """
+        Compress the given data through the pipe of the tool
+
+        :param bytes data: uncompressed data
+        :param list options: compression tool options
+
+        :return: compressed data
+
+        :rtype: bytes
+        """
+        return self._communicate(self._get_compress_options(options), data)
+
+    def uncompress_bytes(self, data: bytes) -> bytes:
+        """
+        Uncompress the given data through the pipe of the tool
+
+        :param bytes data: compressed data
+
+        :return: uncompressed data
+
+        :rtype: bytes
+        """
+        return self._communicate(
+            ['-d', '-c'] + self.compression_format.uncompress_options, data
+        )
+
+    def _get_compress_options(self, options: Optional[List[str]]) -> List[str]:
+        return ['-c'] + (
+            options if options is not None
+            else self.compression_format.compress_options
+        )
+
+    def _run(self, options, stdin, stdout):
+        command = [self.tool] + options
+        if not Path.which(self.tool, access_mode=os.X_OK):
+            raise KiwiCommandNotFound(
+                'Command "%s" not found in the environment' % self.tool
+            )
+        log.debug('EXEC: [%s]', ' '.join(command))
+        return subprocess.Popen(
+            command, stdin=stdin, stdout=stdout, stderr=subprocess.PIPE
+        )
+
+    def _communicate(self, options, data):
+        process = self._run(
+            options, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        output, error = process.communicate(data)
+        if process.returncode != 0:
+            raise KiwiCompressionError(
+                '{0} failed: {1}'.format(self.tool, Codec.decode(error))
+            )
+        return output
+
+    def _wait(self, process, raise_on_error=True):
+        error = process.stderr.read()
+        process.stderr.close()
+        if process.wait() != 0 and raise_on_error:
+            raise KiwiCompressionError(
+                '{0} failed: {1}'.format(self.tool, Codec.decode(error))
+            )
+
+
+class CompressCodecLzma(CompressCodecBase):
+    """
+    **In process xz compression codec using the lzma module**
+
+    The xz command line options for the preset, integrity check
+    and the lzma2 dictionary size are supported
+    """
+    @contextmanager
+    def open_reader(self, filename: str) -> Iterator[io.BufferedIOBase]:
+        """
+        Open xz compressed file for reading the uncompressed data
+
+        :param str filename: compressed file name
+        """
+        with lzma.open(filename) as stream:
+            yield stream
+
+    def uncompress_bytes(self, data: bytes) -> bytes:
+        """
+        Uncompress the given xz data
+
+        :param bytes data: compressed data
+
+        :return: uncompressed data
+
+        :rtype: bytes
+        """
+        return lzma.decompress(data)
+
+    @contextmanager
+    def open_writer(
+        self, filename: Union[str, writable_stream_type],
+        options: List[str] = None
+    ) -> Iterator[io.BufferedIOBase]:
+        """
+        Open file or stream for writing xz compressed data
+
+        :param str filename: compressed file name or writable
+            binary stream
+        :param list options: xz command line options
+        """
+        preset = 6
+        check = lzma.CHECK_CRC64
+        dict_size = None
+        for option in options or []:
+            if re.match(r'^-[0-9]$', option):
+                preset = int(option[1]) | preset & lzma.PRESET_EXTREME
+            elif option in ('-e', '--extreme'):
+                preset |= lzma.PRESET_EXTREME
+            elif option.startswith('--check=') and \
+                    option[8:] in XZ_CHECKS:
+                check = XZ_CHECKS[option[8:]]
+            elif option.startswith('--lzma2=dict='):
+                dict_size = self._to_bytes(option[13:])
+            elif not option.startswith(('--threads=', '-T')):
+                log.warning(
+                    'Ignoring xz option {0} in python codec'.format(option)
+                )
+        filters = None
+        if dict_size:
+            filters = [
+                {'id': lzma.FILTER_LZMA2, 'preset': preset, 'dict_size': dict_size}
+            ]
+        with lzma.LZMAFile(
+            filename, 'wb', check=check,  # type: ignore
+            preset=None if filters else preset, filters=filters
+        ) as stream:
+            yield stream
+
+    @staticmethod
+    def _to_bytes(size: str) -> int:
+        value = re.match(r'^(\d+)(KiB|MiB|GiB)?$', size)
+        if not value:
+            raise KiwiCompressionError(
+                'unsupported xz dictionary size {0}'.format(size)
+            )
+        unit = {'KiB': 1, 'MiB': 2, 'GiB': 3}.get(value.group(2), 0)
+        return int(value.group(1)) * 1024 ** unit
+
+
+class CompressCodecGzip(CompressCodecBase):
+    """
+    **In process gzip compression codec using the gzip module**
+
+    The gzip command line options for the compression level
+    are supported
+    """
+    @contextmanager
+    def open_reader(self, filename: str) -> Iterator[io.BufferedIOBase]:
+        """
+        Open gzip compressed file for reading the uncompressed data
+
+        :param str filename: compressed file name
+        """
+        with gzip.open(filename) as stream:
+            yield stream
+
+    def uncompress_bytes(self, data: bytes) -> bytes:
+        """
+        Uncompress the given gzip data
+
+        :param bytes data: compressed data
+
+        :return: uncompressed data
+
+        :rtype: bytes
+        """
+        return gzip.decompress(data)
+
+    @contextmanager
+    def open_writer(
+        self, filename: Union[str, writable_stream_type],
+        options: List[str] = None
+    ) -> Iterator[io.BufferedIOBase]:
+        """
+        Open file or stream for writing gzip compressed data
+
+        :param str filename: compressed file name or writable
+            binary stream
+        :param list options: gzip command line options
+        """
+        level = 9
+        for option in options or self.compression_format.compress_options:
+            if re.match(r'^-[1-9]$', option):
+                level = int(option[1])
+            else:
+                log.warning(
+                    'Ignoring gzip option {0} in python codec'.format(option)
                 )
+        with gzip.open(filename, 'wb', compresslevel=level) as stream:
+            yield stream
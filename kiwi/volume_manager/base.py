@@ -310,7 +310,11 @@ class VolumeManagerBase(DeviceProvider):
                         os.path.normpath(self.root_dir + os.sep + volume_path)
                     )
 
-            volume_size = SystemSize(lookup_abspath)
+            # the sizes are taken from the index of the root tree
+            # created for the disk size calculation if available
+            root_size = self.custom_args.get('root_size')
+            volume_size = root_size.get_subtree(lookup_abspath) \
+                if root_size else SystemSize(lookup_abspath)
             if mbsize != Defaults.get_min_volume_mbytes():
                 mbsize += Defaults.get_min_volume_mbytes()
             mbsize += volume_size.customize(
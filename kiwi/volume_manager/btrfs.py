@@ -280,11 +280,14 @@ class VolumeManagerBtrfs(VolumeManagerBase):
         """
         Umount btrfs subvolumes
 
+        The unused blocks of the filesystem are discarded before
+
         :return: True if all subvolumes are successfully unmounted
 
         :rtype: bool
         """
         all_volumes_umounted = True
+        self.toplevel_mount.trim()
         for volume_mount in reversed(self.subvol_mount_list):
             if volume_mount.is_mounted():
                 if not volume_mount.umount():
@@ -302,6 +302,8 @@ class VolumeManagerLVM(VolumeManagerBase):
         """
         Umount lvm volumes
 
+        The unused blocks of the volumes are discarded before
+
         :return: True if all subvolumes are successfully unmounted
 
         :rtype: bool
@@ -309,6 +311,7 @@ class VolumeManagerLVM(VolumeManagerBase):
         all_volumes_umounted = True
         for volume_mount in reversed(self.mount_list):
             if volume_mount.is_mounted():
+                volume_mount.trim()
                 if not volume_mount.umount():
                     all_volumes_umounted = False
         return all_volumes_umounted
@@ -16,10 +16,11 @@
 # along with kiwi.  If not, see <http://www.gnu.org/licenses/>
 #
 from typing import (
-    Dict, Any
+    Dict, Any, Tuple
 )
 import os
 import logging
+import hashlib
 from xml.dom import minidom
 from lxml import (
     etree,
@@ -30,6 +31,8 @@ from lxml import (
 from kiwi.utils.temporary import Temporary
 from kiwi.markup import Markup
 from kiwi.defaults import Defaults
+from kiwi.runtime_config import RuntimeConfig
+from kiwi.utils.checksum import Checksum
 from kiwi import xml_parse
 from kiwi.command import Command
 
@@ -45,6 +48,8 @@ from kiwi.exceptions import (
 
 log = logging.getLogger('kiwi')
 
+SCHEMA_VALIDATORS: Dict[str, Tuple[Any, Any]] = {}
+
 
 class XMLDescription:
     """
@@ -75,45 +80,36 @@ class XMLDescription:
     def load(self) -> Any:
         """
         Read XML description, validate it against the schema
-        and the schematron rules and pass it to the
-        autogenerated(generateDS) parser.
+        and the schematron rules and pass the validated tree
+        to the autogenerated(generateDS) parser.
 
         :return: instance of XML toplevel domain (image)
 
         :rtype: object
         """
+        schema_file = Defaults.get_schema_file()
+        validation_stamp = None
+        if RuntimeConfig().get_description_validation_cache():
+            validation_stamp = self._get_validation_stamp(schema_file)
         try:
-            schema_doc = etree.parse(Defaults.get_schema_file())
-            relaxng = etree.RelaxNG(schema_doc)
-            schematron = isoschematron.Schematron(
-                schema_doc, store_report=True
+            # the generateDS classes can't handle comments and
+            # processing instructions, use the same parser as
+            # xml_parse does such that the tree can be shared
+            description = etree.parse(
+                self.description, etree.ETCompatXMLParser()
             )
-        except Exception as issue:
-            raise KiwiSchemaImportError(issue)
-        try:
-            description = etree.parse(self.description)
-            validation_rng = relaxng.validate(description)
-            validation_schematron = schematron.validate(description)
         except Exception as issue:
             raise KiwiValidationError(issue)
-        if not validation_rng:
-            XMLDescription._get_relaxng_validation_details(
-                Defaults.get_schema_file(),
-                self.description,
-                relaxng.error_log
-            )
-        if not validation_schematron:
-            XMLDescription._get_schematron_validation_details(
-                schematron.validation_report
-            )
-        if not validation_rng or not validation_schematron:
-            log.debug(open(self.description).read())
-            raise KiwiDescriptionInvalid(
-                'Failed to validate schema and/or schematron rules. '
-                'Use --debug for more details'
+        if validation_stamp and os.path.exists(validation_stamp):
+            log.debug(
+                'Description validated before, skipping schema validation'
             )
+        else:
+            self._validate(description, schema_file)
+            if validation_stamp:
+                self._create_validation_stamp(validation_stamp)
 
-        parse_result = self._parse()
+        parse_result = self._parse(description.getroot())
 
         if parse_result.get_extension():
             extension_namespace_map = \
@@ -192,6 +188,93 @@ class XMLDescription:
         """
         return self.extension_data.get(namespace_name)
 
+    @staticmethod
+    def _get_schema_validators(schema_file: str) -> Tuple[Any, Any]:
+        """
+        Provide RelaxNG and Schematron validators for the given schema
+
+        The compiled validators are kept in a process wide cache
+        such that the schema is parsed and compiled only once
+
+        :param str schema_file: path to RelaxNG schema file
+
+        :return: tuple of etree.RelaxNG and isoschematron.Schematron
+
+        :rtype: tuple
+        """
+        if schema_file not in SCHEMA_VALIDATORS:
+            try:
+                schema_doc = etree.parse(schema_file)
+                SCHEMA_VALIDATORS[schema_file] = (
+                    etree.RelaxNG(schema_doc),
+                    isoschematron.Schematron(schema_doc, store_report=True)
+                )
+            except Exception as issue:
+                raise KiwiSchemaImportError(issue)
+        return SCHEMA_VALIDATORS[schema_file]
+
+    def _validate(self, description: Any, schema_file: str) -> None:
+        relaxng, schematron = XMLDescription._get_schema_validators(
+            schema_file
+        )
+        try:
+            validation_rng = relaxng.validate(description)
+            validation_schematron = schematron.validate(description)
+        except Exception as issue:
+            raise KiwiValidationError(issue)
+        if not validation_rng:
+            XMLDescription._get_relaxng_validation_details(
+                schema_file,
+                self.description,
+                relaxng.error_log
+            )
+        if not validation_schematron:
+            XMLDescription._get_schematron_validation_details(
+                schematron.validation_report
+            )
+        if not validation_rng or not validation_schematron:
+            log.debug(open(self.description).read())
+            raise KiwiDescriptionInvalid(
+                'Failed to validate schema and/or schematron rules. '
+                'Use --debug for more details'
+            )
+
+    def _get_validation_stamp(self, schema_file: str) -> str:
+        """
+        Provide path of the validation stamp file for the description
+
+        The stamp file name is a checksum over the description
+        contents and the schema contents. Thus it only exists if
+        the very same description was validated successfully
+        against the very same schema before
+
+        :param str schema_file: path to RelaxNG schema file
+
+        :return: file path
+
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        for filename in (self.description, schema_file):
+            digest.update(Checksum(filename).sha256().encode())
+        return os.sep.join(
+            [
+                Defaults.get_description_cache_location(),
+                'validated', digest.hexdigest()
+            ]
+        )
+
+    @staticmethod
+    def _create_validation_stamp(validation_stamp: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(validation_stamp), exist_ok=True)
+            with open(validation_stamp, 'w'):
+                pass
+        except OSError as issue:
+            log.debug(
+                'Failed to store validation stamp: {0}'.format(issue)
+            )
+
     @staticmethod
     def _get_relaxng_validation_details(
         schema_file, description_file, error_log
@@ -232,11 +315,19 @@ class XMLDescription:
         ):
             log.info('--> %s', msg.text)
 
-    def _parse(self):
+    def _parse(self, description_root: Any) -> Any:
+        """
+        Build the generateDS object tree from the given lxml root
+
+        :param object description_root: root element of the description
+
+        :return: instance of XML toplevel domain (image)
+
+        :rtype: object
+        """
         try:
-            parse = xml_parse.parse(
-                self.description, True
-            )
+            parse = xml_parse.image.factory()
+            parse.build(description_root)
             parse.description_dir = self.description_origin and os.path.dirname(
                 self.description_origin
             )
@@ -17,7 +17,7 @@
 #
 import os
 from typing import (
-    List, Optional, Any, Dict, NamedTuple
+    List, Optional, Any, Dict, NamedTuple, Tuple
 )
 import re
 import logging
@@ -92,6 +92,8 @@ class XMLState:
     ):
         self.root_partition_uuid: Optional[str] = None
         self.root_filesystem_uuid: Optional[str] = None
+        self.section_index: Dict[Any, Any] = {}
+        self.section_index_key: Optional[Tuple] = None
         self.host_architecture = defaults.PLATFORM_MACHINE
         self.xml_data = xml_data
         self.profiles = self._used_profiles(profiles)
@@ -109,11 +111,14 @@ class XMLState:
 
         :rtype: list
         """
-        preferences_list = []
-        for preferences in self._profiled(self.xml_data.get_preferences()):
-            if self.preferences_matches_host_architecture(preferences):
-                preferences_list.append(preferences)
-        return preferences_list
+        section_index = self._get_section_index()
+        if 'preferences_for_arch' not in section_index:
+            section_index['preferences_for_arch'] = [
+                preferences for preferences in
+                self._get_profiled_sections('preferences')
+                if self.preferences_matches_host_architecture(preferences)
+            ]
+        return list(section_index['preferences_for_arch'])
 
     def get_description_section(self) -> description_type:
         """
@@ -140,9 +145,7 @@ class XMLState:
 
         :rtype: list
         """
-        return self._profiled(
-            self.xml_data.get_users()
-        )
+        return list(self._get_profiled_sections('users'))
 
     def get_build_type_bundle_format(self) -> str:
         """
@@ -336,15 +339,15 @@ class XMLState:
 
         :rtype: list
         """
-        result = []
-        packages_sections = self._profiled(
-            self.xml_data.get_packages()
-        )
-        for packages in packages_sections:
-            packages_type = packages.get_type()
-            if packages_type in section_types:
-                result.append(packages)
-        return result
+        section_index = self._get_section_index()
+        index_key = ('packages', tuple(section_types))
+        if index_key not in section_index:
+            section_index[index_key] = [
+                packages for packages in
+                self._get_profiled_sections('packages')
+                if packages.get_type() in section_types
+            ]
+        return list(section_index[index_key])
 
     def package_matches_host_architecture(self, package: Any) -> bool:
         """
@@ -416,19 +419,33 @@ class XMLState:
 
         :rtype: list
         """
-        result = []
+        result: List[package_type] = []
         if packages_sections:
+            section_index = self._get_section_index()
             for packages_section in packages_sections:
                 package_list = packages_section.get_package()
-                if package_list:
-                    for package in package_list:
-                        if self.package_matches_host_architecture(package):
-                            result.append(
-                                package_type(
-                                    packages_section=packages_section,
-                                    package_section=package
-                                )
+                if not package_list:
+                    continue
+                # the package list of a section can be changed from
+                # outside, thus the index entry is only used if it was
+                # created from the same list with the same length
+                index_key = ('package', id(packages_section))
+                index_entry = section_index.get(index_key)
+                if not index_entry or index_entry[0] is not package_list \
+                   or index_entry[1] != len(package_list):
+                    index_entry = (
+                        package_list, len(package_list), [
+                            package_type(
+                                packages_section=packages_section,
+                                package_section=package
+                            ) for package in package_list
+                            if self.package_matches_host_architecture(
+                                package
                             )
+                        ]
+                    )
+                    section_index[index_key] = index_entry
+                result += index_entry[2]
         return result
 
     def get_to_become_deleted_packages(self, force: bool = True) -> List:
@@ -1377,6 +1394,7 @@ class XMLState:
                 setup is required
             ''')
             log.warning(message.format(tag))
+        self._invalidate_section_index()
 
     def add_container_config_label(self, label_name: str, value: str) -> None:
         """
@@ -1420,6 +1438,7 @@ class XMLState:
             labels[0].add_label(xml_parse.label(label_name, value))
 
         container_config_section.set_labels(labels)
+        self._invalidate_section_index()
 
     def get_partitions(self) -> Dict[str, ptable_entry_type]:
         """
@@ -1663,9 +1682,7 @@ class XMLState:
 
         :rtype: list
         """
-        drivers_sections = self._profiled(
-            self.xml_data.get_drivers()
-        )
+        drivers_sections = self._get_profiled_sections('drivers')
         result = []
         if drivers_sections:
             for driver in drivers_sections:
@@ -1684,9 +1701,7 @@ class XMLState:
 
         :rtype: list
         """
-        strip_sections = self._profiled(
-            self.xml_data.get_strip()
-        )
+        strip_sections = self._get_profiled_sections('strip')
         result = []
         if strip_sections:
             for strip in strip_sections:
@@ -1746,9 +1761,7 @@ class XMLState:
 
         :rtype: list
         """
-        return self._profiled(
-            self.xml_data.get_repository()
-        )
+        return list(self._get_profiled_sections('repository'))
 
     def get_repository_sections_used_for_build(self) -> List:
         """
@@ -1784,6 +1797,7 @@ class XMLState:
         Delete all repository sections matching configured profiles
         """
         self.xml_data.set_repository([])
+        self._invalidate_section_index()
 
     def delete_repository_sections_used_for_build(self) -> None:
         """
@@ -1797,6 +1811,7 @@ class XMLState:
                 repo for repo in all_repos if repo not in used_for_build
             ]
         )
+        self._invalidate_section_index()
 
     def get_repositories_signing_keys(self) -> List[str]:
         """
@@ -1854,6 +1869,7 @@ class XMLState:
                 repository.set_distribution(distribution)
             if repo_gpgcheck is not None:
                 repository.set_repository_gpgcheck(repo_gpgcheck)
+        self._invalidate_section_index()
 
     def add_repository(
         self, repo_source: str, repo_type: str, repo_alias: str = None,
@@ -1900,6 +1916,7 @@ class XMLState:
                 distribution=distribution
             )
         )
+        self._invalidate_section_index()
 
     def resolve_this_path(self) -> None:
         """
@@ -1931,6 +1948,7 @@ class XMLState:
         displayname = self.xml_data.get_displayname()
         if displayname:
             target_state.xml_data.set_displayname(displayname)
+        target_state._invalidate_section_index()
 
     def copy_name(self, target_state: Any) -> None:
         """
@@ -1941,6 +1959,7 @@ class XMLState:
         target_state.xml_data.set_name(
             self.xml_data.get_name()
         )
+        target_state._invalidate_section_index()
 
     def copy_drivers_sections(self, target_state: Any) -> None:
         """
@@ -1948,12 +1967,11 @@ class XMLState:
 
         :param object target_state: XMLState instance
         """
-        drivers_sections = self._profiled(
-            self.xml_data.get_drivers()
-        )
+        drivers_sections = self._get_profiled_sections('drivers')
         if drivers_sections:
             for drivers_section in drivers_sections:
                 target_state.xml_data.add_drivers(drivers_section)
+        target_state._invalidate_section_index()
 
     def copy_systemdisk_section(self, target_state: Any) -> None:
         """
@@ -1966,6 +1984,7 @@ class XMLState:
             target_state.build_type.set_systemdisk(
                 [systemdisk_section]
             )
+        target_state._invalidate_section_index()
 
     def copy_strip_sections(self, target_state: Any) -> None:
         """
@@ -1973,12 +1992,11 @@ class XMLState:
 
         :param object target_state: XMLState instance
         """
-        strip_sections = self._profiled(
-            self.xml_data.get_strip()
-        )
+        strip_sections = self._get_profiled_sections('strip')
         if strip_sections:
             for strip_section in strip_sections:
                 target_state.xml_data.add_strip(strip_section)
+        target_state._invalidate_section_index()
 
     def copy_machine_section(self, target_state: Any) -> None:
         """
@@ -1991,6 +2009,7 @@ class XMLState:
             target_state.build_type.set_machine(
                 [machine_section]
             )
+        target_state._invalidate_section_index()
 
     def copy_bootloader_section(self, target_state: Any) -> None:
         """
@@ -2003,6 +2022,7 @@ class XMLState:
             target_state.build_type.set_bootloader(
                 [bootloader_section]
             )
+        target_state._invalidate_section_index()
 
     def copy_oemconfig_section(self, target_state: Any) -> None:
         """
@@ -2015,6 +2035,7 @@ class XMLState:
             target_state.build_type.set_oemconfig(
                 [oemconfig_section]
             )
+        target_state._invalidate_section_index()
 
     def copy_repository_sections(
         self, target_state: Any, wipe: bool = False
@@ -2025,9 +2046,7 @@ class XMLState:
         :param object target_state: XMLState instance
         :param bool wipe: delete all repos in target prior to copy
         """
-        repository_sections = self._profiled(
-            self.xml_data.get_repository()
-        )
+        repository_sections = self._get_profiled_sections('repository')
         if repository_sections:
             if wipe:
                 target_state.xml_data.set_repository([])
@@ -2037,6 +2056,7 @@ class XMLState:
                 # in the target description
                 repository_copy.set_profiles(None)
                 target_state.xml_data.add_repository(repository_copy)
+        target_state._invalidate_section_index()
 
     def copy_preferences_subsections(
         self, section_names: List, target_state: Any
@@ -2062,6 +2082,7 @@ class XMLState:
                             target_preferences_section, 'set_' + section_name
                         )
                         set_section_method(section)
+        target_state._invalidate_section_index()
 
     def copy_build_type_attributes(
         self, attribute_names: List, target_state: Any
@@ -2083,6 +2104,7 @@ class XMLState:
                     target_state.build_type, 'set_' + attribute
                 )
                 set_type_method(attribute_value)
+        target_state._invalidate_section_index()
 
     def copy_bootincluded_packages(self, target_state: Any) -> None:
         """
@@ -2129,6 +2151,7 @@ class XMLState:
                         package.packages_section.package.remove(
                             package.package_section
                         )
+        target_state._invalidate_section_index()
 
     def copy_bootincluded_archives(self, target_state: Any) -> None:
         """
@@ -2155,6 +2178,7 @@ class XMLState:
                                     name=archive.get_name()
                                 )
                             )
+        target_state._invalidate_section_index()
 
     def copy_bootdelete_packages(self, target_state: Any) -> None:
         """
@@ -2190,6 +2214,7 @@ class XMLState:
                             name=package.package_section.get_name()
                         )
                     )
+        target_state._invalidate_section_index()
 
     def get_distribution_name_from_boot_attribute(self) -> str:
         """
@@ -2651,6 +2676,52 @@ class XMLState:
             )
         )
 
+    def _get_section_index(self) -> Dict[Any, Any]:
+        """
+        Provide the index of profile and architecture filtered sections
+
+        The index is bound to the xml data, the selected profiles and
+        the host architecture. If any of them changed since the index
+        was populated it gets reset
+
+        :return: section index
+
+        :rtype: dict
+        """
+        section_index_key = (
+            id(self.xml_data),
+            tuple(self.profiles) if self.profiles else None,
+            self.host_architecture
+        )
+        if section_index_key != self.section_index_key:
+            self.section_index = {}
+            self.section_index_key = section_index_key
+        return self.section_index
+
+    def _get_profiled_sections(self, section_name: str) -> List:
+        """
+        Provide the sections of the given toplevel element name which
+        match the selected profiles from the section index
+
+        :param str section_name: toplevel element name, e.g packages
+
+        :return: list of section references
+
+        :rtype: list
+        """
+        section_index = self._get_section_index()
+        if section_name not in section_index:
+            get_sections = getattr(self.xml_data, 'get_' + section_name)
+            section_index[section_name] = self._profiled(get_sections())
+        return section_index[section_name]
+
+    def _invalidate_section_index(self) -> None:
+        """
+        Reset the section index, must be called by all methods
+        which change the xml data
+        """
+        self.section_index = {}
+
     def _profiled(self, xml_abstract):
         """
         return only those sections matching the instance stored
@@ -0,0 +1,27 @@
+<?xml version="1.0" encoding="UTF-8"?>
+<xsl:stylesheet version="1.0"
+        xmlns:xsl="http://www.w3.org/1999/XSL/Transform"
+        xmlns:exslt="http://exslt.org/common"
+        exclude-result-prefixes="exslt"
+>
+
+<!--
+    Style sheet for descriptions which already use the current
+    schemaversion. There is no conversion needed, only include
+    references are resolved and the result is formatted the
+    same way as done in master.xsl
+-->
+<xsl:import href="include.xsl"/>
+<xsl:import href="pretty.xsl"/>
+
+<xsl:output encoding="utf-8"/>
+
+<xsl:template match="/">
+    <xsl:variable name="preprocess">
+        <xsl:apply-templates select="/" mode="include"/>
+    </xsl:variable>
+    <xsl:apply-templates
+        select="exslt:node-set($preprocess)" mode="pretty"
+    />
+</xsl:template>
+</xsl:stylesheet>
@@ -0,0 +1,44 @@
+import os
+import time
+from mock import patch
+
+from kiwi.utils.checksum import Checksum
+
+# size of the synthetic image file in MB, can be changed
+# through the environment for shorter or longer runs
+IMAGE_MBYTES = int(os.environ.get('KIWI_BENCHMARK_MBYTES', '256'))
+
+# minimum throughput in MB/s for md5 and sha256 in one pass
+MIN_MBYTES_PER_SECOND = int(os.environ.get('KIWI_BENCHMARK_MIN_MBS', '25'))
+
+
+def create_image(filename):
+    chunk = os.urandom(1048576)
+    with open(filename, 'wb') as image:
+        for mbyte in range(IMAGE_MBYTES):
+            image.write(chunk)
+
+
+def test_checksum_single_pass(tmpdir):
+    image = format(tmpdir.join('image.raw'))
+    create_image(image)
+    checksum = Checksum(image)
+
+    with patch('builtins.open', wraps=open) as mock_open:
+        start = time.monotonic()
+        result = checksum.calculate(['md5', 'sha256'])
+        duration = time.monotonic() - start
+        # all digests are calculated from one read of the file
+        assert mock_open.call_count == 1
+
+    assert result.hexdigests['md5'] == checksum.md5()
+    assert result.hexdigests['sha256'] == checksum.sha256()
+    assert result.size == IMAGE_MBYTES * 1048576
+
+    throughput = IMAGE_MBYTES / duration
+    print(
+        '\nChecksum: md5 and sha256 of {0} MB in {1:.2f}s: {2:.1f} MB/s'.format(
+            IMAGE_MBYTES, duration, throughput
+        )
+    )
+    assert throughput >= MIN_MBYTES_PER_SECOND
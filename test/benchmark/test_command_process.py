@@ -0,0 +1,112 @@
+import os
+import time
+from mock import Mock
+
+from kiwi.command import Command
+from kiwi.command_process import (
+    CommandIterator, CommandProcess
+)
+from kiwi.package_manager.zypper import PackageManagerZypper
+
+# amount of synthetic command output in MB, can be changed
+# through the environment for shorter or longer runs
+OUTPUT_MBYTES = int(os.environ.get('KIWI_BENCHMARK_MBYTES', '256'))
+
+# minimum throughput in MB/s the iterator must deliver
+MIN_MBYTES_PER_SECOND = int(os.environ.get('KIWI_BENCHMARK_MIN_MBS', '25'))
+
+# number of requested packages and package manager output
+# lines for the package progress benchmark
+PROGRESS_PACKAGES = 5000
+PROGRESS_LINES = 50000
+
+
+def test_command_iterator_throughput():
+    line = 'Installing: package-1.2.3-4.5.x86_64 [done]'
+    output_bytes = OUTPUT_MBYTES * 1048576
+    command = Command.call(
+        [
+            'bash', '-c', 'echo "start" >&2; yes "{0}" | head -c {1}'.format(
+                line, output_bytes
+            )
+        ]
+    )
+    iterator = CommandIterator(command)
+
+    start = time.monotonic()
+    lines_read = 0
+    bytes_read = 0
+    for output_line in iterator:
+        lines_read += 1
+        bytes_read += len(output_line) + 1
+    duration = time.monotonic() - start
+
+    # the last line is cut by head and comes without a newline
+    assert bytes_read - 1 == output_bytes
+    assert lines_read == output_bytes // (len(line) + 1) + 1
+    assert iterator.get_error_output() == 'start\n'
+    assert iterator.get_error_code() == 0
+
+    throughput = OUTPUT_MBYTES / duration
+    print(
+        '\nCommandIterator: {0} MB, {1} lines in {2:.2f}s: {3:.1f} MB/s'.format(
+            OUTPUT_MBYTES, lines_read, duration, throughput
+        )
+    )
+    assert throughput >= MIN_MBYTES_PER_SECOND
+
+
+def test_poll_show_progress_scaling(tmpdir):
+    packages = [
+        'package-{0:05d}-{1}'.format(count, 'devel' if count % 2 else 'data')
+        for count in range(PROGRESS_PACKAGES)
+    ]
+    output_file = tmpdir.join('zypper.log')
+    with open(output_file, 'w') as output:
+        lines_per_package = PROGRESS_LINES // PROGRESS_PACKAGES
+        for count, package in enumerate(packages):
+            for line in range(lines_per_package - 1):
+                output.write(
+                    'Retrieving: {0}-1.0-1.x86_64.rpm [.....]\n'.format(
+                        package
+                    )
+                )
+            output.write(
+                '({0}/{1}) Installing: {2}-1.0-1.x86_64 [....done]\n'.format(
+                    count + 1, PROGRESS_PACKAGES, package
+                )
+            )
+    repository = Mock()
+    repository.runtime_config = Mock(
+        return_value={'zypper_args': [], 'command_env': {}}
+    )
+    manager = PackageManagerZypper(repository)
+
+    process = CommandProcess(Command.call(['cat', format(output_file)]))
+    start = time.monotonic()
+    process.poll_show_progress(
+        items_to_complete=packages,
+        parse_method=manager.parse_package_installed
+    )
+    duration = time.monotonic() - start
+    assert process.items_processed == PROGRESS_PACKAGES
+
+    # the per item match method is only measured on a sample
+    # of the output, a full run would take far too long
+    sample_lines = 10
+    match_method = process.create_match_method(
+        manager.match_package_installed
+    )
+    start = time.monotonic()
+    for line in range(sample_lines):
+        for package in packages:
+            match_method(package, 'Retrieving: foo-1.0-1.x86_64.rpm [.....]')
+    match_duration = (time.monotonic() - start) * PROGRESS_LINES / sample_lines
+
+    print(
+        '\nCommandProcess: {0} packages, {1} lines: '
+        'parse {2:.2f}s, match (estimated) {3:.2f}s'.format(
+            PROGRESS_PACKAGES, PROGRESS_LINES, duration, match_duration
+        )
+    )
+    assert duration < match_duration
@@ -0,0 +1,46 @@
+import os
+import re
+import sys
+import subprocess
+
+# maximum import time in milliseconds for the command line
+# entry points, can be changed through the environment
+MAX_IMPORT_MSECONDS = int(
+    os.environ.get('KIWI_BENCHMARK_MAX_IMPORT_MS', '250')
+)
+
+# modules imported by the kiwi-ng command and the task modules
+# which are expected to start fast
+ENTRY_POINT_MODULES = [
+    'kiwi.kiwi',
+    'kiwi.tasks.result_list'
+]
+
+
+def import_time_mseconds(module):
+    """
+    Run python -X importtime for the given module and return the
+    cumulative import time of the module in milliseconds
+    """
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stderr=subprocess.PIPE, check=True
+    ).stderr.decode()
+    cumulative_useconds = None
+    for line in output.splitlines():
+        import_time = re.match(
+            r'import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)$', line
+        )
+        if import_time and import_time.group(2) == module:
+            cumulative_useconds = int(import_time.group(1))
+    assert cumulative_useconds is not None
+    return cumulative_useconds / 1000
+
+
+def test_entry_point_import_time():
+    for module in ENTRY_POINT_MODULES:
+        # the first run fills the bytecode cache
+        import_time_mseconds(module)
+        mseconds = min(import_time_mseconds(module) for run in range(3))
+        print('\n{0}: import in {1:.1f}ms'.format(module, mseconds))
+        assert mseconds <= MAX_IMPORT_MSECONDS
@@ -0,0 +1,113 @@
+import gc
+import time
+from lxml import etree
+
+from kiwi import xml_parse
+from kiwi.xml_description import XMLDescription
+
+# number of packages and profiles in the synthetic description
+DESCRIPTION_PACKAGES = 10000
+DESCRIPTION_PROFILES = 10
+
+# number of runs per measurement, the fastest run counts
+MEASURE_RUNS = 5
+
+
+def measure(method, *args):
+    durations = []
+    gc.disable()
+    try:
+        for run in range(MEASURE_RUNS):
+            start = time.monotonic()
+            method(*args)
+            durations.append(time.monotonic() - start)
+    finally:
+        gc.enable()
+    return min(durations)
+
+
+def create_description(filename):
+    profiles = [
+        'profile-{0}'.format(count) for count in range(DESCRIPTION_PROFILES)
+    ]
+    with open(filename, 'w') as description:
+        description.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<image schemaversion="7.5" name="benchmark">\n'
+            '  <description type="system">\n'
+            '    <author>Benchmark</author>\n'
+            '    <contact>benchmark@example.com</contact>\n'
+            '    <specification>synthetic description</specification>\n'
+            '  </description>\n'
+            '  <profiles>\n'
+        )
+        for profile in profiles:
+            description.write(
+                '    <profile name="{0}" description="{0}"/>\n'.format(
+                    profile
+                )
+            )
+        description.write(
+            '  </profiles>\n'
+            '  <preferences>\n'
+            '    <version>1.1.1</version>\n'
+            '    <packagemanager>zypper</packagemanager>\n'
+            '    <type image="oem" filesystem="ext4"/>\n'
+            '  </preferences>\n'
+            '  <repository>\n'
+            '    <source path="obs://some/repo"/>\n'
+            '  </repository>\n'
+        )
+        packages_per_profile = DESCRIPTION_PACKAGES // len(profiles)
+        for count, profile in enumerate(profiles):
+            description.write(
+                '  <!-- packages for {0} -->\n'
+                '  <packages type="image" profiles="{0}">\n'.format(profile)
+            )
+            for package in range(packages_per_profile):
+                description.write(
+                    '    <package name="package-{0}-{1}"/>\n'.format(
+                        count, package
+                    )
+                )
+            description.write('  </packages>\n')
+        description.write(
+            '  <packages type="bootstrap">\n'
+            '    <package name="filesystem"/>\n'
+            '  </packages>\n'
+            '</image>\n'
+        )
+
+
+def test_load_description(tmpdir):
+    description_file = format(tmpdir.join('config.xml'))
+    create_description(description_file)
+    description = XMLDescription(description_file)
+
+    start = time.monotonic()
+    xml_data = description.load()
+    load_duration = time.monotonic() - start
+
+    packages = 0
+    for packages_section in xml_data.get_packages():
+        packages += len(packages_section.get_package())
+    assert packages == DESCRIPTION_PACKAGES + 1
+
+    # building the object tree from the validated lxml root must
+    # be faster than reading and parsing the description again
+    tree = etree.parse(description.description, etree.ETCompatXMLParser())
+    build_duration = measure(description._parse, tree.getroot())
+    parse_duration = measure(xml_parse.parse, description.description, True)
+    read_duration = measure(
+        etree.parse, description.description, etree.ETCompatXMLParser()
+    )
+
+    print(
+        '\nXMLDescription: {0} packages: load {1:.2f}s, '
+        'tree build {2:.3f}s, file parse {3:.3f}s, '
+        'saved read {4:.3f}s'.format(
+            DESCRIPTION_PACKAGES, load_duration,
+            build_duration, parse_duration, read_duration
+        )
+    )
+    assert build_duration < parse_duration
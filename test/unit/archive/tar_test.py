@@ -1,15 +1,35 @@
+import os
+import json
+import logging
 from mock import (
-    patch, call
+    patch, call, Mock
+)
+from pytest import (
+    raises, fixture
 )
-from pytest import raises
 import mock
 
-from kiwi.archive.tar import ArchiveTar
+import kiwi.defaults as defaults
 
-from kiwi.exceptions import KiwiCommandCapabilitiesError
+from kiwi.archive.tar import (
+    ArchiveTar, ArchiveTarChunkCompressor
+)
+from kiwi.command import Command
+from kiwi.utils.compress import Compress
+
+from kiwi.exceptions import (
+    KiwiArchiveTarError,
+    KiwiCommandCapabilitiesError,
+    KiwiCommandError,
+    KiwiCompressionError
+)
 
 
 class TestArchiveTar:
+    @fixture(autouse=True)
+    def inject_fixtures(self, caplog):
+        self._caplog = caplog
+
     @patch('kiwi.archive.tar.Command.run')
     def setup(self, mock_command):
         command = mock.Mock()
@@ -119,57 +139,346 @@ class TestArchiveTar:
         mock_command.assert_has_calls(calls)
         assert mock_command.call_count == 2
 
-    @patch('kiwi.archive.tar.Command.run')
+    @patch('kiwi.archive.tar.Compress.get_codec')
     @patch('os.listdir')
-    def test_create_xz_compressed(self, mock_os_dir, mock_command):
+    def test_create_xz_compressed(self, mock_os_dir, mock_get_codec):
         mock_os_dir.return_value = ['foo', 'bar']
         assert self.archive.create_xz_compressed('source-dir') == 'foo.tar.xz'
-        mock_command.assert_called_once_with(
+        mock_get_codec.assert_called_once_with('xz')
+        mock_get_codec.return_value.compress_command.assert_called_once_with(
             [
-                'bash', '-c',
-                ' '.join([
-                    'tar', '-C', 'source-dir', '--xattrs',
-                    '--xattrs-include=*', '-c', '--to-stdout',
-                    'bar', 'foo', '|', 'xz', '-f', '--threads=0',
-                    '>', 'foo.tar.xz'
-                ])
-            ]
+                'tar', '-C', 'source-dir', '--xattrs',
+                '--xattrs-include=*', '-c', '--to-stdout',
+                'bar', 'foo'
+            ], 'foo.tar.xz', ['--threads=0']
         )
 
-    @patch('kiwi.archive.tar.Command.run')
+    @patch('kiwi.archive.tar.Compress.get_codec')
     @patch('os.listdir')
     def test_create_xz_compressed_with_custom_xz_options(
-        self, mock_os_dir, mock_command
+        self, mock_os_dir, mock_get_codec
     ):
         mock_os_dir.return_value = ['foo', 'bar']
         assert self.archive.create_xz_compressed(
             'source-dir', xz_options=['-a', '-b']
         ) == 'foo.tar.xz'
-        mock_command.assert_called_once_with(
+        mock_get_codec.return_value.compress_command.assert_called_once_with(
             [
-                'bash', '-c',
-                ' '.join([
-                    'tar', '-C', 'source-dir', '--xattrs',
-                    '--xattrs-include=*', '-c', '--to-stdout',
-                    'bar', 'foo', '|', 'xz', '-f', '-a', '-b',
-                    '>', 'foo.tar.xz'
-                ])
-            ]
+                'tar', '-C', 'source-dir', '--xattrs',
+                '--xattrs-include=*', '-c', '--to-stdout',
+                'bar', 'foo'
+            ], 'foo.tar.xz', ['-a', '-b']
         )
 
-    @patch('kiwi.archive.tar.Command.run')
+    @patch('kiwi.archive.tar.Compress.get_codec')
+    @patch('os.listdir')
+    def test_create_zstd_compressed(self, mock_os_dir, mock_get_codec):
+        mock_os_dir.return_value = ['foo', 'bar']
+        assert self.archive.create_zstd_compressed('source-dir') == \
+            'foo.tar.zst'
+        mock_get_codec.assert_called_once_with('zstd')
+        mock_get_codec.return_value.compress_command.assert_called_once_with(
+            [
+                'tar', '-C', 'source-dir', '--xattrs',
+                '--xattrs-include=*', '-c', '--to-stdout',
+                'bar', 'foo'
+            ], 'foo.tar.zst', ['--threads=0', '--long=27', '-10']
+        )
+        mock_get_codec.return_value.compress_command.reset_mock()
+        self.archive.create_zstd_compressed(
+            'source-dir', options=['--numeric-owner'], zstd_options=['-19']
+        )
+        mock_get_codec.return_value.compress_command.assert_called_once_with(
+            [
+                'tar', '-C', 'source-dir', '--numeric-owner', '--xattrs',
+                '--xattrs-include=*', '-c', '--to-stdout',
+                'bar', 'foo'
+            ], 'foo.tar.zst', ['-19']
+        )
+
+    @patch('kiwi.archive.tar.Compress.get_codec')
     @patch('os.listdir')
-    def test_create_gnu_gzip_compressed(self, mock_os_dir, mock_command):
+    def test_create_gnu_gzip_compressed(self, mock_os_dir, mock_get_codec):
         mock_os_dir.return_value = ['foo', 'bar']
         assert self.archive.create_gnu_gzip_compressed('source-dir') \
             == 'foo.tar.gz'
-        mock_command.assert_called_once_with(
+        mock_get_codec.assert_called_once_with('gzip')
+        mock_get_codec.return_value.compress_command.assert_called_once_with(
             [
                 'tar', '-C', 'source-dir',
-                '--format=gnu', '-cSz', '-f', 'foo.tar.gz', 'bar', 'foo'
+                '--format=gnu', '-cS', '--to-stdout', 'bar', 'foo'
+            ], 'foo.tar.gz', None
+        )
+
+    @patch('kiwi.utils.compress.RuntimeConfig')
+    def test_create_indexed(self, mock_RuntimeConfig, tmpdir):
+        source = self.create_source(tmpdir)
+        get_codec_orig = Compress.get_codec
+        for codec in ('tool', 'python'):
+            mock_RuntimeConfig.return_value.get_compress_codec.return_value = \
+                codec
+            for zipper in ('xz', 'zstd', 'gzip'):
+                archive = ArchiveTar(
+                    format(tmpdir.join('{0}.tar'.format(codec))),
+                    create_from_file_list=False
+                )
+                with patch('kiwi.defaults.ARCHIVE_INDEX_CHUNK_SIZE', 8192):
+                    if zipper == 'xz':
+                        # padding after the end of the archive
+                        filename = archive.create_xz_compressed(
+                            source, exclude=['excluded'],
+                            options=['--blocking-factor=200'], indexed=True
+                        )
+                    elif zipper == 'zstd':
+                        filename = archive.create_zstd_compressed(
+                            source, exclude=['excluded'],
+                            zstd_options=['-1'], indexed=True
+                        )
+                    else:
+                        filename = archive.create_gnu_gzip_compressed(
+                            source, exclude=['excluded'], indexed=True
+                        )
+                with open(filename + '.index') as index_file:
+                    index = json.load(index_file)
+                assert index['format'] == zipper
+                assert index['size'] == os.path.getsize(filename)
+                assert sorted(index['members']) == [
+                    '.', 'data', 'etc', 'etc/passwd'
+                ]
+                assert len(index['chunks']) > 2
+
+                # the chunks form a valid compressed tar archive
+                target = tmpdir.mkdir('{0}-{1}'.format(codec, zipper))
+                ArchiveTar(filename).extract(format(target))
+                assert target.join('data').read_binary() == \
+                    self.data.read_binary()
+                assert target.join('etc', 'passwd').read() == 'root'
+
+                # a member is extracted from the chunks containing it
+                target = tmpdir.mkdir('{0}-{1}-member'.format(codec, zipper))
+                codecs = []
+
+                def get_codec(name):
+                    codec = get_codec_orig(name)
+                    codec.uncompress_bytes = Mock(wraps=codec.uncompress_bytes)
+                    codecs.append(codec)
+                    return codec
+
+                with patch(
+                    'kiwi.archive.tar.Compress.get_codec',
+                    side_effect=get_codec
+                ):
+                    ArchiveTar(filename).extract(
+                        format(target), files=['./etc/passwd']
+                    )
+                assert target.join('etc', 'passwd').read() == 'root'
+                assert not target.join('data').exists()
+                start, end = index['members']['etc/passwd']
+                assert codecs[0].uncompress_bytes.call_count == len(
+                    [
+                        chunk for chunk in index['chunks']
+                        if chunk[0] < end and chunk[0] + chunk[1] > start
+                    ]
+                ) < len(index['chunks'])
+
+                # a directory is extracted with the members below it
+                # and every chunk is uncompressed once
+                target = tmpdir.mkdir('{0}-{1}-dir'.format(codec, zipper))
+                codecs = []
+                with patch(
+                    'kiwi.archive.tar.Compress.get_codec',
+                    side_effect=get_codec
+                ):
+                    ArchiveTar(filename).extract(
+                        format(target), files=['etc/', 'data', 'etc/passwd']
+                    )
+                assert target.join('etc', 'passwd').read() == 'root'
+                assert target.join('data').read_binary() == \
+                    self.data.read_binary()
+                start = index['members']['data'][0]
+                end = max(
+                    index['members']['data'][1],
+                    index['members']['etc/passwd'][1]
+                )
+                assert codecs[0].uncompress_bytes.call_count == len(
+                    [
+                        chunk for chunk in index['chunks']
+                        if chunk[0] < end and chunk[0] + chunk[1] > start
+                    ]
+                )
+
+    def test_chunk_compressor_options(self):
+        chunk_size = defaults.ARCHIVE_INDEX_CHUNK_SIZE.bit_length() - 1
+        compressor = ArchiveTarChunkCompressor(
+            Mock(), Compress.get_codec('zstd'),
+            ['--threads=0', '--long=27', '-10']
+        )
+        assert compressor.options == [
+            '--long={0}'.format(chunk_size), '-10', '--threads=1'
+        ]
+        compressor.close()
+        compressor = ArchiveTarChunkCompressor(
+            Mock(), Compress.get_codec('xz'), None
+        )
+        assert compressor.options == ['--threads=1']
+        compressor.close()
+        codec = Compress.get_codec('gzip')
+        codec.tool = 'pigz'
+        compressor = ArchiveTarChunkCompressor(Mock(), codec, ['-T4', '-9'])
+        assert compressor.options == ['-9', '-p', '1']
+        compressor.close()
+
+    def test_create_indexed_tar_failed(self, tmpdir):
+        archive = ArchiveTar(
+            format(tmpdir.join('foo.tar')), create_from_file_list=False
+        )
+        with raises(KiwiCommandError):
+            archive.create_xz_compressed(
+                format(tmpdir.join('missing')), exclude=[], indexed=True
+            )
+
+    def test_create_indexed_no_tar_data(self, tmpdir):
+        archive = ArchiveTar(format(tmpdir.join('foo.tar')))
+        call = Command.call(['echo', 'foo'])
+        with patch('kiwi.archive.tar.Command.call', return_value=call):
+            with raises(KiwiArchiveTarError):
+                archive.create_xz_compressed(format(tmpdir), indexed=True)
+
+    @patch('kiwi.utils.compress.RuntimeConfig')
+    def test_create_gzip_compressed(self, mock_RuntimeConfig, tmpdir):
+        source = self.create_source(tmpdir)
+        for codec in ('tool', 'python'):
+            mock_RuntimeConfig.return_value.get_compress_codec.return_value = \
+                codec
+            archive = ArchiveTar(
+                format(tmpdir.join('{0}.tar'.format(codec))),
+                create_from_file_list=False
+            )
+            filename = archive.create_gzip_compressed(
+                source, exclude=['excluded'], options=['--numeric-owner']
+            )
+            assert filename == format(tmpdir.join('{0}.tar.gz'.format(codec)))
+            assert not os.path.exists(filename + '.index')
+            listing = Command.run(['tar', '-tzf', filename]).output
+            assert archive.member_count == len(listing.splitlines()) == 4
+            assert archive.uncompressed_size == int(
+                Command.run(
+                    ['bash', '-c', 'gzip -dc {0} | wc -c'.format(filename)]
+                ).output
+            )
+
+    def test_create_gzip_compressed_tar_failed(self, tmpdir):
+        archive = ArchiveTar(
+            format(tmpdir.join('foo.tar')), create_from_file_list=False
+        )
+        with raises(KiwiCommandError):
+            archive.create_gzip_compressed(
+                format(tmpdir.join('missing')), exclude=[]
+            )
+        assert archive.member_count is None
+
+    def test_create_gzip_compressed_compressor_failed(
+        self, tmpdir, monkeypatch
+    ):
+        source = tmpdir.mkdir('source')
+        source.join('data').write_binary(os.urandom(4 * 1048576))
+        tools = tmpdir.mkdir('tools')
+        for tool in ('pigz', 'gzip'):
+            tools.join(tool).write('#!/bin/sh\necho broken >&2\nexit 1\n')
+            tools.join(tool).chmod(0o755)
+        monkeypatch.setenv(
+            'PATH', os.pathsep.join([format(tools), os.environ['PATH']])
+        )
+        archive = ArchiveTar(
+            format(tmpdir.join('foo.tar')), create_from_file_list=False
+        )
+        with patch('kiwi.utils.compress.RuntimeConfig') as mock_RuntimeConfig:
+            mock_RuntimeConfig.return_value.get_compress_codec.return_value = \
+                'tool'
+            with raises(KiwiCompressionError) as issue:
+                archive.create_gzip_compressed(format(source), exclude=[])
+        assert 'broken' in format(issue.value)
+        assert archive.member_count is None
+
+    def test_create_xz_compressed_compressor_failed(
+        self, tmpdir, monkeypatch
+    ):
+        source = tmpdir.mkdir('source')
+        source.join('data').write_binary(os.urandom(4 * 1048576))
+        tools = tmpdir.mkdir('tools')
+        tools.join('xz').write('#!/bin/sh\necho broken >&2\nexit 1\n')
+        tools.join('xz').chmod(0o755)
+        monkeypatch.setenv(
+            'PATH', os.pathsep.join([format(tools), os.environ['PATH']])
+        )
+        archive = ArchiveTar(
+            format(tmpdir.join('foo.tar')), create_from_file_list=False
+        )
+        with patch('kiwi.utils.compress.RuntimeConfig') as mock_RuntimeConfig:
+            mock_RuntimeConfig.return_value.get_compress_codec.return_value = \
+                'tool'
+            for indexed in (False, True):
+                with raises(KiwiCompressionError) as issue:
+                    archive.create_xz_compressed(
+                        format(source), exclude=[], indexed=indexed
+                    )
+                assert 'broken' in format(issue.value)
+
+    @patch('kiwi.archive.tar.Command.run')
+    def test_extract_files(self, mock_command):
+        self.archive.extract('destination', files=['etc/passwd'])
+        mock_command.assert_called_once_with(
+            [
+                'tar', '-C', 'destination', '-x', '-v', '-f', 'foo.tar',
+                'etc/passwd'
             ]
         )
 
+    @patch('kiwi.archive.tar.Compress.get_codec')
+    def test_extract_compressed(self, mock_get_codec, tmpdir):
+        archive = tmpdir.join('foo.tar.xz')
+        archive.write_binary(b'\xfd7zXZ\x00')
+        ArchiveTar(format(archive)).extract('destination')
+        mock_get_codec.assert_called_once_with('xz')
+        mock_get_codec.return_value.uncompress_command.assert_called_once_with(
+            ['tar', '-C', 'destination', '-x', '-v', '-f', '-'],
+            format(archive)
+        )
+
+    @patch('kiwi.archive.tar.Command.run')
+    def test_extract_outdated_index(self, mock_command, tmpdir):
+        archive = tmpdir.join('foo.tar')
+        archive.write_binary(b'data')
+        tmpdir.join('foo.tar.index').write(json.dumps({'size': 42}))
+        self.archive.filename = format(archive)
+        with self._caplog.at_level(logging.WARNING):
+            self.archive.extract('destination', files=['foo'])
+            assert 'Ignoring outdated archive index' in self._caplog.text
+        mock_command.assert_called_once_with(
+            [
+                'tar', '-C', 'destination', '-x', '-v', '-f', format(archive),
+                'foo'
+            ]
+        )
+
+    def test_extract_member_not_found(self, tmpdir):
+        archive = ArchiveTar(
+            format(tmpdir.join('foo.tar')), create_from_file_list=False
+        )
+        filename = archive.create_gnu_gzip_compressed(
+            self.create_source(tmpdir), exclude=[], indexed=True
+        )
+        with raises(KiwiArchiveTarError):
+            ArchiveTar(filename).extract(format(tmpdir), files=['foo'])
+
+    def create_source(self, tmpdir):
+        source = tmpdir.mkdir('source')
+        self.data = source.join('data')
+        self.data.write_binary(os.urandom(65536))
+        source.mkdir('etc').join('passwd').write('root')
+        source.join('excluded').write('excluded')
+        return format(source)
+
     @patch('kiwi.archive.tar.Command.run')
     @patch('os.listdir')
     def test_create_exclude(self, mock_os_dir, mock_command):
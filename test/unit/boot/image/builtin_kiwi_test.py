@@ -17,6 +17,7 @@ from kiwi.exceptions import KiwiConfigFileNotFound
 
 
 class TestBootImageKiwi:
+    @patch('kiwi.runtime_config.RUNTIME_CONFIG', {})
     @patch('kiwi.boot.image.builtin_kiwi.Temporary')
     @patch('kiwi.boot.image.builtin_kiwi.os.path.exists')
     @patch('kiwi.defaults.Defaults.get_boot_image_description_path')
@@ -52,6 +53,7 @@ class TestBootImageKiwi:
             self.xml_state, 'some-target-dir'
         )
 
+    @patch('kiwi.runtime_config.RUNTIME_CONFIG', {})
     @patch('kiwi.boot.image.builtin_kiwi.Temporary')
     @patch('kiwi.boot.image.builtin_kiwi.os.path.exists')
     @patch('kiwi.defaults.Defaults.get_boot_image_description_path')
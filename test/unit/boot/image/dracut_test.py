@@ -10,6 +10,7 @@ from kiwi.xml_state import XMLState
 
 
 class TestBootImageKiwi:
+    @patch('kiwi.runtime_config.RUNTIME_CONFIG', {})
     @patch('kiwi.boot.image.dracut.Command.run')
     @patch('kiwi.boot.image.base.os.path.exists')
     def setup(self, mock_exists, mock_cmd):
@@ -31,6 +32,7 @@ class TestBootImageKiwi:
             '--list-modules', '--no-kernel'
         ])
 
+    @patch('kiwi.runtime_config.RUNTIME_CONFIG', {})
     @patch('kiwi.boot.image.dracut.Command.run')
     @patch('kiwi.boot.image.base.os.path.exists')
     def setup_method(self, cls, mock_exists, mock_cmd):
@@ -142,6 +142,7 @@ class TestBootLoaderConfigGrub2:
         with raises(KiwiBootLoaderGrubPlatformError):
             BootLoaderConfigGrub2(Mock(), 'root_dir')
 
+    @patch('kiwi.runtime_config.RUNTIME_CONFIG', {})
     @patch('kiwi.defaults.Defaults.get_shim_loader')
     @patch('kiwi.defaults.Defaults.get_signed_grub_loader')
     @patch('kiwi.bootloader.config.grub2.Command.run')
@@ -1148,6 +1149,7 @@ class TestBootLoaderConfigGrub2:
             )
         ]
 
+    @patch('kiwi.runtime_config.RUNTIME_CONFIG', {})
     @patch('kiwi.bootloader.config.grub2.Defaults.get_unsigned_grub_loader')
     @patch('kiwi.bootloader.config.grub2.Command.run')
     @patch('kiwi.bootloader.config.grub2.Path.which')
@@ -1987,6 +1989,7 @@ class TestBootLoaderConfigGrub2:
             options=['-a']
         )
 
+    @patch('kiwi.runtime_config.RUNTIME_CONFIG', {})
     @patch('kiwi.bootloader.config.grub2.Command.run')
     @patch('kiwi.bootloader.config.grub2.Path.which')
     @patch('kiwi.bootloader.config.grub2.DataSync')
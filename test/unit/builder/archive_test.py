@@ -76,6 +76,23 @@ class TestArchiveBuilder:
             'target_dir'
         )
 
+    @patch('kiwi.builder.archive.ArchiveTar')
+    def test_create_zstd(self, mock_tar):
+        self.xml_state.get_build_type_name.return_value = 'tzst'
+        archive = ArchiveBuilder(
+            self.xml_state, 'target_dir', 'root_dir',
+            custom_args={'zstd_options': ['-19']}
+        )
+        result = archive.create()
+        mock_tar.return_value.create_zstd_compressed.assert_called_once_with(
+            'root_dir', exclude=[
+                'image', '.profile', '.kconfig', 'run/*', 'tmp/*',
+                '.buildenv', 'var/cache/kiwi'
+            ], zstd_options=['-19']
+        )
+        assert result.get_results()['root_archive'].filename == \
+            'target_dir/myimage.x86_64-1.2.3.tar.zst'
+
     def teardown(self):
         sys.argv = argv_kiwi_tests
 
@@ -122,6 +122,7 @@ class TestDiskBuilder:
         self.disk_setup = Mock()
         self.disk_setup.get_disksize_mbytes.return_value = 1024
         self.disk_setup.boot_partition_size.return_value = 0
+        self.disk_setup.root_filesystem_size = None
         self.disk_setup.get_efi_label = Mock(
             return_value='EFI'
         )
@@ -200,6 +201,8 @@ class TestDiskBuilder:
         kiwi.builder.disk.Fstab = Mock(
             return_value=self.fstab
         )
+        self.block_copy_patch = patch('kiwi.builder.disk.BlockCopy')
+        self.mock_BlockCopy = self.block_copy_patch.start()
         self.xml_state = XMLState(description.load())
         self.disk_builder = DiskBuilder(
             self.xml_state, 'target_dir', 'root_dir',
@@ -216,6 +219,7 @@ class TestDiskBuilder:
 
     def teardown(self):
         sys.argv = argv_kiwi_tests
+        self.block_copy_patch.stop()
 
     def teardown_method(self, cls):
         self.teardown()
@@ -382,14 +386,14 @@ class TestDiskBuilder:
             call()
         call = filesystem.sync_data.call_args_list[1]
         assert filesystem.sync_data.call_args_list[1] == \
-            call(['efi/*'])
+            call(['efi/*'], populate=True)
         call = filesystem.sync_data.call_args_list[2]
         assert filesystem.sync_data.call_args_list[2] == \
             call([
                 'image', '.profile', '.kconfig', 'run/*', 'tmp/*',
                 '.buildenv', 'var/cache/kiwi', 'boot/*', 'boot/.*',
                 'boot/efi/*', 'boot/efi/.*'
-            ])
+            ], populate=True)
         assert m_open.call_args_list[0:4] == [
             call('boot_dir/config.partids', 'w'),
             call('root_dir/boot/mbrid', 'w'),
@@ -736,13 +740,13 @@ class TestDiskBuilder:
         assert filesystem.sync_data.call_args_list[0] == \
             call()
         assert filesystem.sync_data.call_args_list[1] == \
-            call(['efi/*'])
+            call(['efi/*'], populate=True)
         assert filesystem.sync_data.call_args_list[2] == \
             call([
                 'image', '.profile', '.kconfig', 'run/*', 'tmp/*',
                 '.buildenv', 'var/cache/kiwi', 'boot/*', 'boot/.*',
                 'boot/efi/*', 'boot/efi/.*'
-            ])
+            ], populate=True)
         assert m_open.call_args_list == [
             call('boot_dir/config.partids', 'w'),
             call('root_dir/boot/mbrid', 'w'),
@@ -759,9 +763,12 @@ class TestDiskBuilder:
         assert mock_command.call_args_list == [
             call(['cp', 'root_dir/recovery.partition.size', 'boot_dir']),
             call(['mv', 'initrd', 'root_dir/boot/initramfs-1.2.3.img']),
-            call(['blockdev', '--getsize64', '/dev/root-device']),
-            call(['dd', 'if=tempfile', 'of=/dev/root-device'])
+            call(['blockdev', '--getsize64', '/dev/root-device'])
         ]
+        self.mock_BlockCopy.assert_called_once_with(
+            'tempfile', '/dev/root-device'
+        )
+        self.mock_BlockCopy.return_value.copy.assert_called_once_with()
         self.block_operation.get_blkid.assert_has_calls(
             [call('PARTUUID')]
         )
@@ -859,8 +866,8 @@ class TestDiskBuilder:
         assert mock_command.call_args_list[2] == call(
             ['blockdev', '--getsize64', '/dev/integrityRoot']
         )
-        assert mock_command.call_args_list[3] == call(
-            ['dd', 'if=kiwi-tempname', 'of=/dev/integrityRoot']
+        self.mock_BlockCopy.assert_called_once_with(
+            'kiwi-tempname', '/dev/integrityRoot'
         )
         assert m_open.return_value.write.call_args_list == [
             # config.partids
@@ -1138,6 +1145,9 @@ class TestDiskBuilder:
         self.disk.create_root_lvm_partition.assert_called_once_with(
             'all_free', 0
         )
+        # the volume sizes are taken from the root tree index
+        assert mock_volume_manager.call_args[0][4]['root_size'] == \
+            self.disk_setup.rootsize
         volume_manager.setup.assert_called_once_with('systemVG')
         volume_manager.create_volumes.assert_called_once_with('btrfs')
         volume_manager.mount_volumes.call_args_list[0].assert_called_once_with()
@@ -1215,7 +1225,10 @@ class TestDiskBuilder:
 
         self.disk.set_start_sector.assert_called_once_with(4096)
 
-    def test_create(self):
+    @patch('os.stat')
+    def test_create(self, mock_os_stat):
+        mock_os_stat.return_value.st_size = 1073741824
+        mock_os_stat.return_value.st_blocks = 204800
         result = Mock()
         create_disk = Mock(return_value=result)
         create_install_media = Mock(return_value=result)
@@ -1227,7 +1240,9 @@ class TestDiskBuilder:
         self.disk_builder.append_unpartitioned_space = append_unpartitioned
         self.disk_builder.create_disk_format = create_disk_format
 
-        self.disk_builder.create()
+        with self._caplog.at_level(logging.INFO):
+            self.disk_builder.create()
+            assert 'logical 1024 MB, allocated 100 MB' in self._caplog.text
 
         create_disk.assert_called_once_with()
         create_install_media.assert_called_once_with(result)
@@ -1264,7 +1279,7 @@ class TestDiskBuilder:
                 'image', '.profile', '.kconfig', 'run/*', 'tmp/*',
                 '.buildenv', 'var/cache/kiwi', 'var/*', 'var/.*',
                 'boot/*', 'boot/.*', 'boot/efi/*', 'boot/efi/.*'
-            ]
+            ], populate=True
         )
         assert [
             call('UUID=blkid_result / blkid_result_fs ro 0 0'),
@@ -1322,3 +1337,27 @@ class TestDiskBuilder:
             self.disk_builder.create_disk_format(result_instance)
 
         disk_subformat.create_image_format.assert_called_once_with()
+
+    @patch('kiwi.builder.disk.SystemSize')
+    def test_log_root_filesystem_usage(self, mock_SystemSize):
+        mock_SystemSize.get_used_bytes.return_value = 40 * 1048576
+        self.disk_builder.disk_setup = Mock()
+        self.disk_builder.disk_setup.root_filesystem_size = None
+        with self._caplog.at_level(logging.INFO):
+            self.disk_builder._log_root_filesystem_usage('mountpoint')
+            assert 'root filesystem usage' not in self._caplog.text
+        self.disk_builder.disk_setup.root_filesystem_size = Mock(
+            used_bytes=42 * 1048576, size_bytes=64 * 1048576
+        )
+        with self._caplog.at_level(logging.INFO):
+            self.disk_builder._log_root_filesystem_usage('mountpoint')
+            assert 'root filesystem usage: predicted 42 MB of 64 MB, ' \
+                'actual 40 MB' in self._caplog.text
+        # the prediction is not calculated again from the root tree
+        assert not mock_SystemSize.called
+        mock_SystemSize.get_used_bytes.assert_called_once_with('mountpoint')
+        with self._caplog.at_level(logging.INFO):
+            self.disk_builder._log_root_filesystem_usage(None)
+            assert 'root filesystem usage: predicted 42 MB of 64 MB, ' \
+                'actual usage not measured' in self._caplog.text
+        assert mock_SystemSize.get_used_bytes.call_count == 1
@@ -117,10 +117,12 @@ class TestFileSystemBuilder:
             }
         )
         self.filesystem.create_on_device.assert_called_once_with(None)
-        self.filesystem.sync_data.assert_called_once_with([
-            'image', '.profile', '.kconfig', 'run/*', 'tmp/*',
-            '.buildenv', 'var/cache/kiwi'
-        ])
+        self.filesystem.sync_data.assert_called_once_with(
+            [
+                'image', '.profile', '.kconfig', 'run/*', 'tmp/*',
+                '.buildenv', 'var/cache/kiwi'
+            ], populate=True
+        )
         self.setup.export_package_verification.assert_called_once_with(
             'target_dir'
         )
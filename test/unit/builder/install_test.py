@@ -368,7 +368,7 @@ class TestInstallImageBuilder:
             ]
         )
         mock_md5.assert_called_once_with(
-            'target_dir/result-image.x86_64-1.2.3.raw'
+            'target_dir/result-image.x86_64-1.2.3.raw', cache=True
         )
         checksum.md5.assert_called_once_with(
             'tmpdir/result-image.x86_64-1.2.3.md5'
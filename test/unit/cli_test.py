@@ -1,6 +1,9 @@
 import sys
 import logging
-from mock import patch
+import subprocess
+from mock import (
+    patch, Mock
+)
 from pytest import (
     raises, fixture
 )
@@ -77,6 +80,7 @@ class TestCli:
 
     def teardown(self):
         sys.argv = argv_kiwi_tests
+        Defaults.set_custom_runtime_config_file(None)
 
     def teardown_method(self, cls):
         self.teardown()
@@ -178,6 +182,26 @@ class TestCli:
     def test_load_command(self):
         assert self.cli.load_command() == self.loaded_command
 
+    def test_startup_does_not_import_description_stack(self):
+        # the command line entry point must not pull in the
+        # description stack, it is loaded when a task needs it
+        loaded_modules = subprocess.check_output(
+            [
+                sys.executable, '-c',
+                'import sys; import kiwi.kiwi; print(" ".join(sys.modules))'
+            ]
+        ).decode().split()
+        assert 'kiwi.kiwi' in loaded_modules
+        for module in ['pkg_resources', 'lxml', 'kiwi.xml_parse']:
+            assert module not in loaded_modules
+
+    @patch('importlib.metadata.entry_points')
+    def test_load_command_from_entry_points_dict(self, mock_entry_points):
+        entry_point = Mock()
+        entry_point.name = 'system_prepare'
+        mock_entry_points.return_value = {'kiwi.tasks': [entry_point]}
+        assert self.cli.load_command() == entry_point.load.return_value
+
     @patch('kiwi.cli.Cli.invoke_kiwicompat')
     def test_load_command_compat_mode(self, mock_compat):
         sys.argv = [
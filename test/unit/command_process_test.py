@@ -1,6 +1,9 @@
+import os
 import mock
 import logging
-from mock import patch
+from mock import (
+    patch, call
+)
 from pytest import (
     raises, fixture
 )
@@ -20,45 +23,23 @@ class TestCommandProcess:
     def fake_matcher(self, item, output):
         return True
 
-    def poll(self):
-        return self.data_flow.pop()
-
-    def outavailable(self):
-        return True
-
-    def erravailable(self):
-        return True
-
-    def outdata(self):
-        return self.data_out.pop()
-
-    def errdata(self):
-        return self.data_err.pop()
-
-    def create_flow_method(self, method):
-        def create_method(arg=None):
-            return method()
-        return create_method
+    def create_channel(self, data):
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, data)
+        os.close(write_fd)
+        return os.fdopen(read_fd, 'rb')
 
     def setup(self):
-        self.data_flow = [True, None, None, None, None, None, None]
-        self.data_out = [
-            bytes(b''), bytes(b'\n'), bytes(b'a'),
-            bytes(b't'), bytes(b'a'), bytes(b'd')
-        ]
-        self.data_err = [
-            bytes(b''), bytes(b'r'), bytes(b'o'),
-            bytes(b'r'), bytes(b'r'), bytes(b'e')
-        ]
-        self.flow = self.create_flow_method(self.poll)
-        self.flow_out_available = self.create_flow_method(self.outavailable)
-        self.flow_err_available = self.create_flow_method(self.erravailable)
-        self.flow_out = self.create_flow_method(self.outdata)
-        self.flow_err = self.create_flow_method(self.errdata)
+        self.data_out = bytes(b'data\n')
+        self.data_err = bytes(b'error')
 
     def setup_method(self, cls):
         self.setup()
 
+    def setup_command(self, process):
+        process.command.command.output = self.create_channel(self.data_out)
+        process.command.command.error = self.create_channel(self.data_err)
+
     @patch('kiwi.command.Command')
     def test_returncode(self, mock_command):
         command = mock.Mock()
@@ -72,27 +53,69 @@ class TestCommandProcess:
             self.fake_matcher
         )
         process = CommandProcess(mock_command)
-        process.command.command.process.poll = self.flow
-        process.command.command.output_available = self.flow_out_available
-        process.command.command.error_available = self.flow_err_available
-        process.command.command.output.read = self.flow_out
-        process.command.command.error.read = self.flow_err
+        self.setup_command(process)
         process.command.command.process.returncode = 0
         with self._caplog.at_level(logging.DEBUG):
             process.poll_show_progress(['a', 'b'], match_method)
             assert 'system: data' in self._caplog.text
 
+    @patch('kiwi.command_process.Logger.progress')
+    @patch('kiwi.command.Command')
+    def test_poll_show_progress_with_parse_method(
+        self, mock_command, mock_progress
+    ):
+        self.data_out = bytes(
+            b'Installing: bash-completion-2.7-1.noarch\n'
+            b'Installing: bash-5.1-1.x86_64\n'
+            b'Installing: bash-5.1-1.x86_64\n'
+            b'Installing: vim-data-9.0-1.noarch\n'
+            b'some other output\n'
+        )
+        process = CommandProcess(mock_command)
+        self.setup_command(process)
+        process.command.command.process.returncode = 0
+        process.poll_show_progress(
+            ['bash', 'bash-completion', 'vim', 'foo'],
+            parse_method=lambda line: line.partition('Installing: ')[2]
+        )
+        assert process.items_processed == 3
+        assert process.items_pending == set(['foo'])
+        assert mock_progress.call_args_list == [
+            call(0, 100, '[ INFO    ]: Processing'),
+            call(1, 4, '[ INFO    ]: Processing'),
+            call(2, 4, '[ INFO    ]: Processing'),
+            call(3, 4, '[ INFO    ]: Processing'),
+            call(100, 100, '[ INFO    ]: Processing')
+        ]
+
+    @patch('kiwi.command_process.Logger.progress')
+    @patch('kiwi.command.Command')
+    def test_poll_show_progress_with_parse_method_repeated_item(
+        self, mock_command, mock_progress
+    ):
+        # a repeated line of a completed item does not complete
+        # a pending item which is a prefix of it
+        self.data_out = bytes(
+            b'Installing: foo-devel-1.0-1.x86_64\n'
+            b'Installing: foo-devel-1.0-1.x86_64\n'
+        )
+        process = CommandProcess(mock_command)
+        self.setup_command(process)
+        process.command.command.process.returncode = 0
+        process.poll_show_progress(
+            ['foo', 'foo-devel'],
+            parse_method=lambda line: line.partition('Installing: ')[2]
+        )
+        assert process.items_processed == 1
+        assert process.items_pending == set(['foo'])
+
     @patch('kiwi.command.Command')
     def test_poll_show_progress_raises(self, mock_command):
         match_method = CommandProcess(mock_command).create_match_method(
             self.fake_matcher
         )
         process = CommandProcess(mock_command)
-        process.command.command.process.poll = self.flow
-        process.command.command.output_available = self.flow_out_available
-        process.command.command.error_available = self.flow_err_available
-        process.command.command.output.read = self.flow_out
-        process.command.command.error.read = self.flow_err
+        self.setup_command(process)
         process.command.command.process.returncode = 1
         with raises(KiwiCommandError):
             process.poll_show_progress(['a', 'b'], match_method)
@@ -100,11 +123,7 @@ class TestCommandProcess:
     @patch('kiwi.command.Command')
     def test_poll(self, mock_command):
         process = CommandProcess(mock_command)
-        process.command.command.process.poll = self.flow
-        process.command.command.output_available = self.flow_out_available
-        process.command.command.error_available = self.flow_err_available
-        process.command.command.output.read = self.flow_out
-        process.command.command.error.read = self.flow_err
+        self.setup_command(process)
         process.command.command.process.returncode = 0
         with self._caplog.at_level(logging.DEBUG):
             process.poll()
@@ -113,12 +132,7 @@ class TestCommandProcess:
     @patch('kiwi.command.Command')
     def test_poll_raises(self, mock_command):
         process = CommandProcess(mock_command)
-        process.command.command.process.poll = self.flow
-        process.command.command.output_available = self.flow_out_available
-        process.command.command.error_available = self.flow_err_available
-        process.command.command.output.read = self.flow_out
-        process.command.command.error.read = self.flow_err
-        process.command.command.output.read.return_value = 'data'
+        self.setup_command(process)
         process.command.command.process.returncode = 1
         with raises(KiwiCommandError):
             process.poll()
@@ -126,11 +140,7 @@ class TestCommandProcess:
     @patch('kiwi.command.Command')
     def test_poll_and_watch(self, mock_command):
         process = CommandProcess(mock_command)
-        process.command.command.process.poll = self.flow
-        process.command.command.output_available = self.flow_out_available
-        process.command.command.error_available = self.flow_err_available
-        process.command.command.output.read = self.flow_out
-        process.command.command.error.read = self.flow_err
+        self.setup_command(process)
         process.command.command.process.returncode = 1
         with self._caplog.at_level(logging.DEBUG):
             result = process.poll_and_watch()
@@ -158,3 +168,41 @@ class TestCommandProcess:
     def test_command_iterator(self):
         iterator = CommandIterator(mock.Mock())
         assert iterator.__iter__() == iterator
+
+    def test_command_iterator_lines(self):
+        command = mock.Mock()
+        command.output = self.create_channel(
+            bytes(b'line one\n\nline two\nno newline')
+        )
+        command.error = self.create_channel(bytes(b''))
+        iterator = CommandIterator(command)
+        assert list(iterator) == ['line one', '', 'line two', 'no newline']
+        assert iterator.get_error_output() == ''
+        command.process.wait.assert_called_once_with()
+
+    def test_command_iterator_chunked_read(self):
+        command = mock.Mock()
+        command.output = self.create_channel(
+            bytes(b'first line\nsecond line\n')
+        )
+        command.error = self.create_channel(bytes(b'some error'))
+        iterator = CommandIterator(command)
+        iterator.read_chunk_size = 4
+        assert list(iterator) == ['first line', 'second line']
+        assert iterator.get_error_output() == 'some error'
+
+    def test_command_iterator_data_not_yet_available(self):
+        os_read = os.read
+        read_results = [BlockingIOError]
+
+        def side_effect(fd, size):
+            if read_results:
+                raise read_results.pop()
+            return os_read(fd, size)
+
+        command = mock.Mock()
+        command.output = self.create_channel(bytes(b'data\n'))
+        command.error = self.create_channel(bytes(b''))
+        iterator = CommandIterator(command)
+        with patch('os.read', side_effect=side_effect):
+            assert list(iterator) == ['data']
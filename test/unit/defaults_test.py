@@ -58,6 +58,10 @@ class TestDefaults:
     def test_get_default_shared_cache_location(self):
         assert Defaults.get_shared_cache_location() == 'var/cache/kiwi'
 
+    def test_get_description_cache_location(self):
+        assert Defaults.get_description_cache_location() == \
+            '/var/cache/kiwi/description'
+
     @patch('kiwi.defaults.Path.which')
     def test_get_grub_boot_directory_name(self, mock_which):
         mock_which.return_value = 'grub2-install-was-found'
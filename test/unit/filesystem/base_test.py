@@ -1,3 +1,4 @@
+import os
 import logging
 from mock import patch
 from pytest import (
@@ -89,6 +90,113 @@ class TestFileSystemBase:
         filesystem_mount.mount.assert_called_once_with([])
         assert self.fsbase.get_mountpoint() == 'tmpdir'
 
+    @patch('kiwi.filesystem.base.MountManager')
+    @patch('kiwi.filesystem.base.DataSync')
+    @patch('kiwi.filesystem.base.Command.run')
+    @patch('os.path.exists')
+    def test_sync_data_populate(
+        self, mock_exists, mock_Command_run, mock_sync, mock_mount
+    ):
+        mock_exists.return_value = True
+        self.fsbase._populate = mock.Mock(return_value=True)
+
+        # not created by a tool which can populate
+        self.fsbase.sync_data(populate=True)
+        assert not self.fsbase._populate.called
+        assert mock_sync.called
+
+        mock_sync.reset_mock()
+        self.fsbase.create_command = ['mkfs.foo', '/dev/loop0']
+        self.fsbase.sync_data(['exclude_me'], populate=True)
+        self.fsbase._populate.assert_called_once_with(['exclude_me'])
+        assert not mock_sync.called
+
+        # the data tree can't be expressed
+        self.fsbase._populate.return_value = False
+        self.fsbase.sync_data(populate=True)
+        assert mock_sync.called
+
+    def test_populate(self):
+        assert self.fsbase._populate([]) is False
+
+    def test_get_populate_issue(self, tmpdir):
+        root = tmpdir.mkdir('root')
+        root.mkdir('etc').join('passwd').write('root')
+        fsbase = FileSystemBase(mock.Mock(), format(root))
+        assert fsbase._get_populate_issue([]) == ''
+        assert fsbase._get_populate_issue(
+            [format(root.join('etc'))]
+        ) == 'excluded {0} exists'.format(root.join('etc'))
+        fsbase.custom_args['fs_attributes'] = ['no-copy-on-write']
+        assert fsbase._get_populate_issue([]) == \
+            'filesystem attributes requested'
+        fsbase.custom_args['fs_attributes'] = []
+
+        os.link(format(root.join('etc', 'passwd')), format(root.join('link')))
+        assert fsbase._get_populate_issue([], hardlinks=False) in [
+            '{0} has hard links'.format(root.join('link')),
+            '{0} has hard links'.format(root.join('etc', 'passwd'))
+        ]
+        root.join('link').remove()
+
+        os.setxattr(format(root.join('etc')), 'user.kiwi', b'data')
+        assert fsbase._get_populate_issue([]) == ''
+        assert fsbase._get_populate_issue([], xattrs=False) == \
+            '{0} has extended attributes'.format(root.join('etc'))
+
+        with patch.object(
+            fsbase, '_get_mount_points', return_value=['/root/proc']
+        ):
+            assert fsbase._get_populate_issue([]) == \
+                '/root/proc is a mount point'
+
+    def test_get_mount_points(self, tmpdir):
+        fsbase = FileSystemBase(mock.Mock(), '/root/')
+        mountinfo = (
+            '22 1 8:2 / / rw,relatime shared:1 - ext4 /dev/sda2 rw\n'
+            '23 22 0:5 / /root/proc rw shared:2 - proc proc rw\n'
+            '24 22 0:6 / /root\\040dir rw shared:3 - tmpfs tmpfs rw\n'
+            '25 22 0:7 / /root/my\\040dev rw shared:4 - tmpfs tmpfs rw\n'
+        )
+        with patch('builtins.open', mock.mock_open(read_data=mountinfo)):
+            assert fsbase._get_mount_points() == [
+                '/root/my dev', '/root/proc'
+            ]
+
+    @patch('kiwi.filesystem.base.Command.run')
+    @patch('kiwi.filesystem.base.MountManager')
+    def test_remove_excluded(self, mock_MountManager, mock_command):
+        mock_MountManager.return_value.mountpoint = '/mnt'
+        fsbase = FileSystemBase(self.fsbase.device_provider, '/root')
+        fsbase._remove_excluded(['/root/image', '/root/run/data'])
+        mock_MountManager.assert_called_once_with(device='/dev/loop0')
+        mock_MountManager.return_value.mount.assert_called_once_with([])
+        mock_command.assert_called_once_with(
+            ['rm', '-r', '-f', '/mnt/image', '/mnt/run/data']
+        )
+        assert fsbase.filesystem_mount == mock_MountManager.return_value
+
+    def test_get_exclude_paths(self, tmpdir):
+        root = tmpdir.mkdir('root')
+        root.mkdir('image').join('config.xml').write('xml')
+        root.mkdir('run').join('.hidden').write('')
+        root.join('run', 'data').write('')
+        root.mkdir('tmp')
+        root.join('.profile').write('')
+        root.join('boot').mksymlinkto('run')
+        fsbase = FileSystemBase(mock.Mock(), format(root) + '/')
+        assert fsbase._get_exclude_paths(
+            [
+                'image', '.profile', '.kconfig', 'run/*', 'tmp/*',
+                'boot/*', 'var/cache/kiwi'
+            ]
+        ) == [
+            format(root.join('.profile')),
+            format(root.join('image')),
+            format(root.join('run', '.hidden')),
+            format(root.join('run', 'data'))
+        ]
+
     @patch('kiwi.filesystem.base.VeritySetup')
     def test_create_verity_layer(self, mock_VeritySetup):
         self.fsbase.create_verity_layer()
@@ -108,6 +216,7 @@ class TestFileSystemBase:
         mount = mock.Mock()
         self.fsbase.filesystem_mount = mount
         self.fsbase.umount()
+        mount.trim.assert_called_once_with()
         mount.umount.assert_called_once_with()
 
     def test_mount(self):
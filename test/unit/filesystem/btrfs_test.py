@@ -1,4 +1,9 @@
-from mock import patch
+import os
+import logging
+from mock import (
+    patch, call
+)
+from pytest import fixture
 
 import mock
 
@@ -6,6 +11,10 @@ from kiwi.filesystem.btrfs import FileSystemBtrfs
 
 
 class TestFileSystemBtrfs:
+    @fixture(autouse=True)
+    def inject_fixtures(self, caplog):
+        self._caplog = caplog
+
     @patch('os.path.exists')
     def setup(self, mock_exists):
         mock_exists.return_value = True
@@ -39,3 +48,61 @@ class TestFileSystemBtrfs:
         mock_command.assert_called_once_with(
             ['btrfstune', '-u', '/dev/foo']
         )
+
+    @patch('kiwi.filesystem.btrfs.BlockID')
+    @patch('kiwi.filesystem.btrfs.CommandCapabilities.has_option_in_help')
+    @patch('kiwi.filesystem.btrfs.Command.run')
+    def test_populate(
+        self, mock_command, mock_has_option_in_help, mock_BlockID, tmpdir
+    ):
+        mock_BlockID.return_value.get_uuid.return_value = 'uuid'
+        self.btrfs.root_dir = format(tmpdir)
+        self.btrfs.create_on_device('label')
+        assert self.btrfs._populate([]) is True
+        mock_has_option_in_help.assert_called_once_with(
+            'mkfs.btrfs', '--rootdir', raise_on_error=False
+        )
+        assert mock_command.call_args_list[1] == call(
+            [
+                'mkfs.btrfs', '-f', '--rootdir', format(tmpdir),
+                '-U', 'uuid', '-L', 'label', '/dev/foo'
+            ]
+        )
+        # the requested uuid is kept
+        self.btrfs.create_command = ['mkfs.btrfs', '-U', 'foo', '/dev/foo']
+        assert self.btrfs._populate([]) is True
+        assert mock_command.call_args_list[2] == call(
+            [
+                'mkfs.btrfs', '-f', '--rootdir', format(tmpdir),
+                '-U', 'foo', '/dev/foo'
+            ]
+        )
+
+        # excluded data is removed from the populated filesystem
+        tmpdir.mkdir('image')
+        with patch.object(
+            self.btrfs, '_remove_excluded'
+        ) as mock_remove_excluded:
+            assert self.btrfs._populate(['image', 'var/cache/kiwi']) is True
+            mock_remove_excluded.assert_called_once_with(
+                [format(tmpdir.join('image'))]
+            )
+
+    @patch('kiwi.filesystem.btrfs.CommandCapabilities.has_option_in_help')
+    @patch('kiwi.filesystem.btrfs.Command.run')
+    def test_populate_not_possible(
+        self, mock_command, mock_has_option_in_help, tmpdir
+    ):
+        tmpdir.join('data').write('data')
+        os.link(format(tmpdir.join('data')), format(tmpdir.join('link')))
+        self.btrfs.root_dir = format(tmpdir)
+        self.btrfs.create_on_device('label')
+        with self._caplog.at_level(logging.INFO):
+            assert self.btrfs._populate([]) is False
+            assert 'has hard links' in self._caplog.text
+        tmpdir.join('link').remove()
+        mock_has_option_in_help.return_value = False
+        with self._caplog.at_level(logging.INFO):
+            assert self.btrfs._populate([]) is False
+            assert 'mkfs.btrfs has no populate support' in self._caplog.text
+        assert mock_command.call_count == 1
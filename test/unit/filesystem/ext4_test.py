@@ -1,13 +1,26 @@
+import os
+import logging
 from mock import (
     patch, call
 )
+from pytest import (
+    raises, fixture
+)
 
 import mock
 
+from kiwi.command import Command
 from kiwi.filesystem.ext4 import FileSystemExt4
+from kiwi.utils.block import BlockID
+
+from kiwi.exceptions import KiwiFileSystemSyncError
 
 
 class TestFileSystemExt4:
+    @fixture(autouse=True)
+    def inject_fixtures(self, caplog):
+        self._caplog = caplog
+
     @patch('os.path.exists')
     def setup(self, mock_exists):
         mock_exists.return_value = True
@@ -31,10 +44,107 @@ class TestFileSystemExt4:
         assert mock_command.call_args_list[0] == \
             call(['mkfs.ext4', '-L', 'label', '-U', 'uuid', '/dev/foo', '100'])
 
+    @patch('kiwi.filesystem.ext4.BlockID.invalidate')
     @patch('kiwi.filesystem.ext4.Command.run')
-    def test_set_uuid(self, mock_command):
+    def test_set_uuid(self, mock_command, mock_invalidate):
         self.ext4.set_uuid()
         assert mock_command.call_args_list == [
             call(['e2fsck', '-y', '-f', '/dev/foo'], raise_on_error=False),
             call(['tune2fs', '-f', '-U', 'random', '/dev/foo'])
         ]
+        mock_invalidate.assert_called_once_with('/dev/foo')
+
+    def test_sync_data_populate(self, tmpdir):
+        root = tmpdir.mkdir('root')
+        root.mkdir('etc').join('passwd').write('root')
+        os.setxattr(format(root.join('etc', 'passwd')), 'user.kiwi', b'data')
+        os.link(
+            format(root.join('etc', 'passwd')), format(root.join('etc', 'link'))
+        )
+        root.mkdir('image').mkdir('sub').join('config.xml').write('xml')
+        root.join('image', 'passwd').mklinkto(root.join('etc', 'passwd'))
+        root.join('image', 'etc').mksymlinkto(root.join('etc'))
+        root.mkdir('run').join('data').write('data')
+        image = format(tmpdir.join('image.raw'))
+        with open(image, 'wb') as raw:
+            raw.truncate(33554432)
+        provider = mock.Mock()
+        provider.get_device.return_value = image
+        ext4 = FileSystemExt4(provider, format(root) + '/')
+        ext4.create_on_device('label')
+        uuid = BlockID(image).get_uuid()
+
+        with self._caplog.at_level(logging.INFO):
+            ext4.sync_data(['image', 'run/*', 'tmp/*'], populate=True)
+            assert 'Populating ext4 filesystem on {0}'.format(image) in \
+                self._caplog.text
+        assert ext4.get_mountpoint() is None
+        assert BlockID(image).get_uuid() == uuid
+        assert BlockID(image).get_label() == 'label'
+        Command.run(['e2fsck', '-f', '-n', image])
+        listing = Command.run(['debugfs', '-R', 'ls -p /', image]).output
+        assert '/etc/' in listing
+        assert '/run/' in listing
+        assert '/image/' not in listing
+        assert '/data/' not in Command.run(
+            ['debugfs', '-R', 'ls -p /run', image]
+        ).output
+        assert 'user.kiwi' in Command.run(
+            ['debugfs', '-R', 'ea_list /etc/passwd', image]
+        ).output
+        # the link count reflects the removed link
+        assert 'Links: 2' in Command.run(
+            ['debugfs', '-R', 'stat /etc/passwd', image]
+        ).output
+
+    @patch('kiwi.filesystem.ext4.BlockID')
+    @patch('kiwi.filesystem.ext4.CommandCapabilities.has_option_in_help')
+    @patch('kiwi.filesystem.ext4.Command.run')
+    def test_populate(
+        self, mock_command, mock_has_option_in_help, mock_BlockID, tmpdir
+    ):
+        mock_BlockID.return_value.get_uuid.return_value = 'uuid'
+        self.ext4.root_dir = format(tmpdir)
+        self.ext4.create_on_device('label')
+        assert self.ext4._populate([]) is True
+        mock_has_option_in_help.assert_called_once_with(
+            'mkfs.ext4', '[-d root-directory', ['-h'], raise_on_error=False
+        )
+        assert mock_command.call_args_list[1] == call(
+            [
+                'mkfs.ext4', '-F', '-d', format(tmpdir), '-U', 'uuid',
+                '-L', 'label', '/dev/foo'
+            ]
+        )
+        # the requested uuid is kept
+        self.ext4.create_command = ['mkfs.ext4', '-U', 'foo', '/dev/foo']
+        assert self.ext4._populate([]) is True
+        assert mock_command.call_args_list[2] == call(
+            ['mkfs.ext4', '-F', '-d', format(tmpdir), '-U', 'foo', '/dev/foo']
+        )
+
+    @patch('kiwi.filesystem.ext4.CommandCapabilities.has_option_in_help')
+    @patch('kiwi.filesystem.ext4.Command.run')
+    def test_populate_not_possible(
+        self, mock_command, mock_has_option_in_help, tmpdir
+    ):
+        tmpdir.join('name"').write('')
+        self.ext4.root_dir = format(tmpdir)
+        self.ext4.create_on_device('label')
+        with self._caplog.at_level(logging.INFO):
+            assert self.ext4._populate(['name"']) is False
+            assert 'can not populate: excluded' in self._caplog.text
+        mock_has_option_in_help.return_value = False
+        with self._caplog.at_level(logging.INFO):
+            assert self.ext4._populate([]) is False
+            assert 'mkfs.ext4 has no populate support' in self._caplog.text
+        assert mock_command.call_count == 1
+
+    @patch('kiwi.filesystem.ext4.Command.run')
+    def test_remove_paths_failed(self, mock_command, tmpdir):
+        mock_command.return_value.error = \
+            'debugfs 1.47.0 (5-Feb-2023)\nrm: File not found\n'
+        self.ext4.root_dir = format(tmpdir)
+        with raises(KiwiFileSystemSyncError) as issue:
+            self.ext4._remove_paths('/dev/foo', [format(tmpdir.join('foo'))])
+        assert 'rm: File not found' in format(issue.value)
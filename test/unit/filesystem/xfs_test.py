@@ -1,6 +1,9 @@
+import os
+import logging
 from mock import (
     patch, call
 )
+from pytest import fixture
 
 import mock
 
@@ -8,6 +11,10 @@ from kiwi.filesystem.xfs import FileSystemXfs
 
 
 class TestFileSystemXfs:
+    @fixture(autouse=True)
+    def inject_fixtures(self, caplog):
+        self._caplog = caplog
+
     @patch('os.path.exists')
     def setup(self, mock_exists):
         mock_exists.return_value = True
@@ -42,3 +49,63 @@ class TestFileSystemXfs:
             call(['xfs_repair', '-L', '/dev/foo']),
             call(['xfs_admin', '-U', 'generate', '/dev/foo'])
         ]
+
+    @patch('kiwi.filesystem.xfs.BlockID')
+    @patch('kiwi.filesystem.xfs.CommandCapabilities.check_version')
+    @patch('kiwi.filesystem.xfs.Command.run')
+    def test_populate(
+        self, mock_command, mock_check_version, mock_BlockID, tmpdir
+    ):
+        mock_BlockID.return_value.get_uuid.return_value = 'uuid'
+        self.xfs.root_dir = format(tmpdir)
+        self.xfs.create_on_device('label')
+        assert self.xfs._populate([]) is True
+        mock_check_version.assert_called_once_with(
+            'mkfs.xfs', (6, 17), ['-V'], raise_on_error=False
+        )
+        assert mock_command.call_args_list[1] == call(
+            [
+                'mkfs.xfs', '-f', '-p', format(tmpdir),
+                '-m', 'uuid=uuid', '-L', 'label', '/dev/foo'
+            ]
+        )
+        # the requested uuid is kept
+        self.xfs.create_command = [
+            'mkfs.xfs', '-f', '-m', 'uuid=foo', '/dev/foo'
+        ]
+        assert self.xfs._populate([]) is True
+        assert mock_command.call_args_list[2] == call(
+            [
+                'mkfs.xfs', '-f', '-p', format(tmpdir),
+                '-m', 'uuid=foo', '/dev/foo'
+            ]
+        )
+
+        # excluded data is removed from the populated filesystem
+        tmpdir.mkdir('image')
+        with patch.object(
+            self.xfs, '_remove_excluded'
+        ) as mock_remove_excluded:
+            assert self.xfs._populate(['image', 'var/cache/kiwi']) is True
+            mock_remove_excluded.assert_called_once_with(
+                [format(tmpdir.join('image'))]
+            )
+
+    @patch('kiwi.filesystem.xfs.CommandCapabilities.check_version')
+    @patch('kiwi.filesystem.xfs.Command.run')
+    def test_populate_not_possible(
+        self, mock_command, mock_check_version, tmpdir
+    ):
+        tmpdir.join('data').write('data')
+        os.link(format(tmpdir.join('data')), format(tmpdir.join('link')))
+        self.xfs.root_dir = format(tmpdir)
+        self.xfs.create_on_device('label')
+        with self._caplog.at_level(logging.INFO):
+            assert self.xfs._populate([]) is False
+            assert 'has hard links' in self._caplog.text
+        tmpdir.join('link').remove()
+        mock_check_version.return_value = False
+        with self._caplog.at_level(logging.INFO):
+            assert self.xfs._populate([]) is False
+            assert 'mkfs.xfs has no populate support' in self._caplog.text
+        assert mock_command.call_count == 1
@@ -1,8 +1,16 @@
+import logging
 from lxml import etree
-from mock import patch
-from pytest import raises
+from mock import (
+    patch, Mock
+)
+from pytest import (
+    raises, fixture
+)
 
-from kiwi.markup.base import MarkupBase
+from kiwi.defaults import Defaults
+from kiwi.markup.base import (
+    MarkupBase, XSLT_TRANSFORMS
+)
 from kiwi.xml_description import XMLDescription
 from kiwi.xml_state import XMLState
 
@@ -14,6 +22,10 @@ from kiwi.exceptions import (
 
 
 class TestMarkupBase:
+    @fixture(autouse=True)
+    def inject_fixtures(self, caplog):
+        self._caplog = caplog
+
     def setup(self):
         self.markup = MarkupBase('../data/example_config.xml')
 
@@ -69,3 +81,110 @@ class TestMarkupBase:
         state = XMLState(xml_data)
         assert state.xml_data.get_repository()[0].get_source().get_path() == \
             'http://example.com'
+
+    def test_apply_xslt_stylesheets_current_schema_version(self):
+        with patch.object(
+            MarkupBase, '_get_xslt_transform',
+            wraps=MarkupBase._get_xslt_transform
+        ) as mock_get_xslt_transform:
+            self.markup.apply_xslt_stylesheets('../data/example_config.xml')
+            mock_get_xslt_transform.assert_called_once_with(
+                Defaults.get_xsl_current_schema_stylesheet_file(), '../data'
+            )
+
+    def test_apply_xslt_stylesheets_schema_conversion(self, tmpdir):
+        description = tmpdir.join('config.xml')
+        description.write(
+            '<image schemaversion="7.4" name="foo">'
+            '<preferences><type image="docker">'
+            '<containerconfig name="foo" additionaltags="a,b"/>'
+            '</type></preferences></image>'
+        )
+        with patch.object(
+            MarkupBase, '_get_xslt_transform',
+            wraps=MarkupBase._get_xslt_transform
+        ) as mock_get_xslt_transform:
+            xml_description = self.markup.apply_xslt_stylesheets(
+                description.strpath
+            )
+            mock_get_xslt_transform.assert_called_once_with(
+                Defaults.get_xsl_stylesheet_file(), '../data'
+            )
+        converted = etree.parse(xml_description)
+        assert converted.getroot().get('schemaversion') == \
+            MarkupBase._get_schema_version()
+        assert converted.find('preferences/type/containerconfig').get(
+            'additionalnames'
+        ) == ':a,:b'
+
+    def test_apply_xslt_stylesheets_processed_once(self):
+        with patch.object(
+            MarkupBase, '_get_xslt_processed_data', return_value=b'data'
+        ) as mock_get_xslt_processed_data:
+            first = self.markup.apply_xslt_stylesheets('description')
+            second = self.markup.apply_xslt_stylesheets('description')
+            mock_get_xslt_processed_data.assert_called_once_with(
+                'description'
+            )
+        assert first != second
+        with open(second, 'rb') as processed:
+            assert processed.read() == b'data'
+
+    def test_get_xslt_transform_cached(self):
+        stylesheet = Defaults.get_xsl_stylesheet_file()
+        xslt_transform = MarkupBase._get_xslt_transform(stylesheet, 'dir')
+        assert XSLT_TRANSFORMS[(stylesheet, 'dir')] is xslt_transform
+        with patch('kiwi.markup.base.etree.XSLT') as mock_XSLT:
+            assert MarkupBase._get_xslt_transform(stylesheet, 'dir') is \
+                xslt_transform
+            assert not mock_XSLT.called
+        # include references of another description directory are
+        # resolved by a transformation of its own
+        assert MarkupBase._get_xslt_transform(stylesheet, 'other_dir') is \
+            not xslt_transform
+
+    @patch('kiwi.markup.base.Defaults.get_description_cache_location')
+    @patch('kiwi.markup.base.RuntimeConfig')
+    def test_apply_xslt_stylesheets_transform_cache(
+        self, mock_RuntimeConfig, mock_get_description_cache_location, tmpdir
+    ):
+        runtime_config = Mock()
+        runtime_config.get_description_transform_cache.return_value = True
+        mock_RuntimeConfig.return_value = runtime_config
+        mock_get_description_cache_location.return_value = tmpdir.strpath
+        xml_description = self.markup.apply_xslt_stylesheets(
+            '../data/example_config.xml'
+        )
+        cache_files = tmpdir.join('xslt').listdir()
+        assert len(cache_files) == 1
+        with open(xml_description, 'rb') as processed:
+            assert processed.read() == cache_files[0].read_binary()
+
+        markup = MarkupBase('../data/example_config.xml')
+        with patch.object(MarkupBase, '_get_xslt_transform') as mock_xslt:
+            with self._caplog.at_level(logging.DEBUG):
+                xml_description = markup.apply_xslt_stylesheets(
+                    '../data/example_config.xml'
+                )
+                assert 'Using cached XSLT processed description' in \
+                    self._caplog.text
+            assert not mock_xslt.called
+        with open(xml_description, 'rb') as processed:
+            assert processed.read() == cache_files[0].read_binary()
+
+    @patch('os.makedirs')
+    @patch('kiwi.markup.base.Defaults.get_description_cache_location')
+    @patch('kiwi.markup.base.RuntimeConfig')
+    def test_apply_xslt_stylesheets_transform_cache_write_failed(
+        self, mock_RuntimeConfig, mock_get_description_cache_location,
+        mock_makedirs, tmpdir
+    ):
+        runtime_config = Mock()
+        runtime_config.get_description_transform_cache.return_value = True
+        mock_RuntimeConfig.return_value = runtime_config
+        mock_get_description_cache_location.return_value = tmpdir.strpath
+        mock_makedirs.side_effect = OSError('read-only')
+        with self._caplog.at_level(logging.DEBUG):
+            self.markup.apply_xslt_stylesheets('../data/example_config.xml')
+            assert 'Failed to store XSLT processed description: ' \
+                'read-only' in self._caplog.text
@@ -58,6 +58,26 @@ class TestMountManager:
             ['mount', '-o', 'options', '/dev/some-device', '/some/mountpoint']
         )
 
+    @patch('kiwi.mount_manager.Command.run')
+    @patch('kiwi.mount_manager.MountManager.is_mounted')
+    def test_trim(self, mock_mounted, mock_command):
+        mock_mounted.return_value = True
+        mock_command.return_value.returncode = 0
+        self.mount_manager.trim()
+        mock_command.assert_called_once_with(
+            ['fstrim', '/some/mountpoint'], raise_on_error=False
+        )
+
+    @patch('kiwi.mount_manager.Command.run')
+    @patch('kiwi.mount_manager.MountManager.is_mounted')
+    def test_trim_not_supported(self, mock_mounted, mock_command):
+        mock_mounted.return_value = True
+        mock_command.return_value.returncode = 1
+        mock_command.return_value.error = 'the discard operation is not supported'
+        with self._caplog.at_level(logging.DEBUG):
+            self.mount_manager.trim()
+            assert 'fstrim of /some/mountpoint skipped' in self._caplog.text
+
     @patch('kiwi.mount_manager.Command.run')
     @patch('kiwi.mount_manager.MountManager.is_mounted')
     def test_umount_lazy(self, mock_mounted, mock_command):
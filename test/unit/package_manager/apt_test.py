@@ -325,3 +325,14 @@ class TestPackageManagerApt:
 
     def test_match_package_deleted(self):
         assert self.manager.match_package_deleted('foo', 'Removing foo')
+
+    def test_parse_package_installed(self):
+        assert self.manager.parse_package_installed(
+            'Unpacking foo (1.2-3) over (1.2-2) ...'
+        ) == 'foo'
+        assert self.manager.parse_package_installed('some output') == ''
+
+    def test_parse_package_deleted(self):
+        assert self.manager.parse_package_deleted(
+            'Removing foo (1.2-3) ...'
+        ) == 'foo'
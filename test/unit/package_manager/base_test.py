@@ -75,6 +75,14 @@ class TestPackageManagerBase:
         with raises(NotImplementedError):
             self.manager.match_package_deleted('package_name', 'log')
 
+    def test_parse_package_installed(self):
+        with raises(NotImplementedError):
+            self.manager.parse_package_installed('log')
+
+    def test_parse_package_deleted(self):
+        with raises(NotImplementedError):
+            self.manager.parse_package_deleted('log')
+
     def test_database_consistent(self):
         with raises(DeprecationWarning):
             self.manager.database_consistent()
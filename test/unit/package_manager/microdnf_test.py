@@ -189,6 +189,17 @@ class TestPackageManagerMicroDnf:
     def test_match_package_deleted(self):
         assert self.manager.match_package_deleted('foo', 'Removing: foo')
 
+    def test_parse_package_installed(self):
+        assert self.manager.parse_package_installed(
+            '  Installing  : foo-1.2-3.x86_64    1/2'
+        ) == 'foo-1.2-3.x86_64'
+        assert self.manager.parse_package_installed('some output') == ''
+
+    def test_parse_package_deleted(self):
+        assert self.manager.parse_package_deleted(
+            '  Removing: foo-1.2-3.x86_64    1/2'
+        ) == 'foo-1.2-3.x86_64'
+
     @patch('kiwi.package_manager.microdnf.RpmDataBase')
     def test_post_process_install_requests_bootstrap(self, mock_RpmDataBase):
         rpmdb = mock.Mock()
@@ -147,3 +147,14 @@ class TestPackageManagerPacman:
 
     def test_match_package_deleted(self):
         assert self.manager.match_package_deleted('foo', ' removing foo')
+
+    def test_parse_package_installed(self):
+        assert self.manager.parse_package_installed(
+            '(1/2) installing foo...'
+        ) == 'foo...'
+        assert self.manager.parse_package_installed('some output') == ''
+
+    def test_parse_package_deleted(self):
+        assert self.manager.parse_package_deleted(
+            '(1/2) removing foo...'
+        ) == 'foo...'
@@ -152,6 +152,17 @@ class TestPackageManagerZypper:
     def test_match_package_deleted(self):
         assert self.manager.match_package_deleted('foo', 'Removing: foo')
 
+    def test_parse_package_installed(self):
+        assert self.manager.parse_package_installed(
+            '(1/2) Installing: foo-1.2-3.x86_64 [....done]'
+        ) == 'foo-1.2-3.x86_64'
+        assert self.manager.parse_package_installed('some output') == ''
+
+    def test_parse_package_deleted(self):
+        assert self.manager.parse_package_deleted(
+            '(1/2) Removing: foo-1.2-3.x86_64 [....done]'
+        ) == 'foo-1.2-3.x86_64'
+
     @patch('kiwi.package_manager.zypper.RpmDataBase')
     def test_post_process_install_requests_bootstrap(self, mock_RpmDataBase):
         rpmdb = mock.Mock()
@@ -40,3 +40,6 @@ class TestPartitionerBase:
 
     def test_set_start_sector(self):
         assert self.partitioner.set_start_sector(4096) is None
+
+    def test_commit(self):
+        assert self.partitioner.commit() is None
@@ -1,6 +1,6 @@
 import logging
 from mock import (
-    patch, call, Mock
+    patch, Mock
 )
 from pytest import (
     raises, fixture
@@ -26,23 +26,13 @@ class TestPartitionerGpt:
     def setup_method(self, cls):
         self.setup()
 
-    @patch('kiwi.partitioner.gpt.Command.run')
-    @patch('kiwi.partitioner.gpt.PartitionerGpt.set_flag')
-    def test_create(self, mock_flag, mock_command):
+    def test_create(self):
         self.partitioner.create('name', 100, 't.linux', ['t.csm'])
-        mock_command.assert_called_once_with(
-            ['sgdisk', '-n', '1:0:+100M', '-c', '1:name', '/dev/loop0']
-        )
-        call = mock_flag.call_args_list[0]
-        assert mock_flag.call_args_list[0] == \
-            call(1, 't.linux')
-        call = mock_flag.call_args_list[1]
-        assert mock_flag.call_args_list[1] == \
-            call(1, 't.csm')
+        assert self.partitioner.changes == [
+            '-n', '1:0:+100M', '-c', '1:name', '-t', '1:8300', '-t', '1:EF02'
+        ]
 
-    @patch('kiwi.partitioner.gpt.Command.run')
-    @patch('kiwi.partitioner.gpt.PartitionerGpt.set_flag')
-    def test_create_custom_start_sector(self, mock_flag, mock_command):
+    def test_create_custom_start_sector(self):
         disk_provider = Mock()
         disk_provider.get_device = Mock(
             return_value='/dev/loop0'
@@ -50,64 +40,43 @@ class TestPartitionerGpt:
         partitioner = PartitionerGpt(disk_provider, 4096)
         partitioner.create('name', 100, 't.linux', ['t.csm'])
         partitioner.create('name', 100, 't.linux', ['t.csm'])
-        mock_command.assert_has_calls([
-            call([
-                'sgdisk', '-n', '1:4096:+100M', '-c', '1:name', '/dev/loop0'
-            ]),
-            call([
-                'sgdisk', '-n', '2:0:+100M', '-c', '2:name', '/dev/loop0'
-            ])
-        ])
-        assert mock_flag.call_args_list[0] == \
-            call(1, 't.linux')
-        assert mock_flag.call_args_list[1] == \
-            call(1, 't.csm')
+        assert partitioner.changes == [
+            '-n', '1:4096:+100M', '-c', '1:name', '-t', '1:8300', '-t', '1:EF02',
+            '-n', '2:0:+100M', '-c', '2:name', '-t', '2:8300', '-t', '2:EF02'
+        ]
 
-    @patch('kiwi.partitioner.gpt.Command.run')
-    @patch('kiwi.partitioner.gpt.PartitionerGpt.set_flag')
-    def test_create_all_free(self, mock_flag, mock_command):
+    def test_create_all_free(self):
         self.partitioner.create('name', 'all_free', 't.linux')
-        mock_command.assert_called_once_with(
-            ['sgdisk', '-n', '1:0:0', '-c', '1:name', '/dev/loop0']
-        )
+        assert self.partitioner.changes == [
+            '-n', '1:0:0', '-c', '1:name', '-t', '1:8300'
+        ]
 
     def test_set_flag_invalid(self):
         with raises(KiwiPartitionerGptFlagError):
             self.partitioner.set_flag(1, 'foo')
 
-    @patch('kiwi.partitioner.gpt.Command.run')
-    def test_set_flag(self, mock_command):
+    def test_set_flag(self):
         self.partitioner.set_flag(1, 't.csm')
-        mock_command.assert_called_once_with(
-            ['sgdisk', '-t', '1:EF02', '/dev/loop0']
-        )
+        assert self.partitioner.changes == ['-t', '1:EF02']
+        assert self.partitioner.partition_types == {1: 'EF02'}
 
     def test_set_flag_ignored(self):
         with self._caplog.at_level(logging.WARNING):
             self.partitioner.set_flag(1, 'f.active')
+        assert self.partitioner.changes == []
 
-    @patch('kiwi.partitioner.gpt.Command.run')
-    def test_set_hybrid_mbr(self, mock_command):
+    def test_set_hybrid_mbr(self):
         self.partitioner.partition_id = 5
         self.partitioner.set_hybrid_mbr()
-        mock_command.assert_called_once_with(
-            ['sgdisk', '-h', '1:2:3', '/dev/loop0']
-        )
+        assert self.partitioner.changes == ['-h', '1:2:3']
 
-    @patch('kiwi.partitioner.gpt.Command.run')
-    def test_set_mbr(self, mock_command):
-        command_output = Mock()
-        command_output.output = '...(EFI System)'
-        self.partitioner.partition_id = 4
-        mock_command.return_value = command_output
+    def test_set_mbr(self):
+        self.partitioner.create('efi', 100, 't.efi')
+        self.partitioner.create('root', 'all_free', 't.linux')
+        self.partitioner.changes = []
         self.partitioner.set_mbr()
-        assert mock_command.call_args_list == [
-            call(['sgdisk', '-i=1', '/dev/loop0']),
-            call(['sgdisk', '-i=2', '/dev/loop0']),
-            call(['sgdisk', '-i=3', '/dev/loop0']),
-            call(['sgdisk', '-i=4', '/dev/loop0']),
-            call(['sgdisk', '-t', '4:8300', '/dev/loop0']),
-            call(['sgdisk', '-m', '1:2:3:4', '/dev/loop0'])
+        assert self.partitioner.changes == [
+            '-t', '1:8300', '-m', '1:2'
         ]
 
     @patch('kiwi.partitioner.gpt.Command.run')
@@ -116,3 +85,23 @@ class TestPartitionerGpt:
         mock_command.assert_called_once_with(
             ['sgdisk', '--resize-table', '42', '/dev/loop0']
         )
+        assert self.partitioner.changes == []
+
+    @patch('kiwi.partitioner.gpt.Command.run')
+    def test_commit(self, mock_command):
+        self.partitioner.commit()
+        assert not mock_command.called
+        self.partitioner.create('efi', 100, 't.efi')
+        self.partitioner.create('root', 'all_free', 't.linux')
+        self.partitioner.set_hybrid_mbr()
+        self.partitioner.commit()
+        mock_command.assert_called_once_with(
+            [
+                'sgdisk',
+                '-n', '1:0:+100M', '-c', '1:efi', '-t', '1:EF00',
+                '-n', '2:0:0', '-c', '2:root', '-t', '2:8300',
+                '-h', '1:2',
+                '/dev/loop0'
+            ]
+        )
+        assert self.partitioner.changes == []
@@ -1,6 +1,6 @@
 import logging
 from mock import (
-    patch, call, mock_open, Mock
+    patch, mock_open, Mock
 )
 from pytest import (
     raises, fixture
@@ -30,190 +30,91 @@ class TestPartitionerMsDos:
     def setup_method(self, cls):
         self.setup()
 
-    @patch('kiwi.partitioner.msdos.Command.run')
-    @patch('kiwi.partitioner.msdos.PartitionerMsDos.set_flag')
-    @patch('kiwi.partitioner.msdos.Temporary.new_file')
-    def test_create_primary(self, mock_temp, mock_flag, mock_command):
-        mock_command.side_effect = Exception
-        temp_type = namedtuple(
-            'temp_type', ['name']
-        )
-        mock_temp.return_value = temp_type(
-            name='tempfile'
-        )
-        m_open = mock_open()
-
-        with patch('builtins.open', m_open, create=True):
-            self.partitioner._create_primary(
-                'name', 100, 't.linux', ['f.active']
-            )
-
-        m_open.return_value.write.assert_called_once_with(
-            'n\np\n1\n\n+101M\nw\nq\n'
-        )
-        call = mock_flag.call_args_list[0]
-        assert mock_flag.call_args_list[0] == \
-            call(1, 't.linux')
-        call = mock_flag.call_args_list[1]
-        assert mock_flag.call_args_list[1] == \
-            call(1, 'f.active')
-        mock_command.assert_called_once_with(
-            ['bash', '-c', 'cat tempfile | fdisk /dev/loop0']
-        )
-
-    @patch('kiwi.partitioner.msdos.Command.run')
-    @patch('kiwi.partitioner.msdos.PartitionerMsDos.set_flag')
-    @patch('kiwi.partitioner.msdos.Temporary.new_file')
-    def test_create_extended(self, mock_temp, mock_flag, mock_command):
-        mock_command.side_effect = Exception
-        temp_type = namedtuple(
-            'temp_type', ['name']
-        )
-        mock_temp.return_value = temp_type(
-            name='tempfile'
-        )
-        m_open = mock_open()
-
-        with patch('builtins.open', m_open, create=True):
-            self.partitioner._create_extended('name')
-
-        m_open.return_value.write.assert_called_once_with(
-            'n\ne\n1\n\n\nw\nq\n'
-        )
-        mock_command.assert_called_once_with(
-            ['bash', '-c', 'cat tempfile | fdisk /dev/loop0']
-        )
-
-    @patch('kiwi.partitioner.msdos.Command.run')
-    @patch('kiwi.partitioner.msdos.PartitionerMsDos.set_flag')
-    @patch('kiwi.partitioner.msdos.Temporary.new_file')
-    def test_create_logical(self, mock_temp, mock_flag, mock_command):
-        mock_command.side_effect = Exception
-        temp_type = namedtuple(
-            'temp_type', ['name']
-        )
-        mock_temp.return_value = temp_type(
-            name='tempfile'
-        )
-        m_open = mock_open()
-
-        with patch('builtins.open', m_open, create=True):
-            self.partitioner._create_logical(
-                'name', 100, 't.linux', ['f.active']
-            )
-
-        m_open.return_value.write.assert_called_once_with(
-            'n\n1\n\n+100M\nw\nq\n'
-        )
-        call = mock_flag.call_args_list[0]
-        assert mock_flag.call_args_list[0] == \
-            call(1, 't.linux')
-        call = mock_flag.call_args_list[1]
-        assert mock_flag.call_args_list[1] == \
-            call(1, 'f.active')
-        mock_command.assert_called_once_with(
-            ['bash', '-c', 'cat tempfile | fdisk /dev/loop0']
-        )
-
-    @patch.object(PartitionerMsDos, '_create_primary')
-    @patch.object(PartitionerMsDos, '_create_extended')
-    @patch.object(PartitionerMsDos, '_create_logical')
-    def test_create(
-        self, mock_create_logical, mock_create_extended, mock_create_primary
-    ):
-        self.partitioner.create('name', 100, 't.linux')
-        mock_create_primary.assert_called_once_with(
-            'name', 100, 't.linux', []
-        )
-        mock_create_primary.reset_mock()
-        self.partitioner_extended.create('name', 100, 't.linux')
-        mock_create_primary.assert_called_once_with(
-            'name', 100, 't.linux', []
-        )
-        self.partitioner_extended.partition_id = 3
-        self.partitioner_extended.create('name', 100, 't.linux')
-        mock_create_extended.assert_called_once_with('name')
-        mock_create_logical.assert_called_once_with(
-            'name', 100, 't.linux', []
-        )
-        mock_create_logical.reset_mock()
-        self.partitioner_extended.partition_id = 7
-        self.partitioner_extended.create('name', 100, 't.linux')
-        mock_create_logical.assert_called_once_with(
-            'name', 100, 't.linux', []
-        )
-
-    @patch('kiwi.partitioner.msdos.Command.run')
-    @patch('kiwi.partitioner.msdos.PartitionerMsDos.set_flag')
-    @patch('kiwi.partitioner.msdos.Temporary.new_file')
-    def test_create_all_free(
-        self, mock_temp, mock_flag, mock_command
-    ):
-        mock_command.side_effect = Exception
-        temp_type = namedtuple(
-            'temp_type', ['name']
-        )
-        mock_temp.return_value = temp_type(
-            name='tempfile'
-        )
-
-        m_open = mock_open()
-        with patch('builtins.open', m_open, create=True):
-            self.partitioner.create('name', 'all_free', 't.linux')
-
-        m_open.return_value.write.assert_called_once_with(
-            'n\np\n1\n\n\nw\nq\n'
-        )
+    def test_create(self):
+        self.partitioner.create('name', 100, 't.linux', ['f.active'])
+        assert self.partitioner.partition_id == 1
+        assert self.partitioner.partitions == [
+            {'mbsize': 100, 'type': '83', 'bootable': True}
+        ]
+        assert self.partitioner.changed is True
+
+    def test_create_extended_layout(self):
+        for name in ['efi', 'boot', 'root', 'home']:
+            self.partitioner_extended.create(name, 100, 't.linux')
+        self.partitioner_extended.create('data', 'all_free', 't.lvm')
+        assert self.partitioner_extended.partition_id == 6
+        assert self.partitioner_extended.partitions == [
+            {'mbsize': 100, 'type': '83', 'bootable': False},
+            {'mbsize': 100, 'type': '83', 'bootable': False},
+            {'mbsize': 100, 'type': '83', 'bootable': False},
+            {'mbsize': 'all_free', 'type': '5', 'bootable': False},
+            {'mbsize': 100, 'type': '83', 'bootable': False},
+            {'mbsize': 'all_free', 'type': '8e', 'bootable': False}
+        ]
 
     def test_set_flag_invalid(self):
         with raises(KiwiPartitionerMsDosFlagError):
             self.partitioner.set_flag(1, 'foo')
 
-    @patch('kiwi.partitioner.msdos.Command.run')
-    def test_set_flag(self, mock_command):
-        self.partitioner.set_flag(1, 't.linux')
-        mock_command.assert_called_once_with(
-            ['sfdisk', '-c', '/dev/loop0', '1', '83']
-        )
+    def test_set_flag(self):
+        self.partitioner.create('name', 100, 't.linux')
+        self.partitioner.set_flag(1, 't.lvm')
+        assert self.partitioner.partitions[0]['type'] == '8e'
 
-    @patch('kiwi.partitioner.msdos.Command.run')
-    def test_set_active(self, mock_command):
+    def test_set_active(self):
+        self.partitioner.create('name', 100, 't.linux')
         self.partitioner.set_flag(1, 'f.active')
-        mock_command.assert_called_once_with(
-            ['parted', '/dev/loop0', 'set', '1', 'boot', 'on']
-        )
+        assert self.partitioner.partitions[0]['bootable'] is True
 
     def test_set_flag_ignored(self):
+        self.partitioner.create('name', 100, 't.linux')
         with self._caplog.at_level(logging.WARNING):
             self.partitioner.set_flag(1, 't.csm')
+        assert self.partitioner.partitions == [
+            {'mbsize': 100, 'type': '83', 'bootable': False}
+        ]
 
     def test_resize_table(self):
         self.partitioner.resize_table()
 
+    def test_set_start_sector(self):
+        self.partitioner.set_start_sector(4096)
+        assert self.partitioner.table_start_sector == 4096
+        assert self.partitioner.changed is True
+
     @patch('kiwi.partitioner.msdos.Command.run')
     @patch('kiwi.partitioner.msdos.Temporary.new_file')
-    @patch('kiwi.partitioner.msdos.BlockID')
-    def test_set_start_sector(self, mock_BlockID, mock_temp, mock_Command_run):
+    def test_commit(self, mock_temp, mock_command):
         temp_type = namedtuple(
             'temp_type', ['name']
         )
         mock_temp.return_value = temp_type(
             name='tempfile'
         )
+        self.partitioner_extended.create('boot', 100, 't.linux', ['f.active'])
+        self.partitioner_extended.create('swap', 200, 't.swap')
+        self.partitioner_extended.create('root', 1024, 't.linux')
+        self.partitioner_extended.create('home', 'all_free', 't.linux')
+        self.partitioner_extended.set_start_sector(4096)
         m_open = mock_open()
-        mock_BlockID.return_value.get_partition_count.return_value = 4
         with patch('builtins.open', m_open, create=True):
-            self.partitioner.set_start_sector(4096)
-        assert m_open.return_value.write.call_args_list == [
-            call('d\n1\nn\np\n4096\n\nw\nq\n')
-        ]
-        mock_Command_run.assert_called_once_with(
-            ['bash', '-c', 'cat tempfile | fdisk /dev/loop0']
+            self.partitioner_extended.commit()
+        m_open.assert_called_once_with('tempfile', 'w')
+        m_open.return_value.write.assert_called_once_with(
+            'label: dos\n'
+            'start=4096, size=100MiB, type=83, bootable\n'
+            'size=200MiB, type=82\n'
+            'size=1024MiB, type=83\n'
+            'type=5\n'
+            'type=83\n'
         )
-        mock_BlockID.return_value.get_partition_count.return_value = 3
-        m_open.reset_mock()
-        with patch('builtins.open', m_open, create=True):
-            self.partitioner.set_start_sector(4096)
-        assert m_open.return_value.write.call_args_list == [
-            call('d\n1\nn\np\n1\n4096\n\nw\nq\n')
-        ]
+        mock_command.assert_called_once_with(
+            [
+                'bash', '-c',
+                'sfdisk --no-reread --no-tell-kernel /dev/loop0 < tempfile'
+            ]
+        )
+        assert self.partitioner_extended.changed is False
+        mock_command.reset_mock()
+        self.partitioner_extended.commit()
+        assert not mock_command.called
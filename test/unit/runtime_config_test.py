@@ -60,6 +60,10 @@ class TestRuntimeConfig:
         assert runtime_config.get_xz_options() == ['-a', '-b', 'xxx']
         assert runtime_config.is_obs_public() is True
         assert runtime_config.get_bundle_compression() is True
+        assert runtime_config.get_bundle_compression_format() == 'zstd'
+        assert runtime_config.get_bundle_jobs() == 4
+        assert runtime_config.get_checksum_cache() is True
+        assert runtime_config.get_zstd_options() == ['--long', '-19']
         assert runtime_config.get_obs_download_server_url() == \
             'http://example.com'
         assert runtime_config.get_obs_api_server_url() == \
@@ -68,6 +72,10 @@ class TestRuntimeConfig:
         assert runtime_config.get_iso_tool_category() == 'xorriso'
         assert runtime_config.get_oci_archive_tool() == 'umoci'
         assert runtime_config.get_package_changes() is True
+        assert runtime_config.get_description_validation_cache() is True
+        assert runtime_config.get_description_transform_cache() is True
+        assert runtime_config.get_disk_size_model() == 'filesystem'
+        assert runtime_config.get_compress_codec() == 'python'
         assert runtime_config.get_disabled_runtime_checks() == [
             'check_dracut_module_for_oem_install_in_package_list',
             'check_container_tool_chain_installed'
@@ -93,6 +101,14 @@ class TestRuntimeConfig:
         assert runtime_config.get_iso_tool_category() == 'xorriso'
         assert runtime_config.get_oci_archive_tool() == 'umoci'
         assert runtime_config.get_package_changes() is False
+        assert runtime_config.get_description_validation_cache() is False
+        assert runtime_config.get_description_transform_cache() is False
+        assert runtime_config.get_disk_size_model() == 'factor'
+        assert runtime_config.get_compress_codec() == 'tool'
+        assert runtime_config.get_bundle_compression_format() == 'xz'
+        assert runtime_config.get_bundle_jobs() == 1
+        assert runtime_config.get_checksum_cache() is False
+        assert runtime_config.get_zstd_options() is None
         assert runtime_config.\
             get_credentials_verification_metadata_signing_key_file() == ''
 
@@ -108,6 +124,21 @@ class TestRuntimeConfig:
             assert runtime_config.get_iso_tool_category() == 'xorriso'
             assert 'Skipping invalid iso tool category: foo' in \
                 self._caplog.text
+        with self._caplog.at_level(logging.WARNING):
+            assert runtime_config.get_disk_size_model() == 'factor'
+            assert 'Skipping invalid disk size model: foo' in \
+                self._caplog.text
+        with self._caplog.at_level(logging.WARNING):
+            assert runtime_config.get_compress_codec() == 'tool'
+            assert 'Skipping invalid compress codec: foo' in \
+                self._caplog.text
+        with self._caplog.at_level(logging.WARNING):
+            assert runtime_config.get_bundle_compression_format() == 'xz'
+            assert 'Skipping invalid bundle compression: foo' in \
+                self._caplog.text
+            assert runtime_config.get_bundle_jobs() == 1
+            assert 'Skipping invalid bundle jobs: foo' in \
+                self._caplog.text
 
     def test_config_sections_other_settings(self):
         with patch.dict('os.environ', {'HOME': '../data/kiwi_config/other'}):
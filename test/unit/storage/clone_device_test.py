@@ -23,6 +23,25 @@ class TestCloneDevice:
         self.clone_device = CloneDevice(
             self.storage_device, 'root_dir'
         )
+        self.block_copy_patch = patch(
+            'kiwi.storage.clone_device.BlockCopy'
+        )
+        self.mock_BlockCopy = self.block_copy_patch.start()
+
+    def setup_method(self, cls):
+        self.setup()
+
+    def teardown(self):
+        self.block_copy_patch.stop()
+
+    def teardown_method(self, cls):
+        self.teardown()
+
+    def _assert_block_copy(self):
+        self.mock_BlockCopy.assert_called_once_with(
+            '/dev/source-device', '/dev/target-device'
+        )
+        self.mock_BlockCopy.return_value.copy.assert_called_once_with()
 
     @patch('kiwi.storage.clone_device.Command.run')
     @patch('kiwi.storage.clone_device.BlockID')
@@ -35,14 +54,47 @@ class TestCloneDevice:
 
         self.clone_device.clone([self.target_device])
 
-        mock_Command_run.assert_called_once_with(
-            ['dd', 'if=/dev/source-device', 'of=/dev/target-device']
-        )
+        self._assert_block_copy()
+        assert not mock_Command_run.called
         mock_FileSystem_new.assert_called_once_with(
             'ext3', self.target_device
         )
         mock_FileSystem_new.return_value.set_uuid.assert_called_once_with()
 
+    @patch('kiwi.storage.clone_device.Command.run')
+    @patch('kiwi.storage.clone_device.BlockID')
+    @patch('kiwi.storage.clone_device.FileSystem.new')
+    def test_clone_multiple_targets(
+        self, mock_FileSystem_new, mock_BlockID, mock_Command_run
+    ):
+        self.clone_id.get_filesystem.return_value = 'xfs'
+        mock_BlockID.return_value = self.clone_id
+        second_target_device = Mock()
+        second_target_device.get_device.return_value = '/dev/target-device2'
+
+        self.clone_device.clone([self.target_device, second_target_device])
+
+        self.mock_BlockCopy.assert_called_once_with(
+            '/dev/source-device', '/dev/target-device', '/dev/target-device2'
+        )
+        self.mock_BlockCopy.return_value.copy.assert_called_once_with()
+        assert sorted(
+            mock_FileSystem_new.call_args_list,
+            key=lambda call_args: call_args[0][1].get_device()
+        ) == [
+            call('xfs', self.target_device),
+            call('xfs', second_target_device)
+        ]
+        assert mock_FileSystem_new.return_value.set_uuid.call_count == 2
+        # the metadata of the clones is read again after the copy
+        # and after the identifiers were changed
+        assert sorted(mock_BlockID.invalidate.call_args_list) == [
+            call('/dev/target-device'),
+            call('/dev/target-device'),
+            call('/dev/target-device2'),
+            call('/dev/target-device2')
+        ]
+
     @patch('kiwi.storage.clone_device.Command.run')
     @patch('kiwi.storage.clone_device.BlockID')
     def test_clone_lvm(self, mock_BlockID, mock_Command_run):
@@ -51,10 +103,8 @@ class TestCloneDevice:
 
         self.clone_device.clone([self.target_device])
 
+        self._assert_block_copy()
         assert mock_Command_run.call_args_list == [
-            call(
-                ['dd', 'if=/dev/source-device', 'of=/dev/target-device']
-            ),
             call(
                 ['vgimportclone', '/dev/target-device']
             )
@@ -70,10 +120,8 @@ class TestCloneDevice:
 
         self.clone_device.clone([self.target_device])
 
+        self._assert_block_copy()
         assert mock_Command_run.call_args_list == [
-            call(
-                ['dd', 'if=/dev/source-device', 'of=/dev/target-device']
-            ),
             call(
                 [
                     'cryptsetup', '-q', 'luksUUID',
@@ -107,10 +155,8 @@ class TestCloneDevice:
             mock_MappedDevice.return_value
         )
         mock_FileSystem_new.return_value.set_uuid.assert_called_once_with()
+        self._assert_block_copy()
         assert mock_Command_run.call_args_list == [
-            call(
-                ['dd', 'if=/dev/source-device', 'of=/dev/target-device']
-            ),
             call(
                 ['mdadm', '--stop', '/dev/md0']
             ),
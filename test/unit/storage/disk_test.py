@@ -266,9 +266,12 @@ class TestDisk:
                 ['bash', '-c', 'cat tempfile | fdasd -f /dev/loop0']
             )
 
+    @patch('kiwi.storage.disk.BlockID.invalidate')
     @patch('kiwi.storage.disk.Command.run')
-    def test_map_partitions_loop(self, mock_command):
+    def test_map_partitions_loop(self, mock_command, mock_invalidate):
         self.disk.map_partitions()
+        self.partitioner.commit.assert_called_once_with()
+        mock_invalidate.assert_called_once_with()
         mock_command.assert_called_once_with(
             ['kpartx', '-s', '-a', '/dev/loop0']
         )
@@ -1,10 +1,18 @@
+import os
+import errno
+import struct
 import logging
-from mock import patch
+from mock import (
+    patch, call
+)
 from pytest import (
     raises, fixture
 )
 
-from kiwi.storage.loop_device import LoopDevice
+from kiwi.storage.loop_device import (
+    LoopDevice, LOOP_CONFIG_FORMAT, LOOP_CONFIGURE, LOOP_CTL_GET_FREE,
+    LOOP_CLR_FD
+)
 
 from kiwi.exceptions import KiwiLoopSetupError
 
@@ -27,49 +35,123 @@ class TestLoopDevice:
         with raises(KiwiLoopSetupError):
             LoopDevice('loop-file-does-not-exist-and-no-size-given')
 
+    def test_create_invalid(self):
+        self.loop.filesize_mbytes = None
+        with raises(KiwiLoopSetupError):
+            self.loop.create()
+
     def test_get_device(self):
         assert self.loop.get_device() == ''
 
     def test_is_loop(self):
         assert self.loop.is_loop() is True
 
-    @patch('os.path.exists')
+    def ioctl(self, results):
+        # results of LOOP_CONFIGURE calls, LOOP_CTL_GET_FREE counts up
+        self.configs = []
+        free = iter(range(len(results)))
+        results = iter(results)
+
+        def ioctl(fd, request, arg=0):
+            if request == LOOP_CTL_GET_FREE:
+                return next(free)
+            assert request == LOOP_CONFIGURE
+            self.configs.append(struct.unpack(LOOP_CONFIG_FORMAT, arg))
+            result = next(results)
+            if result:
+                raise OSError(result, os.strerror(result))
+        return ioctl
+
+    @patch('os.close')
+    @patch('os.open')
+    @patch('kiwi.storage.loop_device.fcntl.ioctl')
+    def test_create(self, mock_ioctl, mock_os_open, mock_os_close, tmpdir):
+        mock_ioctl.side_effect = self.ioctl([None])
+        mock_os_open.return_value = 42
+        self.loop.filename = format(tmpdir.join('loop-file'))
+        self.loop.create()
+        assert os.path.getsize(self.loop.filename) == 20 * 1048576
+        assert os.stat(self.loop.filename).st_blocks == 0
+        assert self.loop.get_device() == '/dev/loop0'
+        assert mock_os_open.call_args_list == [
+            call(self.loop.filename, os.O_RDWR | os.O_CLOEXEC),
+            call('/dev/loop-control', os.O_RDWR | os.O_CLOEXEC),
+            call('/dev/loop0', os.O_RDWR | os.O_CLOEXEC)
+        ]
+        assert mock_os_close.call_count == 3
+        config = self.configs[0]
+        # backing file, block size and direct I/O flag
+        assert config[:2] == (42, 4096)
+        assert config[10] == 16
+        assert config[11] == os.fsencode(self.loop.filename)[:63].ljust(
+            64, b'\0'
+        )
+        self.loop.node_name = None
+
+    @patch('os.close')
+    @patch('os.open')
+    @patch('kiwi.storage.loop_device.fcntl.ioctl')
+    def test_create_retry(self, mock_ioctl, mock_os_open, mock_os_close):
+        mock_ioctl.side_effect = self.ioctl(
+            [errno.EINVAL, errno.EBUSY, None]
+        )
+        self.loop.create(overwrite=False)
+        assert self.loop.get_device() == '/dev/loop2'
+        # direct I/O is not used after it was not accepted
+        assert [config[10] for config in self.configs] == [16, 0, 0]
+        self.loop.node_name = None
+
+    @patch('os.close')
+    @patch('os.open')
+    @patch('kiwi.storage.loop_device.fcntl.ioctl')
     @patch('kiwi.storage.loop_device.Command.run')
     @patch('kiwi.storage.loop_device.CommandCapabilities.has_option_in_help')
-    def test_create(
-        self, mock_has_option_in_help, mock_command, mock_exists
+    def test_create_losetup(
+        self, mock_has_option_in_help, mock_command, mock_ioctl,
+        mock_os_open, mock_os_close
     ):
+        mock_command.return_value.output = '/dev/loop1\n'
         mock_has_option_in_help.return_value = True
-        mock_exists.return_value = False
-        self.loop.create()
-        call = mock_command.call_args_list[0]
-        assert mock_command.call_args_list[0] == \
-            call([
-                'qemu-img', 'create', 'loop-file', '20M'
-            ])
-        call = mock_command.call_args_list[1]
-        assert mock_command.call_args_list[1] == \
-            call([
+        # no free loop device
+        mock_ioctl.side_effect = self.ioctl([errno.EBUSY] * 8)
+        self.loop.create(overwrite=False)
+        assert self.loop.get_device() == '/dev/loop1'
+        mock_command.assert_called_once_with(
+            [
                 'losetup', '--sector-size', '4096',
                 '-f', '--show', 'loop-file'
-            ])
+            ]
+        )
+        # no LOOP_CONFIGURE support
         mock_has_option_in_help.return_value = False
         mock_command.reset_mock()
-        self.loop.create()
-        assert mock_command.call_args_list[1] == \
-            call([
+        mock_ioctl.side_effect = self.ioctl([errno.ENOTTY])
+        self.loop.create(overwrite=False)
+        mock_command.assert_called_once_with(
+            [
                 'losetup', '--logical-blocksize', '4096',
                 '-f', '--show', 'loop-file'
-            ])
+            ]
+        )
+        # no loop control device
+        mock_command.reset_mock()
+        mock_os_open.side_effect = [42, OSError(errno.ENOENT, 'ENOENT')]
+        self.loop.create(overwrite=False)
+        assert mock_command.called
+        mock_os_close.assert_called_with(42)
         self.loop.node_name = None
 
-    @patch('kiwi.storage.loop_device.Command.run')
-    def test_destructor(self, mock_command):
+    @patch('os.close')
+    @patch('os.open')
+    @patch('kiwi.storage.loop_device.fcntl.ioctl')
+    def test_destructor(self, mock_ioctl, mock_os_open, mock_os_close):
+        mock_os_open.return_value = 42
         self.loop.node_name = '/dev/loop0'
-        mock_command.side_effect = Exception
         self.loop.__del__()
+        mock_ioctl.assert_called_once_with(42, LOOP_CLR_FD)
+        mock_os_close.assert_called_once_with(42)
+        mock_ioctl.side_effect = OSError(errno.ENXIO, 'ENXIO')
         with self._caplog.at_level(logging.WARNING):
-            mock_command.assert_called_once_with(
-                ['losetup', '-d', '/dev/loop0']
-            )
+            self.loop.__del__()
+            assert 'loop device /dev/loop0 still busy' in self._caplog.text
         self.loop.node_name = None
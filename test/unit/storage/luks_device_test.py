@@ -46,21 +46,22 @@ class TestLuksDevice:
         assert self.luks.get_device() is None
 
     @patch('kiwi.storage.luks_device.Command.run')
+    @patch('kiwi.storage.luks_device.BlockCopy')
     @patch('os.chmod')
     def test_create_crypto_luks_empty_passphrase(
-        self, mock_os_chmod, mock_command
+        self, mock_os_chmod, mock_BlockCopy, mock_command
     ):
         with patch('builtins.open', create=True):
             self.luks.create_crypto_luks(
                 passphrase='', os='sle12', keyfile='some-keyfile'
             )
+            mock_BlockCopy.assert_called_once_with(
+                '/dev/urandom', '/dev/some-device'
+            )
+            mock_BlockCopy.return_value.copy.assert_called_once_with(
+                byte_count=1048576
+            )
             assert mock_command.call_args_list == [
-                call(
-                    [
-                        'dd', 'if=/dev/urandom', 'bs=1M', 'count=1',
-                        'of=/dev/some-device'
-                    ]
-                ),
                 call(
                     [
                         'cryptsetup', '-q', '--key-file', '/dev/zero',
@@ -88,10 +89,11 @@ class TestLuksDevice:
             self.luks.luks_device = None
 
     @patch('kiwi.storage.luks_device.Command.run')
+    @patch('kiwi.storage.luks_device.BlockCopy')
     @patch('kiwi.storage.luks_device.Temporary.new_file')
     @patch('os.chmod')
     def test_create_crypto_luks(
-        self, mock_os_chmod, mock_tmpfile, mock_command
+        self, mock_os_chmod, mock_tmpfile, mock_BlockCopy, mock_command
     ):
         tmpfile = Mock()
         tmpfile.name = 'tmpfile'
@@ -101,12 +103,6 @@ class TestLuksDevice:
                 passphrase='passphrase', os='sle12', keyfile='some-keyfile'
             )
             assert mock_command.call_args_list == [
-                call(
-                    [
-                        'dd', 'if=/dev/urandom', 'bs=1M', 'count=1',
-                        'of=/dev/some-device'
-                    ]
-                ),
                 call(
                     [
                         'cryptsetup', '-q', '--key-file', 'tmpfile',
@@ -1,3 +1,4 @@
+import os
 import logging
 from mock import patch
 from pytest import (
@@ -32,6 +33,9 @@ class TestDiskSetup:
         self.size.accumulate_mbyte_file_sizes = mock.Mock(
             return_value=42
         )
+        self.size.get_subtree = mock.Mock(
+            return_value=self.size
+        )
         kiwi.storage.setup.SystemSize = mock.Mock(
             return_value=self.size
         )
@@ -156,6 +160,23 @@ class TestDiskSetup:
         self.setup.configured_size.mbytes = 1024
         assert self.setup.get_disksize_mbytes() == \
             self.setup.configured_size.mbytes
+        self.size.create_index.assert_called_once_with(
+            jobs=os.cpu_count() or 1
+        )
+
+    def test_get_disksize_mbytes_filesystem_size_model(self):
+        self.size.get_filesystem_size.return_value = mock.Mock(
+            size_bytes=20 * 1048576 + 1
+        )
+        self.setup_ppc.size_model = 'filesystem'
+        assert self.setup_ppc.get_disksize_mbytes() == \
+            Defaults.get_default_prep_mbytes() + 21
+        self.size.get_filesystem_size.assert_called_once_with(
+            self.setup_ppc.filesystem
+        )
+        assert self.setup_ppc.root_filesystem_size == \
+            self.size.get_filesystem_size.return_value
+        assert not self.size.customize.called
 
     def test_get_disksize_mbytes_with_ppc_prep_partition(self):
         assert self.setup_ppc.get_disksize_mbytes() == \
@@ -218,6 +239,9 @@ class TestDiskSetup:
     def test_get_disksize_mbytes_partitions(self, mock_exists):
         mock_exists.side_effect = lambda path: path != 'root_dir/var/tmp'
         assert self.setup_partitions.get_disksize_mbytes() == 732
+        # the partition sizes are answered from the root tree index
+        assert mock.call('root_dir/var') in \
+            self.size.get_subtree.call_args_list
 
     @patch('os.path.exists')
     def test_get_disksize_mbytes_clones(self, mock_exists):
@@ -47,11 +47,12 @@ class TestDiskFormatGce:
             use_for_bundle=True
         )
 
-    @patch('kiwi.storage.subformat.gce.Command.run')
+    @patch('kiwi.storage.subformat.gce.BlockCopy')
+    @patch('os.link')
     @patch('kiwi.storage.subformat.gce.ArchiveTar')
     @patch('kiwi.storage.subformat.gce.Temporary')
     def test_create_image_format(
-        self, mock_Temporary, mock_archive, mock_command
+        self, mock_Temporary, mock_archive, mock_os_link, mock_BlockCopy
     ):
         mock_Temporary.return_value.new_dir.return_value.name = 'tmpdir'
         archive = mock.Mock()
@@ -62,12 +63,10 @@ class TestDiskFormatGce:
         with patch('builtins.open', m_open, create=True):
             self.disk_format.create_image_format()
 
-        mock_command.assert_called_once_with(
-            [
-                'cp', 'target_dir/some-disk-image.x86_64-0.8.15.raw',
-                'tmpdir/disk.raw'
-            ]
+        mock_os_link.assert_called_once_with(
+            'target_dir/some-disk-image.x86_64-0.8.15.raw', 'tmpdir/disk.raw'
         )
+        assert not mock_BlockCopy.called
         assert m_open.call_args_list == [
             call('tmpdir/manifest.json', 'w')
         ]
@@ -83,3 +82,18 @@ class TestDiskFormatGce:
         )
         assert self.disk_format.get_target_file_path_for_format('gce') == \
             'target_dir/some-disk-image.x86_64-0.8.15.tar.gz'
+
+    @patch('kiwi.storage.subformat.gce.BlockCopy')
+    @patch('os.link')
+    @patch('kiwi.storage.subformat.gce.ArchiveTar')
+    @patch('kiwi.storage.subformat.gce.Temporary')
+    def test_create_image_format_copy(
+        self, mock_Temporary, mock_archive, mock_os_link, mock_BlockCopy
+    ):
+        mock_Temporary.return_value.new_dir.return_value.name = 'tmpdir'
+        mock_os_link.side_effect = OSError
+        self.disk_format.create_image_format()
+        mock_BlockCopy.assert_called_once_with(
+            'target_dir/some-disk-image.x86_64-0.8.15.raw', 'tmpdir/disk.raw'
+        )
+        mock_BlockCopy.return_value.copy.assert_called_once_with()
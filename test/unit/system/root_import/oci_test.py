@@ -62,7 +62,9 @@ class TestRootImportOCI:
         oci.import_rootfs.assert_called_once_with(
             'root_dir'
         )
-        mock_md5.assert_called_once_with('root_dir/image/imported_root')
+        mock_md5.assert_called_once_with(
+            'root_dir/image/imported_root', cache=True
+        )
         md5.md5.called_once_with('root_dir/image/imported_root.md5')
         uncompress.get_format.assert_called_once_with()
 
@@ -90,7 +92,9 @@ class TestRootImportOCI:
         oci.import_rootfs.assert_called_once_with(
             'root_dir'
         )
-        mock_md5.assert_called_once_with('root_dir/image/imported_root')
+        mock_md5.assert_called_once_with(
+            'root_dir/image/imported_root', cache=True
+        )
         md5.md5.called_once_with('root_dir/image/imported_root.md5')
         uncompress.get_format.assert_called_once_with()
         uncompress.uncompress.assert_called_once_with(True)
@@ -123,5 +127,7 @@ class TestRootImportOCI:
             oci.import_rootfs.assert_called_once_with(
                 'root_dir'
             )
-            mock_md5.assert_called_once_with('root_dir/image/imported_root')
+            mock_md5.assert_called_once_with(
+                'root_dir/image/imported_root', cache=True
+            )
             md5.md5.called_once_with('root_dir/image/imported_root.md5')
@@ -989,19 +989,18 @@ class TestSystemSetup:
         ]
 
     @patch('kiwi.command.Command.run')
-    @patch('pathlib.Path.touch')
     @patch('kiwi.system.setup.ArchiveTar')
-    @patch('kiwi.system.setup.Compress')
     @patch('os.path.getsize')
     @patch('kiwi.system.setup.Path.wipe')
     def test_create_recovery_archive(
-        self, mock_wipe, mock_getsize, mock_compress,
-        mock_archive, mock_pathlib_Path_touch, mock_command
+        self, mock_wipe, mock_getsize, mock_archive, mock_command
     ):
         mock_getsize.return_value = 42
-        compress = Mock()
-        mock_compress.return_value = compress
         archive = Mock()
+        archive.create_gzip_compressed.return_value = \
+            'root_dir/recovery.tar.gz'
+        archive.member_count = 1
+        archive.uncompressed_size = 42
         mock_archive.return_value = archive
         self.setup.oemconfig['recovery'] = True
         self.setup.oemconfig['recovery_inplace'] = True
@@ -1010,14 +1009,14 @@ class TestSystemSetup:
         with patch('builtins.open', m_open, create=True):
             self.setup.create_recovery_archive()
 
-        assert mock_command.call_args_list[0] == call(
+        mock_command.assert_called_once_with(
             ['bash', '-c', 'rm -f root_dir/recovery.*']
         )
         mock_archive.assert_called_once_with(
             create_from_file_list=False, filename='root_dir/recovery.tar'
         )
-        archive.create.assert_called_once_with(
-            exclude=['dev', 'proc', 'sys'],
+        archive.create_gzip_compressed.assert_called_once_with(
+            exclude=['dev', 'proc', 'sys', 'recovery.tar.gz'],
             options=[
                 '--numeric-owner',
                 '--hard-dereference',
@@ -1029,26 +1028,15 @@ class TestSystemSetup:
             'root_dir/recovery.tar.filesystem', 'w'
         )
         assert m_open.return_value.write.call_args_list[0] == call('ext3')
-
-        assert mock_command.call_args_list[1] == call(
-            ['bash', '-c', 'tar -tf root_dir/recovery.tar | wc -l']
-        )
         assert m_open.call_args_list[1] == call(
             'root_dir/recovery.tar.files', 'w'
         )
-        assert mock_getsize.call_args_list[0] == call(
-            'root_dir/recovery.tar'
-        )
         assert m_open.return_value.write.call_args_list[1] == call('1\n')
         assert m_open.call_args_list[2] == call(
             'root_dir/recovery.tar.size', 'w'
         )
         assert m_open.return_value.write.call_args_list[2] == call('42')
-        mock_compress.assert_called_once_with(
-            'root_dir/recovery.tar'
-        )
-        compress.gzip.assert_called_once_with()
-        assert mock_getsize.call_args_list[1] == call(
+        mock_getsize.assert_called_once_with(
             'root_dir/recovery.tar.gz'
         )
         assert m_open.call_args_list[3] == call(
@@ -1,8 +1,14 @@
+import os
 from mock import patch
+from pytest import raises
 
 import mock
 
-from kiwi.system.size import SystemSize
+from kiwi.system.size import (
+    SystemSize, tree_size_type
+)
+
+from kiwi.exceptions import KiwiFileAccessError
 
 
 class TestSystemSize:
@@ -12,6 +18,19 @@ class TestSystemSize:
     def setup_method(self, cls):
         self.setup()
 
+    def create_tree(self, tmpdir):
+        root = tmpdir.mkdir('root')
+        root.join('file').write('x' * 1048576)
+        root.mkdir('proc').join('cpuinfo').write('x' * 100)
+        usr = root.mkdir('usr')
+        usr.join('data').write('x' * 2 * 1048576)
+        os.link(format(usr.join('data')), format(usr.join('data_link')))
+        var = root.mkdir('var')
+        var.join('log').write('x' * 4 * 1048576)
+        var.mkdir('cache').join('data').write('x' * 1048576)
+        os.symlink('file', format(root.join('link')))
+        return format(root)
+
     def test_customize_ext(self):
         self.size.accumulate_files = mock.Mock(
             return_value=10000
@@ -24,22 +43,176 @@ class TestSystemSize:
     def test_customize_xfs(self):
         assert self.size.customize(42, 'xfs') == 63
 
-    @patch('kiwi.system.size.Command.run')
-    def test_accumulate_mbyte_file_sizes(self, mock_command):
-        assert isinstance(self.size.accumulate_mbyte_file_sizes(['/foo']), int)
-        mock_command.assert_called_once_with(
-            [
-                'du', '-s', '--apparent-size', '--block-size', '1',
-                '--exclude', 'directory/proc',
-                '--exclude', 'directory/sys',
-                '--exclude', 'directory/dev',
-                '--exclude', '/foo', 'directory'
-            ]
+    def test_accumulate_mbyte_file_sizes(self, tmpdir):
+        root = self.create_tree(tmpdir)
+        size = SystemSize(root)
+        assert size.accumulate_mbyte_file_sizes() == 8
+        assert size.accumulate_mbyte_file_sizes(
+            [root + '/var', root + '/var/cache', '/foo']
+        ) == 3
+        assert size.accumulate_mbyte_file_sizes(
+            [root + '/var/cache', root + '/file', root + '/missing']
+        ) == 6
+
+    def test_accumulate_files(self, tmpdir):
+        root = self.create_tree(tmpdir)
+        # root, file, link, usr, usr/data (hardlinked), var, var/log,
+        # var/cache, var/cache/data
+        assert SystemSize(root).accumulate_files() == 9
+
+    def test_get_tree_size(self, tmpdir):
+        root = self.create_tree(tmpdir)
+        tree_size = SystemSize(root + '/var').get_tree_size()
+        assert tree_size.apparent_bytes >= 5 * 1048576
+        assert tree_size.disk_bytes >= 0
+        assert tree_size.inodes == 4
+        # var, var/cache and the data blocks of var/log, var/cache/data
+        assert tree_size.block_bytes == 5 * 1048576 + 2 * 4096
+        assert tree_size.inline_files == 0
+
+    def test_get_tree_size_block_usage(self, tmpdir):
+        root = tmpdir.mkdir('root')
+        root.join('small').write('x' * 100)
+        root.join('large').write('x' * 4097)
+        root.join('empty').write('')
+        os.symlink('small', format(root.join('short_link')))
+        os.symlink('x' * 100, format(root.join('long_link')))
+        os.mkfifo(format(root.join('fifo')))
+        tree_size = SystemSize(format(root)).get_tree_size()
+        # root directory, small, large and long_link
+        assert tree_size.block_bytes == 5 * 4096
+        assert tree_size.inline_files == 1
+        assert tree_size.inline_bytes == 100
+        assert tree_size.inodes == 7
+
+    def test_get_filesystem_size(self):
+        self.size.get_tree_size = mock.Mock(
+            return_value=tree_size_type(
+                apparent_bytes=19 * 1024 ** 3,
+                disk_bytes=19 * 1024 ** 3,
+                inodes=300000,
+                block_bytes=20 * 1024 ** 3,
+                inline_files=100000,
+                inline_bytes=100 * 1048576
+            )
+        )
+        ext4 = self.size.get_filesystem_size('ext4')
+        assert ext4.used_bytes == 20 * 1024 ** 3
+        # inode tables, bitmaps and a 128 MB journal
+        assert ext4.reserved_bytes == \
+            ext4.size_bytes // 16384 * 256 + \
+            -(-ext4.size_bytes // 134217728) * 8192 + 128 * 1048576
+        assert ext4.size_bytes == \
+            21 * 1024 ** 3 + ext4.reserved_bytes
+        # the empiric factor needs 50% more than the data size
+        assert ext4.size_bytes < 23 * 1024 ** 3
+        assert self.size.get_mbyte_filesystem_size('ext4') == \
+            -(-ext4.size_bytes // 1048576)
+
+        ext2 = self.size.get_filesystem_size('ext2')
+        assert ext2.used_bytes == 20 * 1024 ** 3 + 20 * 1048576
+        assert ext2.reserved_bytes < ext4.reserved_bytes
+
+        xfs = self.size.get_filesystem_size('xfs')
+        assert xfs.used_bytes == 20 * 1024 ** 3 + 300032 * 512
+        assert xfs.size_bytes == \
+            xfs.used_bytes + xfs.used_bytes * 5 // 100 + xfs.reserved_bytes
+
+        btrfs = self.size.get_filesystem_size('btrfs')
+        data_bytes = 20 * 1024 ** 3 - 100000 * 4096
+        assert btrfs.used_bytes == data_bytes + 2 * (
+            300000 * 512 + 100 * 1048576 + data_bytes // 1024
         )
+        # system chunks and the last data and metadata chunks
+        assert btrfs.reserved_bytes == 2 * (8 + 256) * 1048576 + 1024 ** 3
 
-    @patch('kiwi.system.size.Command.run')
-    def test_accumulate_files(self, mock_command):
-        assert isinstance(self.size.accumulate_files(), int)
-        mock_command.assert_called_once_with(
-            ['bash', '-c', 'find directory | wc -l']
+        squashfs = self.size.get_filesystem_size('squashfs')
+        assert squashfs.used_bytes == 20 * 1024 ** 3
+        assert squashfs.reserved_bytes == 0
+        assert self.size.get_filesystem_size(None) == squashfs
+
+    def test_get_filesystem_size_small_ext(self):
+        self.size.get_tree_size = mock.Mock(
+            return_value=tree_size_type(
+                apparent_bytes=1048576, disk_bytes=1048576, inodes=30000,
+                block_bytes=1048576, inline_files=0, inline_bytes=0
+            )
+        )
+        ext3 = self.size.get_filesystem_size('ext3')
+        # the data fits, the size is defined by the number of inodes
+        assert ext3.size_bytes == 30000 * 4096
+        self.size.get_tree_size.return_value = \
+            self.size.get_tree_size.return_value._replace(inodes=200000)
+        ext3 = self.size.get_filesystem_size('ext3')
+        # beyond the small filesystem limit the default ratio applies
+        assert ext3.size_bytes == 200000 * 16384
+
+    @patch('os.statvfs')
+    def test_get_used_bytes(self, mock_statvfs):
+        mock_statvfs.return_value = mock.Mock(
+            f_blocks=100, f_bfree=40, f_frsize=4096
+        )
+        assert SystemSize.get_used_bytes('mountpoint') == 60 * 4096
+        mock_statvfs.assert_called_once_with('mountpoint')
+
+    def test_create_index(self, tmpdir):
+        root = self.create_tree(tmpdir)
+        size = SystemSize(root)
+        size.create_index(jobs=2)
+        assert root in size.index
+        with patch('os.scandir') as mock_scandir:
+            assert size.get_subtree(root + '/var/').accumulate_files() == 4
+            assert size.accumulate_mbyte_file_sizes(
+                [root + '/usr']
+            ) == 6
+            assert not mock_scandir.called
+        # the index is not shared with other instances
+        tmpdir.join('root', 'var', 'new').write('x')
+        assert SystemSize(root + '/var').accumulate_files() == 5
+        assert SystemSize(root).accumulate_files() == 10
+        assert size.get_subtree(root + '/var').accumulate_files() == 4
+
+    def test_get_subtree_not_indexed(self, tmpdir):
+        root = self.create_tree(tmpdir)
+        subtree = SystemSize(root).get_subtree(root + '/var')
+        assert subtree.index is None
+        assert subtree.accumulate_files() == 4
+
+    def test_get_tree_size_hardlinks_excluded(self, tmpdir):
+        root = self.create_tree(tmpdir)
+        tmpdir.join('root', 'var').mkdir('lib')
+        os.link(
+            format(tmpdir.join('root', 'usr', 'data')),
+            format(tmpdir.join('root', 'var', 'lib', 'data'))
         )
+        for jobs in (1, 4):
+            size = SystemSize(root)
+            size.create_index(jobs=jobs)
+            # the hard linked data is accounted once
+            assert size.accumulate_mbyte_file_sizes() == 8
+            # the data stays accounted with any of its links excluded
+            assert size.accumulate_mbyte_file_sizes([root + '/usr']) == 8
+            assert size.accumulate_mbyte_file_sizes(
+                [root + '/var/lib', root + '/usr/data']
+            ) == 8
+            # with all links excluded the data is not accounted
+            assert size.accumulate_mbyte_file_sizes(
+                [root + '/var/lib', root + '/usr']
+            ) == 6
+            assert size.get_subtree(
+                root + '/var'
+            ).accumulate_mbyte_file_sizes() == 7
+
+    def test_get_tree_size_not_a_directory(self):
+        with raises(KiwiFileAccessError):
+            self.size.get_tree_size()
+
+    def test_index_directory_vanished(self):
+        assert self.size._index_directory('directory', {}) == [0] * 6
+
+    @patch('os.scandir')
+    def test_index_directory_entry_vanished(self, mock_scandir, tmpdir):
+        entry = mock.Mock()
+        entry.is_dir.side_effect = FileNotFoundError
+        mock_scandir.return_value.__enter__.return_value = [entry]
+        assert self.size._index_directory(format(tmpdir), {})[2] == 1
@@ -92,7 +92,7 @@ class TestCliTask:
             None, None, None
         ]
 
-    @patch('kiwi.tasks.base.RuntimeChecker')
+    @patch('kiwi.runtime_checker.RuntimeChecker')
     def test_load_xml_description(self, mock_runtime_checker):
         self.task.load_xml_description('../data/description')
         mock_runtime_checker.assert_called_once_with(self.task.xml_state)
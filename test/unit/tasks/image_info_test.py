@@ -41,9 +41,11 @@ class TestImageInfoTask:
             }
         }
         self.runtime_checker = Mock()
-        kiwi.tasks.base.RuntimeChecker = Mock(
+        self.runtime_checker_patch = patch(
+            'kiwi.runtime_checker.RuntimeChecker',
             return_value=self.runtime_checker
         )
+        self.runtime_checker_patch.start()
         self.runtime_config = Mock()
         kiwi.tasks.base.RuntimeConfig = Mock(
             return_value=self.runtime_config
@@ -80,6 +82,7 @@ class TestImageInfoTask:
 
     def teardown(self):
         sys.argv = argv_kiwi_tests
+        self.runtime_checker_patch.stop()
 
     def teardown_method(self, cls):
         self.teardown()
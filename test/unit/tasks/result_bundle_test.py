@@ -1,5 +1,9 @@
 import os
 import sys
+import lzma
+import errno
+import hashlib
+import subprocess
 import logging
 from mock import (
     patch, call, Mock, mock_open
@@ -12,7 +16,11 @@ from ..test_helper import argv_kiwi_tests
 
 import kiwi
 from kiwi.tasks.result_bundle import ResultBundleTask
-from kiwi.system.result import Result
+from kiwi.system.result import (
+    Result, result_file_type
+)
+from kiwi.utils.compress import Compress
+from kiwi.utils.checksum import Checksum
 
 from kiwi.exceptions import KiwiBundleError
 
@@ -53,6 +61,12 @@ class TestResultBundleTask:
         runtime_config.is_bundle_compression_requested = Mock(
             return_value=True
         )
+        runtime_config.get_bundle_compression_format = Mock(
+            return_value='xz'
+        )
+        runtime_config.get_bundle_jobs = Mock(
+            return_value=1
+        )
         self.task.runtime_config = runtime_config
 
     def setup_method(self, cls):
@@ -72,6 +86,7 @@ class TestResultBundleTask:
         self.task.command_args['--bundle-dir'] = 'bundle_dir'
         self.task.command_args['--id'] = 'Build_42'
         self.task.command_args['--zsync-source'] = None
+        self.task.command_args['--jobs'] = None
         self.task.command_args['--package-as-rpm'] = None
 
     def test_process_invalid_bundle_directory(self):
@@ -83,94 +98,131 @@ class TestResultBundleTask:
             self.task.process()
 
     @patch('kiwi.tasks.result_bundle.Result.load')
-    @patch('kiwi.tasks.result_bundle.Command.run')
     @patch('kiwi.tasks.result_bundle.Path.create')
-    @patch('kiwi.tasks.result_bundle.Path.which')
-    @patch('kiwi.tasks.result_bundle.Compress')
-    @patch('kiwi.tasks.result_bundle.Checksum')
+    @patch('kiwi.tasks.result_bundle.ResultBundleTask._create_bundle_file')
     @patch('os.path.exists')
     def test_process_result_bundle(
-        self, mock_exists, mock_checksum, mock_compress,
-        mock_path_which, mock_path_create, mock_command, mock_load
+        self, mock_exists, mock_create_bundle_file,
+        mock_path_create, mock_load
     ):
         # This file won't be copied with build id
         self.result.add(
             key='noversion', filename='test-image-noversion',
             use_for_bundle=True, compress=False, shasum=False
         )
-
-        checksum = Mock()
-        compress = Mock()
-        mock_path_which.return_value = 'zsyncmake'
-        compress.compressed_filename = 'compressed_filename'
-        mock_compress.return_value = compress
-        mock_checksum.return_value = checksum
+        self.result.add(
+            key='notbundled', filename='test-image-1.2.3.packages',
+            use_for_bundle=False, compress=False, shasum=False
+        )
         mock_exists.return_value = False
         mock_load.return_value = self.result
         self._init_command_args()
         self.task.command_args['bundle'] = True
-        self.task.command_args['--zsync-source'] = 'http://example.com/zsync'
 
-        m_open = mock_open()
-        with patch('builtins.open', m_open, create=True):
-            self.task.process()
+        self.task.process()
 
         mock_load.assert_called_once_with(
             os.sep.join([self.abs_target_dir, 'kiwi.result'])
         )
         mock_path_create.assert_called_once_with(self.abs_bundle_dir)
-        assert mock_command.call_args_list == [
-            call([
-                'cp', 'test-image-1.2.3',
-                os.sep.join([self.abs_bundle_dir, 'test-image-1.2.3-Build_42'])
-            ]),
-            call([
-                'zsyncmake', '-e',
-                '-u', 'http://example.com/zsync/compressed_filename',
-                '-o', 'compressed_filename.zsync',
-                'compressed_filename'
-            ]),
-            call([
-                'cp', 'test-image-noversion',
-                os.sep.join([self.abs_bundle_dir, 'test-image-noversion'])
-            ])
+        assert mock_create_bundle_file.call_args_list == [
+            call(
+                self.result.get_results()['keyname'],
+                os.sep.join([self.abs_bundle_dir, 'test-image-1.2.3-Build_42']),
+                None
+            ),
+            call(
+                self.result.get_results()['noversion'],
+                os.sep.join([self.abs_bundle_dir, 'test-image-noversion']),
+                None
+            )
         ]
-        mock_compress.assert_called_once_with(
-            os.sep.join([self.abs_bundle_dir, 'test-image-1.2.3-Build_42'])
-        )
-        mock_checksum.assert_called_once_with(
-            compress.compressed_filename
+
+    @patch('kiwi.tasks.result_bundle.Result.load')
+    @patch('kiwi.tasks.result_bundle.Path.create')
+    @patch('kiwi.tasks.result_bundle.ResultBundleTask._create_bundle_file')
+    @patch('os.path.exists')
+    @patch('os.cpu_count')
+    def test_process_result_bundle_jobs(
+        self, mock_cpu_count, mock_exists, mock_create_bundle_file,
+        mock_path_create, mock_load
+    ):
+        self.result.add(
+            key='noversion', filename='test-image-noversion',
+            use_for_bundle=True, compress=False, shasum=False
         )
-        checksum.sha256.assert_called_once_with()
-        m_open.return_value.write.assert_called_once_with(
-            '{0}  compressed_filename{1}'.format(
-                checksum.sha256.return_value, os.linesep
+        mock_cpu_count.return_value = 8
+        mock_exists.return_value = False
+        mock_load.return_value = self.result
+        self._init_command_args()
+        self.task.command_args['--jobs'] = '2'
+
+        self.task.process()
+
+        # same bundle files as in serial mode, the compressor
+        # threads are divided between the jobs
+        assert sorted(mock_create_bundle_file.call_args_list) == [
+            call(
+                self.result.get_results()['keyname'],
+                os.sep.join([self.abs_bundle_dir, 'test-image-1.2.3-Build_42']),
+                4
+            ),
+            call(
+                self.result.get_results()['noversion'],
+                os.sep.join([self.abs_bundle_dir, 'test-image-noversion']),
+                4
             )
+        ]
+
+    @patch('kiwi.tasks.result_bundle.Result.load')
+    @patch('kiwi.tasks.result_bundle.Path.create')
+    @patch('kiwi.tasks.result_bundle.ResultBundleTask._create_bundle_file')
+    @patch('os.path.exists')
+    def test_process_result_bundle_jobs_from_runtime_config(
+        self, mock_exists, mock_create_bundle_file, mock_path_create,
+        mock_load
+    ):
+        mock_exists.return_value = False
+        mock_load.return_value = self.result
+        self._init_command_args()
+        self.task.runtime_config.get_bundle_jobs.return_value = 64
+        mock_create_bundle_file.side_effect = KiwiBundleError('failed')
+
+        with raises(KiwiBundleError):
+            self.task.process()
+
+        mock_create_bundle_file.assert_called_once_with(
+            self.result.get_results()['keyname'],
+            os.sep.join([self.abs_bundle_dir, 'test-image-1.2.3-Build_42']),
+            max(1, (os.cpu_count() or 1) // 64)
         )
 
+    @patch('kiwi.tasks.result_bundle.Result.load')
+    def test_process_result_bundle_invalid_jobs(self, mock_load):
+        mock_load.return_value = self.result
+        self._init_command_args()
+        for jobs in ('0', 'foo'):
+            self.task.command_args['--jobs'] = jobs
+            with raises(KiwiBundleError) as issue:
+                self.task.process()
+            assert 'Invalid number of bundle jobs: {0}'.format(jobs) in \
+                format(issue.value)
+
     @patch('kiwi.tasks.result_bundle.Privileges.check_for_root_permissions')
     @patch('kiwi.tasks.result_bundle.Result.load')
     @patch('kiwi.tasks.result_bundle.Command.run')
     @patch('kiwi.tasks.result_bundle.Path.create')
-    @patch('kiwi.tasks.result_bundle.Path.which')
     @patch('kiwi.tasks.result_bundle.Path.wipe')
-    @patch('kiwi.tasks.result_bundle.Compress')
-    @patch('kiwi.tasks.result_bundle.Checksum')
+    @patch('kiwi.tasks.result_bundle.ResultBundleTask._create_bundle_file')
     @patch('os.path.exists')
     @patch('os.chdir')
     @patch('os.unlink')
     @patch('glob.iglob')
     def test_process_result_bundle_as_rpm(
-        self, mock_iglob, mock_unlink, mock_chdir, mock_exists, mock_checksum,
-        mock_compress, mock_path_wipe, mock_path_which, mock_path_create,
+        self, mock_iglob, mock_unlink, mock_chdir, mock_exists,
+        mock_create_bundle_file, mock_path_wipe, mock_path_create,
         mock_command, mock_load, mock_Privileges_check_for_root_permissions
     ):
-        checksum = Mock()
-        compress = Mock()
-        mock_path_which.return_value = 'zsyncmake'
-        compress.compressed_filename = 'compressed_filename'
-        mock_compress.return_value = compress
-        mock_checksum.return_value = checksum
         mock_exists.return_value = False
         mock_load.return_value = self.result
         self._init_command_args()
@@ -186,15 +238,12 @@ class TestResultBundleTask:
 
         mock_path_wipe.assert_called_once_with(self.abs_bundle_dir)
         mock_Privileges_check_for_root_permissions.assert_called_once_with()
+        mock_create_bundle_file.assert_called_once_with(
+            self.result.get_results()['keyname'],
+            os.sep.join([self.abs_bundle_dir, 'test-image-1.2.3-Build_42']),
+            None
+        )
         assert mock_command.call_args_list == [
-            call(
-                [
-                    'cp', 'test-image-1.2.3',
-                    os.sep.join(
-                        [self.abs_bundle_dir, 'test-image-1.2.3-Build_42']
-                    )
-                ]
-            ),
             call(
                 [
                     'rpmbuild', '--nodeps', '--nocheck', '--rmspec', '-bb',
@@ -213,11 +262,12 @@ class TestResultBundleTask:
         )
 
     @patch('kiwi.tasks.result_bundle.Result.load')
-    @patch('kiwi.tasks.result_bundle.Command.run')
     @patch('kiwi.tasks.result_bundle.Path.create')
+    @patch('kiwi.tasks.result_bundle.ResultBundleTask._create_bundle_file')
     @patch('os.path.exists')
     def test_process_result_bundle_with_bundle_format(
-        self, mock_exists, mock_path_create, mock_command, mock_load
+        self, mock_exists, mock_create_bundle_file, mock_path_create,
+        mock_load
     ):
         self.xml_state.profiles = None
         self.xml_state.host_architecture = 'x86_64'
@@ -242,22 +292,18 @@ class TestResultBundleTask:
 
         self.task.process()
 
-        mock_command.assert_called_once_with(
-            [
-                'cp',
-                '/tmp/mytest/Leap-15.2.x86_64-1.15.2.raw',
-                os.sep.join(
-                    [self.abs_bundle_dir, 'Leap-15.2-oem:1.raw']
-                )
-            ]
+        mock_create_bundle_file.assert_called_once_with(
+            result.get_results()['disk_image'],
+            os.sep.join([self.abs_bundle_dir, 'Leap-15.2-oem:1.raw']), None
         )
 
     @patch('kiwi.tasks.result_bundle.Result.load')
-    @patch('kiwi.tasks.result_bundle.Command.run')
     @patch('kiwi.tasks.result_bundle.Path.create')
+    @patch('kiwi.tasks.result_bundle.ResultBundleTask._create_bundle_file')
     @patch('os.path.exists')
     def test_process_result_bundle_name_includes_version(
-        self, mock_exists, mock_path_create, mock_command, mock_load
+        self, mock_exists, mock_create_bundle_file, mock_path_create,
+        mock_load
     ):
         result = Result(self.xml_state)
         result.add(
@@ -275,48 +321,209 @@ class TestResultBundleTask:
 
         self.task.process()
 
-        mock_load.assert_called_once_with(
-            os.sep.join([self.abs_target_dir, 'kiwi.result'])
+        mock_create_bundle_file.assert_called_once_with(
+            result.get_results()['nameincludesversion'],
+            os.sep.join([
+                self.abs_bundle_dir, 'test-1.2.3-image-1.2.3-Build_42'
+            ]), None
         )
-        mock_path_create.assert_called_once_with(self.abs_bundle_dir)
-        assert mock_command.call_args_list == [
-            call([
-                'cp', 'test-1.2.3-image-1.2.3',
-                os.sep.join([
-                    self.abs_bundle_dir,
-                    'test-1.2.3-image-1.2.3-Build_42'
-                ])
-            ])
-        ]
 
-    @patch('kiwi.tasks.result_bundle.Result.load')
-    @patch('kiwi.tasks.result_bundle.Command.run')
-    @patch('kiwi.tasks.result_bundle.Path.create')
-    @patch('kiwi.tasks.result_bundle.Path.which')
-    @patch('kiwi.tasks.result_bundle.Compress')
-    @patch('kiwi.tasks.result_bundle.Checksum')
-    @patch('os.path.exists')
-    def test_process_result_bundle_zsyncmake_missing(
-        self, mock_exists, mock_checksum, mock_compress,
-        mock_path_which, mock_path_create, mock_command, mock_load
-    ):
-        checksum = Mock()
-        compress = Mock()
-        mock_path_which.return_value = None
-        compress.compressed_filename = 'compressed_filename'
-        mock_compress.return_value = compress
-        mock_checksum.return_value = checksum
-        mock_exists.return_value = False
-        mock_load.return_value = self.result
+    def test_create_bundle_file_xz(self, tmpdir):
+        result_file = self._create_result_file(tmpdir, compress=True)
+        zsyncmake = self._create_zsyncmake(tmpdir)
         self._init_command_args()
-        self.task.command_args['bundle'] = True
         self.task.command_args['--zsync-source'] = 'http://example.com/zsync'
+        self.task.runtime_config.get_xz_options.return_value = None
+        bundle_file = format(tmpdir.join('bundle'))
+
+        with patch('kiwi.tasks.result_bundle.Path.which') as mock_which:
+            mock_which.return_value = zsyncmake
+            with patch('builtins.open', wraps=open) as mock_open_file:
+                assert self.task._create_bundle_file(
+                    result_file, bundle_file
+                ) == bundle_file + '.xz'
+                # the result file is read once for all bundle steps
+                assert [
+                    item[0][0] for item in mock_open_file.call_args_list
+                ].count(result_file.filename) == 1
+
+        with open(bundle_file + '.xz', 'rb') as bundle:
+            data = bundle.read()
+        assert lzma.decompress(data) == b'image' * 1000
+        # the zsync control data is created from the same stream
+        with open(bundle_file + '.xz.zsync', 'rb') as zsync:
+            assert zsync.read() == data
+        with open(bundle_file + '.xz.sha256') as shasum:
+            assert shasum.read() == '{0}  bundle.xz{1}'.format(
+                hashlib.sha256(data).hexdigest(), os.linesep
+            )
+        with open(format(tmpdir.join('zsyncmake.args'))) as args:
+            assert args.read().split() == [
+                '-e', '-u', 'http://example.com/zsync/bundle.xz',
+                '-f', 'bundle.xz', '-o', bundle_file + '.xz.zsync'
+            ]
+
+    def test_create_bundle_file_zstd(self, tmpdir):
+        result_file = self._create_result_file(
+            tmpdir, compress=True, shasum=False
+        )
+        self._init_command_args()
+        self.task.runtime_config.get_bundle_compression_format.return_value = \
+            'zstd'
+        self.task.runtime_config.get_zstd_options.return_value = ['-1']
+        bundle_file = format(tmpdir.join('bundle'))
+
+        with patch('kiwi.utils.compress.RuntimeConfig') as mock_RuntimeConfig:
+            mock_RuntimeConfig.return_value.get_compress_codec.return_value = \
+                'tool'
+            with patch(
+                'subprocess.Popen', wraps=subprocess.Popen
+            ) as mock_Popen:
+                assert self.task._create_bundle_file(
+                    result_file, bundle_file, compress_threads=2
+                ) == bundle_file + '.zst'
+                assert mock_Popen.call_args[0][0] == [
+                    'zstd', '-c', '-1', '--threads=2'
+                ]
 
-        with patch('builtins.open'):
+        with Compress(bundle_file + '.zst').open_uncompressed() as bundle:
+            assert bundle.read() == b'image' * 1000
+        assert not os.path.exists(bundle_file + '.zst.sha256')
+
+    def test_create_bundle_file_link(self, tmpdir):
+        result_file = self._create_result_file(tmpdir)
+        self._init_command_args()
+        bundle_file = format(tmpdir.join('bundle'))
+        tmpdir.join('bundle').write('stale')
+
+        with patch(
+            'kiwi.tasks.result_bundle.Checksum', wraps=Checksum
+        ) as mock_Checksum:
+            assert self.task._create_bundle_file(
+                result_file, bundle_file
+            ) == bundle_file
+            # the checksum of the build result may be cached
+            mock_Checksum.assert_called_once_with(
+                result_file.filename, cache=True
+            )
+
+        assert os.path.samefile(result_file.filename, bundle_file)
+        with open(bundle_file + '.sha256') as shasum:
+            assert shasum.read() == '{0}  bundle{1}'.format(
+                hashlib.sha256(b'image' * 1000).hexdigest(), os.linesep
+            )
+
+    @patch('os.link')
+    def test_create_bundle_file_copy(self, mock_link, tmpdir):
+        mock_link.side_effect = OSError(errno.EXDEV, 'EXDEV')
+        result_file = self._create_result_file(tmpdir, shasum=False)
+        self._init_command_args()
+        bundle_file = format(tmpdir.join('bundle'))
+
+        self.task._create_bundle_file(result_file, bundle_file)
+
+        assert not os.path.samefile(result_file.filename, bundle_file)
+        with open(bundle_file, 'rb') as bundle:
+            assert bundle.read() == b'image' * 1000
+        assert not os.path.exists(bundle_file + '.sha256')
+
+    def test_create_bundle_file_zsyncmake_missing(self, tmpdir):
+        result_file = self._create_result_file(tmpdir)
+        self._init_command_args()
+        self.task.command_args['--zsync-source'] = 'http://example.com/zsync'
+
+        with patch('kiwi.tasks.result_bundle.Path.which') as mock_which:
+            mock_which.return_value = None
             with self._caplog.at_level(logging.WARNING):
-                self.task.process()
+                self.task._create_bundle_file(
+                    result_file, format(tmpdir.join('bundle'))
+                )
                 assert '--> zsyncmake missing, zsync setup skipped' in \
                     self._caplog.text
+        assert os.path.exists(format(tmpdir.join('bundle.sha256')))
+
+    def test_create_bundle_file_zsyncmake_failed(self, tmpdir):
+        result_file = self._create_result_file(tmpdir, size=1048576)
+        self._init_command_args()
+        self.task.command_args['--zsync-source'] = 'http://example.com/zsync'
+        zsyncmake = tmpdir.join('zsyncmake')
+        # writes more than a pipe holds to stderr before reading
+        zsyncmake.write(
+            '#!/bin/sh\nhead -c 262144 /dev/zero | tr "\\\\0" x >&2\n'
+            'cat > /dev/null\necho failed >&2\nexit 1\n'
+        )
+        zsyncmake.chmod(0o755)
+
+        with patch('kiwi.tasks.result_bundle.Path.which') as mock_which:
+            mock_which.return_value = format(zsyncmake)
+            with raises(KiwiBundleError) as issue:
+                self.task._create_bundle_file(
+                    result_file, format(tmpdir.join('bundle'))
+                )
+        assert format(issue.value).endswith('failed\n')
+
+    def test_create_bundle_file_zsyncmake_stopped(self, tmpdir):
+        result_file = self._create_result_file(tmpdir, size=1048576)
+        self._init_command_args()
+        self.task.command_args['--zsync-source'] = 'http://example.com/zsync'
+        zsyncmake = tmpdir.join('zsyncmake')
+        zsyncmake.write('#!/bin/sh\necho stopped >&2\n')
+        zsyncmake.chmod(0o755)
+
+        with patch('kiwi.tasks.result_bundle.Path.which') as mock_which:
+            mock_which.return_value = format(zsyncmake)
+            with raises(KiwiBundleError) as issue:
+                self.task._create_bundle_file(
+                    result_file, format(tmpdir.join('bundle'))
+                )
+        assert 'zsyncmake failed' in format(issue.value)
+        assert 'stopped' in format(issue.value)
+
+    @patch('kiwi.tasks.result_bundle.Compress.get_codec')
+    def test_create_bundle_file_broken_pipe(self, mock_get_codec, tmpdir):
+        codec = mock_get_codec.return_value
+        codec.compression_format.suffix = '.xz'
+        codec.compress_to_stream.side_effect = BrokenPipeError
+        result_file = self._create_result_file(tmpdir, compress=True)
+        self._init_command_args()
+        self.task.runtime_config.get_xz_options.return_value = None
+        bundle_file = format(tmpdir.join('bundle'))
+
+        with raises(BrokenPipeError):
+            self.task._create_bundle_file(result_file, bundle_file)
+
+        self.task.command_args['--zsync-source'] = 'http://example.com/zsync'
+        codec.compress_to_stream.side_effect = None
+        with patch.object(self.task, '_call_zsyncmake') as mock_zsyncmake:
+            zsync = mock_zsyncmake.return_value
+            zsync.returncode = 0
+            zsync.stdin.close.side_effect = BrokenPipeError
+            with raises(KiwiBundleError):
+                self.task._create_bundle_file(result_file, bundle_file)
+            zsync.wait.assert_called_once_with()
+
+    def _create_result_file(
+        self, tmpdir, compress=False, shasum=True, size=5000
+    ):
+        image = tmpdir.mkdir('target').join('test-image-1.2.3')
+        image.write_binary(b'image' * (size // 5))
+        return result_file_type(
+            filename=format(image), use_for_bundle=True,
+            compress=compress, shasum=shasum
+        )
+
+    def _create_zsyncmake(self, tmpdir):
+        # records its arguments and writes the data read from stdin
+        # to the control file given as last argument
+        zsyncmake = tmpdir.join('zsyncmake')
+        zsyncmake.write(
+            '#!/bin/sh\n'
+            'echo "$@" > {0}\n'
+            'eval output=\\${{$#}}\n'
+            'cat > "$output"\n'.format(tmpdir.join('zsyncmake.args'))
+        )
+        zsyncmake.chmod(0o755)
+        return format(zsyncmake)
 
     def test_process_result_bundle_help(self):
         self._init_command_args()
@@ -39,9 +39,11 @@ class TestSystemBuildTask:
         )
 
         self.runtime_checker = mock.Mock()
-        kiwi.tasks.base.RuntimeChecker = mock.Mock(
+        self.runtime_checker_patch = patch(
+            'kiwi.runtime_checker.RuntimeChecker',
             return_value=self.runtime_checker
         )
+        self.runtime_checker_patch.start()
 
         self.runtime_config = mock.Mock()
         self.runtime_config.get_disabled_runtime_checks.return_value = []
@@ -80,6 +82,7 @@ class TestSystemBuildTask:
 
     def teardown(self):
         sys.argv = argv_kiwi_tests
+        self.runtime_checker_patch.stop()
 
     def teardown_method(self, cls):
         self.teardown()
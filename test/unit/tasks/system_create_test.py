@@ -28,9 +28,11 @@ class TestSystemCreateTask:
         )
 
         self.runtime_checker = mock.Mock()
-        kiwi.tasks.base.RuntimeChecker = mock.Mock(
+        self.runtime_checker_patch = mock.patch(
+            'kiwi.runtime_checker.RuntimeChecker',
             return_value=self.runtime_checker
         )
+        self.runtime_checker_patch.start()
 
         self.runtime_config = mock.Mock()
         self.runtime_config.get_disabled_runtime_checks.return_value = []
@@ -59,6 +61,7 @@ class TestSystemCreateTask:
 
     def teardown(self):
         sys.argv = argv_kiwi_tests
+        self.runtime_checker_patch.stop()
 
     def teardown_method(self, cls):
         self.teardown()
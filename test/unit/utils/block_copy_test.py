@@ -0,0 +1,289 @@
+import os
+import stat
+import errno
+import struct
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from mock import patch
+from pytest import (
+    fixture, raises
+)
+
+from kiwi.utils.block_copy import BlockCopy
+
+from kiwi.exceptions import KiwiBlockCopyError
+
+
+class TestBlockCopy:
+    @fixture(autouse=True)
+    def inject_fixtures(self, caplog):
+        self._caplog = caplog
+
+    def create_sparse_file(self, filename):
+        # 1MB hole, 8k data, 1MB hole, 4k data, 1MB hole
+        with open(filename, 'wb') as sparse:
+            sparse.seek(1048576)
+            sparse.write(b'a' * 8192)
+            sparse.seek(2 * 1048576)
+            sparse.write(b'b' * 4096)
+            sparse.truncate(3 * 1048576 + 4096)
+
+    def read(self, filename):
+        with open(filename, 'rb') as data:
+            return data.read()
+
+    def test_copy(self, tmpdir):
+        source = format(tmpdir.join('source'))
+        target = format(tmpdir.join('target'))
+        self.create_sparse_file(source)
+        with open(target, 'wb') as existing:
+            existing.write(b'x' * 4 * 1048576)
+        with self._caplog.at_level(logging.INFO):
+            assert BlockCopy(source, target).copy() == 3 * 1048576 + 4096
+            assert 'Copied 3 MB from {0} to {1}'.format(
+                source, target
+            ) in self._caplog.text
+        assert self.read(target) == self.read(source)
+        # holes are not written to the target
+        assert os.stat(target).st_blocks * 512 < 1048576
+
+    def fstat_as_block_device(self, *devices):
+        real_fstat = os.fstat
+
+        def fstat(fd):
+            fd_stat = real_fstat(fd)
+            if os.readlink('/proc/self/fd/{0}'.format(fd)) not in devices:
+                return fd_stat
+            return os.stat_result(
+                (stat.S_IFBLK | 0o644,) + tuple(fd_stat)[1:]
+            )
+        return fstat
+
+    def test_copy_to_device_with_old_data(self, tmpdir):
+        source = format(tmpdir.join('source'))
+        device = format(tmpdir.join('device'))
+        self.create_sparse_file(source)
+        with open(device, 'wb') as existing:
+            existing.write(b'x' * 4 * 1048576)
+        with patch(
+            'kiwi.utils.block_copy.BlockCopy._open_target',
+            return_value=os.open(device, os.O_WRONLY)
+        ):
+            with patch('os.fstat', side_effect=self.fstat_as_block_device(
+                device
+            )):
+                assert BlockCopy(source, device).copy() == 3 * 1048576 + 4096
+        # holes of the source are zeroed on the device, data
+        # after the copied range is not touched
+        assert self.read(device) == \
+            self.read(source) + b'x' * (1048576 - 4096)
+
+    def test_copy_to_devices_with_old_data(self, tmpdir):
+        source = format(tmpdir.join('source'))
+        devices = [
+            format(tmpdir.join('device1')), format(tmpdir.join('device2'))
+        ]
+        self.create_sparse_file(source)
+        device_fds = []
+        for device in devices:
+            with open(device, 'wb') as existing:
+                existing.write(b'x' * 4 * 1048576)
+            device_fds.append(os.open(device, os.O_WRONLY))
+        with patch(
+            'kiwi.utils.block_copy.BlockCopy._open_target',
+            side_effect=device_fds
+        ):
+            with patch('os.fstat', side_effect=self.fstat_as_block_device(
+                *devices
+            )):
+                BlockCopy(source, *devices).copy()
+        for device in devices:
+            assert self.read(device)[:3 * 1048576 + 4096] == \
+                self.read(source)
+
+    @patch('fcntl.ioctl')
+    def test_zero_hole_on_block_device(self, mock_ioctl):
+        BlockCopy._zero_hole([42], 4096, 8192)
+        mock_ioctl.assert_called_once_with(
+            42, 0x127F, struct.pack('=QQ', 4096, 4096)
+        )
+        mock_ioctl.reset_mock()
+        BlockCopy._zero_hole([42], 8192, 8192)
+        assert not mock_ioctl.called
+
+    def test_copy_byte_count(self, tmpdir):
+        source = format(tmpdir.join('source'))
+        target = format(tmpdir.join('target'))
+        self.create_sparse_file(source)
+        assert BlockCopy(source, target).copy(
+            byte_count=1048576 + 4096
+        ) == 1048576 + 4096
+        assert self.read(target) == self.read(source)[:1048576 + 4096]
+        # no data in the requested range
+        assert BlockCopy(source, target).copy(byte_count=4096) == 4096
+        assert self.read(target) == bytes(4096)
+        # more bytes than the source provides
+        assert BlockCopy(source, target).copy(
+            byte_count=8 * 1048576
+        ) == 3 * 1048576 + 4096
+
+    def test_copy_not_sparse(self, tmpdir):
+        source = format(tmpdir.join('source'))
+        target = format(tmpdir.join('target'))
+        self.create_sparse_file(source)
+        BlockCopy(source, target).copy(sparse=False)
+        assert self.read(target) == self.read(source)
+
+    @patch('os.sendfile')
+    @patch('os.copy_file_range', create=True)
+    def test_copy_buffered(self, mock_copy_file_range, mock_sendfile, tmpdir):
+        mock_copy_file_range.side_effect = OSError(errno.EXDEV, 'EXDEV')
+        mock_sendfile.side_effect = OSError(errno.EINVAL, 'EINVAL')
+        source = format(tmpdir.join('source'))
+        target = format(tmpdir.join('target'))
+        self.create_sparse_file(source)
+        block_copy = BlockCopy(source, target)
+        block_copy.copy()
+        assert self.read(target) == self.read(source)
+        # unsupported copy methods are only tried once
+        assert mock_copy_file_range.call_count == 1
+        assert mock_sendfile.call_count == 1
+        assert block_copy.buffers == []
+
+    def test_copy_to_targets(self, tmpdir):
+        source = format(tmpdir.join('source'))
+        targets = [
+            format(tmpdir.join('target{0}'.format(count)))
+            for count in range(3)
+        ]
+        self.create_sparse_file(source)
+        with patch('kiwi.defaults.BLOCK_COPY_BUFFER_SIZE', 4096):
+            with patch('os.readv', wraps=os.readv) as mock_readv:
+                assert BlockCopy(source, *targets).copy() == \
+                    3 * 1048576 + 4096
+                # each data block is read once for all targets
+                assert mock_readv.call_count == 3
+        for target in targets:
+            assert self.read(target) == self.read(source)
+
+    def test_copy_to_targets_from_character_device(self, tmpdir):
+        targets = [
+            format(tmpdir.join('target1')), format(tmpdir.join('target2'))
+        ]
+        assert BlockCopy('/dev/zero', *targets).copy(
+            byte_count=4096
+        ) == 4096
+        for target in targets:
+            assert self.read(target) == bytes(4096)
+
+    def test_copy_range_to_targets_pipe(self, tmpdir):
+        targets = [
+            format(tmpdir.join('target1')), format(tmpdir.join('target2'))
+        ]
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b'data')
+        os.close(write_fd)
+        target_fds = [
+            os.open(target, os.O_WRONLY | os.O_CREAT) for target in targets
+        ]
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                assert BlockCopy('pipe', *targets)._copy_range_to_targets(
+                    read_fd, target_fds, 0, None, executor
+                ) == 4
+        finally:
+            for fd in [read_fd] + target_fds:
+                os.close(fd)
+        for target in targets:
+            assert self.read(target) == b'data'
+
+    @patch('os.pwrite')
+    def test_copy_to_targets_raises(self, mock_pwrite, tmpdir):
+        mock_pwrite.side_effect = OSError(errno.ENOSPC, 'ENOSPC')
+        source = format(tmpdir.join('source'))
+        self.create_sparse_file(source)
+        with raises(KiwiBlockCopyError) as issue:
+            BlockCopy(
+                source, format(tmpdir.join('a')), format(tmpdir.join('b'))
+            ).copy()
+        assert 'a, ' in format(issue.value)
+
+    @patch('os.copy_file_range', create=True)
+    def test_copy_sendfile(self, mock_copy_file_range, tmpdir):
+        mock_copy_file_range.side_effect = OSError(errno.ENOSYS, 'ENOSYS')
+        source = format(tmpdir.join('source'))
+        target = format(tmpdir.join('target'))
+        self.create_sparse_file(source)
+        BlockCopy(source, target).copy()
+        assert self.read(target) == self.read(source)
+
+    def test_copy_character_device(self, tmpdir):
+        target = format(tmpdir.join('target'))
+        assert BlockCopy('/dev/zero', target).copy(
+            byte_count=5 * 1048576
+        ) == 5 * 1048576
+        assert self.read(target) == bytes(5 * 1048576)
+
+    def test_copy_range_pipe(self, tmpdir):
+        target = format(tmpdir.join('target'))
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b'data')
+        os.close(write_fd)
+        target_fd = os.open(target, os.O_WRONLY | os.O_CREAT)
+        try:
+            block_copy = BlockCopy('pipe', target)
+            assert block_copy._copy_range(read_fd, target_fd, 0, None) == 4
+            with raises(OSError):
+                block_copy._copy_range(read_fd, target_fd, 42, None)
+        finally:
+            os.close(read_fd)
+            os.close(target_fd)
+        assert self.read(target) == b'data'
+
+    @patch('os.copy_file_range', create=True)
+    def test_copy_range_source_ends(self, mock_copy_file_range):
+        mock_copy_file_range.return_value = 0
+        assert BlockCopy('source', 'target')._copy_range(1, 2, 0, 42) == 0
+
+    @patch('os.sendfile')
+    def test_copy_range_source_ends_sendfile(self, mock_sendfile):
+        mock_sendfile.return_value = 0
+        block_copy = BlockCopy('source', 'target')
+        block_copy.copy_file_range = False
+        with patch('os.lseek'):
+            assert block_copy._copy_range(1, 2, 0, 42) == 0
+
+    @patch('os.copy_file_range', create=True)
+    def test_copy_raises_on_copy_file_range(self, mock_copy_file_range, tmpdir):
+        mock_copy_file_range.side_effect = OSError(errno.EIO, 'EIO')
+        source = format(tmpdir.join('source'))
+        self.create_sparse_file(source)
+        with raises(KiwiBlockCopyError):
+            BlockCopy(source, format(tmpdir.join('target'))).copy()
+
+    @patch('os.sendfile')
+    def test_copy_raises_on_sendfile(self, mock_sendfile, tmpdir):
+        mock_sendfile.side_effect = OSError(errno.ENOSPC, 'ENOSPC')
+        source = format(tmpdir.join('source'))
+        self.create_sparse_file(source)
+        block_copy = BlockCopy(source, format(tmpdir.join('target')))
+        block_copy.copy_file_range = False
+        with raises(KiwiBlockCopyError):
+            block_copy.copy()
+
+    def test_copy_raises_source_not_found(self, tmpdir):
+        with raises(KiwiBlockCopyError):
+            BlockCopy('../data/does-not-exist', format(tmpdir)).copy()
+
+    @patch('time.monotonic')
+    def test_copy_no_duration(self, mock_monotonic, tmpdir):
+        mock_monotonic.return_value = 0
+        target = format(tmpdir.join('target'))
+        with self._caplog.at_level(logging.INFO):
+            BlockCopy('/dev/zero', target).copy(byte_count=4096)
+            assert '0.0 MB/s' in self._caplog.text
+
+    @patch('os.lseek')
+    def test_get_data_segments_unsupported(self, mock_lseek):
+        mock_lseek.side_effect = OSError(errno.EINVAL, 'EINVAL')
+        assert list(BlockCopy._get_data_segments(1, 42)) == [(0, 42)]
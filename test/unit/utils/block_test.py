@@ -7,6 +7,7 @@ from kiwi.utils.block import BlockID
 
 class TestBlockID:
     def setup(self):
+        BlockID.invalidate()
         self.blkid = BlockID('device')
 
     def setup_method(self, cls):
@@ -21,12 +22,43 @@ class TestBlockID:
 
     @patch('kiwi.utils.block.Command.run')
     def test_get_blkid(self, mock_command):
-        self.blkid.get_blkid('LABEL')
+        blkid_call = Mock()
+        blkid_call.output = \
+            'DEVNAME=device\nLABEL=my\\ label\nUUID=uuid\nTYPE=ext4\n'
+        mock_command.return_value = blkid_call
+        assert self.blkid.get_blkid('LABEL') == 'my label'
+        assert self.blkid.get_blkid('UUID') == 'uuid'
+        assert BlockID('device').get_blkid('TYPE') == 'ext4'
+        assert self.blkid.get_blkid('PARTUUID') == ''
+        # the metadata is read once per device
         mock_command.assert_called_once_with(
-            ['blkid', 'device', '-s', 'LABEL', '-o', 'value'],
+            ['blkid', '-o', 'export', 'device'],
             raise_on_error=False
         )
 
+    @patch('kiwi.utils.block.Command.run')
+    def test_get_blkid_failed(self, mock_command):
+        blkid_call = Mock()
+        blkid_call.output = None
+        mock_command.return_value = blkid_call
+        assert self.blkid.get_blkid('LABEL') == ''
+
+    @patch('kiwi.utils.block.Command.run')
+    def test_invalidate(self, mock_command):
+        blkid_call = Mock()
+        blkid_call.output = 'TYPE=ext4\nDEVNAME=device'
+        mock_command.return_value = blkid_call
+        self.blkid.get_filesystem()
+        BlockID('other').get_filesystem()
+        BlockID.invalidate('device')
+        self.blkid.get_filesystem()
+        BlockID('other').get_filesystem()
+        assert mock_command.call_count == 3
+        BlockID.invalidate()
+        self.blkid.get_filesystem()
+        BlockID('other').get_filesystem()
+        assert mock_command.call_count == 5
+
     @patch('kiwi.utils.block.BlockID.get_blkid')
     def test_get_filesystem(self, mock_get_blkid):
         self.blkid.get_filesystem()
@@ -48,3 +80,8 @@ class TestBlockID:
         lsblk_call.output = "NAME TYPE\nsda disk\nsda4 part \nsda3 part"
         mock_Command_run.return_value = lsblk_call
         assert self.blkid.get_partition_count() == 2
+        assert self.blkid.get_partition_count() == 2
+        assert mock_Command_run.call_count == 1
+        BlockID.invalidate('device')
+        assert self.blkid.get_partition_count() == 2
+        assert mock_Command_run.call_count == 2
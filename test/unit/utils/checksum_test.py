@@ -1,16 +1,34 @@
+import gzip
+import lzma
+import io
+import os
+import json
+import errno
+import shutil
+import hashlib
+import logging
 from builtins import bytes
 import encodings.ascii as encoding
 from mock import (
-    patch, call, Mock, mock_open
+    patch, mock_open
 )
-from pytest import raises
+from pytest import (
+    raises, fixture
+)
+import xattr
 
-from kiwi.utils.checksum import Checksum
+from kiwi.utils.checksum import (
+    Checksum, ChecksumWriter
+)
 
 from kiwi.exceptions import KiwiFileNotFound
 
 
 class TestChecksum:
+    @fixture(autouse=True)
+    def inject_fixtures(self, caplog):
+        self._caplog = caplog
+
     @patch('os.path.exists')
     def setup(self, mock_exists):
         self.ascii = encoding.getregentry().name
@@ -55,126 +73,211 @@ class TestChecksum:
         with patch('builtins.open', self.m_open, create=True):
             assert self.checksum.matches('foo', 'some-file') is False
 
-    @patch('kiwi.path.Path.which')
-    @patch('kiwi.utils.checksum.Compress')
-    @patch('hashlib.md5')
-    @patch('os.path.getsize')
-    def test_md5_xz(self, mock_size, mock_md5, mock_compress, mock_which):
-        checksum = Mock
-        checksum.uncompressed_filename = 'some-file-uncompressed'
-        mock_which.return_value = 'factor'
-        compress = Mock()
-        digest = Mock()
-        digest.block_size = 1024
-        digest._calculate_hash_hexdigest = Mock(
-            return_value=checksum
-        )
-        digest.hexdigest = Mock(
-            return_value='sum'
-        )
-        compress.get_format = Mock(
-            return_value='xz'
-        )
-        mock_size.return_value = 1343225856
-        mock_md5.return_value = digest
-        mock_compress.return_value = compress
+    def test_calculate(self, tmpdir):
+        source = tmpdir.join('source')
+        source.write_binary(b'data' * 1000)
+        checksum = Checksum(format(source))
+        with patch('kiwi.defaults.CHECKSUM_BUFFER_SIZE', 1024):
+            result = checksum.calculate()
+        assert result.hexdigests == {
+            'md5': hashlib.md5(b'data' * 1000).hexdigest(),
+            'sha256': hashlib.sha256(b'data' * 1000).hexdigest()
+        }
+        assert result.size == 4000
+        assert result.blocksize == 4000
+        assert result.blocks == 1
+        result = checksum.calculate(['sha512', 'blake2b'])
+        assert result.hexdigests == {
+            'sha512': hashlib.sha512(b'data' * 1000).hexdigest(),
+            'blake2b': hashlib.blake2b(b'data' * 1000).hexdigest()
+        }
 
-        with patch('builtins.open', self.m_open, create=True):
-            self.checksum.md5('outfile')
-
-        assert self.m_open.call_args_list == [
-            call('some-file', 'rb'),
-            call('some-file-uncompressed', 'rb'),
-            call('outfile', encoding=self.ascii, mode='w')
-        ]
-        self.m_open.return_value.write.assert_called_once_with(
-            'sum 163968 8192 163968 8192\n'
-        )
+    @patch('kiwi.utils.checksum.RuntimeConfig')
+    def test_calculate_cached(self, mock_RuntimeConfig, tmpdir):
+        mock_RuntimeConfig.return_value.get_checksum_cache.return_value = True
+        source = tmpdir.join('source')
+        source.write_binary(b'data' * 1000)
+        os.utime(format(source), ns=(0, 42))
+        checksum = Checksum(format(source), cache=True)
+        assert checksum.calculate(['md5']).hexdigests == {
+            'md5': hashlib.md5(b'data' * 1000).hexdigest()
+        }
+        source_stat = os.stat(format(source))
+        assert json.loads(
+            xattr.getxattr(format(source), 'user.kiwi.checksum')
+        ) == {
+            'key': [
+                source_stat.st_dev, source_stat.st_ino, 4000, 42
+            ],
+            'data': {
+                'hexdigests': {
+                    'md5': hashlib.md5(b'data' * 1000).hexdigest()
+                },
+                'size': 4000
+            }
+        }
+        with patch('builtins.open', wraps=open) as mock_open_file:
+            # only the missing digest is calculated
+            result = checksum.calculate(['md5', 'sha256'])
+            assert mock_open_file.call_count == 1
+            result = checksum.calculate(['sha256', 'md5'])
+            assert mock_open_file.call_count == 1
+        assert result.hexdigests == {
+            'md5': hashlib.md5(b'data' * 1000).hexdigest(),
+            'sha256': hashlib.sha256(b'data' * 1000).hexdigest()
+        }
+        assert result.size == 4000
+        assert result.blocks == 1
 
-    @patch('kiwi.path.Path.which')
-    @patch('kiwi.utils.checksum.Compress')
-    @patch('hashlib.md5')
-    @patch('os.path.getsize')
-    def test_md5(
-        self, mock_size, mock_md5, mock_compress, mock_which
+        # the verify mode reads the data
+        with patch('builtins.open', wraps=open) as mock_open_file:
+            Checksum(
+                format(source), verify=True, cache=True
+            ).calculate(['md5'])
+            assert mock_open_file.call_count == 1
+
+        # a copy keeps the extended attribute but is another inode
+        shutil.copy2(format(source), format(tmpdir.join('copy')))
+        with patch('builtins.open', wraps=open) as mock_open_file:
+            Checksum(format(tmpdir.join('copy')), cache=True).calculate(['md5'])
+            assert mock_open_file.call_count == 1
+
+        # a modification of the data changes the modification time
+        source.write_binary(b'atad' * 1000)
+        assert Checksum(format(source), cache=True).calculate(['md5']).hexdigests == {
+            'md5': hashlib.md5(b'atad' * 1000).hexdigest()
+        }
+
+    @patch('kiwi.utils.checksum.RuntimeConfig')
+    def test_calculate_cache_invalid(self, mock_RuntimeConfig, tmpdir):
+        mock_RuntimeConfig.return_value.get_checksum_cache.return_value = True
+        source = tmpdir.join('source')
+        source.write_binary(b'data')
+        for value in (b'foo', b'[]', b'{"key": null}'):
+            xattr.setxattr(format(source), 'user.kiwi.checksum', value)
+            assert Checksum(format(source), cache=True).sha256() == \
+                hashlib.sha256(b'data').hexdigest()
+
+    @patch('kiwi.utils.checksum.RuntimeConfig')
+    @patch('xattr.setxattr')
+    def test_calculate_cache_not_supported(
+        self, mock_setxattr, mock_RuntimeConfig, tmpdir
     ):
-        mock_which.return_value = 'factor'
-        compress = Mock()
-        digest = Mock()
-        digest.block_size = 1024
-        digest.hexdigest = Mock(
-            return_value='sum'
-        )
-        compress.get_format = Mock(
-            return_value=None
-        )
-        mock_size.return_value = 1343225856
-        mock_md5.return_value = digest
-        mock_compress.return_value = compress
+        mock_RuntimeConfig.return_value.get_checksum_cache.return_value = True
+        mock_setxattr.side_effect = OSError(errno.EOPNOTSUPP, 'EOPNOTSUPP')
+        source = tmpdir.join('source')
+        source.write_binary(b'data')
+        with self._caplog.at_level(logging.DEBUG):
+            assert Checksum(format(source), cache=True).md5() == \
+                hashlib.md5(b'data').hexdigest()
+            assert 'Checksum cache for {0} not stored'.format(source) in \
+                self._caplog.text
 
-        with patch('builtins.open', self.m_open, create=True):
-            self.checksum.md5('outfile')
-
-        assert self.m_open.call_args_list == [
-            call('some-file', 'rb'),
-            call('outfile', encoding=self.ascii, mode='w')
-        ]
-        self.m_open.return_value.write.assert_called_once_with(
-            'sum 163968 8192\n'
+    def test_calculate_cache_off(self, tmpdir):
+        source = tmpdir.join('source')
+        source.write_binary(b'data')
+        with patch('kiwi.utils.checksum.RuntimeConfig') as mock_RuntimeConfig:
+            mock_RuntimeConfig.return_value.get_checksum_cache.return_value = \
+                False
+            Checksum(format(source), cache=True).md5()
+            # the cache is only used if requested by the caller
+            mock_RuntimeConfig.return_value.get_checksum_cache.return_value = \
+                True
+            Checksum(format(source)).md5()
+        with raises(OSError):
+            xattr.getxattr(format(source), 'user.kiwi.checksum')
+
+    @patch('kiwi.utils.checksum.RuntimeConfig')
+    def test_md5_xz_cached(self, mock_RuntimeConfig, tmpdir):
+        mock_RuntimeConfig.return_value.get_checksum_cache.return_value = True
+        source = tmpdir.join('source.xz')
+        source.write_binary(lzma.compress(b'x' * 16384))
+        Checksum(format(source), cache=True).md5(format(tmpdir.join('outfile')))
+        with patch('kiwi.utils.checksum.Compress') as mock_Compress:
+            mock_Compress.return_value.get_format.return_value = 'xz'
+            Checksum(format(source), cache=True).md5(format(tmpdir.join('cached')))
+            # the uncompressed data is not read again
+            assert not mock_Compress.return_value.open_uncompressed.called
+        assert tmpdir.join('cached').read() == tmpdir.join('outfile').read()
+
+    def test_md5_xz(self, tmpdir):
+        source = tmpdir.join('source.xz')
+        source.write_binary(lzma.compress(b'x' * 16384))
+        outfile = tmpdir.join('outfile')
+
+        checksum = Checksum(format(source))
+        with patch('kiwi.utils.compress.Temporary') as mock_Temporary:
+            assert checksum.md5(format(outfile)) == \
+                hashlib.md5(source.read_binary()).hexdigest()
+            # the uncompressed data is not written to a file
+            assert not mock_Temporary.called
+
+        assert outfile.read() == '{0} 2 8192 {1} {2}\n'.format(
+            hashlib.md5(b'x' * 16384).hexdigest(),
+            checksum._block_list(source.size()).blocks,
+            checksum._block_list(source.size()).blocksize
         )
 
-    @patch('kiwi.path.Path.which')
+    def test_sha256_gzip(self, tmpdir):
+        source = tmpdir.join('source.gz')
+        source.write_binary(gzip.compress(b'x' * 16384))
+        outfile = tmpdir.join('outfile')
+
+        checksum = Checksum(format(source))
+        with patch('kiwi.defaults.CHECKSUM_BUFFER_SIZE', 1024):
+            checksum.sha256(format(outfile))
+
+        assert outfile.read().startswith('{0} 2 8192 '.format(
+            hashlib.md5(b'x' * 16384).hexdigest()
+        ))
+
     @patch('kiwi.utils.checksum.Compress')
-    @patch('hashlib.sha256')
-    @patch('os.path.getsize')
-    def test_sha256(
-        self, mock_size, mock_sha256, mock_compress, mock_which
-    ):
-        mock_which.return_value = 'factor'
-        compress = Mock()
-        digest = Mock()
-        digest.block_size = 1024
-        digest.hexdigest = Mock(
-            return_value='sum'
-        )
-        compress.get_format = Mock(
-            return_value=None
-        )
-        mock_size.return_value = 1343225856
-        mock_sha256.return_value = digest
-        mock_compress.return_value = compress
+    def test_md5(self, mock_Compress, tmpdir):
+        source = tmpdir.join('source')
+        source.write_binary(b'x' * 16384)
+        outfile = tmpdir.join('outfile')
+        mock_Compress.return_value.get_format.return_value = None
 
-        with patch('builtins.open', self.m_open, create=True):
-            self.checksum.sha256('outfile')
-
-        assert self.m_open.call_args_list == [
-            call('some-file', 'rb'),
-            call('outfile', encoding=self.ascii, mode='w')
-        ]
-        self.m_open.return_value.write.assert_called_once_with(
-            'sum 163968 8192\n'
-        )
+        checksum = Checksum(format(source))
+        md5_checksum = checksum.md5(format(outfile))
 
-    @patch('hashlib.sha256')
-    def test_sha256_plain(self, mock_sha256):
-        digest = Mock()
-        digest.block_size = 1024
-        digest.hexdigest = Mock(
-            return_value='sum'
-        )
-        mock_sha256.return_value = digest
+        assert md5_checksum == hashlib.md5(b'x' * 16384).hexdigest()
+        assert outfile.read() == '{0} 2 8192\n'.format(md5_checksum)
 
-        with patch('builtins.open', self.m_open, create=True):
-            assert self.checksum.sha256() == digest.hexdigest.return_value
-
-    @patch('hashlib.md5')
-    def test_md5_plain(self, mock_md5):
-        digest = Mock()
-        digest.block_size = 1024
-        digest.hexdigest = Mock(
-            return_value='sum'
-        )
-        mock_md5.return_value = digest
+    @patch('kiwi.utils.checksum.Compress')
+    def test_sha256(self, mock_Compress, tmpdir):
+        source = tmpdir.join('source')
+        source.write_binary(b'x' * 16384)
+        outfile = tmpdir.join('outfile')
+        mock_Compress.return_value.get_format.return_value = None
 
-        with patch('builtins.open', self.m_open, create=True):
-            assert self.checksum.md5() == digest.hexdigest.return_value
+        checksum = Checksum(format(source))
+        sha256_checksum = checksum.sha256(format(outfile))
+
+        assert sha256_checksum == hashlib.sha256(b'x' * 16384).hexdigest()
+        assert outfile.read() == '{0} 2 8192\n'.format(sha256_checksum)
+
+    def test_sha256_plain(self, tmpdir):
+        source = tmpdir.join('source')
+        source.write_binary(b'data')
+        assert Checksum(format(source)).sha256() == \
+            hashlib.sha256(b'data').hexdigest()
+
+    def test_md5_plain(self, tmpdir):
+        source = tmpdir.join('source')
+        source.write_binary(b'data')
+        assert Checksum(format(source)).md5() == \
+            hashlib.md5(b'data').hexdigest()
+
+    def test_checksum_writer(self):
+        digests = [hashlib.md5(), hashlib.sha256()]
+        targets = [io.BytesIO(), io.BytesIO()]
+        writer = ChecksumWriter(digests, targets)
+        assert writer.writable() is True
+        assert writer.write(b'da') == 2
+        assert writer.write(b'ta') == 2
+        assert writer.size == 4
+        assert digests[0].hexdigest() == hashlib.md5(b'data').hexdigest()
+        assert digests[1].hexdigest() == hashlib.sha256(b'data').hexdigest()
+        for target in targets:
+            assert target.getvalue() == b'data'
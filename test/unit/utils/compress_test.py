@@ -1,14 +1,27 @@
+import io
+import os
+import gzip
+import lzma
+import time
 import logging
-from mock import (
-    patch, Mock
-)
+import subprocess
+from mock import patch
 from pytest import (
     raises, fixture
 )
 
-from kiwi.utils.compress import Compress
+from kiwi.utils.compress import (
+    Compress,
+    CompressCodecBase,
+    CompressCodecGzip,
+    CompressCodecLzma,
+    CompressCodecTool
+)
 
 from kiwi.exceptions import (
+    KiwiCommandError,
+    KiwiCommandNotFound,
+    KiwiCompressionError,
     KiwiFileNotFound,
     KiwiCompressionFormatUnknown
 )
@@ -19,98 +32,361 @@ class TestCompress:
     def inject_fixtures(self, caplog):
         self._caplog = caplog
 
-    @patch('os.path.exists')
-    def setup(self, mock_exists):
-        mock_exists.return_value = True
-        self.compress = Compress('some-file', True)
+    def setup(self):
+        self.runtime_config_patch = patch('kiwi.utils.compress.RuntimeConfig')
+        self.runtime_config = self.runtime_config_patch.start()
+        self.runtime_config.return_value.get_compress_codec.return_value = \
+            'tool'
 
-    @patch('os.path.exists')
-    def setup_method(self, cls, mock_exists):
+    def setup_method(self, cls):
         self.setup()
 
+    def teardown(self):
+        self.runtime_config_patch.stop()
+
+    def teardown_method(self, cls):
+        self.teardown()
+
+    def create_source(self, tmpdir, name='some-file'):
+        source = tmpdir.join(name)
+        source.write_binary(b'data' * 1000)
+        return format(source)
+
+    def use_python_codec(self):
+        self.runtime_config.return_value.get_compress_codec.return_value = \
+            'python'
+
     def test_source_file_not_found(self):
         with raises(KiwiFileNotFound):
             Compress('some-file')
 
-    @patch('kiwi.command.Command.run')
-    def test_xz(self, mock_command):
-        assert self.compress.xz() == 'some-file.xz'
-        mock_command.assert_called_once_with(
-            [
-                'xz', '-f', '--threads=0', '--keep',
-                'some-file'
+    def test_get_codec(self):
+        assert isinstance(Compress.get_codec('xz'), CompressCodecTool)
+        assert isinstance(Compress.get_codec('gzip'), CompressCodecTool)
+        self.use_python_codec()
+        assert isinstance(Compress.get_codec('xz'), CompressCodecLzma)
+        assert isinstance(Compress.get_codec('gzip'), CompressCodecGzip)
+        # no python module for zstd
+        assert isinstance(Compress.get_codec('zstd'), CompressCodecTool)
+        with raises(KiwiCompressionFormatUnknown):
+            Compress.get_codec('foo')
+
+    @patch('kiwi.utils.compress.Path.which')
+    def test_get_codec_tool(self, mock_which):
+        mock_which.side_effect = lambda tool, access_mode: tool == 'gzip'
+        assert Compress.get_codec('gzip').tool == 'gzip'
+        mock_which.side_effect = None
+        mock_which.return_value = '/usr/bin/pigz'
+        assert Compress.get_codec('gzip').tool == 'pigz'
+
+    @patch('kiwi.utils.compress.Path.which')
+    def test_get_codec_tool_not_found(self, mock_which, tmpdir):
+        mock_which.return_value = None
+        with raises(KiwiCommandNotFound):
+            Compress(self.create_source(tmpdir)).xz()
+
+    def test_xz(self, tmpdir):
+        source = self.create_source(tmpdir)
+        os.chmod(source, 0o600)
+        compress = Compress(source, True)
+        with patch('subprocess.Popen', wraps=subprocess.Popen) as mock_Popen:
+            assert compress.xz() == source + '.xz'
+            assert mock_Popen.call_args[0][0] == [
+                'xz', '-c', '--threads=0'
             ]
-        )
-        assert self.compress.compressed_filename == 'some-file.xz'
-
-    @patch('kiwi.command.Command.run')
-    def test_xz_with_custom_options(self, mock_command):
-        assert self.compress.xz(options=['foo', 'bar']) == 'some-file.xz'
-        mock_command.assert_called_once_with(
-            [
-                'xz', '-f', 'foo', 'bar', '--keep',
-                'some-file'
+        assert compress.compressed_filename == source + '.xz'
+        assert lzma.decompress(tmpdir.join('some-file.xz').read_binary()) == \
+            b'data' * 1000
+        assert os.stat(source + '.xz').st_mode & 0o777 == 0o600
+        assert os.path.exists(source)
+
+    def test_xz_with_custom_options(self, tmpdir):
+        source = self.create_source(tmpdir)
+        compress = Compress(source)
+        with patch('subprocess.Popen', wraps=subprocess.Popen) as mock_Popen:
+            assert compress.xz(options=['-1', '--check=crc32']) == \
+                source + '.xz'
+            assert mock_Popen.call_args[0][0] == [
+                'xz', '-c', '-1', '--check=crc32'
             ]
-        )
-        assert self.compress.compressed_filename == 'some-file.xz'
+        assert not os.path.exists(source)
 
-    @patch('kiwi.command.Command.run')
-    def test_gzip(self, mock_command):
-        assert self.compress.gzip() == 'some-file.gz'
-        mock_command.assert_called_once_with(
-            ['gzip', '-f', '-9', '--keep', 'some-file']
-        )
-        assert self.compress.compressed_filename == 'some-file.gz'
-
-    @patch('kiwi.command.Command.run')
-    @patch('kiwi.utils.compress.Temporary.new_file')
-    @patch('kiwi.utils.compress.Compress.get_format')
-    def test_uncompress(self, mock_format, mock_temp, mock_command):
-        mock_format.return_value = 'xz'
-        self.compress.uncompress()
-        mock_command.assert_called_once_with(
-            ['xz', '-d', 'some-file']
-        )
-        assert self.compress.uncompressed_filename == 'some-file'
-
-    @patch('kiwi.command.Command.run')
-    @patch('kiwi.utils.compress.Temporary.new_file')
-    @patch('kiwi.utils.compress.Compress.get_format')
-    def test_uncompress_temporary(self, mock_format, mock_temp, mock_command):
-        tempfile = Mock()
-        tempfile.name = 'tempfile'
-        mock_temp.return_value = tempfile
-        mock_format.return_value = 'xz'
-        self.compress.uncompress(temporary=True)
-        mock_command.assert_called_once_with(
-            ['bash', '-c', 'xz -c -d some-file > tempfile']
+    def test_zstd(self, tmpdir):
+        source = self.create_source(tmpdir)
+        compress = Compress(source)
+        with patch('subprocess.Popen', wraps=subprocess.Popen) as mock_Popen:
+            assert compress.zstd() == source + '.zst'
+            assert mock_Popen.call_args[0][0] == [
+                'zstd', '-c', '--threads=0', '--long=27', '-10'
+            ]
+        assert compress.compressed_filename == source + '.zst'
+        assert not os.path.exists(source)
+        # long distance matching is uncompressed without extra options
+        assert subprocess.run(
+            ['zstd', '-d', '-c', source + '.zst'],
+            stdout=subprocess.PIPE, check=True
+        ).stdout == b'data' * 1000
+        compress = Compress(source + '.zst')
+        assert compress.get_format() == 'zstd'
+        assert compress.uncompress() == source
+        Compress(source).zstd(['-1'])
+        with Compress(source + '.zst').open_uncompressed() as data:
+            assert data.read() == b'data' * 1000
+
+    def test_xz_python(self, tmpdir):
+        self.use_python_codec()
+        source = self.create_source(tmpdir)
+        compress = Compress(source)
+        with self._caplog.at_level(logging.WARNING):
+            compress.xz(
+                [
+                    '-9', '-e', '--check=crc32', '--lzma2=dict=1MiB',
+                    '--threads=0', '-T0', '--foo'
+                ]
+            )
+            assert 'Ignoring xz option --foo' in self._caplog.text
+        with lzma.open(source + '.xz') as xz:
+            assert xz.read() == b'data' * 1000
+            assert xz._buffer.raw._decompressor.check == lzma.CHECK_CRC32
+        Compress(source + '.xz').uncompress()
+        Compress(source, True).xz(['-1'])
+        assert lzma.decompress(tmpdir.join('some-file.xz').read_binary()) == \
+            b'data' * 1000
+
+    def test_xz_python_invalid_dict_size(self, tmpdir):
+        self.use_python_codec()
+        with raises(KiwiCompressionError):
+            Compress(self.create_source(tmpdir)).xz(['--lzma2=dict=1XB'])
+
+    def test_gzip(self, tmpdir):
+        source = self.create_source(tmpdir)
+        compress = Compress(source)
+        assert compress.gzip() == source + '.gz'
+        assert compress.compressed_filename == source + '.gz'
+        assert gzip.decompress(tmpdir.join('some-file.gz').read_binary()) == \
+            b'data' * 1000
+        assert not os.path.exists(source)
+
+    def test_gzip_python(self, tmpdir):
+        self.use_python_codec()
+        source = self.create_source(tmpdir)
+        assert Compress(source).gzip() == source + '.gz'
+        assert gzip.decompress(tmpdir.join('some-file.gz').read_binary()) == \
+            b'data' * 1000
+        with self._caplog.at_level(logging.WARNING):
+            with Compress.get_codec('gzip').open_writer(
+                source, ['-1', '--rsyncable']
+            ) as writer:
+                writer.write(b'data')
+            assert 'Ignoring gzip option --rsyncable' in self._caplog.text
+        assert gzip.decompress(tmpdir.join('some-file').read_binary()) == \
+            b'data'
+
+    def test_uncompress(self, tmpdir):
+        source = self.create_source(tmpdir)
+        compressed = Compress(source).xz()
+        compress = Compress(compressed)
+        assert compress.uncompress() == source
+        assert compress.uncompressed_filename == source
+        assert tmpdir.join('some-file').read_binary() == b'data' * 1000
+        assert not os.path.exists(compressed)
+
+    def test_uncompress_without_suffix(self, tmpdir):
+        source = self.create_source(tmpdir)
+        os.rename(Compress(source).gzip(), source)
+        assert Compress(source).uncompress() == source
+        assert tmpdir.join('some-file').read_binary() == b'data' * 1000
+
+    def test_uncompress_temporary(self, tmpdir):
+        source = self.create_source(tmpdir)
+        compress = Compress(Compress(source).xz())
+        uncompressed = compress.uncompress(temporary=True)
+        assert uncompressed == compress.temp_file.name
+        with open(uncompressed, 'rb') as data:
+            assert data.read() == b'data' * 1000
+
+    def test_uncompress_unknown_format(self, tmpdir):
+        with raises(KiwiCompressionFormatUnknown):
+            Compress(self.create_source(tmpdir)).uncompress()
+
+    def test_uncompress_failed(self, tmpdir):
+        zstd = tmpdir.join('data.zst')
+        zstd.write_binary(b'\x28\xb5\x2f\xfd' + b'data')
+        with raises(KiwiCompressionError):
+            Compress(format(zstd)).uncompress(temporary=True)
+
+    def test_get_format(self, tmpdir):
+        assert Compress('../data/xz_data.xz').get_format() == 'xz'
+        assert Compress('../data/gz_data.gz').get_format() == 'gzip'
+        zstd = tmpdir.join('data.zst')
+        zstd.write_binary(b'\x28\xb5\x2f\xfd' + b'data')
+        assert Compress(format(zstd)).get_format() == 'zstd'
+        assert Compress(self.create_source(tmpdir)).get_format() is None
+
+    def test_open_uncompressed(self, tmpdir):
+        source = self.create_source(tmpdir)
+        xz = tmpdir.join('data.xz')
+        xz.write_binary(lzma.compress(b'data' * 1000))
+        gz = tmpdir.join('data.gz')
+        gz.write_binary(gzip.compress(b'data' * 1000))
+        zstd = tmpdir.join('data.zst')
+        subprocess.run(
+            ['zstd', '-q', '-o', format(zstd), source], check=True
         )
-        assert self.compress.uncompressed_filename == 'tempfile'
+        for codec in ('tool', 'python'):
+            self.runtime_config.return_value.get_compress_codec.return_value = \
+                codec
+            for compressed in (xz, gz, zstd):
+                with Compress(format(compressed)).open_uncompressed() as data:
+                    assert data.read() == b'data' * 1000
+
+    def test_open_uncompressed_failed(self, tmpdir):
+        zstd = tmpdir.join('data.zst')
+        zstd.write_binary(b'\x28\xb5\x2f\xfd' + b'data')
+        with raises(KiwiCompressionError):
+            with Compress(format(zstd)).open_uncompressed() as stream:
+                stream.read()
+
+    def test_open_uncompressed_interrupted(self, tmpdir):
+        xz = tmpdir.join('data.xz')
+        xz.write_binary(lzma.compress(os.urandom(1048576) * 16))
+        processes = []
+        popen = subprocess.Popen
 
-    @patch('kiwi.utils.compress.Compress.get_format')
-    def test_uncompress_unknown_format(self, mock_format):
-        mock_format.return_value = None
+        def track_popen(*args, **kwargs):
+            processes.append(popen(*args, **kwargs))
+            return processes[-1]
+
+        with patch('subprocess.Popen', side_effect=track_popen):
+            with raises(KeyError):
+                with Compress(format(xz)).open_uncompressed() as stream:
+                    stream.read(4096)
+                    raise KeyError('consumer failed')
+        process = processes[0]
+        assert process.returncode is not None
+        assert process.stderr.closed
+
+    def test_open_uncompressed_unknown_format(self, tmpdir):
         with raises(KiwiCompressionFormatUnknown):
-            self.compress.uncompress()
-
-    @patch('kiwi.path.Path.which')
-    def test_get_format(self, mock_which):
-        mock_which.return_value = 'ziptool'
-        xz = Compress('../data/xz_data.xz')
-        assert xz.get_format() == 'xz'
-        gzip = Compress('../data/gz_data.gz')
-        assert gzip.get_format() == 'gzip'
-
-    @patch('kiwi.command.Command.run')
-    def test_get_format_invalid_format(self, mock_run):
-        mock_run.side_effect = ValueError("nothing")
-        invalid = Compress("../data/gz_data.gz")
-        invalid.supported_zipper = ["mock_zip"]
-
-        with self._caplog.at_level(logging.DEBUG):
-            assert invalid.get_format() is None
-            mock_run.assert_called_once_with(
-                ['mock_zip', '-l', '../data/gz_data.gz']
+            with Compress(self.create_source(tmpdir)).open_uncompressed():
+                pass
+
+    def test_open_writer(self, tmpdir):
+        target = format(tmpdir.join('data.zst'))
+        with Compress.get_codec('zstd').open_writer(target) as writer:
+            writer.write(b'data' * 1000)
+        with Compress(target).open_uncompressed() as data:
+            assert data.read() == b'data' * 1000
+
+    def test_open_writer_stream(self, tmpdir):
+        target = io.BytesIO()
+        with Compress.get_codec('xz').open_writer(target, ['-1']) as writer:
+            writer.write(b'data' * 1000)
+        assert lzma.decompress(target.getvalue()) == b'data' * 1000
+
+    def test_open_writer_tool_stopped(self, tmpdir):
+        target = format(tmpdir.join('data.xz'))
+        codec = Compress.get_codec('xz')
+        codec.tool = 'false'
+        with raises(KiwiCompressionError):
+            with codec.open_writer(target) as writer:
+                writer.write(os.urandom(1048576))
+        # a tool exiting successfully without reading all data
+        codec.tool = 'true'
+        with raises(BrokenPipeError):
+            with codec.open_writer(target) as writer:
+                writer.write(os.urandom(1048576))
+        with raises(BrokenPipeError):
+            with codec.open_writer(target) as writer:
+                writer.write(b'data')
+                time.sleep(0.5)
+
+    def test_compress_to_stream(self, tmpdir):
+        source = self.create_source(tmpdir)
+        for codec in ('tool', 'python'):
+            self.runtime_config.return_value.get_compress_codec.return_value = \
+                codec
+            target = io.BytesIO()
+            Compress.get_codec('xz').compress_to_stream(source, target, ['-1'])
+            assert lzma.decompress(target.getvalue()) == b'data' * 1000
+            target = io.BytesIO()
+            Compress.get_codec('gzip').compress_to_stream(source, target)
+            assert gzip.decompress(target.getvalue()) == b'data' * 1000
+
+    def test_compress_to_stream_failed(self, tmpdir):
+        with raises(KiwiCompressionError):
+            Compress.get_codec('xz').compress_to_stream(
+                self.create_source(tmpdir), io.BytesIO(), ['--foo']
+            )
+
+    def test_compress_command(self, tmpdir):
+        source = self.create_source(tmpdir)
+        for codec in ('tool', 'python'):
+            self.runtime_config.return_value.get_compress_codec.return_value = \
+                codec
+            target = format(tmpdir.join('{0}.xz'.format(codec)))
+            Compress.get_codec('xz').compress_command(['cat', source], target)
+            with Compress(target).open_uncompressed() as data:
+                assert data.read() == b'data' * 1000
+
+    def test_compress_command_failed(self, tmpdir):
+        with raises(KiwiCommandError) as issue:
+            Compress.get_codec('xz').compress_command(
+                ['cat', format(tmpdir.join('missing'))],
+                format(tmpdir.join('target.xz'))
+            )
+        assert 'No such file or directory' in format(issue.value)
+
+    def test_compress_bytes(self):
+        for codec in ('tool', 'python'):
+            self.runtime_config.return_value.get_compress_codec.return_value = \
+                codec
+            for zipper in ('xz', 'gzip', 'zstd'):
+                compress_codec = Compress.get_codec(zipper)
+                compressed = compress_codec.compress_bytes(b'data' * 1000)
+                assert compressed != b'data' * 1000
+                assert compress_codec.uncompress_bytes(compressed) == \
+                    b'data' * 1000
+
+    def test_compress_bytes_failed(self):
+        with raises(KiwiCompressionError):
+            Compress.get_codec('xz').compress_bytes(b'data', ['--foo'])
+
+    def test_uncompress_command(self, tmpdir):
+        source = self.create_source(tmpdir)
+        target = format(tmpdir.join('target'))
+        for codec in ('tool', 'python'):
+            self.runtime_config.return_value.get_compress_codec.return_value = \
+                codec
+            Compress(source, True).xz(['-1'])
+            Compress.get_codec('xz').uncompress_command(
+                ['dd', 'of=' + target], source + '.xz'
+            )
+            assert tmpdir.join('target').read_binary() == b'data' * 1000
+
+    def test_uncompress_command_failed(self, tmpdir):
+        source = tmpdir.join('some-file')
+        # more data than the pipe takes without being read
+        source.write_binary(os.urandom(1048576))
+        source = format(source)
+        Compress(source).gzip()
+        with raises(KiwiCommandError) as issue:
+            Compress.get_codec('gzip').uncompress_command(
+                ['bash', '-c', 'echo failed >&2; exit 1'], source + '.gz'
+            )
+        assert 'failed' in format(issue.value)
+        with raises(KiwiCommandNotFound):
+            Compress.get_codec('gzip').uncompress_command(
+                ['does-not-exist'], source + '.gz'
             )
-            assert 'Error running "mock_zip -l ../data/gz_data.gz", got a'
-            ' ValueError: nothing' in self._caplog.text
+
+    def test_codec_base(self, tmpdir):
+        codec = CompressCodecBase('xz')
+        with raises(NotImplementedError):
+            with codec.open_reader('file'):
+                pass
+        with raises(NotImplementedError):
+            with codec.open_writer('file'):
+                pass
+        with raises(NotImplementedError):
+            codec.uncompress_bytes(b'data')
@@ -123,6 +123,22 @@ class TestVolumeManagerBase:
             'ext3'
         ) == 272
 
+    @patch('kiwi.volume_manager.base.SystemSize')
+    @patch('os.path.exists')
+    def test_get_volume_mbsize_from_root_size(
+        self, mock_os_path_exists, mock_size
+    ):
+        mock_os_path_exists.return_value = True
+        root_size = Mock()
+        root_size.get_subtree.return_value.customize.return_value = 42
+        self.volume_manager.custom_args['root_size'] = root_size
+        assert self.volume_manager.get_volume_mbsize(
+            self.volume_manager.volumes[0], self.volume_manager.volumes,
+            'ext3'
+        ) == 272
+        root_size.get_subtree.assert_called_once_with('root_dir/etc')
+        assert not mock_size.called
+
     @patch('kiwi.volume_manager.base.SystemSize')
     @patch('os.path.exists')
     def test_get_volume_mbsize_for_oem_type(
@@ -247,10 +247,11 @@ class TestVolumeManagerBtrfs:
             }
         }
 
+    @patch.dict('kiwi.utils.block.BlockID._blkid_cache', clear=True)
     @patch('kiwi.volume_manager.btrfs.Command.run')
     def test_get_fstab(self, mock_command):
         blkid_result = Mock()
-        blkid_result.output = 'id'
+        blkid_result.output = 'LABEL=id'
         mock_command.return_value = blkid_result
         volume_mount = Mock()
         volume_mount.mountpoint = \
@@ -356,6 +357,7 @@ class TestVolumeManagerBtrfs:
         volume_mount.is_mounted.assert_called_once_with()
         volume_mount.umount.assert_called_once_with()
         self.volume_manager.toplevel_mount.is_mounted.assert_called_once_with()
+        self.volume_manager.toplevel_mount.trim.assert_called_once_with()
         self.volume_manager.toplevel_mount.umount.assert_called_once_with()
 
     def test_umount_sub_volumes_busy(self):
@@ -314,6 +314,7 @@ class TestVolumeManagerLVM:
         volume_mount.mountpoint = 'volume_mount_point'
         self.volume_manager.mount_list = [volume_mount]
         assert self.volume_manager.umount_volumes() is True
+        volume_mount.trim.assert_called_once_with()
         volume_mount.umount.assert_called_once_with()
 
     def test_get_volumes(self):
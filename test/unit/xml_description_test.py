@@ -1,12 +1,18 @@
+import logging
 from mock import patch
 import mock
 from builtins import bytes
 from lxml import etree
-from pytest import raises
+from pytest import (
+    raises, fixture
+)
 from collections import namedtuple
 from kiwi.utils.temporary import Temporary
+from kiwi.defaults import Defaults
 
-from kiwi.xml_description import XMLDescription
+from kiwi.xml_description import (
+    XMLDescription, SCHEMA_VALIDATORS
+)
 
 from kiwi.exceptions import (
     KiwiCommandError,
@@ -20,7 +26,12 @@ from kiwi.exceptions import (
 
 
 class TestSchema:
+    @fixture(autouse=True)
+    def inject_fixtures(self, caplog):
+        self._caplog = caplog
+
     def setup(self):
+        SCHEMA_VALIDATORS.clear()
         test_xml = bytes(
             b"""<?xml version="1.0" encoding="utf-8"?>
             <image schemaversion="1.4" name="bob">
@@ -293,10 +304,48 @@ class TestSchema:
         with raises(KiwiDescriptionInvalid):
             self.description_from_data.load()
 
+    @patch('lxml.etree.parse')
+    def test_load_description_parse_error(self, mock_parse):
+        mock_parse.side_effect = Exception('XMLSyntaxError')
+        with raises(KiwiValidationError):
+            self.description_from_file.load()
+
+    def test_get_schema_validators_cached(self):
+        schema_file = Defaults.get_schema_file()
+        validators = XMLDescription._get_schema_validators(schema_file)
+        with patch('lxml.etree.RelaxNG') as mock_relax:
+            assert XMLDescription._get_schema_validators(
+                schema_file
+            ) is validators
+            assert not mock_relax.called
+
+    @patch('kiwi.xml_description.Defaults.get_description_cache_location')
+    @patch('kiwi.xml_description.RuntimeConfig')
+    def test_load_with_validation_cache(
+        self, mock_RuntimeConfig, mock_get_description_cache_location, tmpdir
+    ):
+        runtime_config = mock.Mock()
+        runtime_config.get_description_validation_cache.return_value = True
+        mock_RuntimeConfig.return_value = runtime_config
+        mock_get_description_cache_location.return_value = tmpdir.strpath
+        self.description_from_file.load()
+        assert len(tmpdir.join('validated').listdir()) == 1
+        with patch.object(XMLDescription, '_validate') as mock_validate:
+            self.description_from_file.load()
+            assert not mock_validate.called
+
+    @patch('os.makedirs')
+    def test_create_validation_stamp_failed(self, mock_makedirs):
+        mock_makedirs.side_effect = OSError('read-only')
+        with self._caplog.at_level(logging.DEBUG):
+            XMLDescription._create_validation_stamp('cache/validated/stamp')
+            assert 'Failed to store validation stamp: read-only' in \
+                self._caplog.text
+
     @patch('lxml.isoschematron.Schematron')
     @patch('lxml.etree.RelaxNG')
     @patch('lxml.etree.parse')
-    @patch('kiwi.xml_parse.parse')
+    @patch('kiwi.xml_parse.image.build')
     def test_load_data_structure_error(
         self, mock_xml_parse, mock_etree_parse, mock_relax, mock_schematron
     ):
@@ -9,6 +9,7 @@ from pytest import (
     raises, fixture
 )
 
+from kiwi import xml_parse
 from kiwi.defaults import Defaults
 from kiwi.xml_state import XMLState
 from kiwi.storage.disk import ptable_entry_type
@@ -265,6 +266,41 @@ class TestXMLState:
         assert self.state.xml_data.get_repository()[3] \
             .get_imageinclude() is True
 
+    def test_section_index(self):
+        self.state._invalidate_section_index()
+        with patch.object(
+            self.state, '_profiled', wraps=self.state._profiled
+        ) as mock_profiled:
+            repositories = self.state.get_repository_sections()
+            assert self.state.get_repository_sections() == repositories
+            assert self.state.get_repository_sections() is not repositories
+            assert mock_profiled.call_count == 1
+            self.state.add_repository('repo', 'type', 'alias', 1)
+            assert len(self.state.get_repository_sections()) == \
+                len(repositories) + 1
+            assert mock_profiled.call_count == 2
+            self.state.delete_repository_sections()
+            assert self.state.get_repository_sections() == []
+            self.state.profiles = ['vmxFlavour']
+            self.state.get_users_sections()
+            self.state.get_users_sections()
+            self.state.host_architecture = 'aarch64'
+            self.state.get_users_sections()
+            assert mock_profiled.call_count == 5
+
+    def test_get_package_sections_index(self):
+        packages_sections = self.state.get_bootstrap_packages_sections()
+        package_list = self.state.get_package_sections(packages_sections)
+        assert self.state.get_package_sections(packages_sections) == \
+            package_list
+        packages_sections[0].add_package(
+            xml_parse.package(name='foo')
+        )
+        assert len(self.state.get_package_sections(packages_sections)) == \
+            len(package_list) + 1
+        packages_sections[0].set_package([])
+        assert self.state.get_package_sections(packages_sections) == []
+
     def test_get_to_become_deleted_packages(self):
         assert self.state.get_to_become_deleted_packages() == [
             'kernel-debug'